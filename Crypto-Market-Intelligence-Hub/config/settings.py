@@ -33,10 +33,45 @@ class Settings(BaseSettings):
     secret_key: str = Field(default="changeme-in-production")
     allowed_origins: list[str] = Field(default=["http://localhost:3000", "http://localhost:8501"])
 
+    # ── Serving (src/api/serve.py) ───────────────────────────────────────────
+    serve_workers: int = Field(default=2, description="Worker processes forked by the serving master")
+    serve_snapshot_path: Path = Field(default=ROOT_DIR / "data" / "snapshots", description="Memory-mapped store snapshots")
+    serve_watch_seconds: float = Field(default=30.0, description="How often the master checks the data version")
+    serve_graceful_seconds: int = Field(default=30, description="Time a retiring worker has to finish requests")
+    serve_preload_models: list[str] = Field(default=["garch_params"], description="Registry objects loaded pre-fork")
+
     # ── External APIs ────────────────────────────────────────────────────────
     coinmarketcap_api_key: str = Field(default="")
     coingecko_api_key: str = Field(default="")  # optional — free tier works without key
 
+    # ── Live Quotes ──────────────────────────────────────────────────────────
+    quote_upstream: str = Field(default="coingecko", description="'coingecko' or 'stub' (local prices)")
+    quote_ttl_seconds: float = Field(default=15.0, description="Snapshot age served without refetching")
+    quote_max_stale_seconds: float = Field(default=3600.0, description="Oldest snapshot served on upstream failure")
+
+    # ── Ensemble ─────────────────────────────────────────────────────────────
+    ensemble_members: list[str] = Field(default=["arima", "prophet", "lstm", "gru"])
+    ensemble_deadline_seconds: float = Field(default=30.0, description="Budget for one ensemble forecast")
+    ensemble_member_timeout_seconds: float = Field(default=30.0, description="Budget per ensemble member")
+    ensemble_workers: int = Field(default=4, description="Worker processes shared by ensemble members")
+    ensemble_error_ttl_seconds: float = Field(default=86400.0, description="Age before backtest weights are refreshed")
+    ensemble_max_backtests: int = Field(default=2, description="Background weight backtests in flight at once")
+    ensemble_backtest_timeout_seconds: float = Field(default=120.0, description="Limit per background backtest")
+
+    # ── Admission Control ────────────────────────────────────────────────────
+    admission_global_rate: float = Field(default=2.0, description="CPU-seconds per second for model fits")
+    admission_global_burst: float = Field(default=240.0, description="Global CPU-seconds that may be spent at once")
+    admission_client_rate: float = Field(default=0.5, description="CPU-seconds per second per client")
+    admission_client_burst: float = Field(default=120.0, description="Per-client CPU-seconds that may be spent at once")
+    admission_max_queue_seconds: float = Field(default=30.0, description="Longest wait before a 429")
+    admission_max_concurrent: int = Field(default=2, description="Model fits running at once")
+    admission_api_keys: list[str] = Field(default=[], description="x-api-key values with their own budget")
+
+    # ── Forecast Ledger ──────────────────────────────────────────────────────
+    ledger_path: Path = Field(default=ROOT_DIR / "data" / "ledger", description="Issued-forecast ledger directory")
+    ledger_flush_rows: int = Field(default=5000, description="Buffered forecast rows that trigger a write")
+    ledger_flush_seconds: float = Field(default=5.0, description="Longest a forecast stays buffered")
+
     # ── MLflow / Experiment Tracking ─────────────────────────────────────────
     mlflow_tracking_uri: str = Field(default="")
 
@@ -44,6 +79,14 @@ class Settings(BaseSettings):
     redis_url: str = Field(default="redis://localhost:6379/0")
     cache_ttl_seconds: int = Field(default=300)
 
+    # ── Retraining ───────────────────────────────────────────────────────────
+    retrain_cpu_cores: int = Field(default=4, description="CPU cores shared by retraining jobs")
+    retrain_memory_mb: int = Field(default=4096, description="Memory budget for retraining jobs")
+    retrain_interval_hours: float = Field(default=6.0, description="Hours between retraining-service cycles")
+
+    # ── Risk ─────────────────────────────────────────────────────────────────
+    risk_memory_mb: int = Field(default=256, description="Working-memory budget per Monte-Carlo run")
+
     # ── Logging ──────────────────────────────────────────────────────────────
     log_level: str = Field(default="INFO")
     log_format: str = Field(default="json")  # "json" | "text"
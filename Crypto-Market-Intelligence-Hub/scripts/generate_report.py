@@ -43,6 +43,8 @@ from reportlab.platypus import (
 from reportlab.platypus.flowables import HRFlowable
 from reportlab.lib.colors import HexColor, white, black
 
+from src.data.resample import load_timeframe, resample_ohlcv
+
 # ── Paths ─────────────────────────────────────────────────────────────────────
 PROCESSED    = ROOT / "data" / "processed"
 SUMMARY_CSV  = ROOT / "notebooks" / "experiments" / "summary_by_asset.csv"
@@ -92,6 +94,15 @@ def load_all_assets() -> pd.DataFrame:
     return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
 
 
+def load_weekly(df_all: pd.DataFrame) -> pd.DataFrame:
+    """Weekly bars from the cached aggregate, resampling only if it is missing."""
+    try:
+        weekly = load_timeframe(PROCESSED, "1w")
+        return weekly[weekly["asset"].isin(df_all["asset"].unique())]
+    except FileNotFoundError:
+        return resample_ohlcv(df_all, "1w")
+
+
 def load_asset(name: str) -> pd.DataFrame:
     p = PROCESSED / f"{name}.parquet"
     if not p.exists():
@@ -342,19 +353,15 @@ def chart_rolling_corr(df_all: pd.DataFrame) -> Image:
     # Pick top assets by data length
     top_assets = ["bitcoin", "ethereum", "binance_coin", "cardano", "xrp",
                   "litecoin", "dogecoin", "solana", "tron", "chainlink"]
-    pivots = {}
-    for a in top_assets:
-        sub = df_all[df_all["asset"] == a].copy() if "asset" in df_all.columns else pd.DataFrame()
-        if sub.empty:
-            continue
-        sub["date"] = pd.to_datetime(sub["date"])
-        sub = sub.set_index("date")["close"].resample("W").last().pct_change()
-        pivots[a] = sub
-
-    if len(pivots) < 3:
+    if "asset" not in df_all.columns:
+        return None
+    weekly = load_weekly(df_all[df_all["asset"].isin(top_assets)])
+    px = weekly.pivot(index="date", columns="asset", values="close")
+    px = px[[a for a in top_assets if a in px.columns]]
+    if px.shape[1] < 3:
         return None
 
-    px = pd.DataFrame(pivots).dropna(how="all")
+    px = px.pct_change().dropna(how="all")
     corr = px.corr()
 
     fig, ax = dark_fig((10, 7))
@@ -0,0 +1,72 @@
+"""Nightly batched ARIMA refit for every asset.
+
+Usage:
+    python scripts/refit_arima.py              # shared (1,1,1) order, warm-started
+    python scripts/refit_arima.py --grid       # batched AIC grid search over p, q ≤ 3
+
+Fits all assets in one vectorised job (see src/models/batch_arima.py), warm-
+starting from the parameters saved by the previous run, and stores the new
+parameter table and forecasts in the model registry.
+"""
+from pathlib import Path
+import argparse
+import logging
+import sys
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import pandas as pd
+
+from src.utils.logger import setup_logging
+from src.data.load import load_all
+from src.data.clean import basic_clean
+from src.models.batch_arima import fit_arima_batch, grid_search_arima_batch
+from src.models.registry import load_sklearn, save_sklearn
+
+setup_logging()
+logger = logging.getLogger(__name__)
+
+PARAMS_NAME = "arima_batch_params"
+FORECAST_NAME = "arima_batch_forecast"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Batched nightly ARIMA refit")
+    parser.add_argument("--grid", action="store_true", help="Re-select (p,1,q) per asset by AIC")
+    parser.add_argument("--steps", type=int, default=30, help="Forecast horizon in days")
+    args = parser.parse_args()
+
+    models_dir = ROOT / "data" / "models"
+    df = basic_clean(load_all(str(ROOT / "data" / "raw")))
+    wide = df.pivot_table(index="date", columns="asset", values="close").sort_index()
+    logger.info("Refitting ARIMA for %d assets", wide.shape[1])
+
+    if args.grid:
+        best, fits = grid_search_arima_batch(wide)
+        params, forecasts = [], []
+        for order, assets in best.groupby(best).groups.items():
+            res = fits[order]
+            rows = [res.assets.index(a) for a in assets]
+            params.append(res.params_frame().iloc[rows])
+            fc = res.forecast(steps=args.steps)
+            forecasts.append(fc[fc["asset"].isin(assets)])
+        params_df = pd.concat(params)
+        forecast_df = pd.concat(forecasts, ignore_index=True)
+    else:
+        try:
+            previous = load_sklearn(PARAMS_NAME, models_dir)
+            previous = previous[previous["order"] == (1, 1, 1)]
+        except FileNotFoundError:
+            previous = None
+        res = fit_arima_batch(wide, order=(1, 1, 1), start_params=previous)
+        params_df = res.params_frame()
+        forecast_df = res.forecast(steps=args.steps)
+
+    save_sklearn(params_df, PARAMS_NAME, models_dir)
+    save_sklearn(forecast_df, FORECAST_NAME, models_dir)
+    logger.info("Batched ARIMA refit complete for %d assets", len(params_df))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Batched GARCH(1,1) volatility refit / daily update for every asset.
+
+Usage:
+    python scripts/refit_garch.py              # warm-started refit of all assets
+    python scripts/refit_garch.py --gjr        # GJR-GARCH(1,1) with leverage term
+    python scripts/refit_garch.py --update     # filter-only pass over new returns
+
+The refit estimates all assets in one vectorised job (see src/models/garch.py),
+warm-starting from the parameters saved by the previous run. ``--update`` keeps
+the stored parameters and only advances each asset's variance state, which is
+the cheap daily path between refits. Both store the parameter table and the
+volatility forecasts in the model registry, where ``/volatility/{asset}`` reads
+them.
+"""
+from pathlib import Path
+import argparse
+import logging
+import sys
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import numpy as np
+
+from src.utils.logger import setup_logging
+from src.data.load import load_all
+from src.data.clean import basic_clean
+from src.models.garch import fit_garch_batch, forecast_volatility, update_garch_state
+from src.models.registry import load_sklearn, save_sklearn
+
+setup_logging()
+logger = logging.getLogger(__name__)
+
+PARAMS_NAME = "garch_params"
+FORECAST_NAME = "garch_forecast"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Batched GARCH volatility refit")
+    parser.add_argument("--gjr", action="store_true", help="Fit GJR-GARCH(1,1) instead of GARCH(1,1)")
+    parser.add_argument("--update", action="store_true", help="Filter new returns with stored params")
+    parser.add_argument("--steps", type=int, default=30, help="Forecast horizon in days")
+    args = parser.parse_args()
+
+    models_dir = ROOT / "data" / "models"
+    df = basic_clean(load_all(str(ROOT / "data" / "raw")))
+    wide = df.pivot_table(index="date", columns="asset", values="close").sort_index()
+    returns = np.log(wide).diff()
+
+    try:
+        previous = load_sklearn(PARAMS_NAME, models_dir)
+    except FileNotFoundError:
+        previous = None
+
+    if args.update and previous is not None:
+        params = update_garch_state(previous, returns)
+    else:
+        if args.update:
+            logger.warning("No stored GARCH parameters; running a full fit instead")
+        logger.info("Refitting GARCH for %d assets", wide.shape[1])
+        params = fit_garch_batch(returns, asymmetric=args.gjr, start_params=previous).params_frame()
+
+    save_sklearn(params, PARAMS_NAME, models_dir)
+    save_sklearn(forecast_volatility(params, args.steps), FORECAST_NAME, models_dir)
+    logger.info("GARCH %s complete for %d assets", "update" if args.update else "refit", len(params))
+
+
+if __name__ == "__main__":
+    main()
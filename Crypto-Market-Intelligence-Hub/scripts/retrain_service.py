@@ -0,0 +1,119 @@
+"""Drift-triggered retraining service.
+
+Usage:
+    python scripts/retrain_service.py                   # cycle every RETRAIN_INTERVAL_HOURS
+    python scripts/retrain_service.py --once            # one cycle, then exit
+    python scripts/retrain_service.py --max-jobs 4      # cap retrains per cycle
+
+Tracks every (asset, model) pair saved in the model registry. A newly seen
+pair starts from the MAPE of its realised forecast-ledger points (run
+scripts/score_forecasts.py first) and its asset's trailing return volatility.
+Each cycle reloads prices, feeds newly realised ledger points and new daily
+returns into the drift detectors, and retrains only the degraded pairs (see
+src/models/retrain_scheduler.py). Detector state survives restarts in
+<models>/retrain_logs/scheduler_state.joblib.
+"""
+from pathlib import Path
+import argparse
+import logging
+import sys
+import time
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import pandas as pd
+
+from config.settings import get_settings
+from src.utils.logger import setup_logging
+from src.data.load import load_all
+from src.data.clean import basic_clean
+from src.data.ledger import REALIZED
+from src.models.registry import list_models
+from src.models.retrain_scheduler import (
+    DEFAULT_BASELINE_MAPE, MODEL_COSTS, RetrainScheduler, baseline_mapes, pipeline_trainer, return_scales,
+)
+
+setup_logging()
+logger = logging.getLogger(__name__)
+
+
+def registry_pairs(models_dir: Path) -> list[tuple[str, str]]:
+    """(asset, model) pairs with a saved model, from ``<asset>_<model>`` registry names."""
+    pairs = []
+    for name in list_models(models_dir):
+        asset, _, model = name.rpartition("_")
+        if asset and model in MODEL_COSTS:
+            pairs.append((asset, model))
+    return sorted(set(pairs))
+
+
+def register_new_pairs(sched: RetrainScheduler, models_dir: Path, prices: pd.DataFrame,
+                       realized: pd.DataFrame) -> list[tuple[str, str]]:
+    """Register registry pairs the scheduler does not track yet; return them."""
+    known_assets = {a for a, _ in sched.pairs}
+    new = [p for p in registry_pairs(models_dir) if p not in sched.pairs]
+    if not new:
+        return []
+    baselines = baseline_mapes(realized)
+    scales = return_scales(prices)
+    for asset, model in new:
+        sched.register(
+            asset, model,
+            baseline_mape=baselines.get((asset, model), DEFAULT_BASELINE_MAPE),
+            return_scale=scales.get(asset),
+        )
+    # History up to now sets the baselines; only what arrives later is live drift
+    if not realized.empty:
+        is_new = pd.Series(list(zip(realized["asset"], realized["model"]))).isin(new).to_numpy()
+        sched.sync_ledger(realized[is_new], observe=False)
+    new_assets = {a for a, _ in new} - known_assets
+    sched.sync_prices(prices[prices["asset"].isin(new_assets)], observe=False)
+    logger.info("Tracking %d new pairs: %s", len(new), new)
+    return new
+
+
+def run_once(sched: RetrainScheduler, state_path: Path, max_jobs: int | None) -> dict:
+    settings = get_settings()
+    prices = basic_clean(load_all(str(ROOT / "data" / "raw")))
+    realized_path = Path(settings.ledger_path) / REALIZED
+    realized = pd.read_parquet(realized_path) if realized_path.exists() else pd.DataFrame()
+
+    register_new_pairs(sched, settings.models_path, prices, realized)
+    n_points = sched.sync_ledger(realized)
+    n_returns = sched.sync_prices(prices)
+    logger.info("Fed %d realised forecasts and %d returns", n_points, n_returns)
+
+    sched.trainer = pipeline_trainer(prices, settings.models_path)
+    summary = sched.run_cycle(max_jobs=max_jobs)
+    sched.save_state(state_path)
+    return summary
+
+
+def main() -> None:
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description="Drift-triggered retraining service")
+    parser.add_argument("--once", action="store_true", help="Run one cycle and exit")
+    parser.add_argument("--interval", type=float, default=settings.retrain_interval_hours,
+                        help="Hours between cycles")
+    parser.add_argument("--max-jobs", type=int, default=None, help="Retrains per cycle")
+    args = parser.parse_args()
+
+    state_path = settings.models_path / "retrain_logs" / "scheduler_state.joblib"
+    sched = RetrainScheduler(trainer=lambda asset, model: None)
+    if state_path.exists():
+        sched.load_state(state_path)
+        logger.info("Restored scheduler state for %d pairs ← %s", len(sched.pairs), state_path)
+
+    while True:
+        try:
+            run_once(sched, state_path, args.max_jobs)
+        except Exception:  # noqa: BLE001 — keep the service alive; retry next cycle
+            logger.exception("Retrain cycle failed")
+        if args.once:
+            break
+        time.sleep(args.interval * 3600)
+
+
+if __name__ == "__main__":
+    main()
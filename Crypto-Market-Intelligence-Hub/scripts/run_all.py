@@ -17,6 +17,7 @@ from src.utils.logger import setup_logging
 from src.data.load import load_all
 from src.data.clean import basic_clean
 from src.data.store import save_parquet, save_asset_parquet
+from src.data.resample import TIMEFRAMES, aggregate_path, build_aggregate_cache, update_aggregate_cache
 from src.features.returns import add_return_features
 from src.features.technical import add_technical_indicators
 from src.models.evaluate import summary_by_asset
@@ -45,6 +46,12 @@ def main() -> None:
 
     df = basic_clean(df)
     logger.info("After cleaning: %d rows", len(df))
+    # Fold new bars into the cached aggregates; full rebuild only on first run.
+    # df is the full base history, so restated bars and missing timeframes are rebuilt from it.
+    if any(aggregate_path(processed_dir, tf).exists() for tf in TIMEFRAMES):
+        update_aggregate_cache(df, processed_dir, history=df)
+    else:
+        build_aggregate_cache(df, processed_dir)
 
     # ── Feature Engineering ───────────────────────────────────────────────────
     df = add_return_features(df, windows=[7, 14, 30, 90])
@@ -0,0 +1,56 @@
+"""Daily all-pairs cointegration scan.
+
+Usage:
+    python scripts/scan_pairs.py                    # default two-year window
+    python scripts/scan_pairs.py --lookback 365 --min-corr 0.9
+
+Screens every asset pair by log-price correlation, runs Engle-Granger tests on
+the survivors in a process pool (see src/models/cointegration.py) and writes
+the ranked pairs to notebooks/experiments/cointegrated_pairs.csv. Results are
+cached by data version under data/processed/cointegration/, so re-running on
+unchanged data returns immediately.
+"""
+from pathlib import Path
+import argparse
+import logging
+import sys
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from src.utils.logger import setup_logging
+from src.data.load import load_all
+from src.data.clean import basic_clean
+from src.models.cointegration import scan_cointegration
+
+setup_logging()
+logger = logging.getLogger(__name__)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="All-pairs cointegration scan")
+    parser.add_argument("--lookback", type=int, default=730, help="Days of history to test")
+    parser.add_argument("--min-corr", type=float, default=0.8, help="Log-price correlation screen")
+    parser.add_argument("--max-pvalue", type=float, default=0.05, help="Engle-Granger p-value cut-off")
+    parser.add_argument("--jobs", type=int, default=None, help="Worker processes (default: all cores)")
+    args = parser.parse_args()
+
+    df = basic_clean(load_all(str(ROOT / "data" / "raw")))
+    pairs = scan_cointegration(
+        df,
+        lookback=args.lookback,
+        min_corr=args.min_corr,
+        max_pvalue=args.max_pvalue,
+        n_jobs=args.jobs,
+        cache_dir=ROOT / "data" / "processed" / "cointegration",
+    )
+
+    out = ROOT / "notebooks" / "experiments" / "cointegrated_pairs.csv"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    pairs.to_csv(out, index=False)
+    logger.info("Wrote %d cointegrated pairs -> %s", len(pairs), out)
+    print(pairs.head(20).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
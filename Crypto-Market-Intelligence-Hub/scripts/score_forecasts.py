@@ -0,0 +1,52 @@
+"""Score issued forecasts against realized prices.
+
+Usage:
+    python scripts/score_forecasts.py            # join new actuals, rebuild accuracy tables
+    python scripts/score_forecasts.py --compact  # also merge closed ledger partitions
+
+Run after each data refresh. Only forecast points whose target dates are newly
+realized are joined (see src/data/ledger.py). Accuracy by model, version and
+horizon is written to the ledger's accuracy_by_horizon.parquet and
+notebooks/experiments/forecast_accuracy.csv.
+"""
+from pathlib import Path
+import argparse
+import logging
+import sys
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from config.settings import get_settings
+from src.utils.logger import setup_logging
+from src.data.load import load_all
+from src.data.clean import basic_clean
+from src.data.ledger import ForecastLedger, score_ledger
+
+setup_logging()
+logger = logging.getLogger(__name__)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Score the forecast ledger")
+    parser.add_argument("--compact", action="store_true", help="Merge files of closed partitions first")
+    args = parser.parse_args()
+
+    ledger_dir = get_settings().ledger_path
+    if args.compact:
+        ledger = ForecastLedger(ledger_dir)
+        ledger.close()
+        logger.info("Compacted %d ledger partitions", ledger.compact())
+
+    prices = basic_clean(load_all(str(ROOT / "data" / "raw")))
+    accuracy = score_ledger(ledger_dir, prices)
+    if accuracy.empty:
+        return
+    out = ROOT / "notebooks" / "experiments" / "forecast_accuracy.csv"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    accuracy.to_csv(out, index=False)
+    logger.info("Accuracy by horizon → %s", out)
+
+
+if __name__ == "__main__":
+    main()
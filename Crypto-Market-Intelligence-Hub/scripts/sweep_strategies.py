@@ -0,0 +1,67 @@
+"""Indicator-strategy parameter sweeps across the universe.
+
+Usage:
+    python scripts/sweep_strategies.py                  # RSI, 10k combinations
+    python scripts/sweep_strategies.py --strategy macd --fee-bps 5
+
+Backtests every parameter combination of the chosen rule on every asset with
+fees and slippage (see src/models/backtest.py) and writes the results to
+notebooks/experiments/sweep_<strategy>.csv.
+"""
+from pathlib import Path
+import argparse
+import logging
+import sys
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from src.utils.logger import setup_logging
+from src.data.load import load_all
+from src.data.clean import basic_clean
+from src.models.backtest import SWEEPS, sweep_assets
+
+setup_logging()
+logger = logging.getLogger(__name__)
+
+GRIDS = {
+    "rsi": {
+        "periods": range(2, 52),
+        "lowers": np.linspace(10, 45, 10),
+        "uppers": np.linspace(55, 95, 20),
+    },
+    "macd": {"fasts": range(4, 20), "slows": range(20, 60, 2), "signals": range(5, 15)},
+    "bollinger": {"windows": range(5, 105), "num_stds": np.linspace(0.5, 3.0, 26)},
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Indicator-strategy parameter sweeps")
+    parser.add_argument("--strategy", choices=list(SWEEPS), default="rsi")
+    parser.add_argument("--fee-bps", type=float, default=10.0, help="Fee per trade (bps)")
+    parser.add_argument("--slippage-bps", type=float, default=5.0, help="Slippage per trade (bps)")
+    parser.add_argument("--assets", nargs="*", default=None, help="Subset of assets")
+    args = parser.parse_args()
+
+    df = basic_clean(load_all(str(ROOT / "data" / "raw")))
+    results = sweep_assets(
+        df,
+        args.strategy,
+        GRIDS[args.strategy],
+        assets=args.assets,
+        fee_bps=args.fee_bps,
+        slippage_bps=args.slippage_bps,
+    )
+
+    out = ROOT / "notebooks" / "experiments" / f"sweep_{args.strategy}.csv"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    results.to_csv(out, index=False)
+    logger.info("Wrote %d sweep results -> %s", len(results), out)
+    best = results.sort_values("sharpe_ratio", ascending=False).groupby("asset").head(1)
+    print(best.head(20).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Train one global LSTM/GRU across every asset.
+
+Usage:
+    python scripts/train_global_rnn.py                 # global LSTM
+    python scripts/train_global_rnn.py --cell gru      # global GRU
+
+Replaces the per-asset networks of run_lstm_pipeline / run_gru_pipeline with a
+single model (see src/models/global_rnn.py). An interrupted run resumes from
+its last completed epoch when restarted.
+"""
+from pathlib import Path
+import argparse
+import logging
+import sys
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from src.utils.logger import setup_logging
+from src.data.load import load_all
+from src.data.clean import basic_clean
+from src.models.global_rnn import CELLS, run_global_pipeline
+
+setup_logging()
+logger = logging.getLogger(__name__)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Train a global multi-asset RNN")
+    parser.add_argument("--cell", choices=CELLS, default="lstm")
+    parser.add_argument("--seq-len", type=int, default=60)
+    parser.add_argument("--epochs", type=int, default=50)
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--steps", type=int, default=30, help="Forecast horizon in days")
+    args = parser.parse_args()
+
+    models_dir = ROOT / "data" / "models"
+    df = basic_clean(load_all(str(ROOT / "data" / "raw")))
+    result = run_global_pipeline(
+        df,
+        cell=args.cell,
+        seq_len=args.seq_len,
+        forecast_steps=args.steps,
+        epochs=args.epochs,
+        batch_size=args.batch_size,
+        models_dir=models_dir,
+    )
+    out = ROOT / "notebooks" / "experiments" / f"global_{args.cell}_metrics.csv"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    result["metrics"].to_csv(out, index=False)
+    logger.info("Per-asset metrics → %s", out)
+
+
+if __name__ == "__main__":
+    main()
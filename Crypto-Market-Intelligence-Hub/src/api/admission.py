@@ -0,0 +1,312 @@
+"""Cost-aware admission control for expensive forecast requests.
+
+Costs are measured in CPU-seconds. Each model's cost is an exponentially
+weighted average of its observed runtimes, seeded with rough defaults. A
+request must draw its cost from two token buckets: its client's, which stops
+one caller from monopolising the server, and a global one, which refills at
+the number of cores set aside for model fits.
+
+Clients are identified by a configured API key sent as ``x-api-key``, or by
+their remote address when no configured key is given. An unknown key does not
+buy a fresh budget.
+
+If the buckets are short, the request may go into debt and wait for them to
+refill, but only for up to ``max_queue_seconds``. A longer wait is rejected
+immediately with the time after which it would be admitted, and the router
+returns that as ``Retry-After``. At most ``max_concurrent`` fits run at once,
+and they run in worker threads. A request that was admitted but then finds no
+free slot in time gets its tokens back. That leaves the event loop, and cheap
+endpoints such as ``/history``, responsive.
+
+Work a fit leaves running after it returns (the ensemble's background
+backtests) is billed to the same buckets with :meth:`AdmissionController.charge`
+once it finishes.
+
+Forecasts are cached for ``cache_ttl_seconds`` (:class:`PredictionCache`).
+Cache hits are served before admission and draw no tokens.
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import hmac
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Callable, Hashable, Iterable
+
+logger = logging.getLogger(__name__)
+
+# CPU-seconds per request before any runtime has been observed
+DEFAULT_COSTS = {
+    "arima": 5.0,
+    "prophet": 10.0,
+    "lstm": 60.0,
+    "gru": 60.0,
+    "global_lstm": 1.0,
+    "global_gru": 1.0,
+    "ensemble": 120.0,
+}
+
+
+class AdmissionRejected(RuntimeError):
+    """The request is over budget; retry after ``retry_after`` seconds."""
+
+    def __init__(self, message: str, retry_after: float) -> None:
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """Token bucket that may be overdrawn by queued reservations.
+
+    Parameters
+    ----------
+    rate : float
+        Tokens added per second.
+    capacity : float
+        Maximum tokens held (the burst size).
+    """
+
+    def __init__(self, rate: float, capacity: float, clock: Callable[[], float] = time.monotonic) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self.clock = clock
+        self.tokens = capacity
+        self._updated = clock()
+
+    def _refill(self) -> None:
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_for(self, cost: float) -> float:
+        """Seconds until *cost* tokens are available (0 if they are now)."""
+        self._refill()
+        return max(min(cost, self.capacity) - self.tokens, 0.0) / self.rate
+
+    def take(self, cost: float) -> None:
+        """Withdraw *cost* tokens, going negative if needed (call :meth:`wait_for` first)."""
+        self._refill()
+        self.tokens -= min(cost, self.capacity)
+
+    def give(self, cost: float) -> None:
+        """Return tokens taken by :meth:`take` for work that never ran."""
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens + min(cost, self.capacity))
+
+
+@dataclass
+class CostModel:
+    """Per-model runtime estimate (EWMA of observed seconds)."""
+
+    defaults: dict[str, float] = field(default_factory=lambda: dict(DEFAULT_COSTS))
+    alpha: float = 0.3
+    fallback: float = 10.0
+
+    def __post_init__(self) -> None:
+        self._estimates: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def estimate(self, model: str) -> float:
+        with self._lock:
+            return self._estimates.get(model, self.defaults.get(model, self.fallback))
+
+    def observe(self, model: str, seconds: float) -> None:
+        with self._lock:
+            prev = self._estimates.get(model)
+            self._estimates[model] = seconds if prev is None else prev + self.alpha * (seconds - prev)
+
+
+@dataclass
+class AdmissionStats:
+    admitted: int = 0
+    queued: int = 0
+    rejected: int = 0
+
+
+class AdmissionController:
+    """Per-client and global token buckets plus a cap on concurrent fits.
+
+    Parameters
+    ----------
+    global_rate : float
+        CPU-seconds per second available to fits (≈ cores reserved for them).
+    global_burst : float
+        CPU-seconds that may be spent at once after an idle period.
+    client_rate, client_burst : float
+        The same budget for each client.
+    max_queue_seconds : float
+        Longest a request may wait for tokens or a free slot before rejection.
+    max_concurrent : int
+        Fits running at the same time.
+    api_keys : Iterable[str]
+        Keys accepted in ``x-api-key``; each gets its own client budget.
+    """
+
+    def __init__(
+        self,
+        global_rate: float = 2.0,
+        global_burst: float = 240.0,
+        client_rate: float = 0.5,
+        client_burst: float = 120.0,
+        max_queue_seconds: float = 30.0,
+        max_concurrent: int = 2,
+        costs: CostModel | None = None,
+        clock: Callable[[], float] = time.monotonic,
+        max_clients: int = 10_000,
+        api_keys: Iterable[str] = (),
+    ) -> None:
+        self.client_rate = client_rate
+        self.client_burst = client_burst
+        self.max_queue_seconds = max_queue_seconds
+        self.costs = costs or CostModel()
+        self.clock = clock
+        self.max_clients = max_clients
+        self._api_keys = [k.encode() for k in api_keys if k]
+        self.stats = AdmissionStats()
+        self._global = TokenBucket(global_rate, global_burst, clock)
+        self._clients: OrderedDict[str, TokenBucket] = OrderedDict()
+        self._slots = threading.BoundedSemaphore(max_concurrent)
+        self._lock = threading.Lock()
+
+    def identify(self, api_key: str | None, remote: str | None) -> str:
+        """Client identity: the configured key presented, else the remote address."""
+        if api_key:
+            presented = api_key.encode()
+            if any(hmac.compare_digest(presented, k) for k in self._api_keys):
+                return "key:" + hashlib.sha256(presented).hexdigest()[:16]
+        return f"ip:{remote or 'unknown'}"
+
+    def _client(self, client: str) -> TokenBucket:
+        bucket = self._clients.get(client)
+        if bucket is None:
+            bucket = self._clients[client] = TokenBucket(self.client_rate, self.client_burst, self.clock)
+            if len(self._clients) > self.max_clients:
+                self._clients.popitem(last=False)
+        self._clients.move_to_end(client)
+        return bucket
+
+    def reserve(self, client: str, model: str) -> float:
+        """Take *model*'s cost from both buckets; return the seconds to wait first.
+
+        Raises
+        ------
+        AdmissionRejected
+            If either bucket would need longer than ``max_queue_seconds``.
+        """
+        return self._reserve(client, model)[0]
+
+    def _reserve(self, client: str, model: str) -> tuple[float, float]:
+        cost = self.costs.estimate(model)
+        with self._lock:
+            bucket = self._client(client)
+            waits = {"client": bucket.wait_for(cost), "global": self._global.wait_for(cost)}
+            wait = max(waits.values())
+            if wait > self.max_queue_seconds:
+                self.stats.rejected += 1
+                scope = max(waits, key=waits.get)
+                raise AdmissionRejected(
+                    f"{scope} forecast budget exhausted ({model} ≈ {cost:.0f} CPU-s)",
+                    retry_after=wait - self.max_queue_seconds,
+                )
+            bucket.take(cost)
+            self._global.take(cost)
+            self.stats.admitted += 1
+            self.stats.queued += wait > 0
+        return wait, cost
+
+    def refund(self, client: str, cost: float) -> None:
+        """Give back tokens reserved for a request that was rejected before running."""
+        with self._lock:
+            self._client(client).give(cost)
+            self._global.give(cost)
+            self.stats.admitted -= 1
+
+    def charge(self, client: str, seconds: float) -> None:
+        """Debit CPU-seconds spent outside :meth:`run`, e.g. background jobs a request started.
+
+        Never rejects; the buckets may go negative and later requests wait.
+        """
+        with self._lock:
+            self._client(client).take(seconds)
+            self._global.take(seconds)
+
+    @asynccontextmanager
+    async def admit(self, client: str, model: str) -> AsyncIterator[float]:
+        """Wait for budget; yields the remaining queue time for :meth:`run`.
+
+        If the body raises :class:`AdmissionRejected` (no fit slot freed up in
+        time), or the request is cancelled while queued (client disconnect),
+        the reserved tokens are refunded.
+        """
+        t0 = self.clock()
+        wait, cost = self._reserve(client, model)
+        if wait > 0:
+            logger.info("Queueing %s request from %s for %.1fs", model, client, wait)
+            try:
+                await asyncio.sleep(wait)
+            except asyncio.CancelledError:
+                self.refund(client, cost)
+                raise
+        try:
+            yield max(self.max_queue_seconds - (self.clock() - t0), 0.0)
+        except AdmissionRejected:
+            self.refund(client, cost)
+            raise
+
+    async def run(self, model: str, fn: Callable[..., Any], *args: Any, slot_timeout: float = 0.0) -> Any:
+        """Run ``fn(*args)`` in a worker thread once a fit slot is free; record its runtime."""
+        from starlette.concurrency import run_in_threadpool
+
+        def guarded() -> Any:
+            if not self._slots.acquire(timeout=slot_timeout):
+                with self._lock:
+                    self.stats.rejected += 1
+                raise AdmissionRejected(
+                    "All forecast workers are busy", retry_after=self.costs.estimate(model)
+                )
+            try:
+                start = time.perf_counter()
+                result = fn(*args)
+                self.costs.observe(model, time.perf_counter() - start)
+                return result
+            finally:
+                self._slots.release()
+
+        return await run_in_threadpool(guarded)
+
+
+def retry_after_header(exc: AdmissionRejected) -> dict[str, str]:
+    return {"Retry-After": str(max(1, math.ceil(exc.retry_after)))}
+
+
+class PredictionCache:
+    """Small LRU of recent forecasts with a TTL."""
+
+    def __init__(self, ttl_seconds: float = 300.0, maxsize: int = 512, clock: Callable[[], float] = time.monotonic) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.maxsize = maxsize
+        self.clock = clock
+        self._items: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Any | None:
+        with self._lock:
+            item = self._items.get(key)
+            if item is None or self.clock() - item[0] > self.ttl_seconds:
+                self._items.pop(key, None)
+                return None
+            self._items.move_to_end(key)
+            return item[1]
+
+    def put(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._items[key] = (self.clock(), value)
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
@@ -1,12 +1,17 @@
 """Shared FastAPI dependencies."""
 from __future__ import annotations
 
+from functools import lru_cache
 from pathlib import Path
 from typing import Annotated
 
 from fastapi import Depends
 
 from config.settings import Settings, get_settings
+from src.api.admission import AdmissionController, PredictionCache
+from src.data.ledger import ForecastLedger
+from src.data.quotes import QuoteService
+from src.models.ensemble import ErrorCache, configure_pool
 
 
 def get_data_path(settings: Annotated[Settings, Depends(get_settings)]) -> Path:
@@ -17,3 +22,71 @@ def get_data_path(settings: Annotated[Settings, Depends(get_settings)]) -> Path:
 def get_processed_path(settings: Annotated[Settings, Depends(get_settings)]) -> Path:
     """Return the processed data directory path."""
     return settings.data_processed_dir
+
+
+def get_models_path(settings: Annotated[Settings, Depends(get_settings)]) -> Path:
+    """Return the model registry directory path."""
+    return settings.models_path
+
+
+@lru_cache(maxsize=1)
+def get_quote_service() -> QuoteService:
+    """Return the process-wide live quote service (one cache per process)."""
+    settings = get_settings()
+    if settings.quote_upstream == "stub":
+        from src.data.quotes import StubUpstream
+        upstream = StubUpstream.from_store(settings.data_processed_dir)
+    else:
+        from functools import partial
+
+        from src.data.fetch import fetch_simple_prices
+        upstream = partial(fetch_simple_prices, api_key=settings.coingecko_api_key)
+    return QuoteService(
+        upstream,
+        ttl_seconds=settings.quote_ttl_seconds,
+        max_stale_seconds=settings.quote_max_stale_seconds,
+    )
+
+
+@lru_cache(maxsize=1)
+def get_ensemble_errors() -> ErrorCache:
+    """Return the process-wide ensemble backtest error cache (persisted in the registry)."""
+    settings = get_settings()
+    configure_pool(settings.ensemble_workers)
+    return ErrorCache(
+        settings.ensemble_error_ttl_seconds,
+        directory=settings.models_path,
+        max_backtests=settings.ensemble_max_backtests,
+    )
+
+
+@lru_cache(maxsize=1)
+def get_forecast_ledger() -> ForecastLedger:
+    """Return the process-wide forecast ledger (writes in a background thread)."""
+    settings = get_settings()
+    return ForecastLedger(
+        settings.ledger_path,
+        flush_rows=settings.ledger_flush_rows,
+        flush_seconds=settings.ledger_flush_seconds,
+    )
+
+
+@lru_cache(maxsize=1)
+def get_admission_controller() -> AdmissionController:
+    """Return the process-wide admission controller for model fits."""
+    settings = get_settings()
+    return AdmissionController(
+        global_rate=settings.admission_global_rate,
+        global_burst=settings.admission_global_burst,
+        client_rate=settings.admission_client_rate,
+        client_burst=settings.admission_client_burst,
+        max_queue_seconds=settings.admission_max_queue_seconds,
+        max_concurrent=settings.admission_max_concurrent,
+        api_keys=settings.admission_api_keys,
+    )
+
+
+@lru_cache(maxsize=1)
+def get_prediction_cache() -> PredictionCache:
+    """Return the process-wide cache of recent forecasts."""
+    return PredictionCache(ttl_seconds=get_settings().cache_ttl_seconds)
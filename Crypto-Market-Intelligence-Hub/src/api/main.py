@@ -9,8 +9,11 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 
 from config.settings import get_settings
+from src.api.dependencies import get_forecast_ledger
 from src.utils.logger import setup_logging
-from src.api.routers import health, historical, predictions
+from src.api.routers import (
+    export, health, historical, predictions, quotes, risk, similarity, volatility,
+)
 
 setup_logging()
 logger = logging.getLogger(__name__)
@@ -23,6 +26,8 @@ async def lifespan(app: FastAPI):
     logger.info("🚀 Crypto Market Intelligence Hub API starting up…")
     logger.info("Environment: %s | Data path: %s", settings.environment, settings.data_path)
     yield
+    if get_forecast_ledger.cache_info().currsize:
+        get_forecast_ledger().close()
     logger.info("👋 API shutting down.")
 
 
@@ -51,6 +56,11 @@ app.add_middleware(
 app.include_router(health.router, prefix="/api/v1", tags=["Health"])
 app.include_router(historical.router, prefix="/api/v1", tags=["Historical"])
 app.include_router(predictions.router, prefix="/api/v1", tags=["Predictions"])
+app.include_router(volatility.router, prefix="/api/v1", tags=["Volatility"])
+app.include_router(risk.router, prefix="/api/v1", tags=["Risk"])
+app.include_router(export.router, prefix="/api/v1", tags=["Export"])
+app.include_router(similarity.router, prefix="/api/v1", tags=["Similarity"])
+app.include_router(quotes.router, prefix="/api/v1", tags=["Quotes"])
 
 
 @app.exception_handler(404)
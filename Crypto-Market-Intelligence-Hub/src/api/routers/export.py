@@ -0,0 +1,113 @@
+"""Bulk history export router — Arrow IPC / Parquet streams and paged JSON."""
+from __future__ import annotations
+
+import json
+import logging
+from pathlib import Path
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import Response, StreamingResponse
+
+from src.api.dependencies import get_processed_path
+from src.data.export import (
+    EXPORT_FORMATS,
+    read_page,
+    scan_history,
+    stream_arrow,
+    stream_parquet,
+)
+from src.data.resample import BASE_TIMEFRAME, TIMEFRAMES
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+_MEDIA_TYPES = {
+    "arrow": ("application/vnd.apache.arrow.stream", "arrows"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+
+
+def _split(value: Optional[str]) -> Optional[list[str]]:
+    if not value:
+        return None
+    return [v.strip().lower() for v in value.split(",") if v.strip()]
+
+
+def _check_timeframe(timeframe: str) -> None:
+    if timeframe not in TIMEFRAMES:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Unknown timeframe '{timeframe}'. Available: {list(TIMEFRAMES)}",
+        )
+
+
+@router.get("/export", summary="Stream bulk history as Arrow IPC or Parquet")
+def export_history(
+    assets: Optional[str] = Query(None, description="Comma-separated assets (default: all)"),
+    start: Optional[str] = Query(None, description="Start date (YYYY-MM-DD)"),
+    end: Optional[str] = Query(None, description="End date (YYYY-MM-DD)"),
+    columns: Optional[str] = Query(None, description="Comma-separated columns (default: OHLCV)"),
+    timeframe: str = Query(BASE_TIMEFRAME, description="Bar size: 1h, 4h, 1d, 1w or 1mo"),
+    format: str = Query("arrow", description="arrow (IPC stream) or parquet"),
+    processed_path: Path = Depends(get_processed_path),
+) -> StreamingResponse:
+    """Stream every matching row in a single response, one record batch at a time."""
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=422, detail=f"format must be one of {list(EXPORT_FORMATS)}")
+    _check_timeframe(timeframe)
+    logger.info("GET /export  assets=%s format=%s timeframe=%s", assets, format, timeframe)
+    try:
+        schema, batches = scan_history(
+            processed_path, _split(assets), start, end, _split(columns), timeframe
+        )
+    except FileNotFoundError as exc:
+        raise HTTPException(status_code=404, detail=str(exc))
+    except (KeyError, ValueError) as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+
+    media_type, ext = _MEDIA_TYPES[format]
+    encoder = stream_arrow if format == "arrow" else stream_parquet
+    return StreamingResponse(
+        encoder(schema, batches),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="history_{timeframe}.{ext}"'},
+    )
+
+
+@router.get("/export/json", summary="Page through bulk history as JSON")
+def export_history_json(
+    assets: Optional[str] = Query(None, description="Comma-separated assets (default: all)"),
+    start: Optional[str] = Query(None, description="Start date (YYYY-MM-DD)"),
+    end: Optional[str] = Query(None, description="End date (YYYY-MM-DD)"),
+    columns: Optional[str] = Query(None, description="Comma-separated columns (default: OHLCV)"),
+    timeframe: str = Query(BASE_TIMEFRAME, description="Bar size: 1h, 4h, 1d, 1w or 1mo"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the previous page"),
+    limit: int = Query(10_000, ge=1, le=100_000, description="Rows per page"),
+    processed_path: Path = Depends(get_processed_path),
+) -> Response:
+    """Return one page of rows ordered by (asset, date) plus ``next_cursor``."""
+    _check_timeframe(timeframe)
+    try:
+        page, next_cursor = read_page(
+            processed_path,
+            limit,
+            cursor,
+            assets=_split(assets),
+            start=start,
+            end=end,
+            columns=_split(columns),
+            timeframe=timeframe,
+        )
+    except FileNotFoundError as exc:
+        raise HTTPException(status_code=404, detail=str(exc))
+    except (KeyError, ValueError) as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+
+    # Serialise column-wise in pandas rather than building per-row models
+    body = (
+        '{"data":' + page.to_json(orient="records", date_format="iso")
+        + ',"count":' + str(len(page))
+        + ',"next_cursor":' + json.dumps(next_cursor) + "}"
+    )
+    return Response(content=body, media_type="application/json")
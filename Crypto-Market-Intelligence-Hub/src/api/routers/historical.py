@@ -8,9 +8,10 @@ from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException, Query
 
 from src.api.schemas import HistoricalResponse, OHLCVRecord, AssetSummary
-from src.api.dependencies import get_data_path
+from src.api.dependencies import get_data_path, get_processed_path
 from src.data.load import load_all
 from src.data.clean import basic_clean
+from src.data.resample import BASE_TIMEFRAME, TIMEFRAMES, load_timeframe, resample_ohlcv
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -32,6 +33,28 @@ def _load_asset(data_path: Path, asset: str):
     return basic_clean(df)
 
 
+def _load_asset_timeframe(data_path: Path, processed_path: Path, asset: str, timeframe: str):
+    """Load *asset* bars at *timeframe*, preferring the cached aggregate."""
+    if timeframe not in TIMEFRAMES:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Unknown timeframe '{timeframe}'. Available: {list(TIMEFRAMES)}",
+        )
+    if timeframe == BASE_TIMEFRAME:
+        return _load_asset(data_path, asset)
+    try:
+        df = load_timeframe(processed_path, timeframe, asset)
+        if not df.empty:
+            return df
+    except FileNotFoundError:
+        pass
+    logger.debug("No cached %s aggregate for %s; resampling raw bars", timeframe, asset)
+    try:
+        return resample_ohlcv(_load_asset(data_path, asset), timeframe)
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc)) from exc
+
+
 @router.get(
     "/history/{asset}",
     response_model=HistoricalResponse,
@@ -42,14 +65,21 @@ async def get_history(
     start: Optional[str] = Query(None, description="Start date (YYYY-MM-DD)"),
     end: Optional[str] = Query(None, description="End date (YYYY-MM-DD)"),
     limit: int = Query(500, ge=1, le=5000, description="Max rows to return"),
+    timeframe: str = Query(BASE_TIMEFRAME, description="Bar size: 1h, 4h, 1d, 1w or 1mo"),
     data_path: Path = Depends(get_data_path),
+    processed_path: Path = Depends(get_processed_path),
 ) -> HistoricalResponse:
     """Return historical OHLCV records for *asset*.
 
-    Filters by date range and limits the number of rows returned.
+    Filters by date range and limits the number of rows returned. Non-daily
+    timeframes are served from the cached aggregates built by
+    ``src.data.resample.build_aggregate_cache``.
     """
-    logger.info("GET /history/%s  start=%s end=%s limit=%d", asset, start, end, limit)
-    df = _load_asset(data_path, asset.lower())
+    logger.info(
+        "GET /history/%s  start=%s end=%s limit=%d timeframe=%s",
+        asset, start, end, limit, timeframe,
+    )
+    df = _load_asset_timeframe(data_path, processed_path, asset.lower(), timeframe)
 
     if start:
         import pandas as pd
@@ -75,6 +105,7 @@ async def get_history(
 
     return HistoricalResponse(
         asset=asset,
+        timeframe=timeframe,
         records=records,
         total=len(records),
         start_date=records[0].date if records else None,
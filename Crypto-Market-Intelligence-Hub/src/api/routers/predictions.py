@@ -2,20 +2,28 @@
 from __future__ import annotations
 
 import logging
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
+from functools import partial
 from pathlib import Path
+from typing import Callable
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 
+from src import __version__
 from src.api.schemas import PredictionRequest, PredictionResponse, ForecastPoint
-from src.api.dependencies import get_data_path
+from src.api.admission import AdmissionController, AdmissionRejected, PredictionCache, retry_after_header
+from src.api.dependencies import (
+    get_admission_controller, get_data_path, get_forecast_ledger, get_prediction_cache,
+)
+from src.data.ledger import ForecastLedger
 from src.data.load import load_all
 from src.data.clean import basic_clean
+from src.models.ensemble import EnsembleUnavailable
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
-SUPPORTED_MODELS = {"arima", "prophet", "lstm", "gru"}
+SUPPORTED_MODELS = {"arima", "prophet", "lstm", "gru", "global_lstm", "global_gru", "ensemble"}
 
 
 @router.post(
@@ -25,13 +33,21 @@ SUPPORTED_MODELS = {"arima", "prophet", "lstm", "gru"}
 )
 async def predict(
     request: PredictionRequest,
+    http_request: Request,
     data_path: Path = Depends(get_data_path),
+    ledger: ForecastLedger = Depends(get_forecast_ledger),
+    admission: AdmissionController = Depends(get_admission_controller),
+    cache: PredictionCache = Depends(get_prediction_cache),
 ) -> PredictionResponse:
     """Run the specified forecasting model and return a price forecast.
 
     - **asset**: crypto asset identifier (e.g. ``bitcoin``)
-    - **model**: ``arima`` | ``prophet`` | ``lstm`` | ``gru``
+    - **model**: ``arima`` | ``prophet`` | ``lstm`` | ``gru`` | ``global_lstm`` | ``global_gru`` | ``ensemble``
     - **horizon**: number of days to forecast (1–90)
+
+    Repeated requests are served from a short-lived cache. Other requests
+    pass cost-aware admission control and get **429** with ``Retry-After``
+    when the caller or the server is over its forecasting budget.
     """
     if request.model not in SUPPORTED_MODELS:
         raise HTTPException(
@@ -41,39 +57,89 @@ async def predict(
 
     logger.info("POST /predict  asset=%s model=%s horizon=%d", request.asset, request.model, request.horizon)
 
-    # Load data
     asset_file = data_path / f"{request.asset}.csv"
     if not asset_file.exists():
         raise HTTPException(status_code=404, detail=f"Asset '{request.asset}' not found.")
 
-    import pandas as pd
-    df = pd.read_csv(asset_file)
-    df.columns = [c.lower() for c in df.columns]
-    if "date" in df.columns:
-        df["date"] = pd.to_datetime(df["date"])
-    df["asset"] = request.asset
-    df = basic_clean(df)
+    # Cache hits bypass admission; new data changes the key
+    cache_key = (request.asset, request.model, request.horizon, asset_file.stat().st_mtime_ns)
+    cached = cache.get(cache_key)
+    if cached is not None:
+        return cached
 
-    current_price = float(df["close"].iloc[-1]) if not df.empty else None
-    last_date = df["date"].iloc[-1]
-
-    # Run the chosen model
+    client = admission.identify(
+        http_request.headers.get("x-api-key"), http_request.client.host if http_request.client else None
+    )
     try:
-        forecast_points = _run_model(df, request.asset, request.model, request.horizon, last_date)
+        async with admission.admit(client, request.model) as remaining:
+            current_price, forecast_points = await admission.run(
+                request.model, _forecast, asset_file, request, partial(admission.charge, client),
+                slot_timeout=remaining,
+            )
+    except AdmissionRejected as exc:
+        raise HTTPException(status_code=429, detail=str(exc), headers=retry_after_header(exc)) from exc
+    except EnsembleUnavailable as exc:
+        raise HTTPException(status_code=503, detail=str(exc)) from exc
     except Exception as exc:
         logger.exception("Model %s failed for asset %s", request.model, request.asset)
         raise HTTPException(status_code=500, detail=f"Forecasting failed: {str(exc)}") from exc
 
-    return PredictionResponse(
+    # Buffered in memory; written to the ledger in the background
+    ledger.record(
+        asset=request.asset,
+        model=request.model,
+        model_version=_model_version(request.model),
+        target_dates=[p.date for p in forecast_points],
+        predicted=[p.predicted for p in forecast_points],
+        lower=[p.lower for p in forecast_points],
+        upper=[p.upper for p in forecast_points],
+    )
+
+    response = PredictionResponse(
         asset=request.asset,
         model=request.model,
         horizon=request.horizon,
         current_price=current_price,
         forecast=forecast_points,
     )
+    cache.put(cache_key, response)
+    return response
+
+
+def _forecast(
+    asset_file: Path,
+    request: PredictionRequest,
+    charge: Callable[[float], None] | None = None,
+) -> tuple[float | None, list[ForecastPoint]]:
+    """Load *asset_file* and run the requested model (called in a worker thread).
+
+    *charge* receives the CPU-seconds of work the model leaves running in the
+    background (ensemble backtests).
+    """
+    import pandas as pd
+    df = pd.read_csv(asset_file)
+    df.columns = [c.lower() for c in df.columns]
+    if "date" in df.columns:
+        df["date"] = pd.to_datetime(df["date"])
+    df["asset"] = request.asset
+    df = basic_clean(df)
+
+    current_price = float(df["close"].iloc[-1]) if not df.empty else None
+    last_date = df["date"].iloc[-1]
+    return current_price, _run_model(df, request.asset, request.model, request.horizon, last_date, charge)
 
 
-def _run_model(df, asset, model_name, horizon, last_date) -> list[ForecastPoint]:
+def _model_version(model_name: str) -> str:
+    """Code version, plus the training timestamp of models served from the registry."""
+    if model_name.startswith("global_"):
+        from src.models.registry import REGISTRY_DIR_DEFAULT
+        artifact = REGISTRY_DIR_DEFAULT / f"{model_name}.keras"
+        if artifact.exists():
+            return f"{__version__}+{datetime.fromtimestamp(artifact.stat().st_mtime, tz=timezone.utc):%Y%m%dT%H%M%S}"
+    return __version__
+
+
+def _run_model(df, asset, model_name, horizon, last_date, charge=None) -> list[ForecastPoint]:
     """Dispatch to the appropriate model pipeline."""
     future_dates = [last_date + timedelta(days=i + 1) for i in range(horizon)]
 
@@ -116,15 +182,54 @@ def _run_model(df, asset, model_name, horizon, last_date) -> list[ForecastPoint]
             for d, v in zip(future_dates, result["forecast"])
         ]
 
+    elif model_name in ("global_lstm", "global_gru"):
+        # Pre-trained by scripts/train_global_rnn.py; inference only
+        from src.models.global_rnn import forecast_all, load_global_rnn
+        model, scaler, seq_len = load_global_rnn(model_name.removeprefix("global_"))
+        if asset not in scaler.assets:
+            raise ValueError(f"Asset '{asset}' was not part of the {model_name} training set")
+        close = df["close"].to_numpy(dtype=float)
+        forecast = forecast_all(model, scaler, {asset: close[close > 0]}, seq_len, horizon)
+        return [
+            ForecastPoint(date=d, predicted=float(v))
+            for d, v in zip(future_dates, forecast.get(asset, []))
+        ]
+
+    elif model_name == "ensemble":
+        from config.settings import get_settings
+        from src.api.dependencies import get_ensemble_errors
+        from src.models.ensemble import ensemble_forecast
+        settings = get_settings()
+        result = ensemble_forecast(
+            df,
+            asset,
+            horizon,
+            members=settings.ensemble_members,
+            deadline_seconds=settings.ensemble_deadline_seconds,
+            member_timeout_seconds=settings.ensemble_member_timeout_seconds,
+            backtest_timeout_seconds=settings.ensemble_backtest_timeout_seconds,
+            errors=get_ensemble_errors(),
+            charge=charge,
+        )
+        # lower / upper: envelope of the member forecasts
+        return [
+            ForecastPoint(date=d, predicted=float(v), lower=float(lo), upper=float(hi))
+            for d, v, lo, hi in zip(future_dates, result.forecast, result.lower, result.upper)
+        ]
+
     return []
 
 
 @router.get("/predict/{asset}", summary="Quick GET-based forecast (Prophet, 30 days)")
 async def predict_get(
     asset: str,
+    http_request: Request,
     horizon: int = 30,
     data_path: Path = Depends(get_data_path),
+    ledger: ForecastLedger = Depends(get_forecast_ledger),
+    admission: AdmissionController = Depends(get_admission_controller),
+    cache: PredictionCache = Depends(get_prediction_cache),
 ) -> PredictionResponse:
     """Convenience GET endpoint using Prophet with default 30-day horizon."""
     req = PredictionRequest(asset=asset, model="prophet", horizon=horizon)
-    return await predict(req, data_path)
+    return await predict(req, http_request, data_path, ledger, admission, cache)
@@ -0,0 +1,42 @@
+"""Quotes router — live price snapshots through the cached quote service."""
+from __future__ import annotations
+
+import logging
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+
+from src.api.dependencies import get_quote_service
+from src.api.schemas import QuoteSnapshot, QuotesResponse
+from src.data.quotes import QuoteService, QuoteUnavailable
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+MAX_ASSETS = 250
+
+
+@router.get("/quotes", response_model=QuotesResponse, summary="Live price snapshots")
+def get_quotes(
+    assets: str = Query(..., description="Comma-separated CoinGecko IDs, e.g. 'bitcoin,ethereum'"),
+    currency: str = Query("usd", description="vs-currency"),
+    service: QuoteService = Depends(get_quote_service),
+) -> QuotesResponse:
+    """Latest snapshot per asset.
+
+    Snapshots are at most ``QUOTE_TTL_SECONDS`` old unless the upstream is
+    failing, in which case the last good value is returned with ``stale=true``.
+    """
+    ids = [a.strip().lower() for a in assets.split(",") if a.strip()]
+    if not ids or len(ids) > MAX_ASSETS:
+        raise HTTPException(status_code=422, detail=f"Provide between 1 and {MAX_ASSETS} asset IDs.")
+    try:
+        quotes = service.get_quotes(ids, currency)
+    except QuoteUnavailable as exc:
+        raise HTTPException(status_code=503, detail=str(exc))
+    if not quotes:
+        raise HTTPException(status_code=404, detail=f"No quotes for: {ids}")
+    return QuotesResponse(
+        currency=currency.lower(),
+        quotes=[QuoteSnapshot(**vars(q)) for q in quotes.values()],
+        missing=[a for a in ids if a not in quotes],
+    )
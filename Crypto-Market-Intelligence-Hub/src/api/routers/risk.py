@@ -0,0 +1,57 @@
+"""Portfolio risk router — Monte-Carlo VaR / CVaR / drawdown."""
+from __future__ import annotations
+
+import logging
+from pathlib import Path
+
+from fastapi import APIRouter, Depends, HTTPException
+
+from config.settings import get_settings
+from src.api.dependencies import get_processed_path
+from src.api.schemas import RiskRequest, RiskResponse
+from src.models.risk import load_returns, portfolio_risk
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+settings = get_settings()
+
+
+@router.post("/risk/portfolio", response_model=RiskResponse, summary="Monte-Carlo portfolio risk")
+def portfolio_risk_endpoint(
+    request: RiskRequest,
+    processed_path: Path = Depends(get_processed_path),
+) -> RiskResponse:
+    """Simulate *n_paths* return paths for the given weights and report tail risk."""
+    weights = {a.lower(): w for a, w in request.weights.items()}
+    if not weights:
+        raise HTTPException(status_code=422, detail="weights must not be empty")
+    if any(not 0 < a < 1 for a in request.alphas):
+        raise HTTPException(status_code=422, detail="alphas must lie strictly between 0 and 1")
+    logger.info("POST /risk/portfolio  assets=%d paths=%d", len(weights), request.n_paths)
+
+    try:
+        returns = load_returns(processed_path, sorted(weights), lookback=request.lookback)
+        report = portfolio_risk(
+            returns,
+            weights,
+            horizon=request.horizon,
+            n_paths=request.n_paths,
+            alphas=tuple(request.alphas),
+            shrinkage=request.shrinkage,
+            method=request.method,
+            memory_mb=settings.risk_memory_mb,
+            seed=request.seed,
+        )
+    except FileNotFoundError as exc:
+        raise HTTPException(status_code=404, detail=str(exc))
+    except (KeyError, ValueError) as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+
+    metrics = report.drop(columns=["portfolio", "horizon"]).iloc[0].astype(float).to_dict()
+    return RiskResponse(
+        weights=weights,
+        horizon=request.horizon,
+        n_paths=request.n_paths,
+        observations=len(returns),
+        metrics=metrics,
+    )
@@ -0,0 +1,80 @@
+"""Similarity router — nearest historical windows across the universe."""
+from __future__ import annotations
+
+import logging
+import threading
+from pathlib import Path
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+
+from src.api.dependencies import get_processed_path
+from src.api.schemas import SimilarityMatch, SimilarityResponse
+from src.models.similarity import SimilarityIndex, refresh_from_store
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+# One index per store, kept in memory and refreshed from file mtimes. Entries
+# are never mutated once published: a refresh swaps in an updated copy, so
+# requests search their index outside the lock.
+_INDEXES: dict[Path, tuple[SimilarityIndex, float]] = {}
+_LOCK = threading.Lock()
+
+
+def reset_indexes() -> None:
+    """Drop every cached index (the next request rebuilds it)."""
+    with _LOCK:
+        _INDEXES.clear()
+
+
+def get_index(processed_path: Path) -> SimilarityIndex:
+    """Cached index of the store at *processed_path*, refreshed from file mtimes."""
+    with _LOCK:
+        if processed_path not in _INDEXES:
+            if not processed_path.exists():
+                raise FileNotFoundError(processed_path)
+            files = list(processed_path.glob("*.parquet"))
+            newest = max((p.stat().st_mtime for p in files), default=0.0)
+            _INDEXES[processed_path] = (SimilarityIndex.from_store(processed_path), newest)
+        else:
+            index, since = _INDEXES[processed_path]
+            _INDEXES[processed_path] = refresh_from_store(index, processed_path, since)
+        return _INDEXES[processed_path][0]
+
+
+@router.get(
+    "/similar",
+    response_model=SimilarityResponse,
+    summary="Past windows most similar to an asset's recent prices",
+)
+def get_similar(
+    asset: str = Query(..., description="Asset whose latest window is the query"),
+    window: int = Query(30, ge=5, le=365, description="Window length in bars"),
+    k: int = Query(10, ge=1, le=100, description="Number of matches"),
+    processed_path: Path = Depends(get_processed_path),
+) -> SimilarityResponse:
+    """Top-k z-normalised nearest windows on any asset to the last *window* bars of *asset*.
+
+    The query's own window (and any window overlapping it) is excluded.
+    """
+    logger.info("GET /similar  asset=%s window=%d k=%d", asset, window, k)
+    try:
+        index = get_index(processed_path)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Processed data store not found.")
+
+    asset = asset.lower()
+    try:
+        query, matches = index.similar_to_recent(asset, window, k)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Asset '{asset}' not found.")
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+
+    return SimilarityResponse(
+        asset=asset,
+        window=window,
+        query_start=query.index[0],
+        query_end=query.index[-1],
+        matches=[SimilarityMatch(**vars(m)) for m in matches],
+    )
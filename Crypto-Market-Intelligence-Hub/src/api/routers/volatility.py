@@ -0,0 +1,63 @@
+"""Volatility router — GARCH forecasts from the model registry."""
+from __future__ import annotations
+
+import logging
+from pathlib import Path
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+
+from src.api.dependencies import get_models_path
+from src.api.schemas import VolatilityPoint, VolatilityResponse
+from src.models.garch import PARAM_COLS, forecast_volatility
+from src.models.registry import load_sklearn_cached
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+PARAMS_NAME = "garch_params"
+
+
+@router.get(
+    "/volatility/{asset}",
+    response_model=VolatilityResponse,
+    summary="GARCH volatility forecast for an asset",
+)
+def get_volatility(
+    asset: str,
+    horizon: int = Query(30, ge=1, le=365, description="Forecast horizon in days"),
+    models_path: Path = Depends(get_models_path),
+) -> VolatilityResponse:
+    """Forecast daily volatility from the stored GARCH parameters and filter state.
+
+    No model is fitted per request: parameters come from the registry entry
+    written by ``scripts/refit_garch.py``.
+    """
+    logger.info("GET /volatility/%s  horizon=%d", asset, horizon)
+    try:
+        params = load_sklearn_cached(PARAMS_NAME, models_path)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="No GARCH parameters in the model registry.")
+    asset = asset.lower()
+    if asset not in params.index:
+        raise HTTPException(status_code=404, detail=f"No GARCH fit for asset '{asset}'.")
+
+    row = params.loc[[asset]]
+    fc = forecast_volatility(row, steps=horizon)
+    values = {c: float(row[c].iloc[0]) for c in PARAM_COLS}
+    values["persistence"] = values["alpha"] + values["gamma"] / 2 + values["beta"]
+    return VolatilityResponse(
+        asset=asset,
+        model=str(row["model"].iloc[0]),
+        horizon=horizon,
+        last_date=row["last_date"].iloc[0],
+        params=values,
+        forecast=[
+            VolatilityPoint(
+                date=r.date,
+                volatility=r.volatility,
+                annualized_volatility=r.annualized_volatility,
+                cumulative_volatility=r.cumulative_volatility,
+            )
+            for r in fc.itertuples(index=False)
+        ],
+    )
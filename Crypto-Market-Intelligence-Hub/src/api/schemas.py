@@ -22,6 +22,7 @@ class OHLCVRecord(BaseModel):
 class HistoricalResponse(BaseModel):
     asset: str
     currency: str = "USD"
+    timeframe: str = "1d"
     records: list[OHLCVRecord]
     total: int
     start_date: Optional[datetime] = None
@@ -59,6 +60,49 @@ class PredictionResponse(BaseModel):
     generated_at: datetime = Field(default_factory=datetime.utcnow)
 
 
+# ── Volatility ────────────────────────────────────────────────────────────────
+
+class VolatilityPoint(BaseModel):
+    date: datetime
+    volatility: float
+    annualized_volatility: float
+    cumulative_volatility: float
+
+
+class VolatilityResponse(BaseModel):
+    asset: str
+    model: str
+    horizon: int
+    last_date: datetime
+    params: dict[str, float]
+    forecast: list[VolatilityPoint]
+    generated_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+# ── Risk ──────────────────────────────────────────────────────────────────────
+
+class RiskRequest(BaseModel):
+    weights: dict[str, float] = Field(
+        ..., examples=[{"bitcoin": 0.6, "ethereum": 0.4}], description="Asset -> portfolio weight"
+    )
+    horizon: int = Field(default=30, ge=1, le=365, description="Horizon in days")
+    n_paths: int = Field(default=100_000, ge=1_000, le=1_000_000, description="Monte-Carlo paths")
+    alphas: list[float] = Field(default=[0.95, 0.99], description="Confidence levels")
+    lookback: int = Field(default=365, ge=30, description="Days of returns used for estimation")
+    shrinkage: Optional[str] = Field(default="ledoit_wolf", description="'ledoit_wolf' or null")
+    method: str = Field(default="portfolio", description="'portfolio' or 'asset'")
+    seed: Optional[int] = None
+
+
+class RiskResponse(BaseModel):
+    weights: dict[str, float]
+    horizon: int
+    n_paths: int
+    observations: int
+    metrics: dict[str, float]
+    generated_at: datetime = Field(default_factory=datetime.utcnow)
+
+
 # ── Health ────────────────────────────────────────────────────────────────────
 
 class HealthResponse(BaseModel):
@@ -80,3 +124,43 @@ class AssetSummary(BaseModel):
     max_close: Optional[float] = None
     min_close: Optional[float] = None
     sharpe_ratio: Optional[float] = None
+
+
+# ── Quotes ────────────────────────────────────────────────────────────────────
+
+class QuoteSnapshot(BaseModel):
+    asset: str
+    currency: str
+    price: float
+    market_cap: Optional[float] = None
+    volume_24h: Optional[float] = None
+    change_24h: Optional[float] = None
+    fetched_at: datetime
+    age_seconds: float
+    stale: bool = False
+
+
+class QuotesResponse(BaseModel):
+    currency: str
+    quotes: list[QuoteSnapshot]
+    missing: list[str] = []
+    generated_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+# ── Similarity ────────────────────────────────────────────────────────────────
+
+class SimilarityMatch(BaseModel):
+    asset: str
+    start: datetime
+    end: datetime
+    distance: float
+    correlation: float
+
+
+class SimilarityResponse(BaseModel):
+    asset: str
+    window: int
+    query_start: datetime
+    query_end: datetime
+    matches: list[SimilarityMatch]
+    generated_at: datetime = Field(default_factory=datetime.utcnow)
@@ -0,0 +1,204 @@
+"""Production entry point: pre-forking multi-worker API server with shared preloaded data.
+
+Usage:
+    python -m src.api.serve --workers 4 --port 8000
+
+``uvicorn --workers N`` starts N fresh interpreters. Each one loads its own
+copy of the data and models. This server instead does the loading once, in
+the master process, and then forks the workers:
+
+1. The processed store is decoded into a memory-mapped snapshot
+   (:mod:`src.data.shared_store`). Every worker reads the same page-cache pages.
+2. Hot registry objects (``SERVE_PRELOAD_MODELS``) and the similarity index
+   are built in memory. ``gc.freeze()`` then moves them out of the garbage
+   collector's reach, so that collections in the workers do not dirty their
+   pages and break copy-on-write sharing.
+3. The master binds the listening socket and forks N workers. Each worker runs
+   a uvicorn server on that shared socket.
+
+The master restarts workers that die. Every ``SERVE_WATCH_SECONDS``, or on
+``SIGHUP``, it compares the store's version with the one it preloaded. When
+the data has changed, it preloads again, forks a new set of workers, and
+sends ``SIGTERM`` to the old ones. Each old worker stops accepting
+connections, finishes its in-flight requests, and exits. The socket stays
+open throughout, so no request is refused during a reload.
+
+Only the first preload is fatal. If a reload fails (e.g. a half-written
+Parquet file), the error is logged, the current workers keep serving, and the
+next check tries again.
+"""
+from __future__ import annotations
+
+import argparse
+import gc
+import logging
+import os
+import signal
+import socket
+import time
+
+from config.settings import Settings, get_settings
+
+logger = logging.getLogger(__name__)
+
+
+def preload(settings: Settings) -> str:
+    """Load shared data and models into this process; return the data version."""
+    from src.api.routers import similarity
+    from src.data.shared_store import SharedStore, build_snapshot, install, store_version
+    from src.models.registry import load_sklearn_cached
+
+    gc.unfreeze()
+    try:
+        processed = settings.data_processed_dir
+        version = store_version(processed) if processed.exists() else "empty"
+        try:
+            install(SharedStore(build_snapshot(processed, settings.serve_snapshot_path)))
+            similarity.reset_indexes()
+            similarity.get_index(processed)
+        except FileNotFoundError:
+            install(None)
+            logger.warning("No processed store at %s; workers will start without preloaded data", processed)
+        for name in settings.serve_preload_models:
+            try:
+                load_sklearn_cached(name, settings.models_path)
+            except FileNotFoundError:
+                logger.info("Preload skipped: %s is not in the registry", name)
+    finally:
+        gc.collect()
+        gc.freeze()
+    logger.info("Preloaded data version %s", version)
+    return version
+
+
+def _reload(settings: Settings, current: str) -> str | None:
+    """Preload again; return the new data version, or ``None`` to keep serving *current*."""
+    try:
+        return preload(settings)
+    except Exception:  # noqa: BLE001 — a bad reload must not take the server down
+        logger.exception("Reload failed; workers keep serving data version %s until the next check", current)
+        return None
+
+
+def _spawn(sock: socket.socket, settings: Settings) -> int:
+    pid = os.fork()
+    if pid:
+        return pid
+    # Worker: drop the master's handlers; uvicorn installs its own
+    for sig in (signal.SIGTERM, signal.SIGINT, signal.SIGHUP):
+        signal.signal(sig, signal.SIG_DFL)
+    code = 0
+    try:
+        import uvicorn
+
+        from src.api.main import app
+        config = uvicorn.Config(
+            app,
+            log_level=settings.log_level.lower(),
+            timeout_graceful_shutdown=settings.serve_graceful_seconds,
+        )
+        uvicorn.Server(config).run(sockets=[sock])
+    except BaseException:  # noqa: BLE001 — never return into the master's loop
+        logger.exception("Worker %d crashed", os.getpid())
+        code = 1
+    finally:
+        os._exit(code)
+
+
+def _stop(pids: list[int], timeout: float) -> None:
+    """SIGTERM *pids* and reap them, escalating to SIGKILL after *timeout* seconds."""
+    for pid in pids:
+        try:
+            os.kill(pid, signal.SIGTERM)
+        except ProcessLookupError:
+            pass
+    deadline = time.monotonic() + timeout
+    remaining = set(pids)
+    while remaining and time.monotonic() < deadline:
+        for pid in list(remaining):
+            if os.waitpid(pid, os.WNOHANG)[0]:
+                remaining.discard(pid)
+        time.sleep(0.05)
+    for pid in remaining:
+        os.kill(pid, signal.SIGKILL)
+        os.waitpid(pid, 0)
+
+
+def serve(host: str, port: int, workers: int, settings: Settings | None = None) -> None:
+    """Run the master loop until SIGTERM / SIGINT."""
+    settings = settings or get_settings()
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+
+    import src.api.main  # noqa: F401 — import the app (and its dependencies) once, pre-fork
+
+    version = preload(settings)
+    pids: dict[int, tuple[str, float]] = {}  # pid -> (data version, start time)
+    for _ in range(workers):
+        pids[_spawn(sock, settings)] = (version, time.monotonic())
+    logger.info("Serving on %s:%d with %d workers (master %d)", host, port, workers, os.getpid())
+
+    state = {"stop": False, "reload": False}
+    signal.signal(signal.SIGTERM, lambda *_: state.update(stop=True))
+    signal.signal(signal.SIGINT, lambda *_: state.update(stop=True))
+    signal.signal(signal.SIGHUP, lambda *_: state.update(reload=True))
+
+    from src.data.shared_store import store_version
+
+    last_check = time.monotonic()
+    while not state["stop"]:
+        time.sleep(0.2)
+        while pids:
+            pid, status = os.waitpid(-1, os.WNOHANG)
+            if not pid:
+                break
+            gen, started = pids.pop(pid, (None, 0.0))
+            if gen != version or state["stop"]:
+                continue  # retired by a reload
+            logger.warning("Worker %d exited (status %d); restarting", pid, status)
+            if time.monotonic() - started < 1.0:
+                time.sleep(1.0)  # crash loop: do not spin
+            pids[_spawn(sock, settings)] = (version, time.monotonic())
+
+        if state["reload"] or time.monotonic() - last_check >= settings.serve_watch_seconds:
+            last_check = time.monotonic()
+            processed = settings.data_processed_dir
+            try:
+                latest = store_version(processed) if processed.exists() else "empty"
+            except OSError:
+                logger.exception("Could not read the data version of %s", processed)
+                continue
+            if latest == version and not state["reload"]:
+                continue
+            state["reload"] = False
+            logger.info("Data version %s → %s: reloading workers", version, latest)
+            loaded = _reload(settings, version)
+            if loaded is None:
+                continue
+            old, version = list(pids), loaded
+            for _ in range(workers):
+                pids[_spawn(sock, settings)] = (version, time.monotonic())
+            _stop(old, settings.serve_graceful_seconds + 5)
+            for pid in old:
+                pids.pop(pid, None)
+
+    logger.info("Shutting down %d workers", len(pids))
+    _stop(list(pids), settings.serve_graceful_seconds + 5)
+    sock.close()
+
+
+def main() -> None:
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description="Multi-worker API server with shared preloaded data")
+    parser.add_argument("--host", default=settings.api_host)
+    parser.add_argument("--port", type=int, default=settings.api_port)
+    parser.add_argument("--workers", type=int, default=settings.serve_workers)
+    args = parser.parse_args()
+    serve(args.host, args.port, args.workers, settings)
+
+
+if __name__ == "__main__":
+    main()
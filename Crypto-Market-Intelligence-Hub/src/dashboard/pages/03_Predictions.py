@@ -10,7 +10,7 @@ import pandas as pd
 
 st.set_page_config(page_title="Predictions | Crypto Hub", page_icon="🤖", layout="wide")
 st.title("🤖 Price Forecasting")
-st.markdown("Run ARIMA · Prophet · LSTM · GRU models and compare their 30-day forecasts.")
+st.markdown("Run ARIMA · Prophet · LSTM · GRU models, or all of them as an ensemble, and compare their forecasts.")
 
 
 @st.cache_data(ttl=3600, show_spinner="Loading data…")
@@ -35,7 +35,7 @@ col1, col2, col3 = st.columns(3)
 with col1:
     asset = st.selectbox("Asset", assets, index=assets.index("bitcoin") if "bitcoin" in assets else 0)
 with col2:
-    model_choice = st.selectbox("Forecasting Model", ["prophet", "arima", "lstm", "gru"])
+    model_choice = st.selectbox("Forecasting Model", ["prophet", "arima", "lstm", "gru", "ensemble"])
 with col3:
     horizon = st.slider("Forecast Horizon (days)", 7, 60, 30)
 
@@ -49,6 +49,7 @@ if run_btn:
 
     with st.spinner("Training model and generating forecast…"):
         try:
+            members = {}
             if model_choice == "prophet":
                 from src.models.prophet_model import run_prophet_pipeline
                 result = run_prophet_pipeline(asset_df, asset, forecast_periods=horizon)
@@ -83,6 +84,18 @@ if run_btn:
                 metrics = result["metrics"]
                 has_ci = False
 
+            elif model_choice == "ensemble":
+                from src.models.ensemble import ensemble_forecast
+                result = ensemble_forecast(asset_df, asset, horizon)
+                pred_vals = result.forecast
+                lower, upper = result.lower, result.upper
+                members = result.members
+                metrics = {}
+                has_ci = False
+                st.caption("Weights: " + ", ".join(f"{m} {w:.0%}" for m, w in result.weights.items()))
+                if result.dropped:
+                    st.warning("Dropped: " + "; ".join(f"{m} ({r})" for m, r in result.dropped.items()))
+
             # ── KPIs ───────────────────────────────────────────────────────────
             k1, k2, k3, k4 = st.columns(4)
             k1.metric("Current Price", f"${current_price:,.2f}")
@@ -104,6 +117,9 @@ if run_btn:
             fig.add_trace(go.Scatter(x=future_dates, y=pred_vals,
                                      name=f"{model_choice.upper()} Forecast",
                                      line=dict(color="#7c3aed", width=2, dash="dash")))
+            for name, values in members.items():
+                fig.add_trace(go.Scatter(x=future_dates, y=values, name=name.upper(),
+                                         line=dict(width=1, dash="dot"), opacity=0.6))
             if has_ci and lower is not None:
                 x_ci = future_dates + future_dates[::-1]
                 y_ci = list(upper) + list(lower)[::-1]
@@ -0,0 +1,267 @@
+"""Bulk history export straight from the Parquet store.
+
+Rows never become Python objects: files are scanned as Arrow record batches
+(with date predicates and column projection pushed into the Parquet reader)
+and re-encoded batch by batch as Arrow IPC or Parquet, so a full-universe
+download streams in roughly constant memory.
+
+JSON clients page through the same scan with an opaque cursor that encodes
+the last ``(asset, date)`` returned; rows are ordered by asset, then date.
+"""
+from __future__ import annotations
+
+import base64
+import json
+import logging
+from pathlib import Path
+from typing import Iterator
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from src.data.resample import BASE_TIMEFRAME, aggregate_path
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_COLUMNS = ("date", "asset", "open", "high", "low", "close", "volume")
+EXPORT_FORMATS = ("arrow", "parquet")
+
+
+# ── Source discovery ─────────────────────────────────────────────────────────
+
+def available_assets(processed_dir: Path | str) -> list[str]:
+    """Assets with a per-asset Parquet file under *processed_dir*."""
+    return sorted(p.stem for p in Path(processed_dir).glob("*.parquet") if p.stem != "all_assets")
+
+
+def _sources(
+    processed_dir: Path | str,
+    assets: list[str],
+    timeframe: str,
+) -> list[tuple[str, ds.Dataset, ds.Expression | None]]:
+    """One (asset, dataset, asset filter) triple per requested asset, in asset order."""
+    if timeframe == BASE_TIMEFRAME:
+        base = Path(processed_dir)
+        missing = [a for a in assets if not (base / f"{a}.parquet").exists()]
+        if missing:
+            raise FileNotFoundError(f"Assets not found in store: {missing}")
+        return [(a, ds.dataset(base / f"{a}.parquet"), None) for a in assets]
+
+    path = aggregate_path(processed_dir, timeframe)
+    if not path.exists():
+        raise FileNotFoundError(f"Aggregate not found: {path}")
+    dataset = ds.dataset(path)
+    return [(a, dataset, ds.field("asset") == a) for a in assets]
+
+
+def _schema(sources, columns: list[str]) -> pa.Schema:
+    """Output schema: the requested *columns*, typed from the first file that has them."""
+    fields: dict[str, pa.Field] = {}
+    for _, dataset, _ in sources:
+        for name in columns:
+            if name not in fields and name in dataset.schema.names:
+                fields[name] = dataset.schema.field(name)
+        if len(fields) == len(columns):
+            break
+    unknown = [c for c in columns if c not in fields]
+    if unknown:
+        raise KeyError(f"Unknown columns: {unknown}")
+    return pa.schema([fields[c] for c in columns])
+
+
+def _conform(batch: pa.RecordBatch, schema: pa.Schema) -> pa.RecordBatch:
+    """Reorder/cast *batch* to *schema*, filling columns the file lacks with nulls."""
+    arrays = []
+    for field in schema:
+        idx = batch.schema.get_field_index(field.name)
+        if idx < 0:
+            arrays.append(pa.nulls(batch.num_rows, field.type))
+        else:
+            arrays.append(batch.column(idx).cast(field.type))
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+def _date_filter(
+    start: str | pd.Timestamp | None,
+    end: str | pd.Timestamp | None,
+    after: pd.Timestamp | None = None,
+) -> ds.Expression | None:
+    def ts(value) -> pa.Scalar:
+        return pa.scalar(pd.Timestamp(value).to_datetime64())
+
+    terms = []
+    if start is not None:
+        terms.append(ds.field("date") >= ts(start))
+    if end is not None:
+        terms.append(ds.field("date") <= ts(end))
+    if after is not None:
+        terms.append(ds.field("date") > ts(after))
+    if not terms:
+        return None
+    expr = terms[0]
+    for term in terms[1:]:
+        expr = expr & term
+    return expr
+
+
+# ── Scanning ─────────────────────────────────────────────────────────────────
+
+def scan_history(
+    processed_dir: Path | str,
+    assets: list[str] | None = None,
+    start: str | None = None,
+    end: str | None = None,
+    columns: list[str] | None = None,
+    timeframe: str = BASE_TIMEFRAME,
+    batch_size: int = 65_536,
+    cursor: tuple[str, pd.Timestamp] | None = None,
+) -> tuple[pa.Schema, Iterator[pa.RecordBatch]]:
+    """Lazily scan stored history for *assets* as Arrow record batches.
+
+    Parameters
+    ----------
+    processed_dir : Path | str
+        Processed-data directory holding per-asset Parquet files.
+    assets : list[str] | None
+        Assets to export (default: every asset in the store).
+    start, end : str | None
+        Inclusive date bounds.
+    columns : list[str] | None
+        Columns to project (default: :data:`DEFAULT_COLUMNS`).
+    timeframe : str
+        ``"1d"`` reads per-asset files; other timeframes read the cached
+        aggregate written by :func:`src.data.resample.build_aggregate_cache`.
+    batch_size : int
+        Maximum rows per record batch.
+    cursor : tuple[str, pd.Timestamp] | None
+        Resume strictly after this ``(asset, date)``.
+
+    Returns
+    -------
+    tuple[pa.Schema, Iterator[pa.RecordBatch]]
+        Output schema and a generator of batches conforming to it.
+
+    Raises
+    ------
+    FileNotFoundError
+        If an asset file or the timeframe aggregate is missing.
+    KeyError
+        If a requested column exists in none of the files.
+    ValueError
+        If *start* or *end* is not a date. Raised here, not while iterating,
+        so a streaming response can still be rejected before it starts.
+    """
+    start = pd.Timestamp(start) if start is not None else None
+    end = pd.Timestamp(end) if end is not None else None
+    assets = sorted(set(assets)) if assets else available_assets(processed_dir)
+    if cursor is not None:
+        assets = [a for a in assets if a >= cursor[0]]
+    columns = list(columns or DEFAULT_COLUMNS)
+    sources = _sources(processed_dir, assets, timeframe)
+    schema = _schema(sources, columns)
+
+    def batches() -> Iterator[pa.RecordBatch]:
+        for asset, dataset, asset_expr in sources:
+            after = cursor[1] if cursor is not None and asset == cursor[0] else None
+            expr = _date_filter(start, end, after)
+            if asset_expr is not None:
+                expr = asset_expr if expr is None else asset_expr & expr
+            present = [c for c in columns if c in dataset.schema.names]
+            for batch in dataset.to_batches(columns=present, filter=expr, batch_size=batch_size):
+                if batch.num_rows:
+                    yield _conform(batch, schema)
+
+    return schema, batches()
+
+
+# ── Encoders ─────────────────────────────────────────────────────────────────
+
+class _ChunkSink:
+    """Write-only file object whose contents are drained after every batch."""
+
+    closed = False
+
+    def __init__(self) -> None:
+        self._chunks: list[bytes] = []
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def drain(self) -> bytes:
+        out = b"".join(self._chunks)
+        self._chunks.clear()
+        return out
+
+
+def stream_arrow(schema: pa.Schema, batches: Iterator[pa.RecordBatch]) -> Iterator[bytes]:
+    """Encode *batches* as an Arrow IPC stream, yielding bytes per batch."""
+    sink = _ChunkSink()
+    with pa.ipc.new_stream(sink, schema) as writer:
+        yield sink.drain()
+        for batch in batches:
+            writer.write_batch(batch)
+            yield sink.drain()
+    yield sink.drain()
+
+
+def stream_parquet(schema: pa.Schema, batches: Iterator[pa.RecordBatch]) -> Iterator[bytes]:
+    """Encode *batches* as a Parquet file, one row group per batch."""
+    sink = _ChunkSink()
+    with pq.ParquetWriter(sink, schema, compression="zstd") as writer:
+        for batch in batches:
+            writer.write_batch(batch)
+            yield sink.drain()
+    yield sink.drain()
+
+
+# ── Cursor pagination ────────────────────────────────────────────────────────
+
+def encode_cursor(asset: str, date: pd.Timestamp) -> str:
+    payload = json.dumps({"a": asset, "d": pd.Timestamp(date).isoformat()})
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[str, pd.Timestamp]:
+    """Inverse of :func:`encode_cursor`; raises ``ValueError`` on malformed input."""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return payload["a"], pd.Timestamp(payload["d"])
+    except Exception as exc:  # noqa: BLE001 — any decoding failure is a bad cursor
+        raise ValueError(f"Invalid cursor: {cursor!r}") from exc
+
+
+def read_page(
+    processed_dir: Path | str,
+    limit: int,
+    cursor: str | None = None,
+    **scan_kwargs,
+) -> tuple[pd.DataFrame, str | None]:
+    """Read at most *limit* rows after *cursor*; return them with the next cursor."""
+    after = decode_cursor(cursor) if cursor else None
+    schema, batches = scan_history(processed_dir, cursor=after, batch_size=limit, **scan_kwargs)
+    if "date" not in schema.names or "asset" not in schema.names:
+        raise KeyError("JSON pagination requires the 'date' and 'asset' columns")
+
+    taken: list[pa.RecordBatch] = []
+    n = 0
+    for batch in batches:
+        taken.append(batch.slice(0, limit - n))
+        n += taken[-1].num_rows
+        if n >= limit:
+            break
+    page = pa.Table.from_batches(taken, schema=schema).to_pandas()
+
+    next_cursor = None
+    if n >= limit:
+        last = page.iloc[-1]
+        next_cursor = encode_cursor(last["asset"], last["date"])
+    return page, next_cursor
@@ -145,18 +145,44 @@ def fetch_coingecko(
     return df.sort_values("date").reset_index(drop=True)
 
 
-def get_current_price(asset: str, currency: str = "usd") -> dict:
-    """Return the latest price snapshot from CoinGecko simple/price endpoint."""
+def fetch_simple_prices(
+    assets: list[str],
+    currency: str = "usd",
+    api_key: str = "",
+    timeout: float = 10.0,
+) -> dict[str, dict]:
+    """Latest price snapshots for many CoinGecko IDs in one ``simple/price`` call.
+
+    Returns
+    -------
+    dict[str, dict]
+        Coin ID -> raw CoinGecko fields (``usd``, ``usd_market_cap``,
+        ``usd_24h_vol``, ``usd_24h_change``). Unknown IDs are absent.
+    """
     import httpx
 
     url = "https://api.coingecko.com/api/v3/simple/price"
+    headers = {"x-cg-demo-api-key": api_key} if api_key else {}
     params = {
-        "ids": asset,
+        "ids": ",".join(sorted(set(assets))),
         "vs_currencies": currency,
         "include_24hr_change": "true",
         "include_market_cap": "true",
         "include_24hr_vol": "true",
     }
-    resp = httpx.get(url, params=params, timeout=10)
-    resp.raise_for_status()
-    return resp.json().get(asset, {})
+    logger.debug("CoinGecko simple/price for %d ids", len(set(assets)))
+    try:
+        resp = httpx.get(url, params=params, headers=headers, timeout=timeout)
+        resp.raise_for_status()
+    except httpx.HTTPStatusError as exc:
+        raise RuntimeError(f"CoinGecko API error: {exc.response.status_code}") from exc
+    return resp.json()
+
+
+def get_current_price(asset: str, currency: str = "usd") -> dict:
+    """Return the latest price snapshot from CoinGecko simple/price endpoint.
+
+    Each call goes upstream; use :class:`src.data.quotes.QuoteService` when
+    serving many readers.
+    """
+    return fetch_simple_prices([asset], currency).get(asset, {})
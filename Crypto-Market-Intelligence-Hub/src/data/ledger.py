@@ -0,0 +1,298 @@
+"""Forecast ledger: every issued forecast, kept for scoring once prices arrive.
+
+Layout under the ledger directory::
+
+    issue_date=YYYY-MM-DD/part-<uuid>.parquet   forecast points, hive-partitioned
+    realized.parquet                            points already joined to an actual close
+    accuracy_by_horizon.parquet                 latest scoring output
+
+:meth:`ForecastLedger.record` only appends rows to an in-memory buffer, so
+issuing a forecast pays no I/O. A daemon thread writes the buffer once it
+holds ``flush_rows`` rows or is ``flush_seconds`` old, one Parquet file per
+issue-date partition per flush. :meth:`ForecastLedger.compact` merges a
+closed partition's files into one.
+
+:func:`score_ledger` is the batch job. Forecast points are joined to realized
+closes as those arrive. An asset's points are read only if their target
+dates fall after that asset's last scored date, and only partitions that
+can still hold such points are opened. Accuracy is then recomputed for every
+``(model, model_version, horizon)`` with the vectorised
+:func:`src.models.evaluate.panel_metrics`, plus interval coverage.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+logger = logging.getLogger(__name__)
+
+LEDGER_SCHEMA = pa.schema([
+    ("forecast_id", pa.string()),
+    ("issued_at", pa.timestamp("us", tz="UTC")),
+    ("asset", pa.string()),
+    ("model", pa.string()),
+    ("model_version", pa.string()),
+    ("horizon", pa.int16()),  # steps ahead, 1-based
+    ("target_date", pa.timestamp("us")),
+    ("predicted", pa.float64()),
+    ("lower", pa.float64()),
+    ("upper", pa.float64()),
+])
+REALIZED = "realized.parquet"
+ACCURACY = "accuracy_by_horizon.parquet"
+MAX_HORIZON_DAYS = 366  # partitions older than this cannot hold unscored points
+
+
+class ForecastLedger:
+    """Buffered, append-only store of issued forecasts.
+
+    Parameters
+    ----------
+    root : Path | str
+        Ledger directory (created if missing).
+    flush_rows : int
+        Buffered rows that trigger a write.
+    flush_seconds : float
+        Longest a recorded forecast waits in memory before it is written.
+    """
+
+    def __init__(self, root: Path | str, flush_rows: int = 5000, flush_seconds: float = 5.0) -> None:
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.flush_rows = flush_rows
+        self.flush_seconds = flush_seconds
+        self._buffer: list[dict[str, list]] = []
+        self._buffered = 0
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="forecast-ledger", daemon=True)
+        self._thread.start()
+        self.rows_written = 0
+
+    # ── Write path ───────────────────────────────────────────────────────────
+
+    def record(
+        self,
+        asset: str,
+        model: str,
+        model_version: str,
+        target_dates: list,
+        predicted: list[float],
+        lower: list[float | None] | None = None,
+        upper: list[float | None] | None = None,
+        issued_at: datetime | None = None,
+    ) -> str:
+        """Queue one forecast (one row per step); return its ID."""
+        n = len(predicted)
+        forecast_id = uuid.uuid4().hex
+        columns = {
+            "forecast_id": [forecast_id] * n,
+            "issued_at": [issued_at or datetime.now(timezone.utc)] * n,
+            "asset": [asset] * n,
+            "model": [model] * n,
+            "model_version": [model_version] * n,
+            "horizon": list(range(1, n + 1)),
+            "target_date": list(target_dates),
+            "predicted": list(predicted),
+            "lower": list(lower) if lower is not None else [None] * n,
+            "upper": list(upper) if upper is not None else [None] * n,
+        }
+        with self._lock:
+            self._buffer.append(columns)
+            self._buffered += n
+            full = self._buffered >= self.flush_rows
+        if full:
+            self._wake.set()
+        return forecast_id
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_seconds)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception:  # noqa: BLE001 — keep the writer alive; rows stay buffered
+                logger.exception("Forecast ledger flush failed in %s", self.root)
+
+    def flush(self) -> int:
+        """Write everything buffered so far; return the number of rows written."""
+        with self._write_lock:
+            with self._lock:
+                batch, self._buffer, self._buffered = self._buffer, [], 0
+            if not batch:
+                return 0
+            try:
+                table = pa.Table.from_pydict(
+                    {c: [v for cols in batch for v in cols[c]] for c in LEDGER_SCHEMA.names},
+                    schema=LEDGER_SCHEMA,
+                )
+            except Exception:
+                logger.exception("Dropping %d malformed forecast ledger batches", len(batch))
+                return 0
+            try:
+                self._write(table)
+            except Exception:
+                with self._lock:
+                    self._buffer[:0] = batch
+                    self._buffered += table.num_rows
+                raise
+            self.rows_written += table.num_rows
+            return table.num_rows
+
+    def _write(self, table: pa.Table) -> None:
+        issue_dates = pc.strftime(table["issued_at"], format="%Y-%m-%d").to_numpy(zero_copy_only=False)
+        for day in np.unique(issue_dates):
+            part = self.root / f"issue_date={day}"
+            part.mkdir(exist_ok=True)
+            rows = table.filter(pa.array(issue_dates == day))
+            name = f"part-{uuid.uuid4().hex}.parquet"
+            pq.write_table(rows, part / f".{name}.tmp", compression="zstd")
+            os.replace(part / f".{name}.tmp", part / name)
+        logger.debug("Forecast ledger wrote %d rows", table.num_rows)
+
+    def close(self) -> None:
+        """Stop the writer thread after a final flush."""
+        self._stop.set()
+        self._wake.set()
+        self._thread.join()
+        self.flush()
+
+    def compact(self, before: str | None = None) -> int:
+        """Merge the files of each partition issued before *before* (default: today).
+
+        Returns the number of partitions rewritten.
+        """
+        before = before or datetime.now(timezone.utc).strftime("%Y-%m-%d")
+        merged = 0
+        for part in sorted(self.root.glob("issue_date=*")):
+            files = sorted(part.glob("part-*.parquet"))
+            if part.name.split("=", 1)[1] >= before or len(files) < 2:
+                continue
+            table = pa.concat_tables([pq.read_table(f, schema=LEDGER_SCHEMA) for f in files])
+            name = f"part-{uuid.uuid4().hex}.parquet"
+            pq.write_table(table, part / f".{name}.tmp", compression="zstd")
+            os.replace(part / f".{name}.tmp", part / name)
+            for f in files:
+                f.unlink()
+            merged += 1
+        return merged
+
+    # ── Read path ────────────────────────────────────────────────────────────
+
+    def read(self, since: str | None = None, columns: list[str] | None = None) -> pd.DataFrame:
+        """Ledger rows issued on or after *since* (``YYYY-MM-DD``)."""
+        return read_ledger(self.root, since, columns)
+
+
+def read_ledger(root: Path | str, since: str | None = None, columns: list[str] | None = None) -> pd.DataFrame:
+    """Written ledger rows under *root*, optionally pruned to issue dates ≥ *since*."""
+    root = Path(root)
+    if not any(root.glob("issue_date=*/part-*.parquet")):
+        return LEDGER_SCHEMA.empty_table().to_pandas()[columns or LEDGER_SCHEMA.names]
+    dataset = ds.dataset(
+        root,
+        schema=LEDGER_SCHEMA.append(pa.field("issue_date", pa.string())),
+        format="parquet",
+        partitioning="hive",
+        exclude_invalid_files=True,
+    )
+    flt = ds.field("issue_date") >= since if since else None
+    table = dataset.to_table(columns=columns or LEDGER_SCHEMA.names, filter=flt)
+    return table.to_pandas()
+
+
+# ── Scoring ──────────────────────────────────────────────────────────────────
+
+def score_ledger(root: Path | str, prices: pd.DataFrame) -> pd.DataFrame:
+    """Join newly realizable forecast points to *prices*; recompute accuracy tables.
+
+    Parameters
+    ----------
+    root : Path | str
+        Ledger directory.
+    prices : pd.DataFrame
+        Realized daily closes with ``date``, ``asset`` and ``close``.
+
+    Returns
+    -------
+    pd.DataFrame
+        Accuracy per ``(model, model_version, horizon)``: n, mae, rmse, mape
+        and r2 from :func:`~src.models.evaluate.panel_metrics`, plus ``coverage``
+        (share of actuals inside ``[lower, upper]`` where an interval was
+        given). Also written to ``accuracy_by_horizon.parquet``.
+    """
+    from src.models.evaluate import panel_metrics
+
+    t0 = time.monotonic()
+    root = Path(root)
+    realized_path = root / REALIZED
+    realized = pd.read_parquet(realized_path) if realized_path.exists() else None
+
+    closes = prices[["date", "asset", "close"]].dropna()
+    closes = closes.assign(date=pd.to_datetime(closes["date"]).dt.tz_localize(None).dt.normalize())
+    closes = closes.drop_duplicates(["asset", "date"], keep="last").rename(
+        columns={"date": "target_date", "close": "actual"}
+    )
+
+    # Only re-read issue dates that can still hold unscored points: anything
+    # issued earlier targets a date before every asset's last scored date
+    if realized is not None and len(realized):
+        since_date = realized.groupby("asset")["target_date"].max().min() - pd.Timedelta(days=MAX_HORIZON_DAYS)
+        since = since_date.strftime("%Y-%m-%d")
+    else:
+        since = None
+
+    ledger = read_ledger(root, since)
+    ledger["target_date"] = pd.to_datetime(ledger["target_date"]).dt.normalize()
+    fresh = ledger.merge(closes, on=["asset", "target_date"], how="inner")
+    if realized is not None and len(realized):
+        # A point is scored once, whenever it was issued
+        scored = pd.MultiIndex.from_frame(realized[["forecast_id", "horizon"]])
+        fresh = fresh[~pd.MultiIndex.from_frame(fresh[["forecast_id", "horizon"]]).isin(scored)]
+
+    if len(fresh):
+        realized = fresh if realized is None else pd.concat([realized, fresh], ignore_index=True)
+        tmp = root / f".{REALIZED}.tmp"
+        realized.to_parquet(tmp, index=False)
+        os.replace(tmp, realized_path)
+    if realized is None or realized.empty:
+        logger.info("Forecast ledger: nothing realized yet")
+        return pd.DataFrame()
+
+    keys = ["model", "model_version", "horizon"]
+    accuracy = panel_metrics(
+        realized, group_cols=keys, y_true_col="actual", y_pred_col="predicted", date_col="target_date"
+    )
+    # Rows of a group span many assets and issue times, so the path-dependent
+    # metrics (direction, strategy Sharpe) have no meaning here
+    accuracy = accuracy.drop(columns=["directional_accuracy", "sharpe_ratio"])
+    has_interval = realized["lower"].notna() & realized["upper"].notna()
+    inside = has_interval & realized["actual"].between(realized["lower"], realized["upper"])
+    coverage = (
+        pd.DataFrame({"inside": inside.astype(float), "has": has_interval.astype(float)})
+        .groupby([realized[k] for k in keys])
+        .sum()
+    )
+    coverage = (coverage["inside"] / coverage["has"]).where(coverage["has"] > 0).rename("coverage")
+    accuracy = accuracy.merge(coverage.reset_index(), on=keys, how="left").sort_values(keys, ignore_index=True)
+
+    accuracy.to_parquet(root / ACCURACY, index=False)
+    logger.info(
+        "Forecast ledger scored: %d new points, %d realized, %d groups in %.2fs",
+        len(fresh), len(realized), len(accuracy), time.monotonic() - t0,
+    )
+    return accuracy
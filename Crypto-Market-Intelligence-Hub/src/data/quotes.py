@@ -0,0 +1,275 @@
+"""Live quote service: batched upstream calls, TTL cache, singleflight, last-good fallback.
+
+Every request resolves its asset IDs against a short-TTL snapshot cache. The
+IDs still missing go upstream together in **one** ``simple/price`` call. While
+that call is in flight, other requests for the same ``(asset, currency)``
+wait on it instead of issuing their own ("singleflight"), so N concurrent
+dashboard viewers cost one upstream call per TTL window.
+
+If the upstream call fails or times out, the last good snapshot of each
+asset is served with ``stale=True``, as long as it is younger than
+``max_stale_seconds``, and upstream is not retried for one TTL. Assets with
+no snapshot that young are unavailable until upstream recovers; the failure
+is cached for one TTL as well, so they do not hammer a failing upstream. IDs
+that the upstream does not know are cached as missing for one TTL, which
+stops them from bypassing the cache.
+
+The upstream is any callable ``(ids, currency) -> {id: raw CoinGecko
+fields}``. :func:`src.data.fetch.fetch_simple_prices` is the production
+one and :class:`StubUpstream` serves local prices for tests and offline
+development.
+"""
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+Upstream = Callable[[list[str], str], dict[str, dict]]
+
+
+class QuoteUnavailable(RuntimeError):
+    """Upstream failed and no usable last-good snapshot exists."""
+
+
+@dataclass
+class Quote:
+    asset: str
+    currency: str
+    price: float
+    market_cap: float | None
+    volume_24h: float | None
+    change_24h: float | None
+    fetched_at: datetime
+    age_seconds: float = 0.0
+    stale: bool = False
+
+    @classmethod
+    def from_coingecko(cls, asset: str, currency: str, raw: dict, fetched_at: datetime) -> Quote:
+        return cls(
+            asset=asset,
+            currency=currency,
+            price=float(raw[currency]),
+            market_cap=raw.get(f"{currency}_market_cap"),
+            volume_24h=raw.get(f"{currency}_24h_vol"),
+            change_24h=raw.get(f"{currency}_24h_change"),
+            fetched_at=fetched_at,
+        )
+
+
+@dataclass
+class _Entry:
+    quote: Quote | None  # None: upstream does not know this ID
+    fetched: float  # service clock
+    good: Quote | None = None  # last successful snapshot, kept past the TTL
+    good_fetched: float = 0.0
+    failed: bool = False  # upstream failed and there was no good snapshot to fall back on
+
+
+@dataclass
+class QuoteStats:
+    requests: int = 0
+    cache_hits: int = 0
+    upstream_calls: int = 0
+    coalesced: int = 0
+    stale_served: int = 0
+    upstream_errors: int = 0
+
+
+@dataclass
+class QuoteService:
+    """Cached, coalescing front for a price upstream.
+
+    Parameters
+    ----------
+    upstream : Upstream
+        Batched price source.
+    ttl_seconds : float
+        Age below which a snapshot is served without going upstream.
+    max_stale_seconds : float
+        Oldest last-good snapshot served when upstream fails.
+    timeout_seconds : float
+        How long a request waits for an in-flight upstream call.
+    clock : Callable[[], float]
+        Monotonic clock (injectable for tests).
+    """
+
+    upstream: Upstream
+    ttl_seconds: float = 15.0
+    max_stale_seconds: float = 3600.0
+    timeout_seconds: float = 15.0
+    clock: Callable[[], float] = time.monotonic
+    stats: QuoteStats = field(default_factory=QuoteStats)
+
+    def __post_init__(self) -> None:
+        self._cache: dict[tuple[str, str], _Entry] = {}
+        self._inflight: dict[tuple[str, str], Future] = {}
+        self._lock = threading.Lock()
+
+    def get_quotes(self, assets: list[str], currency: str = "usd") -> dict[str, Quote]:
+        """Snapshots for *assets*; unknown IDs are left out.
+
+        Raises
+        ------
+        QuoteUnavailable
+            If nothing could be served because upstream failed.
+        """
+        currency = currency.lower()
+        keys = list(dict.fromkeys(a.lower() for a in assets))
+        now = self.clock()
+        result: dict[str, Quote] = {}
+        waits: dict[str, Future] = {}
+        lead: list[str] = []
+        failed: list[str] = []
+
+        with self._lock:
+            self.stats.requests += 1
+            for asset in keys:
+                entry = self._cache.get((asset, currency))
+                if entry is not None and now - entry.fetched < self.ttl_seconds:
+                    self.stats.cache_hits += 1
+                    quote = entry.quote
+                    fetched = entry.good_fetched if quote is not None and quote.stale else entry.fetched
+                    if quote is not None and now - fetched <= self.max_stale_seconds:
+                        result[asset] = self._served(quote, fetched, now)
+                        self.stats.stale_served += quote.stale
+                    elif quote is not None or entry.failed:
+                        failed.append(asset)  # refresh failed and no good value young enough
+                elif (asset, currency) in self._inflight:
+                    self.stats.coalesced += 1
+                    waits[asset] = self._inflight[(asset, currency)]
+                else:
+                    lead.append(asset)
+            if lead:
+                future: Future = Future()
+                for asset in lead:
+                    self._inflight[(asset, currency)] = future
+                waits.update(dict.fromkeys(lead, future))
+
+        if lead:
+            self._fetch(lead, currency, future)
+
+        for asset, fut in waits.items():
+            try:
+                quote = fut.result(timeout=self.timeout_seconds).get(asset)
+            except Exception:  # noqa: BLE001 — upstream error or timeout: use the last good value
+                quote = self._last_good(asset, currency)
+                if quote is None:
+                    failed.append(asset)
+            if quote is not None:
+                result[asset] = quote
+
+        if failed and not result:
+            raise QuoteUnavailable(f"Upstream unavailable and no cached quote for: {failed}")
+        return result
+
+    def _fetch(self, assets: list[str], currency: str, future: Future) -> None:
+        """Leader path: one upstream call for *assets*, then wake the waiters."""
+        with self._lock:
+            self.stats.upstream_calls += 1
+        try:
+            raw = self.upstream(assets, currency)
+            fetched_at = datetime.now(timezone.utc)
+            now = self.clock()
+            quotes: dict[str, Quote | None] = {}
+            with self._lock:
+                for asset in assets:
+                    fields = raw.get(asset)
+                    quote = (
+                        Quote.from_coingecko(asset, currency, fields, fetched_at)
+                        if fields and currency in fields else None
+                    )
+                    entry = self._cache.setdefault((asset, currency), _Entry(None, now))
+                    entry.quote, entry.fetched, entry.failed = quote, now, False
+                    if quote is not None:
+                        entry.good, entry.good_fetched = quote, now
+                    quotes[asset] = quote
+            future.set_result(quotes)
+        except Exception as exc:  # noqa: BLE001 — surfaced to every waiter
+            now = self.clock()
+            with self._lock:
+                self.stats.upstream_errors += 1
+                # Back off for one TTL: keep serving the last good value as
+                # stale instead of retrying a failing (often rate-limited) upstream
+                for asset in assets:
+                    entry = self._cache.setdefault((asset, currency), _Entry(None, now))
+                    if entry.good is not None:
+                        entry.quote = Quote(**{**entry.good.__dict__, "stale": True})
+                    else:
+                        entry.quote, entry.failed = None, True
+                    entry.fetched = now
+            logger.warning("Quote upstream failed for %d assets: %s", len(assets), exc)
+            future.set_exception(exc)
+        finally:
+            with self._lock:
+                for asset in assets:
+                    if self._inflight.get((asset, currency)) is future:
+                        del self._inflight[(asset, currency)]
+
+    def _last_good(self, asset: str, currency: str) -> Quote | None:
+        now = self.clock()
+        with self._lock:
+            entry = self._cache.get((asset, currency))
+            if entry is None or entry.good is None or now - entry.good_fetched > self.max_stale_seconds:
+                return None
+            self.stats.stale_served += 1
+            quote = self._served(entry.good, entry.good_fetched, now)
+        quote.stale = True
+        return quote
+
+    @staticmethod
+    def _served(quote: Quote, fetched: float, now: float) -> Quote:
+        return Quote(**{**quote.__dict__, "age_seconds": max(now - fetched, 0.0)})
+
+
+# ── Upstreams ────────────────────────────────────────────────────────────────
+
+class StubUpstream:
+    """Local stand-in for CoinGecko ``simple/price``.
+
+    Parameters
+    ----------
+    prices : dict[str, float]
+        Price per asset ID in USD.
+    latency_seconds : float
+        Artificial delay per call, to exercise request coalescing.
+    """
+
+    def __init__(self, prices: dict[str, float], latency_seconds: float = 0.0) -> None:
+        self.prices = dict(prices)
+        self.latency_seconds = latency_seconds
+        self.fail = False
+        self.calls: list[list[str]] = []
+
+    @classmethod
+    def from_store(cls, processed_dir: Path | str, **kwargs) -> StubUpstream:
+        """Use the latest stored close of every asset as its live price."""
+        import pyarrow.parquet as pq
+
+        prices = {}
+        for path in sorted(Path(processed_dir).glob("*.parquet")):
+            if path.stem == "all_assets":
+                continue
+            close = pq.read_table(path, columns=["close"]).column("close").drop_null()
+            if len(close):
+                prices[path.stem] = float(close[-1].as_py())
+        return cls(prices, **kwargs)
+
+    def __call__(self, assets: list[str], currency: str) -> dict[str, dict]:
+        self.calls.append(list(assets))
+        if self.latency_seconds:
+            time.sleep(self.latency_seconds)
+        if self.fail:
+            raise RuntimeError("stub upstream failure")
+        return {
+            a: {currency: p, f"{currency}_market_cap": None, f"{currency}_24h_vol": None,
+                f"{currency}_24h_change": 0.0}
+            for a in assets if (p := self.prices.get(a)) is not None
+        }
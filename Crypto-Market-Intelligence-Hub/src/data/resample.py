@@ -0,0 +1,354 @@
+"""Multi-timeframe OHLCV resampling with an incrementally updated Parquet cache.
+
+Bars are aggregated with the usual OHLCV rules (first open, max high, min low,
+last close, summed volume) and labelled by the *start* of their bucket. Since
+those rules are associative, a coarse timeframe can be built from a finer one
+(1h → 4h → 1d → 1w, 1d → 1mo) and new base bars can be folded into the last,
+still-open bucket of a cached aggregate without touching older history.
+
+Every aggregate carries two bookkeeping columns:
+
+- ``n_bars``   — number of base bars folded into the bucket.
+- ``base_end`` — timestamp of the latest base bar in the bucket; it doubles
+  as the per-asset watermark when new bars are merged in.
+"""
+from __future__ import annotations
+
+import logging
+from pathlib import Path
+
+import pandas as pd
+
+from src.data.store import load_parquet, save_parquet
+
+logger = logging.getLogger(__name__)
+
+# Timeframe -> (finer timeframe it is built from, whether it needs intraday bars)
+TIMEFRAMES: dict[str, tuple[str | None, bool]] = {
+    "1h": (None, True),
+    "4h": ("1h", True),
+    "1d": ("4h", False),
+    "1w": ("1d", False),
+    "1mo": ("1d", False),
+}
+BASE_TIMEFRAME = "1d"
+
+_PRICE_COLS = ("open", "high", "low", "close", "volume")
+_FLOOR_FREQ = {"1h": "1h", "4h": "4h", "1d": "1D"}
+
+# (path, mtime) -> frame; avoids re-reading a cached aggregate on every API call
+_MEMO: dict[Path, tuple[float, pd.DataFrame]] = {}
+
+
+# ── Internal helpers ─────────────────────────────────────────────────────────
+
+def _check_timeframe(timeframe: str) -> None:
+    if timeframe not in TIMEFRAMES:
+        raise ValueError(f"Unknown timeframe '{timeframe}'. Available: {list(TIMEFRAMES)}")
+
+
+def _bucket_start(dates: pd.Series, timeframe: str) -> pd.Series:
+    """Start timestamp of the *timeframe* bucket each date falls into."""
+    if timeframe in _FLOOR_FREQ:
+        return dates.dt.floor(_FLOOR_FREQ[timeframe])
+    if timeframe == "1w":
+        # ISO weeks: Monday 00:00 starts the bucket
+        day = dates.dt.normalize()
+        return day - pd.to_timedelta(day.dt.dayofweek, unit="D")
+    return dates.dt.to_period("M").dt.to_timestamp()
+
+
+def _as_bars(df: pd.DataFrame) -> pd.DataFrame:
+    """Normalise *df* to OHLCV bars with ``n_bars``/``base_end`` bookkeeping."""
+    cols = ["asset", "date"] + [c for c in _PRICE_COLS if c in df.columns]
+    bars = df[cols].copy()
+    bars["date"] = pd.to_datetime(bars["date"])
+    bars["n_bars"] = df["n_bars"].to_numpy() if "n_bars" in df.columns else 1
+    bars["base_end"] = pd.to_datetime(df["base_end"]) if "base_end" in df.columns else bars["date"]
+    return bars
+
+
+def _aggregate(bars: pd.DataFrame, timeframe: str) -> pd.DataFrame:
+    """Aggregate normalised *bars* into *timeframe* buckets for all assets at once."""
+    bars = bars.assign(bucket=_bucket_start(bars["date"], timeframe))
+    bars = bars.sort_values(["asset", "bucket", "base_end"], kind="mergesort")
+    g = bars.groupby(["asset", "bucket"], sort=False)
+
+    out = pd.DataFrame(index=g.size().index)
+    if "open" in bars.columns:
+        out["open"] = g["open"].first()
+    if "high" in bars.columns:
+        out["high"] = g["high"].max()
+    if "low" in bars.columns:
+        out["low"] = g["low"].min()
+    out["close"] = g["close"].last()
+    if "volume" in bars.columns:
+        out["volume"] = g["volume"].sum(min_count=1)
+    out["n_bars"] = g["n_bars"].sum()
+    out["base_end"] = g["base_end"].max()
+
+    out = out.reset_index().rename(columns={"bucket": "date"})
+    out = out.sort_values(["asset", "date"], kind="mergesort").reset_index(drop=True)
+    out.attrs["timeframe"] = timeframe
+    return out
+
+
+def infer_base_timeframe(df: pd.DataFrame) -> str:
+    """Return ``"1h"`` for intraday input and ``"1d"`` otherwise."""
+    step = df.sort_values(["asset", "date"])["date"].groupby(df["asset"]).diff().median()
+    return "1h" if pd.notna(step) and step < pd.Timedelta(days=1) else BASE_TIMEFRAME
+
+
+# ── Public API ───────────────────────────────────────────────────────────────
+
+def resample_ohlcv(df: pd.DataFrame, timeframe: str) -> pd.DataFrame:
+    """Resample long-format OHLCV bars (any number of assets) to *timeframe*.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Bars with ``asset``, ``date`` and OHLCV columns. Extra columns are
+        dropped; ``n_bars``/``base_end`` are honoured if already present.
+    timeframe : str
+        One of :data:`TIMEFRAMES`.
+
+    Returns
+    -------
+    pd.DataFrame
+        One row per (asset, bucket), labelled by bucket start.
+
+    Raises
+    ------
+    ValueError
+        If *timeframe* is unknown, or intraday while *df* holds daily bars.
+    """
+    _check_timeframe(timeframe)
+    if df.attrs.get("timeframe") == timeframe:
+        return df
+    if TIMEFRAMES[timeframe][1] and infer_base_timeframe(df) != "1h":
+        raise ValueError(f"Cannot resample to {timeframe}: input bars are not intraday")
+    return _aggregate(_as_bars(df), timeframe)
+
+
+def resample_all(
+    df: pd.DataFrame,
+    timeframes: list[str] | tuple[str, ...] | None = None,
+) -> dict[str, pd.DataFrame]:
+    """Build several timeframes in one pass, each from the next-finer one.
+
+    Intraday timeframes are only produced from intraday input; requesting them
+    for daily data logs a warning and skips them.
+
+    Returns
+    -------
+    dict[str, pd.DataFrame]
+        Mapping of timeframe to its aggregate.
+    """
+    wanted = list(TIMEFRAMES) if timeframes is None else list(timeframes)
+    for tf in wanted:
+        _check_timeframe(tf)
+
+    base_tf = infer_base_timeframe(df)
+    built: dict[str, pd.DataFrame] = {base_tf: _aggregate(_as_bars(df), base_tf)}
+
+    def build(tf: str) -> pd.DataFrame | None:
+        if tf in built:
+            return built[tf]
+        parent, intraday = TIMEFRAMES[tf]
+        if intraday and base_tf != "1h":
+            logger.warning("Skipping %s: input bars are not intraday", tf)
+            return None
+        source = build(parent) if parent is not None else None
+        if source is None:
+            source = built[base_tf]
+        built[tf] = _aggregate(source, tf)
+        return built[tf]
+
+    out = {}
+    for tf in wanted:
+        agg = build(tf)
+        if agg is not None:
+            out[tf] = agg
+    return out
+
+
+def _bucket_keys(bars: pd.DataFrame, timeframe: str) -> pd.MultiIndex:
+    return pd.MultiIndex.from_arrays([bars["asset"], _bucket_start(bars["date"], timeframe)])
+
+
+def _restate(
+    agg: pd.DataFrame,
+    restated: pd.DataFrame,
+    timeframe: str,
+    history: pd.DataFrame | None,
+) -> pd.DataFrame:
+    """Rebuild the buckets of *agg* holding *restated* base bars.
+
+    The buckets are recomputed from *history* when given. Otherwise only
+    buckets whose base bars are all in *restated* can be rebuilt; the others
+    keep their cached values.
+    """
+    keys = _bucket_keys(restated, timeframe).unique()
+    source = _as_bars(history) if history is not None else restated
+    rebuilt = _aggregate(source[_bucket_keys(source, timeframe).isin(keys)], timeframe)
+    if history is None:
+        cached = agg.set_index(["asset", "date"])["n_bars"]
+        covered = rebuilt["n_bars"].to_numpy() >= cached.reindex(
+            pd.MultiIndex.from_frame(rebuilt[["asset", "date"]])
+        ).to_numpy()
+        if not covered.all():
+            logger.debug(
+                "%d %s buckets with restated bars kept: pass history to rebuild them",
+                int((~covered).sum()), timeframe,
+            )
+        rebuilt = rebuilt[covered]
+    if rebuilt.empty:
+        return agg
+    replace = pd.MultiIndex.from_frame(agg[["asset", "date"]]).isin(
+        pd.MultiIndex.from_frame(rebuilt[["asset", "date"]])
+    )
+    return pd.concat([agg[~replace], rebuilt], ignore_index=True)
+
+
+def merge_new_bars(
+    agg: pd.DataFrame,
+    new_bars: pd.DataFrame,
+    timeframe: str,
+    history: pd.DataFrame | None = None,
+) -> pd.DataFrame:
+    """Fold *new_bars* into an existing *timeframe* aggregate.
+
+    Bars after an asset's ``base_end`` watermark are folded into the open
+    bucket. Bars at or before it restate history: their buckets are rebuilt
+    from *history* (the current base bars), or from *new_bars* when those hold
+    every base bar of the bucket, so a replayed or corrected bar replaces the
+    old one instead of being counted twice. Only touched buckets are
+    recomputed — older history is copied through.
+    """
+    _check_timeframe(timeframe)
+    if new_bars.empty:
+        return agg
+
+    new = _as_bars(new_bars)
+    seen = new["asset"].map(agg.groupby("asset")["base_end"].max())
+    restated = new[seen.notna() & (new["date"] <= seen)]
+    if not restated.empty:
+        agg = _restate(agg, restated, timeframe, history)
+        # A bucket rebuilt from history may already hold some of the new bars
+        seen = new["asset"].map(agg.groupby("asset")["base_end"].max())
+    new = new[seen.isna() | (new["date"] > seen)]
+    if new.empty:
+        return _sorted(agg, timeframe)
+
+    first_bucket = _bucket_start(new["date"], timeframe).groupby(new["asset"]).min()
+    cutoff = agg["asset"].map(first_bucket)
+    reopen = cutoff.notna() & (agg["date"] >= cutoff)
+
+    merged = _aggregate(pd.concat([agg[reopen], new], ignore_index=True), timeframe)
+    return _sorted(pd.concat([agg[~reopen], merged], ignore_index=True), timeframe)
+
+
+def _sorted(agg: pd.DataFrame, timeframe: str) -> pd.DataFrame:
+    out = agg.sort_values(["asset", "date"], kind="mergesort").reset_index(drop=True)
+    out.attrs["timeframe"] = timeframe
+    return out
+
+
+# ── Cache ────────────────────────────────────────────────────────────────────
+
+def aggregate_path(processed_dir: Path | str, timeframe: str) -> Path:
+    """Location of the cached *timeframe* aggregate under *processed_dir*."""
+    return Path(processed_dir) / "aggregates" / f"{timeframe}.parquet"
+
+
+def build_aggregate_cache(
+    df: pd.DataFrame,
+    processed_dir: Path | str,
+    timeframes: list[str] | tuple[str, ...] | None = None,
+) -> dict[str, Path]:
+    """Resample *df* to every timeframe and write one Parquet file per timeframe."""
+    saved = {}
+    for tf, agg in resample_all(df, timeframes).items():
+        saved[tf] = save_parquet(agg, aggregate_path(processed_dir, tf))
+    return saved
+
+
+def update_aggregate_cache(
+    new_bars: pd.DataFrame,
+    processed_dir: Path | str,
+    timeframes: list[str] | tuple[str, ...] | None = None,
+    history: pd.DataFrame | None = None,
+) -> dict[str, Path]:
+    """Merge freshly arrived base bars into every cached aggregate.
+
+    *history* is the full set of current base bars, if the caller has it; it
+    is used to rebuild buckets with restated bars (see :func:`merge_new_bars`).
+    A timeframe without a cache file is built from *history*, or else from the
+    (just updated) cache of the timeframe it derives from.
+
+    Raises
+    ------
+    ValueError
+        If a timeframe has no cache, no *history* is given and its parent
+        timeframe is not cached either (the new bars alone would lose history).
+    """
+    wanted = timeframes or list(TIMEFRAMES)
+    updated: dict[str, pd.DataFrame] = {}
+    saved = {}
+    for tf in sorted(wanted, key=list(TIMEFRAMES).index):     # parents first
+        path = aggregate_path(processed_dir, tf)
+        if path.exists():
+            agg = merge_new_bars(load_parquet(path), new_bars, tf, history=history)
+        elif TIMEFRAMES[tf][1] and infer_base_timeframe(new_bars) != "1h":
+            continue                                    # daily bars: no intraday timeframes
+        elif history is not None:
+            built = resample_all(history, [tf])
+            if tf not in built:
+                continue
+            agg = built[tf]
+        else:
+            parent = TIMEFRAMES[tf][0]
+            parent_path = aggregate_path(processed_dir, parent) if parent is not None else None
+            if parent in updated:
+                source = updated[parent]
+            elif parent_path is not None and parent_path.exists():
+                source = merge_new_bars(load_parquet(parent_path), new_bars, parent)
+            else:
+                raise ValueError(f"No {tf} cache to update and no history to build it from")
+            agg = _aggregate(source, tf)
+        updated[tf] = agg
+        saved[tf] = save_parquet(agg, path)
+    return saved
+
+
+def load_timeframe(
+    processed_dir: Path | str,
+    timeframe: str,
+    asset: str | None = None,
+) -> pd.DataFrame:
+    """Read a cached aggregate, optionally restricted to one *asset*.
+
+    The frame is memoised per file modification time, so repeated calls are
+    served from memory until the cache is rewritten.
+
+    Raises
+    ------
+    FileNotFoundError
+        If the aggregate has not been built yet.
+    """
+    _check_timeframe(timeframe)
+    path = aggregate_path(processed_dir, timeframe)
+    if not path.exists():
+        raise FileNotFoundError(f"Aggregate not found: {path}")
+    mtime = path.stat().st_mtime
+    hit = _MEMO.get(path)
+    if hit is None or hit[0] != mtime:
+        hit = (mtime, load_parquet(path))
+        _MEMO[path] = hit
+    df = hit[1]
+    if asset is not None:
+        df = df[df["asset"] == asset].reset_index(drop=True)
+    else:
+        df = df.copy()
+    df.attrs["timeframe"] = timeframe
+    return df
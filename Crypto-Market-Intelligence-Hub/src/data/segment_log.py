@@ -0,0 +1,309 @@
+"""Append-only columnar segment log with size-tiered background compaction.
+
+Layout under the log directory::
+
+    MANIFEST.json          live files (level, sequence number, key ranges) and
+                           replaced files awaiting deletion
+    seg-<seq>.parquet      level-0 segments, one per append
+    L<n>-<seq>.parquet     compacted files at level n
+
+An append writes one small immutable segment (sorted by key) and publishes it
+in the manifest, so its cost is O(new rows). Readers take a snapshot of the
+manifest and merge the live files: rows are deduplicated on the key columns
+and the file with the highest sequence number wins, so a re-appended bar
+replaces the old one.
+
+Compaction is size-tiered. Once ``fanout`` files pile up at one level they are
+merged, sorted and deduplicated into a single file one level up. A row is
+rewritten at most once per level. The number of levels grows with the log of
+the data size, which bounds write amplification to ``O(log_fanout(N))``.
+Replaced files are deleted one compaction cycle later, so readers holding an
+older snapshot can still open them. They are recorded in the manifest, so the
+next cycle deletes them even when it runs in a different ``SegmentLog``
+instance or process. Parquet files in neither list (left by a writer that
+died before publishing) are swept once older than ``orphan_grace_seconds``.
+
+The log assumes a single writer process (appends and compaction share a
+lock); any number of readers may run concurrently.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+logger = logging.getLogger(__name__)
+
+MANIFEST = "MANIFEST.json"
+KEY_COLS = ("asset", "date")
+_SEQ_COL = "__seq"
+
+
+@dataclass(frozen=True)
+class SegmentInfo:
+    """Manifest entry for one immutable file."""
+
+    name: str
+    level: int
+    seq: int
+    rows: int
+    min_date: str
+    max_date: str
+    assets: list[str]
+
+
+class SegmentLog:
+    """Append-only, compacting Parquet log keyed by ``(asset, date)``.
+
+    Parameters
+    ----------
+    root : Path | str
+        Directory holding the segments and manifest (created if missing).
+    fanout : int
+        Files per level that trigger a merge into the next level.
+    orphan_grace_seconds : float
+        Minimum age of an unlisted ``*.parquet`` file before compaction
+        deletes it.
+    """
+
+    def __init__(self, root: Path | str, fanout: int = 8, orphan_grace_seconds: float = 3600.0) -> None:
+        if fanout < 2:
+            raise ValueError("fanout must be at least 2")
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.fanout = fanout
+        self.orphan_grace_seconds = orphan_grace_seconds
+        self._lock = threading.Lock()
+        self._compact_lock = threading.Lock()
+        self._obsolete: list[str] = []
+        self._stop: threading.Event | None = None
+        self._thread: threading.Thread | None = None
+        self._files: list[SegmentInfo] = []
+        self._next_seq = 0
+        self._manifest_mtime: int | None = None
+        # Rows written by this instance, to monitor write amplification
+        self.rows_appended = 0
+        self.rows_compacted = 0
+        self._reload()
+
+    # ── Manifest ─────────────────────────────────────────────────────────────
+
+    def _reload(self) -> None:
+        """Re-read the manifest if another process has published since we last looked."""
+        path = self.root / MANIFEST
+        try:
+            mtime = path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return
+        if mtime == self._manifest_mtime:
+            return
+        payload = json.loads(path.read_text())
+        self._files = [SegmentInfo(**f) for f in payload["files"]]
+        self._obsolete = list(payload.get("obsolete", []))
+        self._next_seq = int(payload["next_seq"])
+        self._manifest_mtime = mtime
+
+    def _publish(self) -> None:
+        """Atomically replace the manifest with the in-memory state."""
+        tmp = self.root / f".{MANIFEST}.tmp"
+        payload = {
+            "next_seq": self._next_seq,
+            "files": [asdict(f) for f in self._files],
+            "obsolete": self._obsolete,
+        }
+        tmp.write_text(json.dumps(payload, indent=1))
+        os.replace(tmp, self.root / MANIFEST)
+        self._manifest_mtime = (self.root / MANIFEST).stat().st_mtime_ns
+
+    def segments(self) -> list[SegmentInfo]:
+        """Snapshot of the live files, oldest first."""
+        with self._lock:
+            self._reload()
+            return sorted(self._files, key=lambda f: f.seq)
+
+    # ── Writes ───────────────────────────────────────────────────────────────
+
+    def _write(self, frame: pd.DataFrame, name: str, level: int, seq: int) -> SegmentInfo:
+        frame = frame.sort_values(list(KEY_COLS), kind="mergesort", ignore_index=True)
+        tmp = self.root / f".{name}.tmp"
+        pq.write_table(pa.Table.from_pandas(frame, preserve_index=False), tmp, compression="zstd")
+        os.replace(tmp, self.root / name)
+        dates = pd.to_datetime(frame["date"])
+        return SegmentInfo(
+            name=name,
+            level=level,
+            seq=seq,
+            rows=len(frame),
+            min_date=dates.min().isoformat(),
+            max_date=dates.max().isoformat(),
+            assets=sorted(frame["asset"].astype(str).unique().tolist()),
+        )
+
+    def append(self, df: pd.DataFrame) -> SegmentInfo | None:
+        """Write *df* as a new level-0 segment and publish it."""
+        missing = [c for c in KEY_COLS if c not in df.columns]
+        if missing:
+            raise KeyError(f"Appended frame lacks key columns: {missing}")
+        if df.empty:
+            return None
+        with self._lock:
+            seq = self._next_seq
+            info = self._write(df, f"seg-{seq:012d}.parquet", 0, seq)
+            self._files.append(info)
+            self._next_seq += 1
+            self._publish()
+            self.rows_appended += info.rows
+        logger.debug("Appended %d rows as %s", info.rows, info.name)
+        return info
+
+    @property
+    def write_amplification(self) -> float:
+        """Rows written (appends + compaction) per row appended."""
+        return (self.rows_appended + self.rows_compacted) / max(self.rows_appended, 1)
+
+    # ── Reads ────────────────────────────────────────────────────────────────
+
+    def read(
+        self,
+        assets: list[str] | None = None,
+        start: str | pd.Timestamp | None = None,
+        end: str | pd.Timestamp | None = None,
+        columns: list[str] | None = None,
+    ) -> pd.DataFrame:
+        """Merged, deduplicated view across all live files, sorted by key.
+
+        Files whose manifest key ranges cannot match the filters are skipped
+        without being opened.
+        """
+        lo = pd.Timestamp(start) if start is not None else None
+        hi = pd.Timestamp(end) if end is not None else None
+        wanted = set(assets) if assets is not None else None
+
+        filters = []
+        if wanted is not None:
+            filters.append(("asset", "in", sorted(wanted)))
+        if lo is not None:
+            filters.append(("date", ">=", lo))
+        if hi is not None:
+            filters.append(("date", "<=", hi))
+        read_cols = None if columns is None else list(dict.fromkeys([*KEY_COLS, *columns]))
+
+        tables = []
+        for info in self.segments():
+            if wanted is not None and wanted.isdisjoint(info.assets):
+                continue
+            if lo is not None and pd.Timestamp(info.max_date) < lo:
+                continue
+            if hi is not None and pd.Timestamp(info.min_date) > hi:
+                continue
+            table = pq.read_table(self.root / info.name, columns=read_cols, filters=filters or None)
+            tables.append(table.append_column(_SEQ_COL, pa.array([info.seq] * table.num_rows, pa.int64())))
+        if not tables:
+            return pd.DataFrame(columns=read_cols or list(KEY_COLS))
+
+        frame = pa.concat_tables(tables, promote_options="permissive").to_pandas()
+        frame = _dedupe(frame).drop(columns=_SEQ_COL)
+        return frame if columns is None else frame[read_cols]
+
+    # ── Compaction ───────────────────────────────────────────────────────────
+
+    def compact(self, full: bool = False) -> int:
+        """Run one compaction pass; return the number of files merged.
+
+        With ``full=True`` every live file is merged into one file at the
+        highest level, e.g. before archiving the store.
+        """
+        with self._compact_lock:
+            with self._lock:
+                self._delete_obsolete()
+            if full:
+                snapshot = self.segments()
+                if len(snapshot) < 2:
+                    return 0
+                return self._merge(snapshot, max(f.level for f in snapshot) + 1)
+
+            merged = 0
+            while True:
+                by_level: dict[int, list[SegmentInfo]] = {}
+                for info in self.segments():
+                    by_level.setdefault(info.level, []).append(info)
+                full_levels = [lvl for lvl, files in sorted(by_level.items()) if len(files) >= self.fanout]
+                if not full_levels:
+                    return merged
+                # Oldest files first keeps every level older than the one below it
+                level = full_levels[0]
+                merged += self._merge(by_level[level][: self.fanout], level + 1)
+
+    def _merge(self, inputs: list[SegmentInfo], level: int) -> int:
+        frames = []
+        for info in inputs:
+            table = pq.read_table(self.root / info.name)
+            frames.append(table.append_column(_SEQ_COL, pa.array([info.seq] * table.num_rows, pa.int64())))
+        frame = _dedupe(pa.concat_tables(frames, promote_options="permissive").to_pandas()).drop(columns=_SEQ_COL)
+        # The merged file inherits the newest input's sequence number, which
+        # keeps last-write-wins ordering against segments outside the merge.
+        seq = max(f.seq for f in inputs)
+        out = self._write(frame, f"L{level}-{seq:012d}.parquet", level, seq)
+
+        names = {f.name for f in inputs}
+        with self._lock:
+            self._reload()
+            self._files = [f for f in self._files if f.name not in names] + [out]
+            self._obsolete.extend(sorted(names))
+            self._publish()
+            self.rows_compacted += out.rows
+        logger.info("Compacted %d files (%d rows) into %s", len(inputs), out.rows, out.name)
+        return len(inputs)
+
+    def _delete_obsolete(self) -> None:
+        """Delete files replaced by the previous cycle, and stale orphans. Caller holds ``_lock``."""
+        self._reload()
+        for name in self._obsolete:
+            (self.root / name).unlink(missing_ok=True)
+        if self._obsolete:
+            self._obsolete = []
+            self._publish()
+
+        live = {f.name for f in self._files}
+        cutoff = time.time() - self.orphan_grace_seconds
+        for path in self.root.glob("*.parquet"):
+            if path.name not in live and path.stat().st_mtime < cutoff:
+                logger.warning("Deleting orphaned segment %s", path.name)
+                path.unlink(missing_ok=True)
+
+    def start_compactor(self, interval_seconds: float = 60.0) -> None:
+        """Compact in a daemon thread every *interval_seconds* until :meth:`stop_compactor`."""
+        if self._thread is not None:
+            return
+        self._stop = threading.Event()
+
+        def loop() -> None:
+            while not self._stop.wait(interval_seconds):
+                try:
+                    self.compact()
+                except Exception:  # noqa: BLE001 — keep the compactor alive
+                    logger.exception("Background compaction failed in %s", self.root)
+
+        self._thread = threading.Thread(target=loop, name=f"compactor-{self.root.name}", daemon=True)
+        self._thread.start()
+
+    def stop_compactor(self) -> None:
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+
+def _dedupe(frame: pd.DataFrame) -> pd.DataFrame:
+    """Keep the highest-sequence row per key, sorted by key."""
+    frame = frame.sort_values([*KEY_COLS, _SEQ_COL], kind="mergesort")
+    return frame.drop_duplicates(list(KEY_COLS), keep="last").reset_index(drop=True)
@@ -0,0 +1,135 @@
+"""Read-only, memory-mapped snapshot of the processed store for multi-worker serving.
+
+The processed store is one Parquet file per asset. Every process that reads it
+holds its own decoded copy. A snapshot decodes the store once into one ``.npy``
+file per column, concatenated across assets::
+
+    <snapshot_dir>/<version>/index.json      assets, row offsets, columns
+    <snapshot_dir>/<version>/<column>.npy    one contiguous array per column
+
+:class:`SharedStore` opens these with ``mmap_mode="r"``, so every worker forked
+from the serving master (see :mod:`src.api.serve`) reads the same page-cache
+pages and adds no private copy. ``version`` is a hash of the names, sizes and
+modification times of the store's files. The master compares it to
+:func:`store_version` to decide when to build a new snapshot and reload.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+INDEX = "index.json"
+_CURRENT: SharedStore | None = None
+
+
+def _store_files(processed_dir: Path) -> list[Path]:
+    return sorted(p for p in processed_dir.glob("*.parquet") if p.stem != "all_assets")
+
+
+def store_version(processed_dir: Path | str) -> str:
+    """Content version of the processed store (changes whenever a file does)."""
+    digest = hashlib.sha1()
+    for path in _store_files(Path(processed_dir)):
+        st = path.stat()
+        digest.update(f"{path.name}:{st.st_size}:{st.st_mtime_ns};".encode())
+    return digest.hexdigest()[:16]
+
+
+def build_snapshot(processed_dir: Path | str, snapshot_dir: Path | str, keep: int = 2) -> Path:
+    """Write (or reuse) the snapshot of the store's current version; return its directory.
+
+    Only the newest *keep* snapshot versions are kept on disk.
+    """
+    processed_dir, snapshot_dir = Path(processed_dir), Path(snapshot_dir)
+    version = store_version(processed_dir)
+    dest = snapshot_dir / version
+    if (dest / INDEX).exists():
+        return dest
+
+    frames = [pd.read_parquet(p) for p in _store_files(processed_dir)]
+    if not frames:
+        raise FileNotFoundError(f"No asset files in {processed_dir}")
+    assets = [str(f["asset"].iloc[0]) if "asset" in f and len(f) else p.stem
+              for f, p in zip(frames, _store_files(processed_dir))]
+    frames = [f.sort_values("date", kind="stable") for f in frames]
+    numeric = [c for c in frames[0].columns if c != "date" and pd.api.types.is_numeric_dtype(frames[0][c])]
+    columns = [c for c in numeric if all(c in f for f in frames)]
+
+    tmp = snapshot_dir / f".{version}.tmp"
+    shutil.rmtree(tmp, ignore_errors=True)
+    tmp.mkdir(parents=True)
+    # Keep the store's own datetime resolution so readers see identical dtypes
+    date_dtype = np.dtype(pd.to_datetime(frames[0]["date"]).to_numpy().dtype)
+    dates = np.concatenate([pd.to_datetime(f["date"]).to_numpy(date_dtype) for f in frames])
+    np.save(tmp / "date.npy", dates.view("int64"))
+    for col in columns:
+        np.save(tmp / f"{col}.npy", np.concatenate([f[col].to_numpy(dtype=float) for f in frames]))
+    offsets = np.cumsum([0] + [len(f) for f in frames]).tolist()
+    index = {"version": version, "source": str(processed_dir.resolve()), "assets": assets,
+             "offsets": offsets, "columns": columns, "date_dtype": date_dtype.str}
+    (tmp / INDEX).write_text(json.dumps(index))
+    os.replace(tmp, dest)
+
+    old = sorted((p for p in snapshot_dir.iterdir() if p.is_dir() and not p.name.startswith(".")),
+                 key=lambda p: p.stat().st_mtime)
+    for stale in old[:-keep]:
+        shutil.rmtree(stale, ignore_errors=True)
+    logger.info("Snapshot %s: %d assets, %d rows, %d columns", version, len(assets), offsets[-1], len(columns))
+    return dest
+
+
+class SharedStore:
+    """Memory-mapped view of one snapshot."""
+
+    def __init__(self, path: Path | str) -> None:
+        self.path = Path(path)
+        index = json.loads((self.path / INDEX).read_text())
+        self.version: str = index["version"]
+        self.source = Path(index["source"])
+        self.assets: list[str] = index["assets"]
+        self.columns: list[str] = index["columns"]
+        self._date_dtype = np.dtype(index["date_dtype"])
+        self._offsets = dict(zip(self.assets, zip(index["offsets"][:-1], index["offsets"][1:])))
+        self._arrays = {c: np.load(self.path / f"{c}.npy", mmap_mode="r") for c in ["date", *self.columns]}
+
+    def __contains__(self, asset: str) -> bool:
+        return asset in self._offsets
+
+    def column(self, asset: str, name: str) -> np.ndarray:
+        """Read-only view of one column of *asset* (``date`` as datetime64)."""
+        lo, hi = self._offsets[asset]
+        values = self._arrays[name][lo:hi]
+        return values.view(self._date_dtype) if name == "date" else values
+
+    def frame(self, asset: str, columns: list[str] | None = None) -> pd.DataFrame:
+        """``date`` plus *columns* (default: all) of *asset*, as a small private copy."""
+        if asset not in self._offsets:
+            raise FileNotFoundError(f"Asset '{asset}' not found in snapshot {self.version}")
+        cols = self.columns if columns is None else columns
+        missing = [c for c in cols if c not in self._arrays]
+        if missing:
+            raise KeyError(f"Columns not in snapshot: {missing}")
+        data = {"date": self.column(asset, "date")} | {c: np.array(self.column(asset, c)) for c in cols}
+        return pd.DataFrame(data).assign(asset=asset)
+
+
+def install(store: SharedStore | None) -> None:
+    """Make *store* the process-wide snapshot (done by the serving master before forking)."""
+    global _CURRENT
+    _CURRENT = store
+
+
+def current(processed_dir: Path | str | None = None) -> SharedStore | None:
+    """The installed snapshot, if any (and if it was built from *processed_dir*)."""
+    if _CURRENT is None or processed_dir is None:
+        return _CURRENT
+    return _CURRENT if Path(processed_dir).resolve() == _CURRENT.source else None
@@ -91,3 +91,4 @@ def load_asset_parquet(asset: str, processed_dir: Path | str) -> pd.DataFrame:
     """Load a single asset's Parquet file."""
     path = Path(processed_dir) / f"{asset}.parquet"
     return load_parquet(path)
+
@@ -0,0 +1,371 @@
+"""Streaming trade ticks → OHLCV candles for several intervals at once.
+
+Ticks are ingested in arrays (one call per asset per chunk), never one Python
+call per tick:
+
+1. The finest interval is reduced straight from the ticks with one sort and
+   ``reduceat``. Coarser intervals are reduced from those partial bars, which
+   is valid because the OHLCV rules are associative and interval widths nest
+   (1m → 5m → 1h → 1d).
+2. Still-open bars live in a fixed-size NumPy ring buffer per asset and
+   interval, keyed by ``bucket % capacity``. Each chunk's partial bars are
+   folded into them.
+3. Event time drives completion. The per-asset watermark is the latest tick
+   time minus ``allowed_lateness_ms``. A bar is emitted once the watermark
+   passes its end. A tick is dropped as late, for that interval only, if its
+   bar had already been emitted when the tick arrived (evaluated tick by
+   tick, so chunking does not change the result). Out-of-order ticks inside
+   the watermark are merged normally: open and close follow tick time, not
+   arrival order.
+4. Completed bars are buffered and appended to the store in batches, one
+   :class:`~src.data.segment_log.SegmentLog` per interval under
+   ``<store>/candles/<interval>/``.
+
+Timestamps are integer milliseconds since the Unix epoch (UTC).
+"""
+from __future__ import annotations
+
+import logging
+import socket
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterable, Iterator
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+from src.data.segment_log import SegmentLog
+
+logger = logging.getLogger(__name__)
+
+INTERVALS: dict[str, int] = {
+    "1m": 60_000,
+    "5m": 300_000,
+    "15m": 900_000,
+    "1h": 3_600_000,
+    "4h": 14_400_000,
+    "1d": 86_400_000,
+}
+DEFAULT_INTERVALS = ("1m", "5m", "1h", "1d")
+CANDLE_COLS = ["date", "asset", "open", "high", "low", "close", "volume", "trades"]
+TICK_COLS = ["ts", "asset", "price", "size"]
+
+# Partial-bar fields, in the order used by _reduce
+_FIELDS = ("first_ts", "open", "last_ts", "close", "high", "low", "volume", "trades")
+
+
+# ── Reduction ────────────────────────────────────────────────────────────────
+
+def _reduce(key: np.ndarray, bars: dict[str, np.ndarray]) -> tuple[np.ndarray, dict[str, np.ndarray]]:
+    """Combine partial bars sharing a *key* (open/close by tick time)."""
+    if len(key) == 0:
+        return key, bars
+    by_first = np.lexsort((bars["first_ts"], key))
+    k = key[by_first]
+    starts = np.flatnonzero(np.r_[True, k[1:] != k[:-1]])
+    ends = np.r_[starts[1:], len(k)] - 1
+    # Same groups, ordered by last tick time, to pick the close
+    by_last = np.lexsort((bars["last_ts"], key))
+
+    def take(name: str, order: np.ndarray, idx: np.ndarray) -> np.ndarray:
+        return bars[name][order][idx]
+
+    out = {
+        "first_ts": take("first_ts", by_first, starts),
+        "open": take("open", by_first, starts),
+        "last_ts": take("last_ts", by_last, ends),
+        "close": take("close", by_last, ends),
+        "high": np.maximum.reduceat(bars["high"][by_first], starts),
+        "low": np.minimum.reduceat(bars["low"][by_first], starts),
+        "volume": np.add.reduceat(bars["volume"][by_first], starts),
+        "trades": np.add.reduceat(bars["trades"][by_first], starts),
+    }
+    return k[starts], out
+
+
+def _select(bars: dict[str, np.ndarray], mask: np.ndarray) -> dict[str, np.ndarray]:
+    return {name: values[mask] for name, values in bars.items()}
+
+
+def _concat(a: dict[str, np.ndarray], b: dict[str, np.ndarray]) -> dict[str, np.ndarray]:
+    return {name: np.concatenate([a[name], b[name]]) for name in _FIELDS}
+
+
+# ── Ring buffer of open bars ─────────────────────────────────────────────────
+
+class _CandleRing:
+    """Fixed-size buffer of the still-open bars of one asset and interval."""
+
+    def __init__(self, capacity: int) -> None:
+        self.capacity = capacity
+        self.bucket = np.full(capacity, -1, dtype=np.int64)
+        self.bars = {
+            name: np.zeros(capacity, dtype=np.int64 if name.endswith("ts") or name == "trades" else float)
+            for name in _FIELDS
+        }
+
+    def live(self) -> tuple[np.ndarray, dict[str, np.ndarray]]:
+        mask = self.bucket >= 0
+        return self.bucket[mask], _select(self.bars, mask)
+
+    def store(self, bucket: np.ndarray, bars: dict[str, np.ndarray]) -> None:
+        slots = bucket % self.capacity
+        if len(np.unique(slots)) != len(slots):
+            raise RuntimeError("Candle ring buffer overflow; increase capacity")
+        self.bucket[:] = -1
+        self.bucket[slots] = bucket
+        for name, values in bars.items():
+            self.bars[name][slots] = values
+
+    def clear(self) -> None:
+        self.bucket[:] = -1
+
+
+@dataclass
+class _AssetState:
+    rings: list[_CandleRing]
+    max_ts: int = np.iinfo(np.int64).min // 2  # headroom so max_ts - lateness cannot wrap
+
+
+# ── Builder ──────────────────────────────────────────────────────────────────
+
+@dataclass
+class BuilderStats:
+    ticks: int = 0
+    late_dropped: dict[str, int] = field(default_factory=dict)
+    bars_emitted: dict[str, int] = field(default_factory=dict)
+
+
+class CandleBuilder:
+    """Aggregate trade ticks into OHLCV candles for several intervals.
+
+    Parameters
+    ----------
+    intervals : Iterable[str]
+        Keys of :data:`INTERVALS`; each width must divide the next.
+    allowed_lateness_ms : int
+        How far behind the latest tick of an asset a tick may arrive and
+        still be counted.
+    capacity : int
+        Ring-buffer slots per asset and interval.
+    store_dir : Path | str | None
+        If given, completed candles are appended under ``store_dir/candles``.
+    flush_rows : int
+        Completed candles buffered before an automatic flush.
+    """
+
+    def __init__(
+        self,
+        intervals: Iterable[str] = DEFAULT_INTERVALS,
+        allowed_lateness_ms: int = 5_000,
+        capacity: int = 64,
+        store_dir: Path | str | None = None,
+        flush_rows: int = 50_000,
+    ) -> None:
+        unknown = [i for i in intervals if i not in INTERVALS]
+        if unknown:
+            raise ValueError(f"Unknown intervals {unknown}. Available: {list(INTERVALS)}")
+        self.intervals = sorted(set(intervals), key=INTERVALS.__getitem__)
+        self.widths = np.array([INTERVALS[i] for i in self.intervals], dtype=np.int64)
+        if np.any(self.widths[1:] % self.widths[:-1]):
+            raise ValueError(f"Interval widths must nest: {self.intervals}")
+        if allowed_lateness_ms // self.widths[0] + 2 > capacity:
+            raise ValueError("capacity too small for allowed_lateness_ms at the finest interval")
+
+        self.allowed_lateness_ms = int(allowed_lateness_ms)
+        self.capacity = capacity
+        self.store_dir = Path(store_dir) if store_dir is not None else None
+        self.flush_rows = flush_rows
+        self.stats = BuilderStats(
+            late_dropped={i: 0 for i in self.intervals},
+            bars_emitted={i: 0 for i in self.intervals},
+        )
+        self._assets: dict[str, _AssetState] = {}
+        self._pending: dict[str, list[pd.DataFrame]] = {i: [] for i in self.intervals}
+        self._n_pending = 0
+        self._logs: dict[str, SegmentLog] = {}
+
+    # ── Ingestion ────────────────────────────────────────────────────────────
+
+    def ingest(self, asset: str, ts: np.ndarray, price: np.ndarray, size: np.ndarray) -> None:
+        """Fold a chunk of ticks for one *asset*, in arrival order."""
+        ts = np.asarray(ts, dtype=np.int64)
+        if len(ts) == 0:
+            return
+        price = np.asarray(price, dtype=float)
+        size = np.asarray(size, dtype=float)
+        state = self._assets.get(asset)
+        if state is None:
+            state = self._assets[asset] = _AssetState([_CandleRing(self.capacity) for _ in self.intervals])
+
+        # Watermark in force when each tick arrives
+        seen = np.maximum.accumulate(np.r_[state.max_ts, ts[:-1]])
+        wm_before = np.maximum(seen, state.max_ts) - self.allowed_lateness_ms
+        state.max_ts = max(state.max_ts, int(ts.max()))
+        watermark = state.max_ts - self.allowed_lateness_ms
+
+        # depth = number of intervals (finest first) the tick is too late for
+        depth = np.zeros(len(ts), dtype=np.int64)
+        for width in self.widths:
+            depth += (ts // width + 1) * width <= wm_before
+
+        key, bars = _reduce(
+            (ts // self.widths[0]) * (len(self.widths) + 1) + depth,
+            {
+                "first_ts": ts, "open": price, "last_ts": ts, "close": price,
+                "high": price, "low": price, "volume": size,
+                "trades": np.ones(len(ts), dtype=np.int64),
+            },
+        )
+        base_bucket, depth = np.divmod(key, len(self.widths) + 1)
+        self.stats.ticks += len(ts)
+
+        for level, (name, width, ring) in enumerate(zip(self.intervals, self.widths, state.rings)):
+            on_time = depth <= level
+            self.stats.late_dropped[name] += int(bars["trades"][~on_time].sum())
+            bucket = base_bucket[on_time] * self.widths[0] // width
+            live_bucket, live_bars = ring.live()
+            bucket, merged = _reduce(
+                np.r_[live_bucket, bucket], _concat(live_bars, _select(bars, on_time))
+            )
+            done = (bucket + 1) * width <= watermark
+            self._emit(name, asset, bucket[done] * width, _select(merged, done))
+            ring.store(bucket[~done], _select(merged, ~done))
+
+        if self._n_pending >= self.flush_rows:
+            self.flush()
+
+    def ingest_frame(self, ticks: pd.DataFrame) -> None:
+        """Fold a chunk of ticks with :data:`TICK_COLS` columns (any mix of assets)."""
+        ts = ticks["ts"]
+        if not pd.api.types.is_integer_dtype(ts):
+            ts = pd.to_datetime(ts, utc=True).dt.as_unit("ms").astype("int64")
+        ts = np.asarray(ts, dtype=np.int64)
+        price = ticks["price"].to_numpy(dtype=float)
+        size = ticks["size"].to_numpy(dtype=float)
+        codes, assets = pd.factorize(ticks["asset"], sort=False)
+        if len(assets) == 1:
+            self.ingest(str(assets[0]), ts, price, size)
+            return
+        order = np.argsort(codes, kind="stable")
+        bounds = np.flatnonzero(np.diff(codes[order])) + 1
+        for idx in np.split(order, bounds):
+            self.ingest(str(assets[codes[idx[0]]]), ts[idx], price[idx], size[idx])
+
+    # ── Output ───────────────────────────────────────────────────────────────
+
+    def _emit(self, interval: str, asset: str, start_ms: np.ndarray, bars: dict[str, np.ndarray]) -> None:
+        if len(start_ms) == 0:
+            return
+        self._pending[interval].append(pd.DataFrame({
+            "date": pd.to_datetime(start_ms, unit="ms"),
+            "asset": asset,
+            "open": bars["open"],
+            "high": bars["high"],
+            "low": bars["low"],
+            "close": bars["close"],
+            "volume": bars["volume"],
+            "trades": bars["trades"],
+        }))
+        self.stats.bars_emitted[interval] += len(start_ms)
+        self._n_pending += len(start_ms)
+
+    def flush(self) -> dict[str, pd.DataFrame]:
+        """Write buffered completed candles; return them per interval."""
+        out: dict[str, pd.DataFrame] = {}
+        for interval, parts in self._pending.items():
+            if not parts:
+                continue
+            frame = pd.concat(parts, ignore_index=True).sort_values(["asset", "date"], ignore_index=True)
+            parts.clear()
+            out[interval] = frame
+            if self.store_dir is not None:
+                self._write(interval, frame)
+        self._n_pending = 0
+        return out
+
+    def _write(self, interval: str, frame: pd.DataFrame) -> None:
+        if interval not in self._logs:
+            self._logs[interval] = SegmentLog(candle_dir(self.store_dir, interval))
+        self._logs[interval].append(frame)
+
+    def logs(self) -> dict[str, SegmentLog]:
+        """Segment log per interval (e.g. to start their background compactors)."""
+        return dict(self._logs)
+
+    def close(self) -> dict[str, pd.DataFrame]:
+        """End of stream: emit every open bar, then flush."""
+        for asset, state in self._assets.items():
+            for name, width, ring in zip(self.intervals, self.widths, state.rings):
+                bucket, bars = ring.live()
+                order = np.argsort(bucket)
+                self._emit(name, asset, bucket[order] * width, _select(bars, order))
+                ring.clear()
+        return self.flush()
+
+
+# ── Store ────────────────────────────────────────────────────────────────────
+
+def candle_dir(store_dir: Path | str, interval: str) -> Path:
+    return Path(store_dir) / "candles" / interval
+
+
+def load_candles(store_dir: Path | str, interval: str, asset: str | None = None) -> pd.DataFrame:
+    """Merged view of every flushed candle for *interval* (optionally one asset)."""
+    path = candle_dir(store_dir, interval)
+    if not path.exists():
+        raise FileNotFoundError(f"No {interval} candles under {path.parent}")
+    frame = SegmentLog(path).read(assets=[asset] if asset is not None else None)
+    return frame[CANDLE_COLS]
+
+
+# ── Replay sources ───────────────────────────────────────────────────────────
+
+def replay_file(path: Path | str, chunk_size: int = 100_000) -> Iterator[pd.DataFrame]:
+    """Yield tick chunks from a Parquet or CSV file with :data:`TICK_COLS` columns."""
+    path = Path(path)
+    if path.suffix == ".parquet":
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size, columns=TICK_COLS):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, usecols=TICK_COLS, chunksize=chunk_size)
+
+
+def replay_socket(host: str, port: int, chunk_size: int = 10_000) -> Iterator[pd.DataFrame]:
+    """Yield tick chunks from newline-delimited ``ts,asset,price,size`` text on a TCP socket.
+
+    A partial chunk is yielded whenever the sender pauses, so the builder's
+    watermark keeps moving on a slow feed. The iterator ends when the peer
+    closes the connection.
+    """
+    with socket.create_connection((host, port)) as conn:
+        buffer = b""
+        while True:
+            data = conn.recv(1 << 20)
+            if not data:
+                break
+            buffer += data
+            *lines, buffer = buffer.split(b"\n")
+            for lo in range(0, len(lines), chunk_size):
+                yield _parse_lines(lines[lo:lo + chunk_size])
+        if buffer.strip():
+            yield _parse_lines([buffer])
+
+
+def _parse_lines(lines: list[bytes]) -> pd.DataFrame:
+    rows = [line.decode().split(",") for line in lines if line.strip()]
+    frame = pd.DataFrame(rows, columns=TICK_COLS)
+    return frame.astype({"ts": np.int64, "price": float, "size": float})
+
+
+def run_replay(builder: CandleBuilder, source: Iterable[pd.DataFrame]) -> BuilderStats:
+    """Drive *builder* from *source* to the end of the stream."""
+    for chunk in source:
+        builder.ingest_frame(chunk)
+    builder.close()
+    logger.info(
+        "Replayed %d ticks: emitted %s, dropped late %s",
+        builder.stats.ticks, builder.stats.bars_emitted, builder.stats.late_dropped,
+    )
+    return builder.stats
@@ -2,6 +2,11 @@
 
 All functions operate on a single-asset DataFrame (sorted by date ascending)
 with OHLCV columns: open, high, low, close, volume.
+
+The ``*_multi`` kernels compute one indicator for a whole vector of periods
+and return a (T, P) array, one column per period. The price differences,
+gains/losses and true range are computed once and shared by every period.
+They expect a series without interior gaps (leading NaNs are allowed).
 """
 from __future__ import annotations
 
@@ -11,12 +16,40 @@ import pandas as pd
 
 # ── Internal helpers ─────────────────────────────────────────────────────────
 
-def _ema(series: pd.Series, span: int) -> pd.Series:
-    return series.ewm(span=span, adjust=False).mean()
+def _wilder_multi(x: np.ndarray, periods: np.ndarray) -> np.ndarray:
+    """``ewm(alpha=1/period, adjust=False).mean()`` of each column of *x* for every period.
+
+    *x* is (T,) or (T, C); the result is (T, P) or (T, C, P). Each period is
+    one linear recursive filter applied to all columns at once.
+    """
+    from scipy.signal import lfilter
+
+    x = np.asarray(x, dtype=float)
+    flat = x.reshape(len(x), -1)
+    out = np.full((*flat.shape, len(periods)), np.nan)
+    valid = np.flatnonzero(np.isfinite(flat).all(axis=1))
+    if valid.size:
+        start = valid[0]
+        seg = flat[start:]
+        for j, period in enumerate(periods):
+            a = 1.0 / period
+            # Initial state chosen so the first output equals the first input
+            out[start:, :, j] = lfilter([a], [1.0, a - 1.0], seg, axis=0, zi=(1 - a) * seg[:1])[0]
+    return out.reshape(*x.shape, len(periods))
+
+
+def _true_range(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+    prev_close = np.concatenate([[np.nan], close[:-1]])
+    return np.fmax(high - low, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)))
 
 
 # ── Public indicators ─────────────────────────────────────────────────────────
 
+def compute_ema(series: pd.Series, span: int) -> pd.Series:
+    """Exponential moving average (recursive form, ``adjust=False``)."""
+    return series.ewm(span=span, adjust=False).mean()
+
+
 def compute_rsi(close: pd.Series, period: int = 14) -> pd.Series:
     """Relative Strength Index."""
     delta = close.diff()
@@ -41,10 +74,10 @@ def compute_macd(
     tuple[pd.Series, pd.Series, pd.Series]
         (macd_line, signal_line, histogram)
     """
-    fast_ema = _ema(close, fast)
-    slow_ema = _ema(close, slow)
+    fast_ema = compute_ema(close, fast)
+    slow_ema = compute_ema(close, slow)
     macd_line = fast_ema - slow_ema
-    signal_line = _ema(macd_line, signal)
+    signal_line = compute_ema(macd_line, signal)
     histogram = macd_line - signal_line
     return macd_line, signal_line, histogram
 
@@ -82,6 +115,77 @@ def compute_atr(high: pd.Series, low: pd.Series, close: pd.Series, period: int =
     return tr.ewm(alpha=1 / period, adjust=False).mean()
 
 
+# ── Multi-period kernels ─────────────────────────────────────────────────────
+
+def compute_rsi_multi(close: pd.Series | np.ndarray, periods) -> np.ndarray:
+    """RSI for every period in *periods* as a (T, P) array.
+
+    Column ``j`` equals ``compute_rsi(close, periods[j])``.
+    """
+    close = np.asarray(close, dtype=float)
+    periods = np.asarray(periods, dtype=float)
+    delta = np.diff(close, prepend=np.nan)
+    gain_loss = np.column_stack([np.clip(delta, 0, None), np.clip(-delta, 0, None)])
+    avg = _wilder_multi(gain_loss, periods)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rs = avg[:, 0] / np.where(avg[:, 1] == 0, np.nan, avg[:, 1])
+    return 100 - 100 / (1 + rs)
+
+
+def compute_bollinger_multi(
+    close: pd.Series | np.ndarray,
+    windows,
+    num_std: float = 2.0,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Bollinger Bands for every window in *windows*, each a (T, P) array.
+
+    Every trailing window of bar ``t`` is a prefix of the same lag vector, so
+    one cumulative sum over lags gives the rolling sums for all windows. Sums
+    are taken of deviations from the current price, which keeps the variance
+    free of cancellation when the price level drifts by orders of magnitude.
+    Column ``j`` matches ``compute_bollinger_bands(close, windows[j], num_std)``.
+
+    Returns
+    -------
+    tuple[np.ndarray, np.ndarray, np.ndarray]
+        (upper_band, middle_band, lower_band)
+    """
+    close = np.asarray(close, dtype=float)
+    windows = np.asarray(windows, dtype=int)
+    width = int(windows.max())
+    padded = np.concatenate([np.full(width - 1, np.nan), close])
+    # lags[t, k] = close[t - k]
+    lags = np.lib.stride_tricks.sliding_window_view(padded, width)[:, ::-1]
+    anchor = np.nan_to_num(close)
+    dev = lags - anchor[:, None]
+    seen = np.isfinite(dev)
+    dev = np.where(seen, dev, 0.0)
+
+    cols = windows - 1
+    count = np.cumsum(seen, axis=1)[:, cols]
+    total = np.cumsum(dev, axis=1)[:, cols]
+    total_sq = np.cumsum(dev * dev, axis=1)[:, cols]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = total / count
+        var = (total_sq - total * mean) / (count - 1)
+    std = np.sqrt(np.where(count > 1, np.maximum(var, 0), np.nan))
+    middle = np.where(count > 0, mean + anchor[:, None], np.nan)
+    return middle + num_std * std, middle, middle - num_std * std
+
+
+def compute_atr_multi(
+    high: pd.Series | np.ndarray,
+    low: pd.Series | np.ndarray,
+    close: pd.Series | np.ndarray,
+    periods,
+) -> np.ndarray:
+    """ATR for every period in *periods* as a (T, P) array (true range computed once)."""
+    tr = _true_range(
+        np.asarray(high, dtype=float), np.asarray(low, dtype=float), np.asarray(close, dtype=float)
+    )
+    return _wilder_multi(tr, np.asarray(periods, dtype=float))
+
+
 def compute_obv(close: pd.Series, volume: pd.Series) -> pd.Series:
     """On-Balance Volume."""
     direction = np.sign(close.diff()).fillna(0)
@@ -97,16 +201,25 @@ def add_technical_indicators(
     bb_window: int = 20,
     bb_std: float = 2.0,
     atr_period: int = 14,
+    timeframe: str | None = None,
 ) -> pd.DataFrame:
     """Add all technical indicators to a long-format DataFrame.
 
     Operates per-asset group. Requires: open, high, low, close, volume, asset, date.
 
+    If *timeframe* is given (e.g. ``"1w"``), bars are first resampled with
+    :func:`src.data.resample.resample_ohlcv`; frames already at that timeframe
+    (such as those returned by ``load_timeframe``) are used as-is.
+
     New columns added:
         rsi, macd, macd_signal, macd_hist,
         bb_upper, bb_middle, bb_lower, bb_width, bb_pct,
         atr, obv
     """
+    if timeframe is not None:
+        from src.data.resample import resample_ohlcv
+        df = resample_ohlcv(df, timeframe)
+
     df = df.copy()
     df = df.sort_values(["asset", "date"]).reset_index(drop=True)
 
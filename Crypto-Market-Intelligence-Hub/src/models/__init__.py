@@ -1,5 +1,6 @@
 """src.models package — forecasting models and evaluation."""
 
-from .evaluate import compute_metrics, summary_by_asset
+from .evaluate import compute_metrics, panel_metrics, summary_by_asset
+from .risk import portfolio_risk
 
-__all__ = ["compute_metrics", "summary_by_asset"]
+__all__ = ["compute_metrics", "panel_metrics", "portfolio_risk", "summary_by_asset"]
@@ -0,0 +1,234 @@
+"""Vectorised backtests of indicator rules with parameter sweeps.
+
+A sweep never loops over parameter combinations. Each indicator is computed
+for all of its periods in one call to the ``*_multi`` kernels of
+:mod:`src.features.technical`. Thresholds are then broadcast against it to give a
+(T, N) matrix of positions, one column per combination, and every column is
+scored by the same array expressions.
+
+Conventions
+-----------
+- Positions are long/flat (1 / 0). A signal computed on bar ``t`` is traded
+  at the close of bar ``t`` and earns the return of bar ``t + 1``.
+- Each change in position costs ``fee_bps + slippage_bps`` basis points of
+  the traded notional.
+- Metrics are annualised with 365 periods per year (crypto trades daily).
+
+Strategies
+----------
+``rsi``       enter when RSI < ``lower``, exit when RSI > ``upper``
+``macd``      long while the MACD line is above its signal line
+``bollinger`` enter below the lower band, exit above the middle band
+"""
+from __future__ import annotations
+
+import logging
+from itertools import product
+
+import numpy as np
+import pandas as pd
+
+from src.features.technical import compute_bollinger_multi, compute_ema, compute_rsi_multi
+
+logger = logging.getLogger(__name__)
+
+PERIODS_PER_YEAR = 365
+METRIC_COLS = ["total_return", "sharpe_ratio", "max_drawdown", "n_trades", "exposure"]
+
+
+# ── Core ─────────────────────────────────────────────────────────────────────
+
+def hold_between(entry: np.ndarray, exit_: np.ndarray) -> np.ndarray:
+    """Stateful long/flat position from (T, N) entry and exit masks.
+
+    A position opens on an entry bar and stays open until the next exit bar
+    (exit wins if both fire on the same bar). Vectorised via a forward fill
+    of the last event index along time.
+    """
+    t = np.arange(entry.shape[0])[:, None]
+    event = entry | exit_
+    last = np.maximum.accumulate(np.where(event, t, -1), axis=0)
+    cols = np.arange(entry.shape[1])[None, :]
+    state = entry & ~exit_
+    return np.where(last >= 0, state[np.maximum(last, 0), cols], False).astype(np.float32)
+
+
+def backtest_positions(
+    close: np.ndarray,
+    positions: np.ndarray,
+    fee_bps: float = 10.0,
+    slippage_bps: float = 5.0,
+) -> dict[str, np.ndarray]:
+    """Score every column of a (T, N) position matrix against one price series.
+
+    Returns
+    -------
+    dict[str, np.ndarray]
+        Each metric in :data:`METRIC_COLS` as an (N,) array.
+    """
+    close = np.asarray(close, dtype=np.float64)
+    ret = np.zeros(len(close), dtype=np.float32)
+    ret[1:] = close[1:] / close[:-1] - 1
+
+    pos = np.asarray(positions, dtype=np.float32)
+    held = np.zeros_like(pos)
+    held[1:] = pos[:-1]
+    turnover = np.abs(np.diff(pos, axis=0, prepend=0))
+    cost = np.float32((fee_bps + slippage_bps) / 1e4)
+
+    strat = held * ret[:, None] - turnover * cost
+    log_eq = np.cumsum(np.log1p(strat), axis=0)
+    peak = np.maximum.accumulate(np.maximum(log_eq, 0), axis=0)
+
+    mean = strat.mean(axis=0, dtype=np.float64)
+    std = strat.std(axis=0, dtype=np.float64)
+    sharpe = mean / np.where(std > 1e-10, std, np.inf) * np.sqrt(PERIODS_PER_YEAR)
+    return {
+        "total_return": np.expm1(log_eq[-1]).astype(np.float64),
+        "sharpe_ratio": sharpe,
+        "max_drawdown": np.expm1((log_eq - peak).min(axis=0)).astype(np.float64),
+        "n_trades": (np.diff(pos, axis=0, prepend=0) > 0).sum(axis=0),
+        "exposure": held.mean(axis=0, dtype=np.float64),
+    }
+
+
+def _frame(params: dict[str, np.ndarray], metrics: dict[str, np.ndarray]) -> pd.DataFrame:
+    return pd.DataFrame({**params, **metrics})
+
+
+# ── Strategy sweeps (single asset) ───────────────────────────────────────────
+
+def sweep_rsi(
+    close: pd.Series | np.ndarray,
+    periods: list[int] | np.ndarray,
+    lowers: list[float] | np.ndarray,
+    uppers: list[float] | np.ndarray,
+    fee_bps: float = 10.0,
+    slippage_bps: float = 5.0,
+) -> pd.DataFrame:
+    """RSI mean-reversion over the grid ``periods × lowers × uppers``.
+
+    Combinations with ``lower >= upper`` are skipped.
+    """
+    close = pd.Series(np.asarray(close, dtype=float))
+    lo, up = (np.asarray(v, dtype=np.float32) for v in np.meshgrid(lowers, uppers, indexing="ij"))
+    valid = lo < up
+    lo, up = lo[valid], up[valid]
+
+    rsi_all = compute_rsi_multi(close, periods).astype(np.float32)
+    parts = []
+    for j, period in enumerate(periods):
+        rsi = rsi_all[:, j:j + 1]
+        with np.errstate(invalid="ignore"):
+            pos = hold_between(rsi < lo[None], rsi > up[None])
+        metrics = backtest_positions(close.to_numpy(), pos, fee_bps, slippage_bps)
+        params = {"period": np.full(lo.size, int(period)), "lower": lo, "upper": up}
+        parts.append(_frame(params, metrics))
+    return pd.concat(parts, ignore_index=True)
+
+
+def sweep_macd(
+    close: pd.Series | np.ndarray,
+    fasts: list[int] | np.ndarray,
+    slows: list[int] | np.ndarray,
+    signals: list[int] | np.ndarray,
+    fee_bps: float = 10.0,
+    slippage_bps: float = 5.0,
+) -> pd.DataFrame:
+    """MACD crossover over the grid ``fasts × slows × signals`` (``fast < slow``)."""
+    close = pd.Series(np.asarray(close, dtype=float))
+    emas = {span: compute_ema(close, int(span)).to_numpy() for span in set(fasts) | set(slows)}
+    pairs = [(f, s) for f, s in product(fasts, slows) if f < s]
+    if not pairs:
+        return pd.DataFrame(columns=["fast", "slow", "signal", *METRIC_COLS])
+
+    # Every (fast, slow) MACD line as one matrix; signal EMAs run column-wise
+    macd = pd.DataFrame(np.column_stack([emas[f] - emas[s] for f, s in pairs]))
+    parts = []
+    for sig in signals:
+        signal_line = macd.ewm(span=int(sig), adjust=False).mean().to_numpy()
+        pos = (macd.to_numpy() > signal_line).astype(np.float32)
+        metrics = backtest_positions(close.to_numpy(), pos, fee_bps, slippage_bps)
+        params = {
+            "fast": np.array([f for f, _ in pairs]),
+            "slow": np.array([s for _, s in pairs]),
+            "signal": np.full(len(pairs), int(sig)),
+        }
+        parts.append(_frame(params, metrics))
+    return pd.concat(parts, ignore_index=True)
+
+
+def sweep_bollinger(
+    close: pd.Series | np.ndarray,
+    windows: list[int] | np.ndarray,
+    num_stds: list[float] | np.ndarray,
+    fee_bps: float = 10.0,
+    slippage_bps: float = 5.0,
+) -> pd.DataFrame:
+    """Bollinger mean-reversion over the grid ``windows × num_stds``."""
+    close = pd.Series(np.asarray(close, dtype=float))
+    k = np.asarray(num_stds, dtype=np.float32)[None]
+    price = close.to_numpy(dtype=np.float32)[:, None]
+
+    upper_all, middle_all, _ = compute_bollinger_multi(close, windows, num_std=1.0)
+    std_all = np.nan_to_num(upper_all - middle_all).astype(np.float32)
+    parts = []
+    for j, window in enumerate(windows):
+        middle = middle_all[:, j:j + 1].astype(np.float32)
+        std = std_all[:, j:j + 1]
+        pos = hold_between(price < middle - k * std, price > middle)
+        metrics = backtest_positions(close.to_numpy(), pos, fee_bps, slippage_bps)
+        params = {"window": np.full(k.size, int(window)), "num_std": k.ravel()}
+        parts.append(_frame(params, metrics))
+    return pd.concat(parts, ignore_index=True)
+
+
+SWEEPS = {"rsi": sweep_rsi, "macd": sweep_macd, "bollinger": sweep_bollinger}
+
+
+# ── Universe ─────────────────────────────────────────────────────────────────
+
+def sweep_assets(
+    df: pd.DataFrame,
+    strategy: str,
+    grid: dict[str, list],
+    assets: list[str] | None = None,
+    fee_bps: float = 10.0,
+    slippage_bps: float = 5.0,
+) -> pd.DataFrame:
+    """Run one strategy sweep for every asset of a long-format frame.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Long-format frame with date, asset and close columns.
+    strategy : str
+        Key of :data:`SWEEPS`.
+    grid : dict[str, list]
+        Keyword arguments of the sweep function, e.g.
+        ``{"periods": range(2, 51), "lowers": [20, 25, 30], "uppers": [70, 75, 80]}``.
+    assets : list[str], optional
+        Subset of assets (default: all).
+
+    Returns
+    -------
+    pd.DataFrame
+        One row per (asset, parameter combination) with :data:`METRIC_COLS`.
+    """
+    if strategy not in SWEEPS:
+        raise ValueError(f"Unknown strategy '{strategy}'. Available: {list(SWEEPS)}")
+    sweep = SWEEPS[strategy]
+
+    parts = []
+    for asset, grp in df.sort_values("date").groupby("asset", sort=True):
+        if assets is not None and asset not in assets:
+            continue
+        close = grp["close"].dropna().to_numpy()
+        if len(close) < 2:
+            continue
+        res = sweep(close, **grid, fee_bps=fee_bps, slippage_bps=slippage_bps)
+        res.insert(0, "asset", asset)
+        parts.append(res)
+    result = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame()
+    logger.info("Swept %s: %d results across %d assets", strategy, len(result), len(parts))
+    return result
@@ -0,0 +1,497 @@
+"""Batched ARIMA(p, 1, q): vectorised Kalman filter likelihood for many assets at once.
+
+The per-asset path in :mod:`src.models.arima_model` calls statsmodels once per
+series, so refitting 50 assets repeats the Python overhead 50 times and leaves
+the optimiser single-threaded per call.  This module evaluates the exact
+Gaussian log-likelihood of a *stack* of differenced series in one NumPy pass
+over time (vectorised across the batch) and optimises every asset's parameters
+jointly.
+
+Model
+-----
+The price series is differenced once and the differences follow a zero-mean
+ARMA(p, q) in Harvey's state-space form — the same model statsmodels fits for
+``ARIMA(series, order=(p, 1, q))`` (no trend term when ``d > 0``).  Stationarity
+and invertibility are enforced with the Monahan transform used by statsmodels,
+and ``sigma2`` is concentrated out of the likelihood.
+"""
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass, field
+from itertools import product
+
+import numpy as np
+import pandas as pd
+
+from src.models.optim import batched_bfgs
+
+logger = logging.getLogger(__name__)
+
+MAX_ORDER = 3
+
+
+# ── Parameter transforms ──────────────────────────────────────────────────────
+
+def _constrain(unconstrained: np.ndarray) -> np.ndarray:
+    """Batched Monahan transform: (B, k) unconstrained → (B, k) stationary coefficients."""
+    n = unconstrained.shape[1]
+    if n == 0:
+        return unconstrained.copy()
+    r = unconstrained / np.sqrt(1 + unconstrained**2)
+    y = np.zeros(unconstrained.shape + (n,))
+    for k in range(n):
+        for i in range(k):
+            y[:, k, i] = y[:, k - 1, i] + r[:, k] * y[:, k - 1, k - i - 1]
+        y[:, k, k] = r[:, k]
+    return -y[:, n - 1, :]
+
+
+def _unconstrain(constrained: np.ndarray) -> np.ndarray:
+    """Inverse of :func:`_constrain` (batched), used for warm starts."""
+    n = constrained.shape[1]
+    if n == 0:
+        return constrained.copy()
+    y = np.zeros(constrained.shape + (n,))
+    y[:, n - 1, :] = -constrained
+    for k in range(n - 1, 0, -1):
+        rk = y[:, k, k]
+        denom = (1 - rk**2)[:, None]
+        for i in range(k):
+            y[:, k - 1, i] = (y[:, k, i] - rk * y[:, k, k - i - 1]) / denom[:, 0]
+    r = np.stack([y[:, k, k] for k in range(n)], axis=1)
+    r = np.clip(r, -0.999999, 0.999999)
+    return r / np.sqrt(1 - r**2)
+
+
+def _split(params: np.ndarray, p: int, q: int) -> tuple[np.ndarray, np.ndarray]:
+    """Unconstrained (B, p+q) → constrained (ar, ma) coefficient arrays."""
+    ar = _constrain(params[:, :p])
+    ma = -_constrain(params[:, p : p + q])
+    return ar, ma
+
+
+# ── State-space system ────────────────────────────────────────────────────────
+
+def _system(ar: np.ndarray, ma: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Build batched transition T (B, r, r) and selection R (B, r) matrices."""
+    batch = ar.shape[0]
+    p, q = ar.shape[1], ma.shape[1]
+    r = max(p, q + 1)
+    T = np.zeros((batch, r, r))
+    T[:, :p, 0] = ar
+    if r > 1:
+        T[:, np.arange(r - 1), np.arange(1, r)] = 1.0
+    R = np.zeros((batch, r))
+    R[:, 0] = 1.0
+    R[:, 1 : q + 1] = ma
+    return T, R
+
+
+def _stationary_cov(T: np.ndarray, RR: np.ndarray) -> np.ndarray:
+    """Solve P = T P T' + RR' for every batch member via the vec/Kronecker form."""
+    batch, r, _ = T.shape
+    kron = np.einsum("bij,bkl->bikjl", T, T).reshape(batch, r * r, r * r)
+    lhs = np.eye(r * r)[None] - kron
+    vec = np.linalg.solve(lhs, RR.reshape(batch, r * r, 1))
+    P = vec.reshape(batch, r, r)
+    return 0.5 * (P + P.transpose(0, 2, 1))
+
+
+_STEADY_TOL = 1e-10
+
+
+def _complete_suffix_start(observed: np.ndarray) -> int:
+    """First time index after which every series is fully observed."""
+    gaps = np.flatnonzero(~observed.all(axis=0))
+    return int(gaps[-1]) + 1 if gaps.size else 0
+
+
+def _filter(
+    endog: np.ndarray, ar: np.ndarray, ma: np.ndarray
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Run the Kalman filter (unit innovation variance) over a stacked batch.
+
+    Parameters
+    ----------
+    endog : np.ndarray, shape (B, n)
+        Differenced series; NaN marks a missing (or left-padding) observation.
+    ar, ma : np.ndarray, shape (B, p) / (B, q)
+        Constrained coefficients.
+
+    Returns
+    -------
+    sum_v2f, sum_logf, nobs : np.ndarray, shape (B,)
+        Sufficient statistics of the concentrated log-likelihood.
+    a, P : np.ndarray
+        Predicted state mean (B, r) and covariance (B, r, r) for time n + 1.
+    T : np.ndarray
+        Transition matrices, reused for forecasting.
+    """
+    batch, n = endog.shape
+    T, R = _system(ar, ma)
+    RR = np.einsum("bi,bj->bij", R, R)
+    r = T.shape[1]
+
+    a = np.zeros((batch, r))
+    P = _stationary_cov(T, RR)
+    Tt = T.transpose(0, 2, 1)
+
+    sum_v2f = np.zeros(batch)
+    sum_logf = np.zeros(batch)
+    observed = ~np.isnan(endog)
+    nobs = observed.sum(axis=1).astype(float)
+    values = np.where(observed, endog, 0.0)
+
+    complete_from = _complete_suffix_start(observed)
+    for t in range(n):
+        obs = observed[:, t]
+        F = P[:, 0, 0]
+        v = values[:, t] - a[:, 0]
+        TP = T @ P
+        a = np.einsum("bij,bj->bi", T, a)
+        P = TP @ Tt + RR
+        if obs.any():
+            F_safe = np.where(obs, F, 1.0)
+            K = TP[:, :, 0] / F_safe[:, None]
+            gain = np.where(obs, 1.0, 0.0)
+            a = a + gain[:, None] * K * v[:, None]
+            P = P - gain[:, None, None] * np.einsum("bi,bj->bij", K, K) * F_safe[:, None, None]
+            sum_v2f += np.where(obs, v * v / F_safe, 0.0)
+            sum_logf += np.where(obs, np.log(F_safe), 0.0)
+            # Once the covariance recursion has converged and no gaps remain,
+            # F and K are constant: finish with the cheap steady-state filter.
+            if t >= complete_from and t + 1 < n and np.abs(P[:, 0, 0] - F).max() < _STEADY_TOL:
+                F_ss, K_ss = P[:, 0, 0], (T @ P)[:, :, 0] / P[:, 0, 0][:, None]
+                for s in range(t + 1, n):
+                    v = values[:, s] - a[:, 0]
+                    a = np.einsum("bij,bj->bi", T, a) + K_ss * v[:, None]
+                    sum_v2f += v * v / F_ss
+                sum_logf += (n - t - 1) * np.log(F_ss)
+                break
+    return sum_v2f, sum_logf, nobs, a, P, T
+
+
+def _concentrated_llf(sum_v2f: np.ndarray, sum_logf: np.ndarray, nobs: np.ndarray):
+    """Concentrated log-likelihood and the implied innovation variance."""
+    sigma2 = sum_v2f / np.maximum(nobs, 1)
+    llf = -0.5 * (nobs * (np.log(2 * np.pi) + np.log(sigma2) + 1) + sum_logf)
+    return llf, sigma2
+
+
+def batch_loglike(
+    endog: np.ndarray,
+    ar: np.ndarray,
+    ma: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Exact ARMA log-likelihood for a stacked batch of (differenced) series.
+
+    Parameters
+    ----------
+    endog : np.ndarray, shape (B, n)
+        Stacked series, left-padded with NaN where histories are shorter.
+    ar, ma : np.ndarray, shape (B, p) / (B, q)
+        AR and MA coefficients per series.
+
+    Returns
+    -------
+    llf, sigma2 : np.ndarray, shape (B,)
+        Log-likelihood at the concentrated ``sigma2`` and that ``sigma2``.
+    """
+    endog = np.atleast_2d(np.asarray(endog, dtype=float))
+    ar = np.asarray(ar, dtype=float).reshape(endog.shape[0], -1)
+    ma = np.asarray(ma, dtype=float).reshape(endog.shape[0], -1)
+    sum_v2f, sum_logf, nobs, *_ = _filter(endog, ar, ma)
+    return _concentrated_llf(sum_v2f, sum_logf, nobs)
+
+
+# ── Result container ──────────────────────────────────────────────────────────
+
+@dataclass
+class BatchARIMAResult:
+    """Fitted parameters for every asset in a batch, sharing one order."""
+
+    order: tuple[int, int, int]
+    assets: list[str]
+    ar: np.ndarray
+    ma: np.ndarray
+    sigma2: np.ndarray
+    llf: np.ndarray
+    nobs: np.ndarray
+    converged: bool = True
+    n_iter: int = 0
+    last_level: np.ndarray = field(default_factory=lambda: np.zeros(0))
+    last_date: list[pd.Timestamp] = field(default_factory=list)
+    _state: tuple[np.ndarray, np.ndarray, np.ndarray] | None = field(default=None, repr=False)
+
+    @property
+    def k_params(self) -> int:
+        return self.order[0] + self.order[2] + 1
+
+    @property
+    def aic(self) -> np.ndarray:
+        return -2 * self.llf + 2 * self.k_params
+
+    @property
+    def bic(self) -> np.ndarray:
+        return -2 * self.llf + np.log(self.nobs) * self.k_params
+
+    def params_frame(self) -> pd.DataFrame:
+        """One row per asset with ``ar.L*``, ``ma.L*``, ``sigma2``, ``llf`` and ``aic``."""
+        cols: dict[str, np.ndarray] = {}
+        for i in range(self.ar.shape[1]):
+            cols[f"ar.L{i + 1}"] = self.ar[:, i]
+        for i in range(self.ma.shape[1]):
+            cols[f"ma.L{i + 1}"] = self.ma[:, i]
+        cols["sigma2"] = self.sigma2
+        cols["llf"] = self.llf
+        cols["aic"] = self.aic
+        out = pd.DataFrame(cols, index=pd.Index(self.assets, name="asset"))
+        out.insert(0, "order", [self.order] * len(self.assets))
+        return out
+
+    def forecast(self, steps: int = 30, alpha: float | None = 0.05) -> pd.DataFrame:
+        """Forecast price levels for every asset.
+
+        Returns
+        -------
+        pd.DataFrame
+            Long format with columns asset, step, date, predicted and — when
+            *alpha* is given — lower / upper bounds.
+        """
+        if self._state is None:
+            raise RuntimeError("Result has no filtered state; fit with fit_arima_batch().")
+        a, _, T = self._state
+        batch = len(self.assets)
+
+        diffs = np.empty((batch, steps))
+        state = a.copy()
+        for h in range(steps):
+            diffs[:, h] = state[:, 0]
+            state = np.einsum("bij,bj->bi", T, state)
+        levels = self.last_level[:, None] + np.cumsum(diffs, axis=1)
+
+        frame = pd.DataFrame({
+            "asset": np.repeat(self.assets, steps),
+            "step": np.tile(np.arange(1, steps + 1), batch),
+            "predicted": levels.ravel(),
+        })
+        if self.last_date:
+            frame["date"] = [
+                d + pd.Timedelta(days=int(s))
+                for d, s in zip(np.repeat(self.last_date, steps), frame["step"])
+            ]
+
+        if alpha is not None:
+            from scipy.stats import norm
+
+            psi = _psi_weights(self.ar, self.ma, steps)
+            var = self.sigma2[:, None] * np.cumsum(np.cumsum(psi, axis=1) ** 2, axis=1)
+            z = norm.ppf(1 - alpha / 2)
+            half = (z * np.sqrt(var)).ravel()
+            frame["lower"] = frame["predicted"] - half
+            frame["upper"] = frame["predicted"] + half
+        return frame
+
+
+def _psi_weights(ar: np.ndarray, ma: np.ndarray, steps: int) -> np.ndarray:
+    """MA(∞) weights ψ_0 … ψ_{steps-1} of the differenced ARMA, per series."""
+    batch = ar.shape[0]
+    psi = np.zeros((batch, steps))
+    psi[:, 0] = 1.0
+    for j in range(1, steps):
+        val = ma[:, j - 1].copy() if j - 1 < ma.shape[1] else np.zeros(batch)
+        for i in range(min(j, ar.shape[1])):
+            val += ar[:, i] * psi[:, j - 1 - i]
+        psi[:, j] = val
+    return psi
+
+
+# ── Fitting ───────────────────────────────────────────────────────────────────
+
+def stack_series(series: dict[str, pd.Series] | pd.DataFrame) -> tuple[list[str], np.ndarray, np.ndarray, list]:
+    """Right-align per-asset price series into a NaN-padded (B, n) matrix.
+
+    Returns asset names, the differenced matrix, the last level per asset and
+    the last index label per asset.
+    """
+    if isinstance(series, pd.DataFrame):
+        series = {str(c): series[c].dropna() for c in series.columns}
+    assets = list(series)
+    if not assets:
+        raise ValueError("No series supplied.")
+    values = [np.asarray(series[a].dropna(), dtype=float) for a in assets]
+    if min(len(v) for v in values) < 3:
+        raise ValueError("Every series needs at least 3 observations.")
+    n = max(len(v) for v in values) - 1
+    endog = np.full((len(assets), n), np.nan)
+    for i, v in enumerate(values):
+        d = np.diff(v)
+        endog[i, n - len(d):] = d
+    last_level = np.array([v[-1] for v in values])
+    last_date = [series[a].dropna().index[-1] for a in assets]
+    return assets, endog, last_level, last_date
+
+
+def fit_arima_batch(
+    series: dict[str, pd.Series] | pd.DataFrame,
+    order: tuple[int, int, int] = (1, 1, 1),
+    start_params: pd.DataFrame | None = None,
+    maxiter: int = 200,
+    gtol: float = 1e-6,
+    eps: float = 1e-5,
+) -> BatchARIMAResult:
+    """Fit ARIMA(p, 1, q) to every series jointly.
+
+    Every asset is optimised by its own BFGS recursion, but all of them
+    advance in lock-step so each iteration is a single stacked filter pass.
+    Gradients are central finite differences, evaluated for every asset and
+    parameter in that same pass (``B * (2k + 1)`` rows).
+
+    Parameters
+    ----------
+    series : dict[str, pd.Series] | pd.DataFrame
+        Price series per asset (a wide frame is split by column).
+    order : tuple[int, int, int]
+        ``(p, 1, q)`` with ``p, q <= 3``.
+    start_params : pd.DataFrame, optional
+        Output of :meth:`BatchARIMAResult.params_frame` from a previous fit,
+        used to warm-start (e.g. yesterday's nightly run).
+    maxiter : int
+        BFGS iteration cap.
+    gtol : float
+        Convergence threshold on the per-observation gradient.
+    eps : float
+        Finite-difference step in unconstrained parameter space.
+
+    Returns
+    -------
+    BatchARIMAResult
+    """
+    p, d, q = order
+    if d != 1:
+        raise ValueError("fit_arima_batch only supports d=1.")
+    if not (0 <= p <= MAX_ORDER and 0 <= q <= MAX_ORDER):
+        raise ValueError(f"p and q must be between 0 and {MAX_ORDER}.")
+
+    assets, endog, last_level, last_date = stack_series(series)
+    batch, k = len(assets), p + q
+    nobs = (~np.isnan(endog)).sum(axis=1).astype(float)
+
+    x0 = np.zeros((batch, k))
+    if start_params is not None and k:
+        prev = start_params.reindex(assets)
+        ar0 = prev[[f"ar.L{i + 1}" for i in range(p)]].to_numpy(dtype=float) if p else np.zeros((batch, 0))
+        ma0 = prev[[f"ma.L{i + 1}" for i in range(q)]].to_numpy(dtype=float) if q else np.zeros((batch, 0))
+        warm = np.hstack([_unconstrain(np.nan_to_num(ar0)), _unconstrain(-np.nan_to_num(ma0))])
+        x0 = np.where(np.isfinite(warm), warm, 0.0)
+
+    if k == 0:
+        ar, ma = np.zeros((batch, 0)), np.zeros((batch, 0))
+        sum_v2f, sum_logf, nobs, a, P, T = _filter(endog, ar, ma)
+        llf, sigma2 = _concentrated_llf(sum_v2f, sum_logf, nobs)
+        return BatchARIMAResult(
+            order=order, assets=assets, ar=ar, ma=ma, sigma2=sigma2, llf=llf, nobs=nobs,
+            last_level=last_level, last_date=last_date, _state=(a, P, T),
+        )
+
+    n_eval = 2 * k + 1
+    offsets = np.zeros((n_eval, k))
+    offsets[1 : k + 1] = np.eye(k) * eps
+    offsets[k + 1 :] = -np.eye(k) * eps
+
+    def objective(params: np.ndarray, rows: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Per-series NLL (per observation) and its gradient in one stacked pass."""
+        m = len(rows)
+        stacked = (params[:, None, :] + offsets[None]).reshape(m * n_eval, k)
+        ar, ma = _split(stacked, p, q)
+        llf, _ = batch_loglike(np.repeat(endog[rows], n_eval, axis=0), ar, ma)
+        nll = (-llf / np.repeat(nobs[rows], n_eval)).reshape(m, n_eval)
+        grad = (nll[:, 1 : k + 1] - nll[:, k + 1 :]) / (2 * eps)
+        return nll[:, 0], grad
+
+    x, n_iter, done = batched_bfgs(objective, x0, maxiter=maxiter, gtol=gtol)
+    ar, ma = _split(x, p, q)
+    sum_v2f, sum_logf, nobs, a, P, T = _filter(endog, ar, ma)
+    llf, sigma2 = _concentrated_llf(sum_v2f, sum_logf, nobs)
+
+    logger.info(
+        "Batched ARIMA%s fitted on %d assets in %d iterations (%d/%d converged).",
+        order, batch, n_iter, int(done.sum()), batch,
+    )
+    return BatchARIMAResult(
+        order=order, assets=assets, ar=ar, ma=ma, sigma2=sigma2, llf=llf, nobs=nobs,
+        converged=bool(done.all()), n_iter=n_iter,
+        last_level=last_level, last_date=last_date, _state=(a, P, T),
+    )
+
+
+def grid_search_arima_batch(
+    series: dict[str, pd.Series] | pd.DataFrame,
+    p_range: list[int] | None = None,
+    q_range: list[int] | None = None,
+    ic: str = "aic",
+) -> tuple[pd.Series, dict[tuple[int, int, int], BatchARIMAResult]]:
+    """Batched counterpart of :func:`src.models.arima_model.grid_search_arima`.
+
+    Fits every candidate order once for the whole batch instead of once per
+    asset and order.
+
+    Returns
+    -------
+    best : pd.Series
+        Winning ``(p, 1, q)`` order per asset (lowest *ic*).
+    fits : dict
+        Mapping ``order -> BatchARIMAResult`` for every candidate order.
+    """
+    p_range = p_range or [0, 1, 2, 3]
+    q_range = q_range or [0, 1, 2, 3]
+    fits = {
+        (p, 1, q): fit_arima_batch(series, order=(p, 1, q))
+        for p, q in product(p_range, q_range)
+    }
+    first = next(iter(fits.values()))
+    scores = pd.DataFrame(
+        {order: getattr(res, ic) for order, res in fits.items()}, index=first.assets
+    )
+    best = scores.idxmin(axis=1).rename("order")
+    logger.info("Batched grid search: best orders %s", best.value_counts().to_dict())
+    return best, fits
+
+
+def run_batch_arima_pipeline(
+    df: pd.DataFrame,
+    assets: list[str] | None = None,
+    order: tuple[int, int, int] = (1, 1, 1),
+    steps: int = 30,
+    start_params: pd.DataFrame | None = None,
+) -> dict:
+    """Refit ARIMA for many assets in one batched job.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Long-format frame with date, asset and close columns.
+    assets : list[str], optional
+        Subset of assets; defaults to every asset in *df*.
+    order : tuple[int, int, int]
+        Shared ``(p, 1, q)`` order.
+    steps : int
+        Forecast horizon in days.
+    start_params : pd.DataFrame, optional
+        Previous :meth:`BatchARIMAResult.params_frame` for warm starts.
+
+    Returns
+    -------
+    dict
+        Keys: result, params, forecast.
+    """
+    wide = df.pivot_table(index="date", columns="asset", values="close").sort_index()
+    if assets is not None:
+        wide = wide[[a for a in assets if a in wide.columns]]
+    result = fit_arima_batch(wide, order=order, start_params=start_params)
+    return {
+        "result": result,
+        "params": result.params_frame(),
+        "forecast": result.forecast(steps=steps),
+    }
@@ -0,0 +1,105 @@
+"""Cheap online drift detectors for live forecasts and incoming returns.
+
+Two signals decide whether an (asset, model) pair needs retraining:
+
+- :class:`ErrorTracker` — exponentially weighted absolute percentage error of
+  the live forecasts compared with the error measured at training time.
+- :class:`PageHinkley` — sequential change-point test on new log returns
+  (mean shift) and on their absolute value (volatility shift).
+
+Both are O(1) per observation and keep only a few floats of state, so they
+can run on every new bar for the whole universe.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+
+@dataclass
+class PageHinkley:
+    """Two-sided Page-Hinkley test for a shift in the mean of a stream.
+
+    Parameters
+    ----------
+    delta : float
+        Magnitude of change tolerated without alarm (in units of the stream).
+    threshold : float
+        Alarm threshold ``λ`` on the cumulative deviation.
+    min_obs : int
+        Observations required before an alarm can fire.
+    """
+
+    delta: float = 0.005
+    threshold: float = 0.5
+    min_obs: int = 30
+    n: int = 0
+    mean: float = 0.0
+    cum_up: float = 0.0
+    cum_down: float = 0.0
+    min_up: float = 0.0
+    max_down: float = 0.0
+
+    def update(self, x: float) -> bool:
+        """Consume one observation; return True when a change is detected."""
+        self.n += 1
+        self.mean += (x - self.mean) / self.n
+        self.cum_up += x - self.mean - self.delta
+        self.cum_down += x - self.mean + self.delta
+        self.min_up = min(self.min_up, self.cum_up)
+        self.max_down = max(self.max_down, self.cum_down)
+        return self.n >= self.min_obs and self.statistic > self.threshold
+
+    @property
+    def statistic(self) -> float:
+        """Largest one-sided deviation seen so far."""
+        return max(self.cum_up - self.min_up, self.max_down - self.cum_down)
+
+    def reset(self) -> None:
+        self.n = 0
+        self.mean = self.cum_up = self.cum_down = self.min_up = self.max_down = 0.0
+
+
+@dataclass
+class ErrorTracker:
+    """EWMA of live absolute percentage error against a training-time baseline.
+
+    Parameters
+    ----------
+    baseline_mape : float
+        MAPE (%) measured on the hold-out set when the model was trained.
+    alpha : float
+        EWMA smoothing factor.
+    ratio : float
+        Degradation is flagged when the live EWMA exceeds ``ratio * baseline``.
+    min_obs : int
+        Live observations required before degradation can be flagged.
+    """
+
+    baseline_mape: float
+    alpha: float = 0.1
+    ratio: float = 1.5
+    min_obs: int = 5
+    n: int = 0
+    ewma: float = 0.0
+
+    def update(self, y_true: float, y_pred: float, eps: float = 1e-8) -> float:
+        """Add one realised forecast; return the updated EWMA error (%)."""
+        ape = abs(y_true - y_pred) / (abs(y_true) + eps) * 100
+        self.ewma = ape if self.n == 0 else self.alpha * ape + (1 - self.alpha) * self.ewma
+        self.n += 1
+        return self.ewma
+
+    @property
+    def degradation(self) -> float:
+        """Live error relative to the baseline (1.0 = as good as at training)."""
+        return self.ewma / max(self.baseline_mape, 1e-8)
+
+    @property
+    def degraded(self) -> bool:
+        return self.n >= self.min_obs and self.degradation > self.ratio
+
+    def reset(self, baseline_mape: float | None = None) -> None:
+        if baseline_mape is not None:
+            self.baseline_mape = baseline_mape
+        self.n = 0
+        self.ewma = 0.0
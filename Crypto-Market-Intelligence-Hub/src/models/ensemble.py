@@ -0,0 +1,477 @@
+"""Ensemble forecaster: ARIMA, Prophet, LSTM and GRU run concurrently and are combined.
+
+Each member runs in a worker process. The caller gets a response when the
+first of these happens:
+
+- every member has finished,
+- the overall ``deadline_seconds`` has passed, or
+- each remaining member has passed its own ``member_timeout_seconds``.
+
+Members that raise, return unusable output or miss their time limit are
+dropped, and the forecast combines the members that finished.
+
+Members are weighted by inverse mean squared error on a recent backtest: each
+member is refitted without the last ``holdout`` bars and scored on them. These
+errors are cached per asset and member (in memory and in the model registry)
+for ``ttl_seconds``. A missing or stale error is recomputed by a backtest job
+submitted next to the forecast jobs. That job is not bound by the deadline: it
+records its error when it completes, even if the response has already been
+sent. At most ``max_backtests`` of them run at once per cache, each is killed
+after ``backtest_timeout_seconds``, and the CPU-seconds each one used are
+reported through ``charge`` so admission control can bill the request that
+started it.
+
+Every job runs in its own worker process (:class:`ProcessExecutor`), at most
+``ensemble_workers`` at a time. A member that misses its time limit is killed,
+so its worker frees up at once.
+"""
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, wait
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+MEMBERS = ("arima", "prophet", "lstm", "gru")
+
+Forecaster = Callable[[str, pd.DataFrame, str, int], np.ndarray]
+
+
+class EnsembleUnavailable(RuntimeError):
+    """No member produced a forecast within the deadline."""
+
+
+def forecast_member(member: str, df: pd.DataFrame, asset: str, horizon: int) -> np.ndarray:
+    """*horizon*-step price forecast of one member model (runs in a worker process)."""
+    if member == "arima":
+        from .arima_model import run_arima_pipeline
+        return np.asarray(run_arima_pipeline(df, asset, steps=horizon)["forecast"], dtype=float)
+    if member == "prophet":
+        from .prophet_model import run_prophet_pipeline
+        result = run_prophet_pipeline(df, asset, forecast_periods=horizon)
+        return result["forecast"]["yhat"].to_numpy(dtype=float)
+    if member == "lstm":
+        from .lstm_model import run_lstm_pipeline
+        return np.asarray(run_lstm_pipeline(df, asset, forecast_steps=horizon)["forecast"], dtype=float)
+    if member == "gru":
+        from .gru_model import run_gru_pipeline
+        return np.asarray(run_gru_pipeline(df, asset, forecast_steps=horizon)["forecast"], dtype=float)
+    raise ValueError(f"Unknown ensemble member '{member}'. Choose from: {MEMBERS}")
+
+
+# ── Backtest error cache ─────────────────────────────────────────────────────
+
+class ErrorCache:
+    """Recent backtest RMSE per ``(asset, member)``, with a TTL.
+
+    Parameters
+    ----------
+    ttl_seconds : float
+        Age after which an error is recomputed.
+    directory : Path | str | None
+        Registry directory to persist errors in (shared across processes and
+        restarts). ``None`` keeps them in memory only.
+    max_backtests : int
+        Backtests that may be in flight at once; further stale members wait
+        for a later request.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = 86400.0,
+        directory: Path | str | None = None,
+        max_backtests: int = 4,
+    ) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.directory = Path(directory) if directory is not None else None
+        self.max_backtests = max_backtests
+        self._errors: dict[str, dict[str, tuple[float, float]]] = {}  # asset -> member -> (rmse, wall time)
+        self._pending: set[tuple[str, str]] = set()
+        self._lock = threading.Lock()
+
+    def _name(self, asset: str) -> str:
+        return f"ensemble_errors_{asset}"
+
+    def get(self, asset: str) -> dict[str, float]:
+        """Fresh errors for *asset*, by member."""
+        with self._lock:
+            if asset not in self._errors and self.directory is not None:
+                from .registry import load_sklearn
+                try:
+                    self._errors[asset] = load_sklearn(self._name(asset), self.directory)
+                except FileNotFoundError:
+                    pass
+            now = time.time()
+            entries = self._errors.get(asset, {})
+            return {m: err for m, (err, at) in entries.items() if now - at < self.ttl_seconds}
+
+    def claim(self, asset: str, members: list[str]) -> list[str]:
+        """Members of *asset* whose error is stale and not already being recomputed.
+
+        At most ``max_backtests`` claims are outstanding at any time.
+        """
+        fresh = self.get(asset)
+        with self._lock:
+            room = max(self.max_backtests - len(self._pending), 0)
+            claimed = [m for m in members if m not in fresh and (asset, m) not in self._pending][:room]
+            self._pending.update((asset, m) for m in claimed)
+        return claimed
+
+    def record(self, asset: str, member: str, rmse: float | None) -> None:
+        """Store a backtest result (``None`` releases the claim without storing)."""
+        with self._lock:
+            self._pending.discard((asset, member))
+            if rmse is None:
+                return
+            entries = self._errors.setdefault(asset, {})
+            entries[member] = (float(rmse), time.time())
+            snapshot = dict(entries)
+        if self.directory is not None:
+            from .registry import save_sklearn
+            save_sklearn(snapshot, self._name(asset), self.directory)
+
+
+def inverse_mse_weights(members: list[str], errors: dict[str, float]) -> dict[str, float]:
+    """Weights ∝ 1 / RMSE² over *members*; members without an error get the median."""
+    known = [errors[m] for m in members if m in errors and np.isfinite(errors[m])]
+    if not known:
+        return {m: 1.0 / len(members) for m in members}
+    fill = float(np.median(known))
+    raw = {m: 1.0 / max(errors.get(m, fill), 1e-12) ** 2 for m in members}
+    total = sum(raw.values())
+    return {m: w / total for m, w in raw.items()}
+
+
+# ── Worker processes ─────────────────────────────────────────────────────────
+
+def _child(conn, fn: Callable, args: tuple) -> None:
+    try:
+        result = (True, fn(*args))
+    except BaseException as exc:  # noqa: BLE001 — sent back to the parent
+        result = (False, exc)
+    try:
+        conn.send(result)
+    except Exception as exc:  # noqa: BLE001 — unpicklable result or exception
+        conn.send((False, RuntimeError(f"{type(exc).__name__}: {exc}")))
+    finally:
+        conn.close()
+
+
+class ProcessExecutor(Executor):
+    """Runs each job in a fresh process, at most *max_workers* at a time.
+
+    Unlike :class:`~concurrent.futures.ProcessPoolExecutor`, a running job can
+    be stopped with :meth:`kill`, which terminates its process and frees the
+    slot. Queued jobs wait in a supervising thread each.
+
+    Workers are started with ``forkserver`` (``spawn`` where unavailable), never
+    ``fork``: the API process runs many threads, and a forked child could
+    inherit a lock one of them held. Jobs must therefore be picklable.
+    """
+
+    def __init__(self, max_workers: int = 4) -> None:
+        self.max_workers = max(1, max_workers)
+        self._slots = threading.BoundedSemaphore(self.max_workers)
+        methods = multiprocessing.get_all_start_methods()
+        self._ctx = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+        self._procs: dict[Future, multiprocessing.process.BaseProcess] = {}
+        self._doomed: set[Future] = set()     # killed before their process was registered
+        self._lock = threading.Lock()
+        self._shutdown = False
+
+    def submit(self, fn: Callable, /, *args, **kwargs) -> Future:
+        if kwargs:
+            raise TypeError("ProcessExecutor.submit takes positional arguments only")
+        if self._shutdown:
+            raise RuntimeError("cannot submit after shutdown")
+        future: Future = Future()
+        threading.Thread(target=self._run, args=(future, fn, args), daemon=True).start()
+        return future
+
+    def _run(self, future: Future, fn: Callable, args: tuple) -> None:
+        try:
+            with self._slots:
+                if not future.set_running_or_notify_cancel():
+                    return
+                ok, value = self._spawn(future, fn, args)
+            if ok:
+                future.set_result(value)
+            else:
+                future.set_exception(value)
+        finally:
+            # Deregister only once the future is done, so kill() never misses a live job
+            with self._lock:
+                self._procs.pop(future, None)
+                self._doomed.discard(future)
+
+    def _spawn(self, future: Future, fn: Callable, args: tuple) -> tuple[bool, object]:
+        recv, send = self._ctx.Pipe(duplex=False)
+        proc = self._ctx.Process(target=_child, args=(send, fn, args), daemon=True)
+        with self._lock:
+            killed = future in self._doomed
+            if not (self._shutdown or killed):
+                proc.start()
+                self._procs[future] = proc
+        send.close()
+        if proc.pid is None:
+            recv.close()
+            if killed:
+                return False, BrokenProcessPool("job killed before its process started")
+            return False, RuntimeError("executor shut down")
+        try:
+            return recv.recv()
+        except (EOFError, OSError):
+            proc.join()
+            return False, BrokenProcessPool(f"worker exited with code {proc.exitcode}")
+        finally:
+            recv.close()
+            proc.join()
+
+    def kill(self, future: Future) -> bool:
+        """Stop *future*'s job: cancel it if queued, terminate its process if running."""
+        if future.cancel():
+            return True
+        with self._lock:
+            proc = self._procs.get(future)
+            if proc is None:
+                if future.done():
+                    return False
+                # Running but its process not started yet: _run sees this and skips it
+                self._doomed.add(future)
+                return True
+        proc.kill()
+        return True
+
+    def shutdown(self, wait: bool = True, *, cancel_futures: bool = False) -> None:
+        with self._lock:
+            self._shutdown = True
+            running = list(self._procs.values())
+        if cancel_futures:
+            for proc in running:
+                proc.kill()
+        if wait:
+            for proc in running:
+                proc.join()
+
+
+_EXECUTOR: ProcessExecutor | None = None
+_EXECUTOR_LOCK = threading.Lock()
+_POOL_WORKERS = 4
+
+
+def get_pool() -> ProcessExecutor:
+    """Shared executor for ensemble jobs (created on first use)."""
+    global _EXECUTOR
+    with _EXECUTOR_LOCK:
+        if _EXECUTOR is None:
+            _EXECUTOR = ProcessExecutor(max_workers=_POOL_WORKERS)
+        return _EXECUTOR
+
+
+def configure_pool(max_workers: int) -> None:
+    """Set the shared executor size; takes effect when it is next created."""
+    global _POOL_WORKERS
+    _POOL_WORKERS = max(1, max_workers)
+
+
+def shutdown_pool() -> None:
+    """Kill every running ensemble job and drop the shared executor."""
+    global _EXECUTOR
+    with _EXECUTOR_LOCK:
+        if _EXECUTOR is not None:
+            _EXECUTOR.shutdown(wait=False, cancel_futures=True)
+            _EXECUTOR = None
+
+
+def _kill(executor: Executor, future: Future) -> None:
+    """Stop *future* on *executor*: kill it where supported, else cancel if still queued."""
+    kill = getattr(executor, "kill", None)
+    if kill is not None:
+        kill(future)
+    else:
+        future.cancel()
+
+
+def _timed(forecaster: Forecaster, *args) -> tuple[float, np.ndarray]:
+    """Run *forecaster* and return ``(seconds, forecast)`` (runs in the worker)."""
+    start = time.perf_counter()
+    values = forecaster(*args)
+    return time.perf_counter() - start, values
+
+
+# ── Ensemble ─────────────────────────────────────────────────────────────────
+
+@dataclass
+class EnsembleResult:
+    """Combined forecast plus what each member contributed."""
+
+    forecast: np.ndarray
+    members: dict[str, np.ndarray]
+    weights: dict[str, float]
+    dropped: dict[str, str] = field(default_factory=dict)  # member -> reason
+
+    @property
+    def lower(self) -> np.ndarray:
+        """Lowest member forecast per step."""
+        return np.min(np.vstack(list(self.members.values())), axis=0)
+
+    @property
+    def upper(self) -> np.ndarray:
+        """Highest member forecast per step."""
+        return np.max(np.vstack(list(self.members.values())), axis=0)
+
+
+def ensemble_forecast(
+    df: pd.DataFrame,
+    asset: str,
+    horizon: int = 30,
+    members: tuple[str, ...] | list[str] = MEMBERS,
+    deadline_seconds: float = 30.0,
+    member_timeout_seconds: float | dict[str, float] | None = None,
+    holdout: int | None = None,
+    errors: ErrorCache | None = None,
+    executor: Executor | None = None,
+    forecaster: Forecaster = forecast_member,
+    backtest_timeout_seconds: float | None = None,
+    charge: Callable[[float], None] | None = None,
+) -> EnsembleResult:
+    """Run *members* concurrently and combine them with inverse-MSE weights.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Long-format OHLCV data; only *asset*'s rows are sent to the workers.
+    deadline_seconds : float
+        Wall-clock budget for the whole call.
+    member_timeout_seconds : float | dict[str, float] | None
+        Budget per member (a single value or one per member). Defaults to the deadline.
+    holdout : int | None
+        Bars held out for the backtest that sets the weights (default: *horizon*).
+    errors : ErrorCache | None
+        Backtest error cache; a private in-memory cache if omitted.
+    executor : Executor | None
+        Where members run; the shared :class:`ProcessExecutor` (see
+        :func:`get_pool`) if omitted. Overrunning jobs are killed if the
+        executor has a ``kill`` method and merely cancelled otherwise.
+    backtest_timeout_seconds : float | None
+        Limit for each background backtest (default: 4 × *deadline_seconds*).
+    charge : Callable[[float], None] | None
+        Called with the seconds each background backtest ran, e.g. to debit
+        admission budgets for work done after the response.
+
+    Raises
+    ------
+    EnsembleUnavailable
+        If no member finished in time.
+    """
+    t0 = time.monotonic()
+    members = list(dict.fromkeys(members))
+    errors = errors if errors is not None else ErrorCache()
+    executor = executor if executor is not None else get_pool()
+    holdout = holdout or horizon
+    backtest_limit = backtest_timeout_seconds or 4 * deadline_seconds
+
+    asset_df = df[df["asset"] == asset].sort_values("date").reset_index(drop=True)
+    if len(asset_df) <= holdout:
+        raise ValueError(f"'{asset}' has only {len(asset_df)} bars; holdout is {holdout}")
+
+    if isinstance(member_timeout_seconds, dict):
+        budgets = {m: member_timeout_seconds.get(m, deadline_seconds) for m in members}
+    else:
+        budgets = dict.fromkeys(members, member_timeout_seconds or deadline_seconds)
+    limits = {m: min(budgets[m], deadline_seconds) for m in members}
+
+    # Forecast jobs go in first so they get workers before any backtests
+    futures = {executor.submit(forecaster, m, asset_df, asset, horizon): m for m in members}
+    backtest_df, actual = asset_df.iloc[:-holdout], asset_df["close"].to_numpy(dtype=float)[-holdout:]
+    for member in errors.claim(asset, members):
+        future = executor.submit(_timed, forecaster, member, backtest_df, asset, holdout)
+        timer = threading.Timer(backtest_limit, _kill, (executor, future))
+        timer.daemon = True
+        timer.start()
+        future.add_done_callback(lambda _, t=timer: t.cancel())
+        future.add_done_callback(_backtest_callback(errors, asset, member, actual, charge))
+
+    finished, dropped = _collect(executor, futures, limits, t0)
+    forecasts: dict[str, np.ndarray] = {}
+    for member, values in finished.items():
+        values = np.asarray(values, dtype=float).reshape(-1)
+        if len(values) < horizon or not np.isfinite(values[:horizon]).all():
+            dropped[member] = f"unusable forecast ({len(values)} values)"
+        else:
+            forecasts[member] = values[:horizon]
+    for member, reason in dropped.items():
+        logger.warning("Ensemble member %s dropped for %s: %s", member, asset, reason)
+    if not forecasts:
+        raise EnsembleUnavailable(f"No ensemble member finished for '{asset}': {dropped}")
+
+    weights = inverse_mse_weights(list(forecasts), errors.get(asset))
+    combined = sum(weights[m] * forecasts[m] for m in forecasts)
+    logger.info(
+        "Ensemble for %s: %s in %.1fs",
+        asset, {m: round(w, 3) for m, w in weights.items()}, time.monotonic() - t0,
+    )
+    return EnsembleResult(combined, forecasts, weights, dropped)
+
+
+def _collect(
+    executor: Executor,
+    futures: dict[Future, str],
+    limits: dict[str, float],
+    t0: float,
+) -> tuple[dict[str, np.ndarray], dict[str, str]]:
+    """Wait for *futures* until each finishes or passes its limit (seconds since *t0*)."""
+    finished: dict[str, np.ndarray] = {}
+    dropped: dict[str, str] = {}
+    pending = dict(futures)
+    while pending:
+        elapsed = time.monotonic() - t0
+        for future, member in list(pending.items()):
+            if elapsed >= limits[member] and not future.done():
+                _kill(executor, future)
+                dropped[member] = f"timed out after {limits[member]:.0f}s"
+                del pending[future]
+        if not pending:
+            break
+        timeout = max(min(limits[m] for m in pending.values()) - elapsed, 0.0)
+        done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+        for future in done:
+            member = pending.pop(future)
+            try:
+                finished[member] = future.result()
+            except Exception as exc:  # noqa: BLE001 — a failing member is dropped, not fatal
+                dropped[member] = f"{type(exc).__name__}: {exc}"
+    return finished, dropped
+
+
+def _backtest_callback(
+    errors: ErrorCache,
+    asset: str,
+    member: str,
+    actual: np.ndarray,
+    charge: Callable[[float], None] | None,
+) -> Callable[[Future], None]:
+    def record(future: Future) -> None:
+        rmse = None
+        try:
+            seconds, pred = future.result()
+            if charge is not None:
+                charge(seconds)
+            pred = np.asarray(pred, dtype=float).reshape(-1)[:len(actual)]
+            if len(pred) == len(actual) and np.isfinite(pred).all():
+                rmse = float(np.sqrt(np.mean((pred - actual) ** 2)))
+        except BaseException as exc:  # noqa: BLE001 — includes CancelledError
+            logger.info("Backtest of %s for %s failed: %s", member, asset, exc or type(exc).__name__)
+        errors.record(asset, member, rmse)
+
+    return record
@@ -1,6 +1,8 @@
 """Evaluation metrics and asset-level summaries.
 
 Migrated from src/evaluate.py and expanded with MAPE, R², and Sharpe ratio.
+:func:`panel_metrics` computes the same metrics for every (asset, model, fold)
+group of a long-format backtest frame in one grouped reduction.
 """
 from __future__ import annotations
 
@@ -77,6 +79,115 @@ def compute_metrics(
     }
 
 
+# ── Panel metrics ─────────────────────────────────────────────────────────────
+
+PANEL_METRICS = ("n", "mae", "rmse", "mape", "r2", "directional_accuracy", "sharpe_ratio")
+
+
+def _grouped_sharpe(
+    returns: pd.Series,
+    keys: list[pd.Series] | pd.Series,
+    risk_free_rate: float = 0.0,
+    periods: int = 365,
+) -> pd.Series:
+    """Vectorised :func:`sharpe_ratio` per group (population std, zero if flat)."""
+    excess = returns - risk_free_rate / periods
+    grouped = excess.groupby(keys, sort=False, observed=True)
+    mean = grouped.mean()
+    # Two-pass variance: subtract the broadcast group mean before squaring
+    dev = excess - grouped.transform("mean")
+    std = np.sqrt((dev * dev).groupby(keys, sort=False, observed=True).mean())
+    return (mean / std * np.sqrt(periods)).where(std >= 1e-10, 0.0)
+
+
+def panel_metrics(
+    df: pd.DataFrame,
+    group_cols: list[str] | tuple[str, ...] = ("asset", "model", "fold"),
+    y_true_col: str = "y_true",
+    y_pred_col: str = "y_pred",
+    date_col: str | None = "date",
+    eps: float = 1e-8,
+    periods: int = 365,
+) -> pd.DataFrame:
+    """Compute forecast metrics for every group of a long-format panel.
+
+    Each metric is reduced to per-row terms first and then summed with a
+    single ``groupby().sum()``, so the cost is a handful of vectorised column
+    operations regardless of the number of groups.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        One row per forecast point with actual and predicted values.
+    group_cols : sequence of str
+        Grouping keys; those missing from *df* are ignored.
+    y_true_col, y_pred_col : str
+        Actual and predicted value columns.
+    date_col : str, optional
+        Used to order points within a group for directional accuracy and
+        Sharpe; pass ``None`` if *df* is already ordered.
+    eps : float
+        Denominator guard for MAPE (matches :func:`mape`).
+    periods : int
+        Annualisation factor for the Sharpe ratio.
+
+    Returns
+    -------
+    pd.DataFrame
+        One row per group with the key columns plus n, mae, rmse, mape, r2,
+        directional_accuracy and sharpe_ratio.  Directional accuracy compares
+        ``sign(y_t - y_{t-1})`` with ``sign(ŷ_t - y_{t-1})``; the Sharpe ratio
+        is that of the long/short strategy following the predicted direction.
+    """
+    keys = [c for c in group_cols if c in df.columns]
+    if not keys:
+        raise ValueError(f"None of the group columns {list(group_cols)} are in the frame.")
+
+    cols = keys + [y_true_col, y_pred_col] + ([date_col] if date_col and date_col in df.columns else [])
+    data = df[cols]
+    if date_col and date_col in df.columns:
+        data = data.sort_values(keys + [date_col], kind="stable")
+    data = data.reset_index(drop=True)
+    key_series = [data[k] for k in keys]
+
+    y = data[y_true_col].to_numpy(dtype=float)
+    yhat = data[y_pred_col].to_numpy(dtype=float)
+    err = y - yhat
+
+    # Previous actual within the same group (NaN at each group start)
+    prev = data.groupby(key_series, sort=False, observed=True)[y_true_col].shift(1).to_numpy(dtype=float)
+    actual_move = np.sign(y - prev)
+    pred_move = np.sign(yhat - prev)
+    has_prev = ~np.isnan(prev)
+    period_ret = np.where(has_prev, y / np.where(has_prev, prev, 1.0) - 1, np.nan)
+    strat_ret = pd.Series(np.where(has_prev, pred_move * period_ret, np.nan))
+
+    y_dev = y - data.groupby(key_series, sort=False, observed=True)[y_true_col].transform("mean").to_numpy(dtype=float)
+
+    terms = pd.DataFrame({
+        "n": np.ones(len(data)),
+        "abs_err": np.abs(err),
+        "sq_err": err * err,
+        "ape": np.abs(err / (np.abs(y) + eps)),
+        "y_dev2": y_dev * y_dev,
+        "hit": np.where(has_prev, (actual_move == pred_move).astype(float), 0.0),
+        "n_dir": has_prev.astype(float),
+    })
+    sums = terms.groupby(key_series, sort=False, observed=True).sum()
+
+    n = sums["n"]
+    out = pd.DataFrame({
+        "n": n.astype(int),
+        "mae": sums["abs_err"] / n,
+        "rmse": np.sqrt(sums["sq_err"] / n),
+        "mape": sums["ape"] / n * 100,
+        "r2": 1 - sums["sq_err"] / (sums["y_dev2"] + 1e-10),
+        "directional_accuracy": (sums["hit"] / sums["n_dir"]).where(sums["n_dir"] > 0),
+        "sharpe_ratio": _grouped_sharpe(strat_ret, key_series, periods=periods),
+    })
+    return out[list(PANEL_METRICS)].reset_index()
+
+
 # ── DataFrame-level summaries ─────────────────────────────────────────────────
 
 def summary_by_asset(df: pd.DataFrame) -> pd.DataFrame:
@@ -105,12 +216,11 @@ def summary_by_asset(df: pd.DataFrame) -> pd.DataFrame:
 
     # Sharpe ratio if log_return available
     if "log_return" in df.columns:
+        rets = df.dropna(subset=["log_return"])
         sharpe = (
-            df.dropna(subset=["log_return"])
-            .groupby("asset")["log_return"]
-            .apply(lambda s: sharpe_ratio(s.values))
+            _grouped_sharpe(rets["log_return"], rets["asset"])
+            .rename("sharpe_ratio")
             .reset_index()
-            .rename(columns={"log_return": "sharpe_ratio"})
         )
         out = out.merge(sharpe, on="asset", how="left")
 
@@ -0,0 +1,423 @@
+"""Batched GARCH(1,1) / GJR-GARCH(1,1) volatility models for many assets at once.
+
+Log returns of every asset are stacked into a NaN-padded (B, n) matrix and the
+Gaussian likelihood is evaluated in one NumPy pass over time, vectorised
+across assets; all assets are then optimised together with the per-row BFGS
+from :mod:`src.models.optim`.
+
+Model (returns in percent, ``r = 100 * log_return``)::
+
+    r_t      = mu + e_t
+    sigma2_t = omega + (alpha + gamma * 1[e_{t-1} < 0]) * e_{t-1}^2 + beta * sigma2_{t-1}
+
+``gamma`` is fixed at zero for plain GARCH. Positivity and covariance
+stationarity (``alpha + gamma / 2 + beta < 1``) hold by construction of the
+unconstrained parameterisation.
+
+Returns are winsorised at ``clip_mads`` robust standard deviations from the
+median before fitting, so a single bad print (e.g. a listing-day price jump)
+cannot pin the variance recursion at an explosive corner.
+
+The fitted parameter table also carries each asset's last residual and
+conditional variance, so a daily update is a single filter pass over the new
+returns (:func:`update_garch_state`) rather than a refit.
+"""
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from src.models.optim import batched_bfgs
+
+logger = logging.getLogger(__name__)
+
+SCALE = 100.0  # fit on percent returns for a well-conditioned likelihood
+MAX_PERSISTENCE = 0.9999
+PARAM_COLS = ("mu", "omega", "alpha", "gamma", "beta")
+_LOG_2PI = np.log(2 * np.pi)
+
+
+# ── Parameterisation ─────────────────────────────────────────────────────────
+
+def _n_params(asymmetric: bool) -> int:
+    return 5 if asymmetric else 4
+
+
+def _constrain(x: np.ndarray, asymmetric: bool) -> np.ndarray:
+    """Unconstrained (B, k) -> (B, 5) columns mu, omega, alpha, gamma, beta."""
+    x = np.clip(x, -30.0, 30.0)
+    out = np.zeros((x.shape[0], 5))
+    out[:, 0] = x[:, 0]
+    out[:, 1] = np.exp(x[:, 1])
+    persistence = MAX_PERSISTENCE / (1 + np.exp(-x[:, 2]))
+    if asymmetric:
+        # Softmax over (alpha, gamma/2, beta) shares of the persistence
+        logits = np.column_stack([x[:, 3], x[:, 4], np.zeros(len(x))])
+        shares = np.exp(logits - logits.max(axis=1, keepdims=True))
+        shares /= shares.sum(axis=1, keepdims=True)
+        out[:, 2] = persistence * shares[:, 0]
+        out[:, 3] = 2 * persistence * shares[:, 1]
+        out[:, 4] = persistence * shares[:, 2]
+    else:
+        share = 1 / (1 + np.exp(-x[:, 3]))
+        out[:, 2] = persistence * share
+        out[:, 4] = persistence * (1 - share)
+    return out
+
+
+def _unconstrain(params: np.ndarray, asymmetric: bool) -> np.ndarray:
+    """Inverse of :func:`_constrain` for (B, 5) parameter rows."""
+    mu, omega, alpha, gamma, beta = params.T
+    persistence = np.clip(alpha + gamma / 2 + beta, 1e-6, MAX_PERSISTENCE * (1 - 1e-6))
+    p = persistence / MAX_PERSISTENCE
+    cols = [mu, np.log(np.maximum(omega, 1e-12)), np.log(p / (1 - p))]
+    a = np.maximum(alpha, 1e-8) / persistence
+    if asymmetric:
+        g = np.maximum(gamma / 2, 1e-8) / persistence
+        b = np.maximum(beta, 1e-8) / persistence
+        cols += [np.log(a / b), np.log(g / b)]
+    else:
+        a = np.clip(a, 1e-6, 1 - 1e-6)
+        cols.append(np.log(a / (1 - a)))
+    return np.column_stack(cols)
+
+
+def _default_start(batch: int, asymmetric: bool) -> np.ndarray:
+    start = np.tile([0.0, 0.1, 0.05, 0.0, 0.9], (batch, 1))
+    if asymmetric:
+        start[:, 2], start[:, 3] = 0.03, 0.04
+    return start
+
+
+# ── Filter & likelihood ──────────────────────────────────────────────────────
+
+def _filter(
+    r: np.ndarray,
+    params: np.ndarray,
+    backcast: np.ndarray,
+    e0: np.ndarray | None = None,
+    s0: np.ndarray | None = None,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Run the variance recursion over (B, n) returns with NaN left-padding.
+
+    Returns
+    -------
+    nll : np.ndarray, shape (B,)
+        Negative log-likelihood summed over observed returns.
+    nobs : np.ndarray, shape (B,)
+    last_resid, last_sigma2 : np.ndarray, shape (B,)
+        Filter state after the final observation.
+    """
+    mu, omega, alpha, gamma, beta = params.T
+    e_prev = np.zeros(len(r)) if e0 is None else e0.copy()
+    s_prev = backcast.copy() if s0 is None else s0.copy()
+    started = np.zeros(len(r), dtype=bool) if e0 is None else np.ones(len(r), dtype=bool)
+    nll = np.zeros(len(r))
+    nobs = np.zeros(len(r))
+    # Skip the padding shared by every row (short-history assets)
+    first = int(np.argmax(~np.isnan(r).all(axis=0))) if r.size else 0
+
+    for t in range(first, r.shape[1]):
+        obs = ~np.isnan(r[:, t])
+        if not obs.any():
+            continue
+        # The first observation of each series uses the backcast variance
+        shock = (alpha + gamma * (e_prev < 0)) * e_prev**2
+        s_t = np.where(started, omega + shock + beta * s_prev, backcast)
+        e_t = r[:, t] - mu
+        nll += np.where(obs, 0.5 * (_LOG_2PI + np.log(s_t) + e_t**2 / s_t), 0.0)
+        nobs += obs
+        e_prev = np.where(obs, e_t, e_prev)
+        s_prev = np.where(obs, s_t, s_prev)
+        started |= obs
+    return nll, nobs, e_prev, s_prev
+
+
+def _backcast(r: np.ndarray, span: int = 75, decay: float = 0.94) -> np.ndarray:
+    """Initial variance per series: decaying average of its first *span* squared returns.
+
+    Using only the start of each series (as the ``arch`` package does) keeps a
+    single extreme print later in the history from inflating the start-up
+    variance of the whole recursion.
+    """
+    backcast = np.empty(len(r))
+    for i, row in enumerate(r):
+        head = row[~np.isnan(row)][:span]
+        head = head - np.median(row[~np.isnan(row)])
+        w = decay ** np.arange(len(head))
+        backcast[i] = np.sum(w * head**2) / w.sum()
+    return np.maximum(backcast, 1e-8)
+
+
+def _clip_bounds(r: np.ndarray, clip_mads: float | None) -> tuple[np.ndarray, np.ndarray]:
+    """Per-series winsorisation bounds at *clip_mads* robust standard deviations."""
+    if clip_mads is None:
+        return np.full(len(r), -np.inf), np.full(len(r), np.inf)
+    med = np.nanmedian(r, axis=1)
+    scale = 1.4826 * np.nanmedian(np.abs(r - med[:, None]), axis=1)
+    # Mostly-flat series (prices quoted below their tick size) have MAD == 0
+    scale = np.where(scale > 0, scale, np.nanstd(r, axis=1))
+    return med - clip_mads * scale, med + clip_mads * scale
+
+
+def stack_returns(returns: pd.DataFrame) -> tuple[list[str], np.ndarray, list]:
+    """Right-align the columns of a (date × asset) return frame into (B, n) percent returns."""
+    assets = [str(c) for c in returns.columns]
+    values = [returns[c].dropna() for c in returns.columns]
+    if not assets or min(len(v) for v in values) < 30:
+        raise ValueError("Every asset needs at least 30 returns to fit a GARCH model.")
+    n = max(len(v) for v in values)
+    r = np.full((len(assets), n), np.nan)
+    for i, v in enumerate(values):
+        r[i, n - len(v):] = v.to_numpy(dtype=float) * SCALE
+    return assets, r, [v.index[-1] for v in values]
+
+
+# ── Results ──────────────────────────────────────────────────────────────────
+
+@dataclass
+class BatchGARCHResult:
+    """Fitted parameters and terminal filter state for a batch of assets."""
+
+    assets: list[str]
+    params: np.ndarray  # (B, 5) mu, omega, alpha, gamma, beta (percent units)
+    llf: np.ndarray
+    nobs: np.ndarray
+    last_resid: np.ndarray
+    last_sigma2: np.ndarray
+    last_date: list
+    clip_lo: np.ndarray | None = None
+    clip_hi: np.ndarray | None = None
+    asymmetric: bool = False
+    converged: bool = True
+    n_iter: int = 0
+
+    @property
+    def persistence(self) -> np.ndarray:
+        return self.params[:, 2] + self.params[:, 3] / 2 + self.params[:, 4]
+
+    def params_frame(self) -> pd.DataFrame:
+        """Parameters plus filter state, indexed by asset — the registry format."""
+        frame = pd.DataFrame(self.params, index=self.assets, columns=list(PARAM_COLS))
+        frame["model"] = "gjr" if self.asymmetric else "garch"
+        frame["llf"] = self.llf
+        frame["last_resid"] = self.last_resid
+        frame["last_sigma2"] = self.last_sigma2
+        frame["last_date"] = self.last_date
+        frame["nobs"] = self.nobs.astype(int)
+        if self.clip_lo is not None:
+            frame["clip_lo"] = self.clip_lo
+            frame["clip_hi"] = self.clip_hi
+        frame.index.name = "asset"
+        return frame
+
+    def forecast(self, steps: int = 30) -> pd.DataFrame:
+        return forecast_volatility(self.params_frame(), steps)
+
+
+# ── Fitting ──────────────────────────────────────────────────────────────────
+
+def fit_garch_batch(
+    returns: pd.DataFrame,
+    asymmetric: bool = False,
+    start_params: pd.DataFrame | None = None,
+    clip_mads: float | None = 15.0,
+    maxiter: int = 200,
+    gtol: float = 1e-5,
+    eps: float = 1e-5,
+) -> BatchGARCHResult:
+    """Fit GARCH(1,1) (or GJR-GARCH(1,1)) to every column of *returns* jointly.
+
+    Parameters
+    ----------
+    returns : pd.DataFrame
+        Wide (date × asset) frame of daily log returns; leading gaps are fine.
+    asymmetric : bool
+        Fit the GJR leverage term ``gamma``.
+    start_params : pd.DataFrame, optional
+        A previous :meth:`BatchGARCHResult.params_frame`, used to warm-start
+        (e.g. yesterday's fit). Assets missing from it use default starts.
+    clip_mads : float | None
+        Winsorise returns at this many robust (MAD) standard deviations from
+        the median; None disables clipping.
+    maxiter, gtol, eps
+        BFGS iteration cap, gradient tolerance and finite-difference step.
+
+    Returns
+    -------
+    BatchGARCHResult
+    """
+    assets, r, last_date = stack_returns(returns)
+    clip_lo, clip_hi = _clip_bounds(r, clip_mads)
+    r = np.clip(r, clip_lo[:, None], clip_hi[:, None])
+    batch, k = len(assets), _n_params(asymmetric)
+    backcast = _backcast(r)
+
+    start = _default_start(batch, asymmetric)
+    start[:, 0] = np.nanmedian(r, axis=1)
+    if start_params is not None:
+        prev = start_params.reindex(assets)[list(PARAM_COLS)].to_numpy(dtype=float)
+        known = np.isfinite(prev).all(axis=1)
+        start[known] = prev[known]
+    x0 = _unconstrain(start, asymmetric)
+
+    n_eval = 2 * k + 1
+    offsets = np.zeros((n_eval, k))
+    offsets[1 : k + 1] = np.eye(k) * eps
+    offsets[k + 1 :] = -np.eye(k) * eps
+    nobs_all = (~np.isnan(r)).sum(axis=1)
+
+    def objective(x: np.ndarray, rows: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Per-asset NLL (per observation) and central-difference gradient in one pass."""
+        m = len(rows)
+        stacked = (x[:, None, :] + offsets[None]).reshape(m * n_eval, k)
+        nll, _, _, _ = _filter(
+            np.repeat(r[rows], n_eval, axis=0),
+            _constrain(stacked, asymmetric),
+            np.repeat(backcast[rows], n_eval),
+        )
+        nll = (nll / np.repeat(nobs_all[rows], n_eval)).reshape(m, n_eval)
+        grad = (nll[:, 1 : k + 1] - nll[:, k + 1 :]) / (2 * eps)
+        return nll[:, 0], grad
+
+    x, n_iter, done = batched_bfgs(objective, x0, maxiter=maxiter, gtol=gtol)
+    params = _constrain(x, asymmetric)
+    nll, nobs, last_resid, last_sigma2 = _filter(r, params, backcast)
+
+    logger.info(
+        "Batched %s fitted on %d assets in %d iterations (%d/%d converged).",
+        "GJR-GARCH(1,1)" if asymmetric else "GARCH(1,1)", batch, n_iter, int(done.sum()), batch,
+    )
+    return BatchGARCHResult(
+        assets=assets, params=params, llf=-nll, nobs=nobs,
+        last_resid=last_resid, last_sigma2=last_sigma2, last_date=last_date,
+        clip_lo=clip_lo, clip_hi=clip_hi, asymmetric=asymmetric, converged=bool(done.all()), n_iter=n_iter,
+    )
+
+
+def update_garch_state(params: pd.DataFrame, returns: pd.DataFrame) -> pd.DataFrame:
+    """Advance stored filter state with returns observed after each ``last_date``.
+
+    Parameters are kept fixed, so this is one O(new days) recursion — the
+    cheap daily path between full refits.
+
+    Parameters
+    ----------
+    params : pd.DataFrame
+        Registry frame from :meth:`BatchGARCHResult.params_frame`.
+    returns : pd.DataFrame
+        Wide (date × asset) frame of daily log returns.
+
+    Returns
+    -------
+    pd.DataFrame
+        Copy of *params* with updated ``last_resid``, ``last_sigma2``,
+        ``last_date`` and ``nobs``.
+    """
+    out = params.copy()
+    assets = [a for a in out.index if a in returns.columns]
+    if not assets:
+        return out
+    last = pd.to_datetime(out.loc[assets, "last_date"])
+    new = returns[assets].sort_index()
+    new = new.where(new.index.to_numpy()[:, None] > last.to_numpy()[None, :])
+    if new.notna().sum().sum() == 0:
+        return out
+
+    r = new.to_numpy(dtype=float).T * SCALE
+    state = out.loc[assets]
+    if "clip_lo" in state.columns:
+        r = np.clip(r, state["clip_lo"].to_numpy()[:, None], state["clip_hi"].to_numpy()[:, None])
+    _, nobs, e, s = _filter(
+        r,
+        state[list(PARAM_COLS)].to_numpy(dtype=float),
+        state["last_sigma2"].to_numpy(dtype=float),
+        e0=state["last_resid"].to_numpy(dtype=float),
+        s0=state["last_sigma2"].to_numpy(dtype=float),
+    )
+    seen = new.notna()
+    updated = nobs > 0
+    idx = [a for a, u in zip(assets, updated) if u]
+    out.loc[idx, "last_resid"] = e[updated]
+    out.loc[idx, "last_sigma2"] = s[updated]
+    out.loc[idx, "last_date"] = [seen.index[seen[a]].max() for a in idx]
+    out.loc[idx, "nobs"] = out.loc[idx, "nobs"] + nobs[updated].astype(int)
+    logger.info("GARCH state advanced for %d assets", len(idx))
+    return out
+
+
+def forecast_volatility(params: pd.DataFrame, steps: int = 30, periods: int = 365) -> pd.DataFrame:
+    """Multi-day-ahead volatility from stored parameters and state.
+
+    Uses ``E[sigma2_{t+h}] = vbar + p^{h-1} (sigma2_{t+1} - vbar)`` with
+    persistence ``p = alpha + gamma/2 + beta`` and long-run variance
+    ``vbar = omega / (1 - p)``.
+
+    Returns
+    -------
+    pd.DataFrame
+        Long frame with asset, step, date, volatility (daily, decimal),
+        annualized_volatility and cumulative_volatility (over steps 1..h).
+    """
+    mu, omega, alpha, gamma, beta = (params[c].to_numpy(dtype=float) for c in PARAM_COLS)
+    e = params["last_resid"].to_numpy(dtype=float)
+    s = params["last_sigma2"].to_numpy(dtype=float)
+    persistence = alpha + gamma / 2 + beta
+    vbar = omega / (1 - persistence)
+    # One step ahead is known exactly; E[1(e<0) e^2] = sigma2 / 2 beyond that
+    next_var = omega + (alpha + gamma * (e < 0)) * e**2 + beta * s
+    h = np.arange(steps)
+    var = vbar[:, None] + persistence[:, None] ** h[None] * (next_var - vbar)[:, None]
+    var /= SCALE**2
+
+    last_date = pd.to_datetime(params["last_date"]).to_numpy()
+    frame = pd.DataFrame({
+        "asset": np.repeat(params.index.to_numpy(), steps),
+        "step": np.tile(h + 1, len(params)),
+        "date": (last_date[:, None] + (h + 1)[None] * np.timedelta64(1, "D")).ravel(),
+        "volatility": np.sqrt(var).ravel(),
+        "annualized_volatility": np.sqrt(var * periods).ravel(),
+        "cumulative_volatility": np.sqrt(np.cumsum(var, axis=1)).ravel(),
+    })
+    return frame
+
+
+def run_batch_garch_pipeline(
+    df: pd.DataFrame,
+    assets: list[str] | None = None,
+    steps: int = 30,
+    asymmetric: bool = False,
+    start_params: pd.DataFrame | None = None,
+) -> dict:
+    """Fit GARCH for many assets in one batched job.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Long-format frame with date, asset and log_return columns.
+    assets : list[str], optional
+        Subset of assets; defaults to every asset in *df*.
+    steps : int
+        Forecast horizon in days.
+    asymmetric : bool
+        Fit GJR-GARCH instead of GARCH.
+    start_params : pd.DataFrame, optional
+        Previous :meth:`BatchGARCHResult.params_frame` for warm starts.
+
+    Returns
+    -------
+    dict
+        Keys: result, params, forecast.
+    """
+    wide = df.pivot_table(index="date", columns="asset", values="log_return").sort_index()
+    if assets is not None:
+        wide = wide[[a for a in assets if a in wide.columns]]
+    result = fit_garch_batch(wide, asymmetric=asymmetric, start_params=start_params)
+    return {
+        "result": result,
+        "params": result.params_frame(),
+        "forecast": result.forecast(steps=steps),
+    }
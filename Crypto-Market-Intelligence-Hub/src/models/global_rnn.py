@@ -0,0 +1,379 @@
+"""Global recurrent model: one LSTM/GRU network trained across every asset.
+
+:func:`run_lstm_pipeline` and :func:`run_gru_pipeline` fit one network and one
+scaler per asset. The global model instead shares a single network:
+
+- **Per-asset normalisation** — log closes are standardised with each
+  asset's own training mean and std (:class:`AssetScaler`), so assets whose
+  prices differ by orders of magnitude share one input scale.
+- **Asset embedding** — an asset ID feeds a small learned embedding that is
+  concatenated to every time step, letting the network specialise per asset.
+- **Streaming windows** — :class:`WindowGenerator` keeps only the scaled
+  series and an index of window starts. Batches are gathered on demand and
+  prefetched in a background thread (or by ``tf.data`` when training), so the
+  ``(n_windows, seq_len)`` tensor is never materialised.
+- **Checkpoint / resume** — training backs up its state every epoch and
+  resumes from the last completed epoch after an interruption.
+- **Batched inference** — every asset is forecast in the same ``predict``
+  call, one call per forecast step.
+
+One Keras model and one scaler are stored, instead of two per asset.
+"""
+from __future__ import annotations
+
+import logging
+import queue
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Iterator
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+CELLS = ("lstm", "gru")
+
+
+# ── Normalisation ────────────────────────────────────────────────────────────
+
+@dataclass
+class AssetScaler:
+    """Per-asset standardisation of log prices."""
+
+    assets: list[str]
+    mean: np.ndarray
+    std: np.ndarray
+
+    @classmethod
+    def fit(cls, series: dict[str, np.ndarray]) -> AssetScaler:
+        assets = sorted(series)
+        logs = [np.log(series[a]) for a in assets]
+        std = np.array([x.std() for x in logs])
+        return cls(assets, np.array([x.mean() for x in logs]), np.where(std > 0, std, 1.0))
+
+    def index(self, asset: str) -> int:
+        return self.assets.index(asset)
+
+    def transform(self, asset: str, close: np.ndarray) -> np.ndarray:
+        i = self.index(asset)
+        return ((np.log(close) - self.mean[i]) / self.std[i]).astype(np.float32)
+
+    def inverse(self, ids: np.ndarray, scaled: np.ndarray) -> np.ndarray:
+        """Prices from scaled values; *ids* broadcast against *scaled* along axis 0."""
+        ids = np.asarray(ids)
+        shape = (-1,) + (1,) * (np.ndim(scaled) - 1)
+        return np.exp(scaled * self.std[ids].reshape(shape) + self.mean[ids].reshape(shape))
+
+
+def asset_series(df: pd.DataFrame, min_length: int) -> dict[str, np.ndarray]:
+    """Positive close series per asset with at least *min_length* bars."""
+    out = {}
+    for asset, grp in df.sort_values("date").groupby("asset", sort=True):
+        close = grp["close"].to_numpy(dtype=float)
+        close = close[np.isfinite(close) & (close > 0)]
+        if len(close) >= min_length:
+            out[str(asset)] = close
+    return out
+
+
+# ── Streaming input pipeline ─────────────────────────────────────────────────
+
+class WindowGenerator:
+    """Sliding ``(window, next value)`` pairs across many series, gathered per batch.
+
+    Parameters
+    ----------
+    scaled : dict[int, np.ndarray]
+        Scaled series keyed by asset ID.
+    seq_len : int
+        Input window length.
+    bounds : dict[int, tuple[int, int]] | None
+        Optional ``[lo, hi)`` range of *target* positions per asset, e.g. to
+        split each series into train / validation / test.
+    """
+
+    def __init__(
+        self,
+        scaled: dict[int, np.ndarray],
+        seq_len: int,
+        bounds: dict[int, tuple[int, int]] | None = None,
+    ) -> None:
+        self.seq_len = seq_len
+        ids = sorted(scaled)
+        self._flat = np.concatenate([scaled[i] for i in ids]).astype(np.float32)
+        offsets = np.cumsum([0] + [len(scaled[i]) for i in ids[:-1]])
+
+        starts, owners = [], []
+        for asset_id, offset in zip(ids, offsets):
+            n = len(scaled[asset_id])
+            lo, hi = bounds.get(asset_id, (seq_len, n)) if bounds else (seq_len, n)
+            targets = np.arange(max(lo, seq_len), min(hi, n))
+            starts.append(offset + targets - seq_len)
+            owners.append(np.full(len(targets), asset_id))
+        self._starts = np.concatenate(starts).astype(np.int64) if starts else np.zeros(0, np.int64)
+        self._owners = np.concatenate(owners).astype(np.int32) if owners else np.zeros(0, np.int32)
+        self._steps = np.arange(seq_len)
+
+    def __len__(self) -> int:
+        return len(self._starts)
+
+    def gather(self, rows: np.ndarray) -> tuple[tuple[np.ndarray, np.ndarray], np.ndarray]:
+        """``((x, asset_id), y)`` for window *rows*; x has shape (B, seq_len, 1)."""
+        starts = self._starts[rows]
+        x = self._flat[starts[:, None] + self._steps][..., None]
+        y = self._flat[starts + self.seq_len]
+        return (x, self._owners[rows]), y
+
+    def batches(
+        self,
+        batch_size: int = 256,
+        shuffle: bool = True,
+        seed: int | None = None,
+    ) -> Iterator[tuple[tuple[np.ndarray, np.ndarray], np.ndarray]]:
+        """One epoch of batches, in shuffled or original order."""
+        order = np.random.default_rng(seed).permutation(len(self)) if shuffle else np.arange(len(self))
+        for lo in range(0, len(order), batch_size):
+            yield self.gather(order[lo:lo + batch_size])
+
+    def dataset(self, batch_size: int = 256, shuffle: bool = True, seed: int | None = None) -> Any:
+        """Repeating ``tf.data.Dataset`` of batches, prefetched with AUTOTUNE."""
+        import tensorflow as tf
+
+        spec = (
+            (
+                tf.TensorSpec((None, self.seq_len, 1), tf.float32),
+                tf.TensorSpec((None,), tf.int32),
+            ),
+            tf.TensorSpec((None,), tf.float32),
+        )
+        epoch = iter(range(1 << 30))
+
+        def generate():
+            # A fresh permutation each epoch, reproducible from *seed*
+            sub_seed = None if seed is None else seed + next(epoch)
+            yield from self.batches(batch_size, shuffle, sub_seed)
+
+        return tf.data.Dataset.from_generator(generate, output_signature=spec).repeat().prefetch(
+            tf.data.AUTOTUNE
+        )
+
+    def steps_per_epoch(self, batch_size: int) -> int:
+        return max(1, -(-len(self) // batch_size))
+
+
+def prefetch(iterator: Iterator, depth: int = 4) -> Iterator:
+    """Run *iterator* in a background thread, keeping up to *depth* items ready.
+
+    An exception raised by *iterator* is re-raised in the consumer after the
+    items produced before it.
+    """
+    buffer: queue.Queue = queue.Queue(maxsize=depth)
+    done = object()
+    error: list[BaseException] = []
+
+    def produce() -> None:
+        try:
+            for item in iterator:
+                buffer.put(item)
+        except BaseException as exc:  # noqa: BLE001 — handed to the consumer
+            error.append(exc)
+        finally:
+            buffer.put(done)
+
+    threading.Thread(target=produce, daemon=True).start()
+    while (item := buffer.get()) is not done:
+        yield item
+    if error:
+        raise error[0]
+
+
+# ── Model ────────────────────────────────────────────────────────────────────
+
+def build_global_rnn(
+    seq_len: int,
+    n_assets: int,
+    cell: str = "lstm",
+    units: list[int] | None = None,
+    embed_dim: int = 8,
+    dropout_rate: float = 0.2,
+    dense_units: int = 32,
+    learning_rate: float = 0.001,
+) -> Any:
+    """Stacked LSTM/GRU over ``[price window, asset embedding]``.
+
+    Same layer stack as :func:`src.models.lstm_model.build_lstm`, with a
+    second integer input (the asset ID) embedded and repeated over time.
+    """
+    if cell not in CELLS:
+        raise ValueError(f"Unknown cell '{cell}'. Choose from: {CELLS}")
+    try:
+        from tensorflow import keras
+    except ImportError as exc:
+        raise ImportError("TensorFlow is required. Run: pip install tensorflow") from exc
+
+    units = units or [128, 64]
+    layer = keras.layers.LSTM if cell == "lstm" else keras.layers.GRU
+
+    window = keras.Input(shape=(seq_len, 1), name="window")
+    asset_id = keras.Input(shape=(), dtype="int32", name="asset_id")
+    embedded = keras.layers.Embedding(n_assets, embed_dim)(asset_id)
+    x = keras.layers.Concatenate()([window, keras.layers.RepeatVector(seq_len)(embedded)])
+    for i, n_units in enumerate(units):
+        x = layer(n_units, return_sequences=i < len(units) - 1)(x)
+        x = keras.layers.Dropout(dropout_rate)(x)
+    x = keras.layers.Concatenate()([x, embedded])
+    x = keras.layers.Dense(dense_units, activation="relu")(x)
+    outputs = keras.layers.Dense(1)(x)
+
+    model = keras.Model([window, asset_id], outputs)
+    model.compile(optimizer=keras.optimizers.Adam(learning_rate=learning_rate), loss="mse")
+    logger.info("Global %s model built: %d params, %d assets", cell.upper(), model.count_params(), n_assets)
+    return model
+
+
+def train_global_rnn(
+    model: Any,
+    train: WindowGenerator,
+    val: WindowGenerator,
+    checkpoint_dir: Path | str,
+    epochs: int = 50,
+    batch_size: int = 256,
+    seed: int = 42,
+) -> Any:
+    """Fit on streamed batches; resumes from *checkpoint_dir* if a run was interrupted."""
+    from tensorflow import keras
+
+    checkpoint_dir = Path(checkpoint_dir)
+    checkpoint_dir.mkdir(parents=True, exist_ok=True)
+    callbacks = [
+        # Saves model + optimizer + epoch each epoch; restored on the next fit()
+        keras.callbacks.BackupAndRestore(str(checkpoint_dir / "backup")),
+        keras.callbacks.EarlyStopping(monitor="val_loss", patience=8, restore_best_weights=True),
+        keras.callbacks.ReduceLROnPlateau(monitor="val_loss", factor=0.5, patience=4, min_lr=1e-6),
+    ]
+    history = model.fit(
+        train.dataset(batch_size, shuffle=True, seed=seed),
+        steps_per_epoch=train.steps_per_epoch(batch_size),
+        validation_data=val.dataset(batch_size, shuffle=False),
+        validation_steps=val.steps_per_epoch(batch_size),
+        epochs=epochs,
+        callbacks=callbacks,
+        verbose=0,
+    )
+    logger.info("Global model training complete (%d epochs this run).", len(history.history["loss"]))
+    return history
+
+
+# ── Inference ────────────────────────────────────────────────────────────────
+
+def predict_windows(model: Any, windows: WindowGenerator, batch_size: int = 4096) -> np.ndarray:
+    """Scaled one-step predictions for every window, in generator order."""
+    preds = [
+        model.predict_on_batch(list(inputs)).reshape(-1)
+        for inputs, _ in prefetch(windows.batches(batch_size, shuffle=False))
+    ]
+    return np.concatenate(preds) if preds else np.zeros(0, np.float32)
+
+
+def forecast_all(
+    model: Any,
+    scaler: AssetScaler,
+    series: dict[str, np.ndarray],
+    seq_len: int,
+    steps: int,
+) -> dict[str, np.ndarray]:
+    """Recursive *steps*-ahead price forecasts for every asset in one batch per step."""
+    assets = [a for a in scaler.assets if a in series and len(series[a]) >= seq_len]
+    if not assets:
+        return {}
+    ids = np.array([scaler.index(a) for a in assets], dtype=np.int32)
+    window = np.stack([scaler.transform(a, series[a][-seq_len:]) for a in assets])
+    out = np.empty((len(assets), steps), dtype=np.float32)
+    for step in range(steps):
+        nxt = model.predict_on_batch([window[..., None], ids]).reshape(-1)
+        out[:, step] = nxt
+        window = np.concatenate([window[:, 1:], nxt[:, None]], axis=1)
+    prices = scaler.inverse(ids, out)
+    return dict(zip(assets, prices))
+
+
+def load_global_rnn(cell: str = "lstm", models_dir: Path | str | None = None) -> tuple[Any, AssetScaler, int]:
+    """``(model, scaler, seq_len)`` saved by :func:`run_global_pipeline`."""
+    from .registry import load_keras, load_sklearn
+
+    meta = load_sklearn(f"global_{cell}_scaler", models_dir)
+    return load_keras(f"global_{cell}.keras", models_dir), meta["scaler"], meta["seq_len"]
+
+
+# ── Pipeline ─────────────────────────────────────────────────────────────────
+
+def run_global_pipeline(
+    df: pd.DataFrame,
+    cell: str = "lstm",
+    seq_len: int = 60,
+    train_frac: float = 0.8,
+    val_frac: float = 0.1,
+    forecast_steps: int = 30,
+    epochs: int = 50,
+    batch_size: int = 256,
+    models_dir: Path | str | None = None,
+) -> dict:
+    """Train one global network on every asset, evaluate per asset and forecast.
+
+    Each series is split in time: the first ``train_frac - val_frac`` of its
+    targets for training, the next ``val_frac`` for validation and the rest
+    for test. The scaler is fitted on the training part only.
+
+    Returns
+    -------
+    dict
+        ``metrics`` (one row per asset), ``forecast`` ({asset: prices}),
+        ``model`` and ``scaler``. If *models_dir* is given, the model and scaler
+        are saved to the registry as ``global_<cell>``.
+    """
+    from .evaluate import compute_metrics
+    from .registry import save_keras, save_sklearn
+
+    series = asset_series(df, min_length=seq_len * 3)
+    cuts = {a: (int(len(s) * (train_frac - val_frac)), int(len(s) * train_frac)) for a, s in series.items()}
+    scaler = AssetScaler.fit({a: s[:cuts[a][0]] for a, s in series.items()})
+    scaled = {scaler.index(a): scaler.transform(a, s) for a, s in series.items()}
+    ids = {a: scaler.index(a) for a in series}
+
+    def split(part: int) -> WindowGenerator:
+        bounds = {}
+        for a, s in series.items():
+            edges = (seq_len, cuts[a][0], cuts[a][1], len(s))
+            bounds[ids[a]] = (edges[part], edges[part + 1])
+        return WindowGenerator(scaled, seq_len, bounds)
+
+    train, val, test = split(0), split(1), split(2)
+    logger.info(
+        "Global %s: %d assets, %d train / %d val / %d test windows",
+        cell, len(series), len(train), len(val), len(test),
+    )
+
+    base = Path(models_dir) if models_dir else Path("data/models")
+    model = build_global_rnn(seq_len, len(scaler.assets), cell=cell)
+    train_global_rnn(model, train, val, base / f"global_{cell}_checkpoints", epochs, batch_size)
+
+    preds = predict_windows(model, test)
+    (_, owners), y_true = test.gather(np.arange(len(test)))
+    rows = []
+    for a, i in ids.items():
+        mask = owners == i
+        if mask.any():
+            actual = scaler.inverse(np.full(mask.sum(), i), y_true[mask])
+            pred = scaler.inverse(np.full(mask.sum(), i), preds[mask])
+            rows.append(compute_metrics(actual, pred, model_name=f"Global{cell.upper()}", asset=a))
+    metrics = pd.DataFrame(rows)
+
+    forecast = forecast_all(model, scaler, series, seq_len, forecast_steps)
+    if models_dir is not None:
+        save_keras(model, f"global_{cell}.keras", models_dir)
+        save_sklearn({"scaler": scaler, "seq_len": seq_len}, f"global_{cell}_scaler", models_dir)
+
+    logger.info("Global %s pipeline done for %d assets", cell, len(series))
+    return {"metrics": metrics, "forecast": forecast, "model": model, "scaler": scaler}
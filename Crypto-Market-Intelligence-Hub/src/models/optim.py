@@ -0,0 +1,92 @@
+"""Batched quasi-Newton optimisation shared by the vectorised model fitters.
+
+:mod:`src.models.batch_arima` and :mod:`src.models.garch` evaluate the
+likelihood of many assets in one stacked pass; :func:`batched_bfgs` minimises
+all of those independent problems together, calling the objective once per
+step for the rows that have not converged yet.
+"""
+from __future__ import annotations
+
+import numpy as np
+
+
+def batched_bfgs(
+    objective,
+    x0: np.ndarray,
+    maxiter: int = 200,
+    gtol: float = 1e-6,
+    max_halvings: int = 20,
+) -> tuple[np.ndarray, int, np.ndarray]:
+    """Minimise B independent problems with BFGS, one stacked evaluation per step.
+
+    Each row keeps its own inverse-Hessian approximation and Armijo step
+    length; converged rows drop out so later iterations only filter the
+    series that still move.
+
+    Returns
+    -------
+    x : np.ndarray, shape (B, k)
+        Minimisers.
+    n_iter : int
+        Iterations taken by the slowest row.
+    converged : np.ndarray of bool, shape (B,)
+    """
+    batch, k = x0.shape
+    x = x0.copy()
+    f, g = objective(x, np.arange(batch))
+    H = np.repeat(np.eye(k)[None], batch, axis=0)
+    done = np.abs(g).max(axis=1) < gtol
+
+    n_iter = 0
+    for _ in range(maxiter):
+        n_iter += 1
+        rows = np.flatnonzero(~done)
+        if rows.size == 0:
+            break
+        d = -np.einsum("bij,bj->bi", H[rows], g[rows])
+        slope = np.einsum("bi,bi->b", g[rows], d)
+        # Fall back to steepest descent where H lost positive definiteness.
+        bad = slope >= 0
+        d[bad] = -g[rows][bad]
+        slope[bad] = -np.einsum("bi,bi->b", g[rows][bad], g[rows][bad])
+        H[rows[bad]] = np.eye(k)
+
+        step = np.ones(rows.size)
+        pending = np.arange(rows.size)
+        f_new = np.empty(rows.size)
+        g_new = np.empty((rows.size, k))
+        for _ in range(max_halvings):
+            f_try, g_try = objective(x[rows[pending]] + step[pending, None] * d[pending], rows[pending])
+            ok = np.isfinite(f_try) & (f_try <= f[rows[pending]] + 1e-4 * step[pending] * slope[pending])
+            f_new[pending[ok]] = f_try[ok]
+            g_new[pending[ok]] = g_try[ok]
+            pending = pending[~ok]
+            if pending.size == 0:
+                break
+            step[pending] *= 0.5
+        # Rows whose line search failed cannot make progress: mark converged.
+        stalled = np.zeros(rows.size, dtype=bool)
+        stalled[pending] = True
+        moved = ~stalled
+
+        s_vec = step[moved, None] * d[moved]
+        y_vec = g_new[moved] - g[rows[moved]]
+        sy = np.einsum("bi,bi->b", s_vec, y_vec)
+        idx = rows[moved]
+        x[idx] += s_vec
+        f_change = f[idx] - f_new[moved]
+        f[idx], g[idx] = f_new[moved], g_new[moved]
+
+        upd = sy > 1e-12
+        if upd.any():
+            Hs = H[idx[upd]]
+            rho = 1.0 / sy[upd]
+            eye = np.eye(k)[None]
+            left = eye - rho[:, None, None] * np.einsum("bi,bj->bij", s_vec[upd], y_vec[upd])
+            H[idx[upd]] = left @ Hs @ left.transpose(0, 2, 1) + rho[:, None, None] * np.einsum(
+                "bi,bj->bij", s_vec[upd], s_vec[upd]
+            )
+
+        done[rows[stalled]] = True
+        done[idx] = (np.abs(g[idx]).max(axis=1) < gtol) | (np.abs(f_change) < 1e-12)
+    return x, n_iter, done
@@ -59,6 +59,25 @@ def load_sklearn(name: str, directory: Path | str | None = None) -> Any:
     return obj
 
 
+_HOT: dict[Path, tuple[int, Any]] = {}
+
+
+def load_sklearn_cached(name: str, directory: Path | str | None = None) -> Any:
+    """:func:`load_sklearn`, kept in memory until the file on disk changes.
+
+    Objects loaded in the serving master before it forks are shared
+    copy-on-write by every worker (see ``src/api/serve.py``).
+    """
+    src = (_resolve_dir(directory) / f"{name}.joblib").resolve()
+    if not src.exists():
+        raise FileNotFoundError(f"Model not found: {src}")
+    mtime = src.stat().st_mtime_ns
+    hit = _HOT.get(src)
+    if hit is None or hit[0] != mtime:
+        _HOT[src] = hit = (mtime, load_sklearn(name, directory))
+    return hit[1]
+
+
 def load_keras(name: str, directory: Path | str | None = None) -> Any:
     """Load a saved Keras model."""
     try:
@@ -0,0 +1,491 @@
+"""Drift-triggered retraining scheduler for the crypto model fleet.
+
+Instead of retraining every (asset, model) pair on a timer, the scheduler
+watches two cheap online signals per pair (see :mod:`src.models.drift`):
+
+- live forecast error drifting above the error measured at training time;
+- a Page-Hinkley change point in the asset's standardised log returns
+  (mean shift) or in their absolute value (volatility shift).
+
+Only degraded pairs are queued.  Jobs are ordered by priority and executed
+concurrently under a global CPU-core and memory budget; every cycle writes a
+JSON summary of what was retrained and why.
+
+Usage
+-----
+>>> sched = RetrainScheduler(trainer=my_trainer)
+>>> sched.register("bitcoin", "arima", baseline_mape=2.1, return_scale=0.035)
+>>> sched.observe_forecast("bitcoin", "arima", y_true=64_000, y_pred=61_500)
+>>> sched.observe_returns("bitcoin", [0.012, -0.034])
+>>> summary = sched.run_cycle()
+
+``scripts/retrain_service.py`` runs it as a service: baselines come from the
+forecast ledger (:func:`baseline_mapes`) and the return history
+(:func:`return_scales`). Each cycle feeds newly realised ledger points and
+new daily returns through :meth:`RetrainScheduler.sync_ledger` and
+:meth:`RetrainScheduler.sync_prices` before running.
+"""
+from __future__ import annotations
+
+import heapq
+import json
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Iterable
+
+import numpy as np
+import pandas as pd
+
+from .drift import ErrorTracker, PageHinkley
+
+logger = logging.getLogger(__name__)
+
+# Rough resource footprint of one training run: (CPU cores, memory in MB)
+MODEL_COSTS: dict[str, tuple[int, int]] = {
+    "arima": (1, 300),
+    "prophet": (1, 600),
+    "lstm": (2, 1500),
+    "gru": (2, 1200),
+}
+
+# Extra priority for models that are expensive to leave stale
+MODEL_WEIGHTS: dict[str, float] = {"arima": 1.0, "prophet": 1.0, "lstm": 1.2, "gru": 1.2}
+
+# Baseline for a pair with too few realised ledger points to measure one
+DEFAULT_BASELINE_MAPE = 5.0
+
+
+@dataclass
+class ResourceBudget:
+    """Global limits shared by all concurrently running retraining jobs."""
+
+    cpu_cores: int = 4
+    memory_mb: int = 4096
+
+    def fits(self, job: "RetrainJob") -> bool:
+        return job.cpu_cores <= self.cpu_cores and job.memory_mb <= self.memory_mb
+
+
+@dataclass(order=True)
+class RetrainJob:
+    """One queued retraining run; ordered so the highest priority pops first."""
+
+    sort_key: float = field(init=False, repr=False)
+    priority: float
+    asset: str = field(compare=False)
+    model: str = field(compare=False)
+    reasons: list[str] = field(default_factory=list, compare=False)
+    cpu_cores: int = field(default=1, compare=False)
+    memory_mb: int = field(default=300, compare=False)
+
+    def __post_init__(self) -> None:
+        self.sort_key = -self.priority
+
+
+@dataclass
+class _PairState:
+    error: ErrorTracker
+    retrained_at: str | None = None
+    drift_handled: bool = False   # retrained since the asset's current drift fired
+
+
+@dataclass
+class _AssetState:
+    scale: float
+    mean_shift: PageHinkley
+    vol_shift: PageHinkley
+    drift_reasons: list[str] = field(default_factory=list)
+
+
+class RetrainScheduler:
+    """Queue and run retraining only for series whose forecasts degraded.
+
+    Parameters
+    ----------
+    trainer : Callable[[str, str], dict | None]
+        ``trainer(asset, model)`` retrains and persists one pair.  May return
+        a dict with a new ``"mape"`` baseline (e.g. the ``metrics`` dict of a
+        ``run_*_pipeline`` result).
+    budget : ResourceBudget, optional
+        Global CPU / memory limits for concurrently running jobs.
+    summary_dir : Path | str, optional
+        Where cycle summaries are written (``retrain_<timestamp>.json``).
+        Defaults to ``retrain_logs/`` under the configured models path.
+    error_ratio : float
+        Live/baseline MAPE ratio that counts as degraded.
+    """
+
+    def __init__(
+        self,
+        trainer: Callable[[str, str], dict | None],
+        budget: ResourceBudget | None = None,
+        summary_dir: Path | str | None = None,
+        error_ratio: float = 1.5,
+        drift_delta: float = 0.1,
+        drift_threshold: float = 20.0,
+    ):
+        self.trainer = trainer
+        if budget is None or summary_dir is None:
+            from config.settings import get_settings
+
+            settings = get_settings()
+            budget = budget or ResourceBudget(settings.retrain_cpu_cores, settings.retrain_memory_mb)
+            summary_dir = summary_dir or settings.models_path / "retrain_logs"
+        self.budget = budget
+        self.summary_dir = Path(summary_dir)
+        self.error_ratio = error_ratio
+        self.drift_delta = drift_delta
+        self.drift_threshold = drift_threshold
+        self._pairs: dict[tuple[str, str], _PairState] = {}
+        self._assets: dict[str, _AssetState] = {}
+        self._pending: set[tuple[str, str]] = set()   # runnable pairs not yet retrained this cycle
+        self._seen_forecasts: set[tuple[str, int]] = set()   # (forecast_id, horizon) fed already
+        self._returns_through: dict[str, pd.Timestamp] = {}
+        self._lock = threading.Lock()
+
+    # ── Registration & observation ────────────────────────────────────────────
+
+    @property
+    def pairs(self) -> list[tuple[str, str]]:
+        """Registered (asset, model) pairs."""
+        return list(self._pairs)
+
+    def register(
+        self,
+        asset: str,
+        model: str,
+        baseline_mape: float,
+        return_scale: float | None = None,
+    ) -> None:
+        """Start tracking an (asset, model) pair.
+
+        Parameters
+        ----------
+        baseline_mape : float
+            Hold-out MAPE (%) from the last training run.
+        return_scale : float, optional
+            Standard deviation of the training log returns; new returns are
+            divided by it so drift thresholds are unit-free.
+        """
+        self._pairs[(asset, model)] = _PairState(
+            error=ErrorTracker(baseline_mape=baseline_mape, ratio=self.error_ratio)
+        )
+        if asset not in self._assets:
+            self._assets[asset] = _AssetState(
+                scale=return_scale or 1.0,
+                mean_shift=PageHinkley(delta=self.drift_delta, threshold=self.drift_threshold),
+                vol_shift=PageHinkley(delta=self.drift_delta, threshold=self.drift_threshold),
+            )
+
+    def observe_forecast(self, asset: str, model: str, y_true: float, y_pred: float) -> None:
+        """Record a forecast whose actual value has now been realised."""
+        state = self._pairs.get((asset, model))
+        if state is None:
+            raise KeyError(f"Pair ({asset}, {model}) is not registered.")
+        state.error.update(y_true, y_pred)
+
+    def observe_returns(self, asset: str, returns: Iterable[float]) -> None:
+        """Feed newly arrived log returns for *asset* into the shift detectors."""
+        state = self._assets.get(asset)
+        if state is None:
+            raise KeyError(f"Asset '{asset}' is not registered.")
+        for r in np.asarray(list(returns), dtype=float):
+            if not np.isfinite(r):
+                continue
+            z = r / state.scale
+            if state.mean_shift.update(z) and "return_mean_shift" not in state.drift_reasons:
+                state.drift_reasons.append("return_mean_shift")
+            if state.vol_shift.update(abs(z)) and "volatility_shift" not in state.drift_reasons:
+                state.drift_reasons.append("volatility_shift")
+
+    def sync_ledger(self, realized: pd.DataFrame, observe: bool = True) -> int:
+        """Feed realised ledger points not seen before; return how many were fed.
+
+        *realized* is the ledger's ``realized.parquet`` (``forecast_id``,
+        ``horizon``, ``asset``, ``model``, ``actual``, ``predicted``). Points of
+        unregistered pairs are ignored. With ``observe=False`` the points are
+        only marked as seen, e.g. when they were used to set the baseline.
+        """
+        if realized is None or realized.empty:
+            return 0
+        rows = realized.sort_values("target_date", kind="stable") if "target_date" in realized else realized
+        fed = 0
+        for fid, h, asset, model, y, yhat in zip(
+            rows["forecast_id"], rows["horizon"], rows["asset"], rows["model"],
+            rows["actual"], rows["predicted"],
+        ):
+            key = (fid, int(h))
+            if key in self._seen_forecasts or (asset, model) not in self._pairs:
+                continue
+            self._seen_forecasts.add(key)
+            if observe:
+                self.observe_forecast(asset, model, float(y), float(yhat))
+            fed += 1
+        return fed
+
+    def sync_prices(self, prices: pd.DataFrame, observe: bool = True) -> int:
+        """Feed daily log returns newer than those already seen, per registered asset.
+
+        With ``observe=False`` only the per-asset watermark moves.
+        """
+        fed = 0
+        for asset, grp in prices[prices["asset"].isin(list(self._assets))].groupby("asset"):
+            closes = grp.set_index(pd.to_datetime(grp["date"]))["close"].sort_index()
+            returns = np.log(closes).diff().dropna()
+            since = self._returns_through.get(asset)
+            if since is not None:
+                returns = returns[returns.index > since]
+            if returns.empty:
+                continue
+            if observe:
+                self.observe_returns(asset, returns.to_numpy())
+            self._returns_through[asset] = returns.index[-1]
+            fed += len(returns)
+        return fed
+
+    # ── Planning ──────────────────────────────────────────────────────────────
+
+    def plan(self) -> list[RetrainJob]:
+        """Return the retraining queue in priority order (highest first)."""
+        heap: list[RetrainJob] = []
+        for (asset, model), pair in self._pairs.items():
+            reasons: list[str] = []
+            priority = 0.0
+            if pair.error.degraded:
+                reasons.append(
+                    f"forecast_error: live MAPE {pair.error.ewma:.2f}% vs "
+                    f"baseline {pair.error.baseline_mape:.2f}%"
+                )
+                priority += pair.error.degradation
+            drift = self._assets[asset].drift_reasons
+            if drift and not pair.drift_handled:
+                reasons.extend(drift)
+                priority += 1.0
+            if not reasons:
+                continue
+            cpu, mem = MODEL_COSTS.get(model, (1, 500))
+            heapq.heappush(heap, RetrainJob(
+                priority=round(priority * MODEL_WEIGHTS.get(model, 1.0), 4),
+                asset=asset, model=model, reasons=reasons, cpu_cores=cpu, memory_mb=mem,
+            ))
+        return [heapq.heappop(heap) for _ in range(len(heap))]
+
+    # ── Execution ─────────────────────────────────────────────────────────────
+
+    def run_cycle(self, max_jobs: int | None = None) -> dict[str, Any]:
+        """Plan, run the queue under the resource budget and write a summary.
+
+        Jobs start in priority order whenever enough CPU and memory remain;
+        a job larger than the whole budget is skipped.
+
+        Returns
+        -------
+        dict
+            Summary with keys: started_at, finished_at, budget, retrained,
+            failed, skipped, tracked_pairs.
+        """
+        started = datetime.now(timezone.utc)
+        queue = self.plan()
+        if max_jobs is not None:
+            queue, deferred = queue[:max_jobs], queue[max_jobs:]
+        else:
+            deferred = []
+        with self._lock:
+            self._pending = {(j.asset, j.model) for j in queue + deferred if self.budget.fits(j)}
+
+        skipped = [
+            {**_job_info(j), "why_skipped": "exceeds global budget"}
+            for j in queue if not self.budget.fits(j)
+        ]
+        skipped += [{**_job_info(j), "why_skipped": "max_jobs reached"} for j in deferred]
+        runnable = [j for j in queue if self.budget.fits(j)]
+
+        retrained: list[dict] = []
+        failed: list[dict] = []
+        free = {"cpu": self.budget.cpu_cores, "mem": self.budget.memory_mb}
+        cond = threading.Condition()
+
+        def _run(job: RetrainJob) -> None:
+            t0 = time.perf_counter()
+            try:
+                out = self.trainer(job.asset, job.model)
+                self._on_success(job, out)
+                retrained.append({**_job_info(job), "seconds": round(time.perf_counter() - t0, 3)})
+            except Exception as exc:  # noqa: BLE001
+                logger.exception("Retraining %s/%s failed", job.asset, job.model)
+                failed.append({**_job_info(job), "error": str(exc)})
+            finally:
+                with cond:
+                    free["cpu"] += job.cpu_cores
+                    free["mem"] += job.memory_mb
+                    cond.notify_all()
+
+        with ThreadPoolExecutor(max_workers=max(1, self.budget.cpu_cores)) as pool:
+            for job in runnable:
+                with cond:
+                    cond.wait_for(
+                        lambda j=job: free["cpu"] >= j.cpu_cores and free["mem"] >= j.memory_mb
+                    )
+                    free["cpu"] -= job.cpu_cores
+                    free["mem"] -= job.memory_mb
+                pool.submit(_run, job)
+
+        summary = {
+            "started_at": started.isoformat(),
+            "finished_at": datetime.now(timezone.utc).isoformat(),
+            "budget": asdict(self.budget),
+            "retrained": retrained,
+            "failed": failed,
+            "skipped": skipped,
+            "tracked_pairs": len(self._pairs),
+        }
+        self._write_summary(summary, started)
+        logger.info(
+            "Retrain cycle: %d retrained, %d failed, %d skipped, %d pairs healthy",
+            len(retrained), len(failed), len(skipped),
+            len(self._pairs) - len(queue) - len(deferred),
+        )
+        return summary
+
+    def _on_success(self, job: RetrainJob, out: dict | None) -> None:
+        """Reset detectors for a freshly retrained pair.
+
+        Return drift is per asset, so its detectors are reset only once no
+        other pair of the asset is still pending (deferred by ``max_jobs`` or
+        failed). Until then pairs already retrained are marked as handled so
+        the remaining drift does not queue them again.
+        """
+        new_baseline = None
+        if isinstance(out, dict):
+            metrics = out.get("metrics", out)
+            if isinstance(metrics, dict) and "mape" in metrics:
+                new_baseline = float(metrics["mape"])
+        with self._lock:
+            pair = self._pairs[(job.asset, job.model)]
+            pair.error.reset(new_baseline)
+            pair.retrained_at = datetime.now(timezone.utc).isoformat()
+            self._pending.discard((job.asset, job.model))
+            asset = self._assets[job.asset]
+            if asset.drift_reasons:
+                pair.drift_handled = True
+            if any(a == job.asset for a, _ in self._pending):
+                return
+            asset.mean_shift.reset()
+            asset.vol_shift.reset()
+            asset.drift_reasons = []
+            for (a, _), other in self._pairs.items():
+                if a == job.asset:
+                    other.drift_handled = False
+
+    def serve(self, interval_seconds: float, stop: threading.Event | None = None) -> None:
+        """Run :meth:`run_cycle` every *interval_seconds* until *stop* is set."""
+        stop = stop or threading.Event()
+        while not stop.is_set():
+            self.run_cycle()
+            stop.wait(interval_seconds)
+
+    # ── Persistence ───────────────────────────────────────────────────────────
+
+    def save_state(self, path: Path | str) -> Path:
+        """Persist detector state so tracking survives restarts."""
+        import joblib
+
+        dest = Path(path)
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        joblib.dump({
+            "pairs": self._pairs,
+            "assets": self._assets,
+            "seen_forecasts": self._seen_forecasts,
+            "returns_through": self._returns_through,
+        }, dest)
+        return dest
+
+    def load_state(self, path: Path | str) -> None:
+        """Restore detector state written by :meth:`save_state`."""
+        import joblib
+
+        state = joblib.load(Path(path))
+        self._pairs, self._assets = state["pairs"], state["assets"]
+        self._seen_forecasts = state.get("seen_forecasts", set())
+        self._returns_through = state.get("returns_through", {})
+
+    def _write_summary(self, summary: dict, started: datetime) -> Path:
+        self.summary_dir.mkdir(parents=True, exist_ok=True)
+        dest = self.summary_dir / f"retrain_{started:%Y%m%dT%H%M%S}.json"
+        dest.write_text(json.dumps(summary, indent=2))
+        logger.info("Retrain summary written -> %s", dest)
+        return dest
+
+
+def _job_info(job: RetrainJob) -> dict:
+    return {
+        "asset": job.asset,
+        "model": job.model,
+        "priority": job.priority,
+        "reasons": job.reasons,
+        "cpu_cores": job.cpu_cores,
+        "memory_mb": job.memory_mb,
+    }
+
+
+def baseline_mapes(realized: pd.DataFrame, min_points: int = 10) -> dict[tuple[str, str], float]:
+    """MAPE (%) per (asset, model) over realised ledger points, for pairs with enough of them."""
+    if realized is None or realized.empty:
+        return {}
+    ape = (realized["actual"] - realized["predicted"]).abs() / (realized["actual"].abs() + 1e-8) * 100
+    grouped = ape.groupby([realized["asset"], realized["model"]])
+    stats = pd.DataFrame({"mape": grouped.mean(), "n": grouped.size()})
+    stats = stats[stats["n"] >= min_points]
+    return {key: float(v) for key, v in stats["mape"].items()}
+
+
+def return_scales(prices: pd.DataFrame, window: int = 365) -> dict[str, float]:
+    """Standard deviation of each asset's daily log returns over the last *window* days."""
+    out = {}
+    for asset, grp in prices.groupby("asset"):
+        closes = grp.sort_values("date")["close"]
+        r = np.log(closes).diff().dropna().tail(window)
+        if len(r) > 1 and r.std() > 0:
+            out[asset] = float(r.std())
+    return out
+
+
+def pipeline_trainer(df, models_dir: Path | str | None = None) -> Callable[[str, str], dict]:
+    """Build a trainer that reruns the model's ``run_*_pipeline`` and saves it.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Long-format OHLCV frame with the latest data.
+    models_dir : Path | str, optional
+        Registry directory (defaults to :data:`src.models.registry.REGISTRY_DIR_DEFAULT`).
+    """
+    from .registry import save_keras, save_sklearn
+
+    def _train(asset: str, model: str) -> dict:
+        if model == "arima":
+            from .arima_model import run_arima_pipeline
+            result = run_arima_pipeline(df, asset)
+            save_sklearn(result["model"], f"{asset}_arima", models_dir)
+        elif model == "prophet":
+            from .prophet_model import run_prophet_pipeline
+            result = run_prophet_pipeline(df, asset)
+            save_sklearn(result["model"], f"{asset}_prophet", models_dir)
+        elif model in ("lstm", "gru"):
+            if model == "lstm":
+                from .lstm_model import run_lstm_pipeline as run
+            else:
+                from .gru_model import run_gru_pipeline as run
+            result = run(df, asset)
+            save_keras(result["model"], f"{asset}_{model}", models_dir)
+            save_sklearn(result["scaler"], f"{asset}_{model}_scaler", models_dir)
+        else:
+            raise ValueError(f"Unknown model: {model}")
+        return result["metrics"]
+
+    return _train
@@ -0,0 +1,324 @@
+"""Portfolio risk: shrunk covariance and Monte-Carlo VaR / CVaR / drawdown.
+
+Correlated daily return paths are simulated in chunks sized to a fixed memory
+budget, so peak memory does not grow with ``n_paths``. Two engines are
+available:
+
+- ``"portfolio"`` (default) — approximates every portfolio's daily log
+  return as Gaussian, with mean ``w'μ`` plus the rebalancing
+  (diversification) correction ``½(w'diag Σ − w'Σw)`` and variance
+  ``w'Σw``. This is a second-order expansion of the log of a weighted sum
+  of log-normal returns: exact for a single asset, increasingly off for
+  large daily moves or leverage. Only ``K`` correlated draws per day are
+  needed for ``K`` weight vectors, which keeps 100k × 30-day paths well
+  under a second.
+- ``"asset"`` — simulates every asset and compounds the daily-rebalanced
+  simple returns exactly. Costs ``N / K`` times more random draws. With
+  leverage or shorts a day can lose more than 100 %; such paths are ruined
+  (terminal return and drawdown −100 %) and counted in
+  ``SimulationResult.meta["ruined_paths"]``.
+"""
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Mapping
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+_BYTES_PER_CELL = 8 * 3  # float64 draws + cumulative path + running max
+
+
+# ── Returns & covariance ─────────────────────────────────────────────────────
+
+def returns_matrix(
+    df: pd.DataFrame,
+    assets: list[str] | None = None,
+    value_col: str = "log_return",
+    lookback: int | None = 365,
+    min_coverage: float = 0.9,
+) -> pd.DataFrame:
+    """Pivot long-format returns to a complete (date × asset) matrix.
+
+    Assets observed on fewer than ``min_coverage`` of the dates in the
+    lookback window are dropped (with a warning); remaining rows with any
+    gap are removed so the covariance is estimated on a common sample.
+    """
+    wide = df.pivot_table(index="date", columns="asset", values=value_col).sort_index()
+    if assets is not None:
+        missing = sorted(set(assets) - set(wide.columns))
+        if missing:
+            raise KeyError(f"No returns for assets: {missing}")
+        wide = wide[list(assets)]
+    if lookback is not None:
+        wide = wide.tail(lookback)
+
+    coverage = wide.notna().mean()
+    sparse = coverage.index[coverage < min_coverage].tolist()
+    if sparse:
+        if assets is not None:
+            raise ValueError(f"Insufficient history in lookback window for: {sparse}")
+        logger.warning("Dropping %d assets with < %.0f%% coverage", len(sparse), min_coverage * 100)
+        wide = wide.drop(columns=sparse)
+    return wide.dropna()
+
+
+def load_returns(
+    processed_dir: Path | str,
+    assets: list[str],
+    lookback: int | None = 365,
+    value_col: str = "log_return",
+) -> pd.DataFrame:
+    """Read only the return column for *assets* from the processed store."""
+    from src.data.shared_store import current
+
+    base = Path(processed_dir)
+    shared = current(base)
+    frames = []
+    for asset in assets:
+        if shared is not None and asset in shared and value_col in shared.columns:
+            frames.append(shared.frame(asset, [value_col]))
+            continue
+        path = base / f"{asset}.parquet"
+        if not path.exists():
+            raise FileNotFoundError(f"Asset '{asset}' not found in {base}")
+        part = pd.read_parquet(path, columns=["date", value_col])
+        part["asset"] = asset
+        frames.append(part)
+    return returns_matrix(pd.concat(frames, ignore_index=True), assets, value_col, lookback)
+
+
+def ledoit_wolf_shrinkage(returns: np.ndarray) -> float:
+    """Optimal Ledoit-Wolf intensity towards the scaled identity ``μI``."""
+    x = returns - returns.mean(axis=0)
+    n, p = x.shape
+    x2 = x**2
+    var_trace = x2.sum(axis=0) / n
+    mu = var_trace.sum() / p
+    delta_ = np.sum((x.T @ x) ** 2) / n**2
+    beta_ = np.sum(x2.T @ x2)
+    beta = (beta_ / n - delta_) / (p * n)
+    delta = (delta_ - 2 * mu * var_trace.sum() + p * mu**2) / p
+    beta = min(beta, delta)
+    return 0.0 if beta == 0 else float(beta / delta)
+
+
+def estimate_covariance(
+    returns: pd.DataFrame | np.ndarray,
+    shrinkage: str | float | None = "ledoit_wolf",
+) -> np.ndarray:
+    """Covariance of daily returns, optionally shrunk towards ``μI``.
+
+    Parameters
+    ----------
+    returns : pd.DataFrame | np.ndarray
+        (T, N) matrix of daily returns without gaps.
+    shrinkage : str | float | None
+        ``"ledoit_wolf"`` for the analytical optimum, a float in [0, 1] for a
+        fixed intensity, or None for the (biased) sample covariance.
+    """
+    x = np.asarray(returns, dtype=float)
+    if x.shape[0] < 2:
+        raise ValueError("Need at least two observations to estimate covariance")
+    centred = x - x.mean(axis=0)
+    cov = centred.T @ centred / x.shape[0]
+    if shrinkage is None:
+        return cov
+    if shrinkage == "ledoit_wolf":
+        intensity = ledoit_wolf_shrinkage(x)
+    elif isinstance(shrinkage, (int, float)) and 0 <= shrinkage <= 1:
+        intensity = float(shrinkage)
+    else:
+        raise ValueError(f"Invalid shrinkage: {shrinkage!r}")
+    target = np.trace(cov) / cov.shape[0] * np.eye(cov.shape[0])
+    return (1 - intensity) * cov + intensity * target
+
+
+# ── Simulation ───────────────────────────────────────────────────────────────
+
+@dataclass
+class SimulationResult:
+    """Per-path outcomes of a Monte-Carlo run for ``K`` portfolios."""
+
+    horizon: int
+    portfolios: list[str]
+    terminal_returns: np.ndarray  # (n_paths, K) simple return over the horizon
+    max_drawdowns: np.ndarray  # (n_paths, K) worst peak-to-trough loss, ≤ 0
+    meta: dict = field(default_factory=dict)
+
+    def report(self, alphas: tuple[float, ...] = (0.95, 0.99)) -> pd.DataFrame:
+        """VaR / CVaR and drawdown quantiles per portfolio (losses positive)."""
+        rows = []
+        for k, name in enumerate(self.portfolios):
+            ret = self.terminal_returns[:, k]
+            dd = self.max_drawdowns[:, k]
+            row = {
+                "portfolio": name,
+                "horizon": self.horizon,
+                "expected_return": float(ret.mean()),
+                "volatility": float(ret.std()),
+                "prob_loss": float((ret < 0).mean()),
+                "median_max_drawdown": float(np.median(dd)),
+            }
+            for alpha in alphas:
+                q = np.quantile(ret, 1 - alpha)
+                tag = f"{alpha * 100:g}"
+                row[f"var_{tag}"] = float(-q)
+                row[f"cvar_{tag}"] = float(-ret[ret <= q].mean())
+                row[f"max_drawdown_{tag}"] = float(-np.quantile(dd, 1 - alpha))
+            rows.append(row)
+        return pd.DataFrame(rows)
+
+
+def _weight_matrix(
+    weights: Mapping[str, float] | np.ndarray | pd.DataFrame,
+    assets: list[str],
+) -> tuple[np.ndarray, list[str]]:
+    """Normalise *weights* to a (K, N) array aligned with *assets*."""
+    if isinstance(weights, pd.DataFrame):
+        w = weights.reindex(columns=assets, fill_value=0.0)
+        return w.to_numpy(dtype=float), [str(i) for i in w.index]
+    if isinstance(weights, Mapping):
+        unknown = sorted(set(weights) - set(assets))
+        if unknown:
+            raise KeyError(f"Weights given for unknown assets: {unknown}")
+        return np.array([[weights.get(a, 0.0) for a in assets]], dtype=float), ["portfolio"]
+    w = np.atleast_2d(np.asarray(weights, dtype=float))
+    if w.shape[1] != len(assets):
+        raise ValueError(f"Weights have {w.shape[1]} columns; expected {len(assets)}")
+    return w, [f"portfolio_{k}" for k in range(w.shape[0])]
+
+
+def _chunk_size(n_paths: int, cells_per_path: int, memory_mb: float, chunk_size: int | None) -> int:
+    if chunk_size is None:
+        chunk_size = int(memory_mb * 2**20 // (cells_per_path * _BYTES_PER_CELL))
+    return int(np.clip(chunk_size, 1, n_paths))
+
+
+def _path_stats(log_paths: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Terminal simple return and max drawdown from (c, H, K) daily log returns."""
+    np.cumsum(log_paths, axis=1, out=log_paths)
+    peak = np.maximum.accumulate(np.maximum(log_paths, 0.0), axis=1)
+    # Drawdown in log space, converted once per path
+    worst = (log_paths - peak).min(axis=1)
+    return np.expm1(log_paths[:, -1]), np.expm1(worst)
+
+
+def simulate_portfolio(
+    mu: np.ndarray,
+    cov: np.ndarray,
+    weights: Mapping[str, float] | np.ndarray | pd.DataFrame,
+    assets: list[str],
+    horizon: int = 30,
+    n_paths: int = 100_000,
+    method: str = "portfolio",
+    memory_mb: float = 256.0,
+    chunk_size: int | None = None,
+    seed: int | None = None,
+) -> SimulationResult:
+    """Simulate correlated daily return paths for one or more weight vectors.
+
+    Parameters
+    ----------
+    mu : np.ndarray
+        (N,) mean daily log return per asset.
+    cov : np.ndarray
+        (N, N) covariance of daily log returns.
+    weights : mapping | array | DataFrame
+        ``{asset: weight}``, a (K, N) array aligned with *assets*, or a
+        DataFrame with one row per portfolio. Weights are used as given
+        (no normalisation), so leverage and shorts are allowed.
+    assets : list[str]
+        Asset order of *mu* and *cov*.
+    horizon : int
+        Days per path.
+    n_paths : int
+        Number of simulated paths.
+    method : str
+        ``"portfolio"`` or ``"asset"`` (see module docstring).
+    memory_mb : float
+        Budget for the per-chunk working arrays; sets the chunk size unless
+        *chunk_size* is given explicitly.
+    chunk_size : int | None
+        Paths per chunk.
+    seed : int | None
+        Seed for reproducible draws.
+    """
+    w, names = _weight_matrix(weights, assets)
+    mu = np.asarray(mu, dtype=float)
+    cov = np.asarray(cov, dtype=float)
+    k = w.shape[0]
+    rng = np.random.default_rng(seed)
+
+    if method == "portfolio":
+        p_cov = w @ cov @ w.T
+        p_mu = w @ mu + 0.5 * (w @ np.diag(cov) - np.diag(p_cov))
+        chol = np.linalg.cholesky(p_cov + 1e-12 * np.eye(k))
+        width = k
+    elif method == "asset":
+        chol = np.linalg.cholesky(cov + 1e-12 * np.eye(len(mu)))
+        width = len(mu)
+    else:
+        raise ValueError(f"Unknown method '{method}'. Use 'portfolio' or 'asset'.")
+
+    size = _chunk_size(n_paths, horizon * width, memory_mb, chunk_size)
+    terminal = np.empty((n_paths, k))
+    drawdown = np.empty((n_paths, k))
+    ruined = np.zeros(k, dtype=int)
+    for lo in range(0, n_paths, size):
+        c = min(size, n_paths - lo)
+        draws = rng.standard_normal((c * horizon, width)) @ chol.T
+        if method == "portfolio":
+            draws += p_mu
+            log_paths = draws.reshape(c, horizon, k)
+        else:
+            draws += mu
+            np.expm1(draws, out=draws)
+            simple = (draws @ w.T).reshape(c, horizon, k)
+            wiped = simple <= -1.0
+            if wiped.any():
+                ruined += wiped.any(axis=1).sum(axis=0)
+                np.maximum(simple, -1.0, out=simple)
+            with np.errstate(divide="ignore"):      # log1p(-1) = -inf: wealth stays at zero
+                log_paths = np.log1p(simple)
+        terminal[lo:lo + c], drawdown[lo:lo + c] = _path_stats(log_paths)
+
+    logger.debug("Simulated %d paths x %d days in chunks of %d (%s)", n_paths, horizon, size, method)
+    if ruined.any():
+        logger.warning("Ruined paths (a day below -100%%) per portfolio: %s", dict(zip(names, ruined.tolist())))
+    return SimulationResult(
+        horizon=horizon,
+        portfolios=names,
+        terminal_returns=terminal,
+        max_drawdowns=drawdown,
+        meta={"method": method, "chunk_size": size, "n_paths": n_paths, "ruined_paths": ruined.tolist()},
+    )
+
+
+def portfolio_risk(
+    returns: pd.DataFrame,
+    weights: Mapping[str, float] | np.ndarray | pd.DataFrame,
+    horizon: int = 30,
+    n_paths: int = 100_000,
+    alphas: tuple[float, ...] = (0.95, 0.99),
+    shrinkage: str | float | None = "ledoit_wolf",
+    zero_mean: bool = False,
+    **sim_kwargs,
+) -> pd.DataFrame:
+    """End-to-end risk report from a (date × asset) log-return matrix.
+
+    Returns
+    -------
+    pd.DataFrame
+        One row per portfolio: expected return, volatility, probability of
+        loss, VaR / CVaR and drawdown quantiles at each level in *alphas*.
+    """
+    assets = list(returns.columns)
+    cov = estimate_covariance(returns, shrinkage)
+    mu = np.zeros(len(assets)) if zero_mean else returns.mean().to_numpy()
+    result = simulate_portfolio(mu, cov, weights, assets, horizon, n_paths, **sim_kwargs)
+    return result.report(alphas)
@@ -0,0 +1,272 @@
+"""Pattern similarity search over z-normalised close prices (MASS).
+
+Every asset's close series is one row of a padded (A, L) matrix whose FFTs
+are computed once. A query is z-normalised, transformed once, and its sliding
+dot product with every window of every asset comes from a single batched
+inverse FFT (Mueen's Algorithm for Similarity Search). The z-normalised
+Euclidean distance of a window with mean ``μ`` and std ``σ`` is then::
+
+    d = sqrt(2 m (1 - q·t / (m σ)))
+
+for a zero-mean, unit-variance query ``q`` of length ``m``. Rolling window
+standard deviations are cached per window length.
+
+New bars only touch the row of the asset they belong to: :meth:`update`
+recomputes that row's FFT and its cached window statistics. The matrix is only
+rebuilt when a series outgrows the padded FFT length.
+"""
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+MAX_WINDOW = 365
+_HEADROOM = 256  # bars a series may grow before the FFT length is rebuilt
+
+
+@dataclass
+class Match:
+    """One window similar to the query."""
+
+    asset: str
+    start: pd.Timestamp
+    end: pd.Timestamp
+    distance: float
+    correlation: float
+
+
+class SimilarityIndex:
+    """FFT index of many close series for z-normalised nearest-window search.
+
+    Parameters
+    ----------
+    series : dict[str, pd.Series]
+        Close prices per asset, indexed by date.
+    max_window : int
+        Longest query the index must support without rebuilding.
+    """
+
+    def __init__(self, series: dict[str, pd.Series], max_window: int = MAX_WINDOW) -> None:
+        self.max_window = max_window
+        self.assets: list[str] = []
+        self.dates: list[pd.DatetimeIndex] = []
+        self.lengths = np.zeros(0, dtype=int)
+        self._build({a: s for a, s in sorted(series.items())})
+
+    # ── Construction ─────────────────────────────────────────────────────────
+
+    @classmethod
+    def from_store(cls, processed_dir: Path | str, max_window: int = MAX_WINDOW) -> SimilarityIndex:
+        """Build from the per-asset Parquet files of the processed store.
+
+        Uses the memory-mapped snapshot instead when one of this store is installed.
+        """
+        from src.data.shared_store import current
+
+        shared = current(processed_dir)
+        if shared is not None and "close" in shared.columns:
+            series = {
+                a: pd.Series(shared.column(a, "close"), index=pd.DatetimeIndex(shared.column(a, "date")))
+                for a in shared.assets
+            }
+            return cls(series, max_window)
+        series = {
+            path.stem: _read_close(path)
+            for path in sorted(Path(processed_dir).glob("*.parquet"))
+            if path.stem != "all_assets"
+        }
+        return cls(series, max_window)
+
+    def _build(self, series: dict[str, pd.Series]) -> None:
+        from scipy.fft import next_fast_len
+
+        cleaned = {a: _clean(s) for a, s in series.items()}
+        self.assets = list(cleaned)
+        self._row = {a: i for i, a in enumerate(self.assets)}
+        self.dates = [s.index for s in cleaned.values()]
+        self.lengths = np.array([len(s) for s in cleaned.values()], dtype=int)
+        longest = int(self.lengths.max()) if len(self.lengths) else 0
+        self._nfft = next_fast_len(longest + _HEADROOM + self.max_window)
+        self._values = np.zeros((len(self.assets), longest + _HEADROOM))
+        self._spectra = np.zeros((len(self.assets), self._nfft // 2 + 1), dtype=complex)
+        for i, s in enumerate(cleaned.values()):
+            self._set_row(i, s.to_numpy())
+        self._sigma: dict[int, np.ndarray] = {}
+        logger.info("Similarity index built: %d assets, FFT length %d", len(self.assets), self._nfft)
+
+    def _set_row(self, i: int, values: np.ndarray) -> None:
+        # Scaling a whole series by a constant leaves z-normalised distances
+        # unchanged and keeps every row on a comparable numeric scale.
+        scaled = values / np.mean(values) if len(values) else values
+        self._values[i] = 0.0
+        self._values[i, :len(scaled)] = scaled
+        self._spectra[i] = np.fft.rfft(self._values[i], self._nfft)
+
+    def update(self, asset: str, close: pd.Series) -> None:
+        """Replace or add *asset*'s series (e.g. after new bars were appended)."""
+        close = _clean(close)
+        if asset not in self._row or len(close) > self._values.shape[1]:
+            series = dict(zip(self.assets, (self.series(a) for a in self.assets)))
+            series[asset] = close
+            self._build(dict(sorted(series.items())))
+            return
+        i = self._row[asset]
+        self.dates[i] = close.index
+        self.lengths[i] = len(close)
+        self._set_row(i, close.to_numpy())
+        for m, sigma in self._sigma.items():
+            sigma[i] = _rolling_std(self._values[i, :len(close)], m, sigma.shape[1])
+
+    def copy(self) -> SimilarityIndex:
+        """Independent copy whose :meth:`update` leaves this index untouched."""
+        other = object.__new__(SimilarityIndex)
+        other.__dict__.update(self.__dict__)
+        other.assets = list(self.assets)
+        other._row = dict(self._row)
+        other.dates = list(self.dates)
+        other.lengths = self.lengths.copy()
+        other._values = self._values.copy()
+        other._spectra = self._spectra.copy()
+        other._sigma = {m: s.copy() for m, s in self._sigma.items()}
+        return other
+
+    def series(self, asset: str) -> pd.Series:
+        """Stored close series of *asset* (on the index's internal scale)."""
+        i = self._row[asset]
+        return pd.Series(self._values[i, :self.lengths[i]], index=self.dates[i])
+
+    # ── Search ───────────────────────────────────────────────────────────────
+
+    def _window_std(self, m: int) -> np.ndarray:
+        if m not in self._sigma:
+            n_windows = self._values.shape[1] - m + 1
+            self._sigma[m] = np.vstack([
+                _rolling_std(self._values[i, :n], m, n_windows) for i, n in enumerate(self.lengths)
+            ]) if len(self.lengths) else np.empty((0, n_windows))
+        return self._sigma[m]
+
+    def distance_profile(self, query: np.ndarray) -> np.ndarray:
+        """(A, W) z-normalised distance of *query* to every window (inf if invalid)."""
+        query = np.asarray(query, dtype=float)
+        m = len(query)
+        if not 3 <= m <= self.max_window:
+            raise ValueError(f"Query length must be between 3 and {self.max_window}; got {m}")
+        std = query.std()
+        if not np.isfinite(std) or std == 0:
+            raise ValueError("Query is constant or contains NaNs; cannot z-normalise")
+        q = (query - query.mean()) / std
+
+        q_spec = np.fft.rfft(q[::-1], self._nfft)
+        dots = np.fft.irfft(self._spectra * q_spec, self._nfft)[:, m - 1:self._values.shape[1]]
+        sigma = self._window_std(m)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            corr = np.clip(dots / (m * sigma), -1.0, 1.0)
+        dist = np.sqrt(2 * m * (1 - corr))
+        return np.where(np.isfinite(dist), dist, np.inf)
+
+    def search(
+        self,
+        query: np.ndarray,
+        k: int = 10,
+        exclude: tuple[str, int, int] | None = None,
+    ) -> list[Match]:
+        """Top-*k* windows most similar to *query* across all assets.
+
+        Windows overlapping an earlier match on the same asset by more than
+        half the query length are skipped, so results are not shifted copies
+        of one another. ``exclude=(asset, start, stop)`` additionally removes
+        windows overlapping positions ``[start, stop)`` of that asset (use it
+        to drop the query's own location).
+        """
+        m = len(query)
+        dist = self.distance_profile(query)
+        zone = max(m // 2, 1)
+        if exclude is not None and exclude[0] in self._row:
+            i = self._row[exclude[0]]
+            dist[i, max(exclude[1] - m + 1, 0):exclude[2]] = np.inf
+
+        matches: list[Match] = []
+        while len(matches) < k:
+            flat = int(np.argmin(dist))
+            i, j = divmod(flat, dist.shape[1])
+            d = float(dist[i, j])
+            if not np.isfinite(d):
+                break
+            dates = self.dates[i]
+            matches.append(Match(
+                asset=self.assets[i],
+                start=dates[j],
+                end=dates[j + m - 1],
+                distance=d,
+                correlation=1 - d * d / (2 * m),
+            ))
+            dist[i, max(j - zone + 1, 0):j + zone] = np.inf
+        return matches
+
+    def similar_to_recent(self, asset: str, window: int = 30, k: int = 10) -> tuple[pd.Series, list[Match]]:
+        """Top-*k* matches for the last *window* bars of *asset*, excluding itself."""
+        if asset not in self._row:
+            raise KeyError(f"Asset '{asset}' is not in the similarity index")
+        n = int(self.lengths[self._row[asset]])
+        if n < window:
+            raise ValueError(f"'{asset}' has only {n} bars; window is {window}")
+        recent = self.series(asset).iloc[-window:]
+        return recent, self.search(recent.to_numpy(), k, exclude=(asset, n - window, n))
+
+
+# ── Helpers ──────────────────────────────────────────────────────────────────
+
+def refresh_from_store(
+    index: SimilarityIndex, processed_dir: Path | str, since: float,
+) -> tuple[SimilarityIndex, float]:
+    """Apply every asset file modified after *since* (a ``st_mtime``).
+
+    *index* itself is never modified: when a file changed, a copy is updated
+    and returned, so concurrent searches on *index* stay consistent.
+
+    Returns
+    -------
+    tuple[SimilarityIndex, float]
+        The up-to-date index and the newest modification time seen, to pass
+        as *since* next time.
+    """
+    changed = [
+        (path, mtime)
+        for path in sorted(Path(processed_dir).glob("*.parquet"))
+        if path.stem != "all_assets" and (mtime := path.stat().st_mtime) > since
+    ]
+    if not changed:
+        return index, since
+    index = index.copy()
+    for path, _ in changed:
+        index.update(path.stem, _read_close(path))
+    return index, max(since, *(m for _, m in changed))
+
+
+def _read_close(path: Path) -> pd.Series:
+    frame = pd.read_parquet(path, columns=["date", "close"])
+    return frame.set_index("date")["close"]
+
+
+def _clean(close: pd.Series) -> pd.Series:
+    close = close.sort_index()
+    close = close[~close.index.duplicated(keep="last")].ffill().dropna()
+    return close[close > 0].astype(float)
+
+
+def _rolling_std(values: np.ndarray, m: int, n_windows: int) -> np.ndarray:
+    """Population std of every length-*m* window, NaN-padded to *n_windows*."""
+    sigma = np.full(n_windows, np.nan)
+    if len(values) >= m:
+        roll = pd.Series(values).rolling(m)
+        sd = roll.std(ddof=0).to_numpy()[m - 1:]
+        mean = roll.mean().to_numpy()[m - 1:]
+        # Flat windows have no shape to compare
+        sigma[:len(sd)] = np.where(sd > 1e-9 * mean, sd, np.nan)
+    return sigma
@@ -0,0 +1,154 @@
+"""Unit tests for src.api.admission and its use in /predict."""
+import asyncio
+import time
+
+import httpx
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+from src.api.admission import AdmissionController, AdmissionRejected, CostModel, PredictionCache
+from src.api.dependencies import (
+    get_admission_controller, get_data_path, get_forecast_ledger, get_prediction_cache,
+)
+from src.api.main import app
+from src.api.routers import predictions
+from src.api.schemas import ForecastPoint
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class NullLedger:
+    def record(self, **kwargs) -> None:
+        pass
+
+
+def test_client_budget_queues_then_rejects():
+    clock = FakeClock()
+    ctl = AdmissionController(
+        global_rate=2.0, global_burst=240, client_rate=0.5, client_burst=120,
+        max_queue_seconds=30, clock=clock,
+    )
+    assert ctl.reserve("a", "lstm") == 0 and ctl.reserve("a", "lstm") == 0
+    with pytest.raises(AdmissionRejected) as exc:
+        ctl.reserve("a", "lstm")
+    # 60 CPU-s short at 0.5/s is 120 s; queueing is allowed once 30 s remain
+    assert exc.value.retry_after == pytest.approx(90)
+    assert ctl.reserve("b", "arima") == 0  # other clients keep their own budget
+
+    clock.now = 100.0
+    assert ctl.reserve("a", "lstm") == pytest.approx(20)
+    assert (ctl.stats.admitted, ctl.stats.queued, ctl.stats.rejected) == (4, 1, 1)
+
+
+def test_background_work_is_charged_to_the_client():
+    clock = FakeClock()
+    ctl = AdmissionController(client_rate=0.5, client_burst=120, max_queue_seconds=30, clock=clock)
+    ctl.charge("a", 100.0)
+    with pytest.raises(AdmissionRejected):
+        ctl.reserve("a", "lstm")                # 20 CPU-s left, 60 needed
+    assert ctl.reserve("b", "lstm") == 0
+
+
+def test_client_identity_ignores_unknown_keys():
+    ctl = AdmissionController(api_keys=["s3cret"])
+    assert ctl.identify("s3cret", "10.0.0.1") == ctl.identify("s3cret", "10.0.0.2")
+    assert ctl.identify("s3cret", "10.0.0.1").startswith("key:")
+    # Rotating made-up keys does not buy new budgets
+    assert ctl.identify("made-up-1", "10.0.0.1") == ctl.identify("made-up-2", "10.0.0.1") == "ip:10.0.0.1"
+
+
+async def test_tokens_refunded_when_no_slot_frees_up():
+    clock = FakeClock()
+    ctl = AdmissionController(client_rate=0.5, client_burst=120, max_concurrent=1, clock=clock)
+    ctl._slots.acquire()  # the only fit slot is busy
+    with pytest.raises(AdmissionRejected, match="busy"):
+        async with ctl.admit("a", "lstm") as remaining:
+            await ctl.run("lstm", lambda: None, slot_timeout=min(remaining, 0.01))
+    ctl._slots.release()
+    assert ctl._client("a").tokens == pytest.approx(120)
+    assert ctl.stats.admitted == 0 and ctl.stats.rejected == 1
+
+
+async def test_tokens_refunded_when_client_leaves_the_queue():
+    clock = FakeClock()
+    ctl = AdmissionController(client_rate=0.5, client_burst=120, max_queue_seconds=30, clock=clock)
+    ctl.charge("a", 70.0)                       # 50 CPU-s left: an lstm fit queues for 20 s
+
+    async def queued():
+        async with ctl.admit("a", "lstm"):
+            pass
+
+    task = asyncio.create_task(queued())
+    await asyncio.sleep(0.01)
+    task.cancel()                               # client disconnected while waiting
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    assert ctl._client("a").tokens == pytest.approx(50)
+    assert ctl.stats.admitted == 0
+
+
+def test_cost_model_tracks_runtimes():
+    costs = CostModel(alpha=0.5)
+    assert costs.estimate("lstm") == 60.0 and costs.estimate("unknown") == costs.fallback
+    costs.observe("lstm", 20.0)
+    costs.observe("lstm", 10.0)
+    assert costs.estimate("lstm") == pytest.approx(15.0)
+
+
+@pytest.fixture
+def api(sample_ohlcv_df, tmp_path, monkeypatch):
+    sample_ohlcv_df[sample_ohlcv_df["asset"] == "bitcoin"].drop(columns="asset").to_csv(
+        tmp_path / "bitcoin.csv", index=False
+    )
+    calls = []
+
+    def fake_run_model(df, asset, model_name, horizon, last_date, charge=None):
+        calls.append(model_name)
+        time.sleep(0.5 if model_name == "lstm" else 0.0)
+        return [ForecastPoint(date=d, predicted=1.0) for d in pd.date_range(last_date, periods=horizon + 1)[1:]]
+
+    monkeypatch.setattr(predictions, "_run_model", fake_run_model)
+    ctl = AdmissionController(client_rate=0.01, client_burst=60, max_queue_seconds=1)
+    cache = PredictionCache(ttl_seconds=60)
+    app.dependency_overrides[get_data_path] = lambda: tmp_path
+    app.dependency_overrides[get_forecast_ledger] = NullLedger
+    app.dependency_overrides[get_admission_controller] = lambda: ctl
+    app.dependency_overrides[get_prediction_cache] = lambda: cache
+    yield ctl, calls
+    app.dependency_overrides.clear()
+
+
+def test_cache_hits_bypass_admission_and_overload_gets_429(api):
+    ctl, calls = api
+    client = TestClient(app)
+    body = {"asset": "bitcoin", "model": "lstm", "horizon": 5}
+    assert client.post("/api/v1/predict", json=body).status_code == 200
+    assert client.post("/api/v1/predict", json=body).status_code == 200
+    assert calls == ["lstm"] and ctl.stats.admitted == 1
+
+    response = client.post("/api/v1/predict", json={**body, "horizon": 6})
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) > 0
+    assert calls == ["lstm"]
+
+
+async def test_cheap_endpoints_stay_responsive_during_fits(api):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        fit = asyncio.create_task(
+            client.post("/api/v1/predict", json={"asset": "bitcoin", "model": "lstm", "horizon": 5})
+        )
+        await asyncio.sleep(0.05)
+        t0 = time.perf_counter()
+        health = await client.get("/api/v1/health")
+        elapsed = time.perf_counter() - t0
+        assert health.status_code == 200 and not fit.done()
+        assert elapsed < 0.25
+        assert (await fit).status_code == 200
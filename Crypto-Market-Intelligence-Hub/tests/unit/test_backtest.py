@@ -0,0 +1,75 @@
+"""Unit tests for src.models.backtest."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.features.technical import compute_rsi
+from src.models.backtest import (
+    METRIC_COLS,
+    backtest_positions,
+    hold_between,
+    sweep_assets,
+    sweep_bollinger,
+    sweep_macd,
+    sweep_rsi,
+)
+
+
+def _loop_backtest(close, rsi, lower, upper, cost):
+    """Bar-by-bar reference for the RSI rule."""
+    pos = prev = 0
+    equity = 1.0
+    for t in range(len(close)):
+        if rsi[t] > upper:
+            pos = 0
+        elif rsi[t] < lower:
+            pos = 1
+        ret = close[t] / close[t - 1] - 1 if t else 0.0
+        equity *= 1 + prev * ret - abs(pos - prev) * cost
+        prev = pos
+    return equity - 1
+
+
+def test_hold_between_keeps_state_until_exit():
+    entry = np.array([0, 1, 0, 0, 1, 1, 0], dtype=bool)[:, None]
+    exit_ = np.array([0, 0, 0, 1, 0, 1, 0], dtype=bool)[:, None]
+    assert hold_between(entry, exit_).ravel().tolist() == [0, 1, 1, 0, 1, 0, 0]
+
+
+def test_costs_reduce_returns():
+    close = np.array([100.0, 101, 102, 101, 103, 104])
+    pos = np.array([[1, 1], [0, 1], [1, 1], [0, 1], [1, 1], [1, 1]], dtype=float)
+    free = backtest_positions(close, pos, fee_bps=0, slippage_bps=0)
+    paid = backtest_positions(close, pos, fee_bps=10, slippage_bps=5)
+    assert (paid["total_return"] < free["total_return"]).all()
+    assert free["total_return"][1] == pytest.approx(close[-1] / close[0] - 1, rel=1e-5)
+    assert paid["n_trades"].tolist() == [3, 1]
+
+
+def test_rsi_sweep_matches_loop(single_asset_df):
+    close = single_asset_df["close"].to_numpy()
+    result = sweep_rsi(close, [7, 14], [25, 30, 35], [65, 70])
+    assert len(result) == 12
+    assert list(result.columns) == ["period", "lower", "upper", *METRIC_COLS]
+    row = result.iloc[5]
+    rsi = compute_rsi(pd.Series(close), int(row["period"])).to_numpy()
+    expected = _loop_backtest(close, rsi, row["lower"], row["upper"], 15e-4)
+    assert row["total_return"] == pytest.approx(expected, abs=1e-4)
+
+
+def test_macd_and_bollinger_grid_shapes(single_asset_df):
+    close = single_asset_df["close"]
+    macd = sweep_macd(close, [5, 12, 30], [26, 40], [9, 5])
+    assert len(macd) == 5 * 2  # (30, 26) is skipped
+    boll = sweep_bollinger(close, [10, 20], [1.0, 2.0, 2.5])
+    assert len(boll) == 6
+    assert boll["exposure"].between(0, 1).all()
+
+
+def test_sweep_assets(sample_ohlcv_df):
+    grid = {"periods": [7, 14], "lowers": [30], "uppers": [70]}
+    result = sweep_assets(sample_ohlcv_df, "rsi", grid)
+    assert sorted(result["asset"].unique()) == ["bitcoin", "ethereum"]
+    assert len(result) == 4
+    with pytest.raises(ValueError):
+        sweep_assets(sample_ohlcv_df, "unknown", grid)
@@ -0,0 +1,85 @@
+"""Unit tests for src.models.batch_arima module."""
+import warnings
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.models.batch_arima import (
+    batch_loglike,
+    fit_arima_batch,
+    grid_search_arima_batch,
+    run_batch_arima_pipeline,
+)
+
+
+@pytest.fixture(scope="module")
+def arma_prices() -> dict[str, pd.Series]:
+    """Three ARIMA(1,1,1) price paths of different lengths."""
+    rng = np.random.default_rng(7)
+    out = {}
+    for i, n in enumerate([400, 350, 300]):
+        e = rng.normal(size=n + 1)
+        x = np.zeros(n)
+        for t in range(1, n):
+            x[t] = 0.5 * x[t - 1] + e[t] + 0.3 * e[t - 1]
+        out[f"coin_{i}"] = pd.Series(
+            100 + x.cumsum(), index=pd.date_range("2022-01-01", periods=n, freq="D")
+        )
+    return out
+
+
+def test_fit_matches_statsmodels(arma_prices):
+    from statsmodels.tsa.arima.model import ARIMA
+
+    res = fit_arima_batch(arma_prices, order=(1, 1, 1))
+    assert res.converged
+    for j, s in enumerate(arma_prices.values()):
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            ref = ARIMA(s.values, order=(1, 1, 1)).fit()
+        assert res.llf[j] == pytest.approx(ref.llf, abs=1e-2)
+        assert res.ar[j, 0] == pytest.approx(ref.params[0], abs=1e-2)
+        assert res.ma[j, 0] == pytest.approx(ref.params[1], abs=1e-2)
+        assert res.sigma2[j] == pytest.approx(ref.params[2], rel=1e-2)
+
+
+def test_loglike_is_per_series(arma_prices):
+    res = fit_arima_batch(arma_prices, order=(1, 1, 1))
+    x = np.diff(arma_prices["coin_1"].values)[None]
+    llf, _ = batch_loglike(x, res.ar[1:2], res.ma[1:2])
+    assert llf[0] == pytest.approx(res.llf[1], abs=1e-8)
+
+
+def test_warm_start_converges_immediately(arma_prices):
+    res = fit_arima_batch(arma_prices, order=(1, 1, 1))
+    warm = fit_arima_batch(arma_prices, order=(1, 1, 1), start_params=res.params_frame())
+    assert warm.n_iter <= 2
+    np.testing.assert_allclose(warm.llf, res.llf, atol=1e-6)
+
+
+def test_forecast_shape_and_bounds(arma_prices):
+    res = fit_arima_batch(arma_prices, order=(1, 1, 1))
+    fc = res.forecast(steps=10)
+    assert len(fc) == 30
+    assert (fc["upper"] >= fc["predicted"]).all()
+    assert (fc["lower"] <= fc["predicted"]).all()
+
+
+def test_invalid_order_raises(arma_prices):
+    with pytest.raises(ValueError):
+        fit_arima_batch(arma_prices, order=(4, 1, 0))
+    with pytest.raises(ValueError):
+        fit_arima_batch(arma_prices, order=(1, 0, 1))
+
+
+def test_grid_search_returns_order_per_asset(arma_prices):
+    best, fits = grid_search_arima_batch(arma_prices, p_range=[0, 1], q_range=[0, 1])
+    assert set(best.index) == set(arma_prices)
+    assert set(best) <= set(fits)
+
+
+def test_run_batch_pipeline_long_format(sample_ohlcv_df):
+    out = run_batch_arima_pipeline(sample_ohlcv_df, steps=5)
+    assert set(out["params"].index) == {"bitcoin", "ethereum"}
+    assert len(out["forecast"]) == 10
@@ -0,0 +1,72 @@
+"""Unit tests for src.models.cointegration."""
+import numpy as np
+import pandas as pd
+import pytest
+
+import src.models.cointegration as coint_mod
+from src.models.cointegration import half_life, log_price_matrix, scan_cointegration, screen_pairs
+
+
+@pytest.fixture(scope="module")
+def universe() -> pd.DataFrame:
+    """x is a random walk, y = 1.5 x + AR(1) noise (half-life ~ 6.6), z is independent."""
+    rng = np.random.default_rng(5)
+    n = 500
+    x = 4 + rng.normal(0, 0.03, n).cumsum()
+    noise = np.zeros(n)
+    for t in range(1, n):
+        noise[t] = 0.9 * noise[t - 1] + rng.normal(0, 0.01)
+    y = 0.2 + 1.5 * x + noise
+    z = 3 + rng.normal(0, 0.03, n).cumsum()
+    dates = pd.date_range("2023-01-01", periods=n, freq="D")
+    frames = [
+        pd.DataFrame({"date": dates, "asset": name, "close": np.exp(series)})
+        for name, series in {"xcoin": x, "ycoin": y, "zcoin": z}.items()
+    ]
+    return pd.concat(frames, ignore_index=True)
+
+
+def test_finds_cointegrated_pair_with_hedge_ratio(universe):
+    result = scan_cointegration(universe, lookback=None, min_corr=-1.0, n_jobs=1)
+    top = result.iloc[0]
+    assert {top["asset_y"], top["asset_x"]} == {"xcoin", "ycoin"}
+    ratio = top["hedge_ratio"] if top["asset_y"] == "ycoin" else 1 / top["hedge_ratio"]
+    assert ratio == pytest.approx(1.5, rel=0.05)
+    assert 3 < top["half_life"] < 15
+
+
+def test_screen_drops_uncorrelated_pairs(universe):
+    lp = log_price_matrix(universe, lookback=None)
+    assert len(screen_pairs(lp, min_corr=-1.0)) == 3
+    kept = screen_pairs(lp, min_corr=0.95)
+    assert len(kept) == 1 and kept["corr"].iloc[0] > 0.95
+
+
+def test_half_life_of_ar1():
+    rng = np.random.default_rng(0)
+    s = np.zeros(20_000)
+    for t in range(1, len(s)):
+        s[t] = 0.8 * s[t - 1] + rng.normal()
+    assert half_life(s) == pytest.approx(np.log(2) / 0.2, rel=0.1)
+    assert half_life(np.arange(100.0)) == float("inf")
+
+
+def test_process_pool_matches_serial(universe):
+    serial = scan_cointegration(universe, lookback=None, min_corr=-1.0, max_pvalue=1.0, n_jobs=1)
+    pooled = scan_cointegration(universe, lookback=None, min_corr=-1.0, max_pvalue=1.0,
+                                n_jobs=2, chunk_size=1)
+    pd.testing.assert_frame_equal(serial, pooled)
+
+
+def test_cache_hit_skips_tests(universe, tmp_path, monkeypatch):
+    first = scan_cointegration(universe, lookback=None, n_jobs=1, cache_dir=tmp_path)
+
+    def boom(*args, **kwargs):
+        raise AssertionError("pair tests should not run on a cache hit")
+
+    monkeypatch.setattr(coint_mod, "engle_granger", boom)
+    pd.testing.assert_frame_equal(first, scan_cointegration(universe, lookback=None, n_jobs=1,
+                                                            cache_dir=tmp_path))
+    changed = universe.assign(close=universe["close"] * 1.01)
+    with pytest.raises(AssertionError):
+        scan_cointegration(changed, lookback=None, n_jobs=1, cache_dir=tmp_path)
@@ -0,0 +1,149 @@
+"""Unit tests for src.models.ensemble."""
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from src.models.ensemble import (
+    EnsembleUnavailable,
+    ErrorCache,
+    ProcessExecutor,
+    ensemble_forecast,
+    inverse_mse_weights,
+)
+
+# Each fake member forecasts the last close times a fixed factor
+FACTORS = {"arima": 1.0, "prophet": 1.05, "lstm": 1.2, "gru": 0.9}
+
+
+def fake_member(member, df, asset, horizon):
+    if member == "prophet":
+        raise RuntimeError("prophet not installed")
+    if member == "gru":
+        time.sleep(1.0)
+    return np.full(horizon, df["close"].iloc[-1] * FACTORS[member])
+
+
+def test_inverse_mse_weights():
+    weights = inverse_mse_weights(["a", "b", "c"], {"a": 1.0, "b": 2.0})
+    # c has no error and gets the median (1.5)
+    raw = np.array([1.0, 1 / 4, 1 / 2.25])
+    np.testing.assert_allclose([weights[m] for m in "abc"], raw / raw.sum())
+    assert inverse_mse_weights(["a", "b"], {}) == {"a": 0.5, "b": 0.5}
+
+
+def test_failing_and_slow_members_are_dropped(single_asset_df):
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        t0 = time.monotonic()
+        result = ensemble_forecast(
+            single_asset_df, "bitcoin", horizon=5, deadline_seconds=0.3, executor=pool,
+            forecaster=fake_member,
+        )
+        elapsed = time.monotonic() - t0
+    assert elapsed < 0.8
+    assert set(result.members) == {"arima", "lstm"}
+    assert "RuntimeError" in result.dropped["prophet"] and "timed out" in result.dropped["gru"]
+    assert result.forecast.shape == (5,)
+    assert (result.lower <= result.forecast).all() and (result.forecast <= result.upper).all()
+
+
+def test_weights_come_from_cached_backtest_errors(single_asset_df, tmp_path):
+    errors = ErrorCache(directory=tmp_path)
+    members = ["arima", "lstm"]
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        ensemble_forecast(single_asset_df, "bitcoin", 5, members, holdout=10, errors=errors,
+                          executor=pool, forecaster=fake_member)
+    # Backtests finished once the pool shut down; the second call reuses them
+    close = single_asset_df["close"].to_numpy()
+    actual, last = close[-10:], close[-11]
+    expected = {m: np.sqrt(np.mean((last * FACTORS[m] - actual) ** 2)) for m in members}
+    assert ErrorCache(directory=tmp_path).get("bitcoin") == pytest.approx(expected)
+    assert errors.claim("bitcoin", members) == []
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        result = ensemble_forecast(single_asset_df, "bitcoin", 5, members, errors=errors,
+                                   executor=pool, forecaster=fake_member)
+    assert result.weights == pytest.approx(inverse_mse_weights(members, expected))
+    combined = sum(result.weights[m] * close[-1] * FACTORS[m] for m in members)
+    np.testing.assert_allclose(result.forecast, combined)
+
+
+def test_backtests_are_capped_and_charged(single_asset_df):
+    errors = ErrorCache(max_backtests=1)
+    charged = []
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        ensemble_forecast(single_asset_df, "bitcoin", 5, ["arima", "lstm"], errors=errors,
+                          executor=pool, forecaster=fake_member, charge=charged.append)
+    assert set(errors.get("bitcoin")) == {"arima"}        # one backtest per call
+    assert len(charged) == 1 and charged[0] >= 0
+    assert errors.claim("bitcoin", ["arima", "lstm"]) == ["lstm"]
+    assert errors.claim("bitcoin", ["arima", "lstm"]) == []
+
+
+def slow_member(member, df, asset, horizon):
+    if member == "gru":
+        time.sleep(30)
+    return np.full(horizon, df["close"].iloc[-1])
+
+
+def test_overrunning_member_process_is_killed(single_asset_df):
+    executor = ProcessExecutor(max_workers=1)
+    try:
+        t0 = time.monotonic()
+        result = ensemble_forecast(single_asset_df, "bitcoin", 5, ["arima", "gru"], deadline_seconds=2,
+                                   errors=ErrorCache(max_backtests=0), executor=executor,
+                                   forecaster=slow_member)
+        assert "timed out" in result.dropped["gru"]
+        # The killed worker frees its slot: a new job runs right away
+        assert executor.submit(slow_member, "arima", single_asset_df, "bitcoin", 3).result(timeout=10).shape == (3,)
+        assert time.monotonic() - t0 < 15
+    finally:
+        executor.shutdown(cancel_futures=True)
+
+
+def test_kill_before_the_process_starts_is_honoured(single_asset_df):
+    import threading
+    from concurrent.futures.process import BrokenProcessPool
+
+    class GatedContext:
+        """Holds the job between set_running_or_notify_cancel and the process start."""
+
+        def __init__(self, ctx, gate):
+            self.ctx, self.gate = ctx, gate
+
+        def Pipe(self, *args, **kwargs):
+            self.gate.wait(10)
+            return self.ctx.Pipe(*args, **kwargs)
+
+        def Process(self, *args, **kwargs):
+            return self.ctx.Process(*args, **kwargs)
+
+    executor = ProcessExecutor(max_workers=1)
+    gate = threading.Event()
+    executor._ctx = GatedContext(executor._ctx, gate)
+    try:
+        future = executor.submit(slow_member, "gru", single_asset_df, "bitcoin", 3)
+        while not future.running():
+            time.sleep(0.01)
+        assert executor.kill(future)
+        gate.set()
+        assert isinstance(future.exception(timeout=10), BrokenProcessPool)
+    finally:
+        executor.shutdown(cancel_futures=True)
+
+
+def test_no_finished_member_raises(single_asset_df):
+    with ThreadPoolExecutor(max_workers=2) as pool, pytest.raises(EnsembleUnavailable):
+        ensemble_forecast(single_asset_df, "bitcoin", 5, ["prophet", "gru"], deadline_seconds=0.2,
+                          executor=pool, forecaster=fake_member)
+
+
+def test_members_run_in_worker_processes(single_asset_df):
+    with ProcessPoolExecutor(max_workers=2) as pool:
+        result = ensemble_forecast(single_asset_df, "bitcoin", 7, ["arima", "prophet"],
+                                   deadline_seconds=60, executor=pool)
+    assert "arima" in result.members
+    assert set(result.members) | set(result.dropped) == {"arima", "prophet"}
+    assert sum(result.weights.values()) == pytest.approx(1.0)
+    assert np.isfinite(result.forecast).all() and result.forecast.shape == (7,)
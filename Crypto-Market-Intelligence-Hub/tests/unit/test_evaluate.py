@@ -48,3 +48,44 @@ def test_summary_by_asset(sample_ohlcv_df):
     assert "asset" in result.columns
     assert len(result) == 2  # bitcoin, ethereum
     assert "sharpe_ratio" in result.columns
+
+
+def test_panel_metrics_matches_compute_metrics():
+    import pandas as pd
+    from src.models.evaluate import PANEL_METRICS, panel_metrics
+
+    rng = np.random.default_rng(3)
+    frames = []
+    for asset in ["btc", "eth"]:
+        for model in ["arima", "lstm"]:
+            for fold in range(3):
+                y = 100 + rng.normal(0, 1, 40).cumsum()
+                frames.append(pd.DataFrame({
+                    "asset": asset, "model": model, "fold": fold,
+                    "date": pd.date_range("2023-01-01", periods=40),
+                    "y_true": y, "y_pred": y + rng.normal(0, 0.5, 40),
+                }))
+    panel = pd.concat(frames, ignore_index=True).sample(frac=1, random_state=0)
+    result = panel_metrics(panel)
+    assert len(result) == 12
+    assert list(result.columns) == ["asset", "model", "fold", *PANEL_METRICS]
+
+    row = result[(result["asset"] == "eth") & (result["model"] == "lstm") & (result["fold"] == 2)].iloc[0]
+    grp = panel[(panel["asset"] == "eth") & (panel["model"] == "lstm") & (panel["fold"] == 2)].sort_values("date")
+    ref = compute_metrics(grp["y_true"].values, grp["y_pred"].values)
+    for key in ["mae", "rmse", "mape", "r2"]:
+        assert row[key] == pytest.approx(ref[key], abs=1e-4)
+
+    prev = grp["y_true"].shift(1)
+    hits = (np.sign(grp["y_true"] - prev) == np.sign(grp["y_pred"] - prev))[1:]
+    assert row["directional_accuracy"] == pytest.approx(hits.mean())
+    strat = (np.sign(grp["y_pred"] - prev) * (grp["y_true"] / prev - 1))[1:]
+    assert row["sharpe_ratio"] == pytest.approx(sharpe_ratio(strat.values))
+
+
+def test_summary_by_asset_sharpe_matches_scalar(sample_ohlcv_df):
+    from src.features.returns import add_return_features
+    df_with_ret = add_return_features(sample_ohlcv_df)
+    result = summary_by_asset(df_with_ret).set_index("asset")
+    btc = df_with_ret[df_with_ret["asset"] == "bitcoin"]["log_return"].dropna().values
+    assert result.loc["bitcoin", "sharpe_ratio"] == pytest.approx(sharpe_ratio(btc))
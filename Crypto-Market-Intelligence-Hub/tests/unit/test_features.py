@@ -54,3 +54,23 @@ def test_add_technical_indicators_adds_rsi(sample_ohlcv_df):
     assert "rsi" in result.columns
     assert "macd" in result.columns
     assert "bb_upper" in result.columns
+
+
+def test_multi_period_kernels_match_single(single_asset_df):
+    from src.features.technical import compute_atr_multi, compute_bollinger_multi, compute_rsi_multi
+    df = single_asset_df
+    periods = [2, 7, 14, 30]
+
+    rsi = compute_rsi_multi(df["close"], periods)
+    atr = compute_atr_multi(df["high"], df["low"], df["close"], periods)
+    upper, middle, lower = compute_bollinger_multi(df["close"], periods, num_std=2.0)
+    assert rsi.shape == atr.shape == upper.shape == (len(df), len(periods))
+
+    for j, p in enumerate(periods):
+        np.testing.assert_allclose(rsi[:, j], compute_rsi(df["close"], p), rtol=1e-10)
+        np.testing.assert_allclose(
+            atr[:, j], compute_atr(df["high"], df["low"], df["close"], p), rtol=1e-10
+        )
+        bands = compute_bollinger_bands(df["close"], p, 2.0)
+        for got, expected in zip((upper, middle, lower), bands):
+            np.testing.assert_allclose(got[:, j], expected, rtol=1e-8)
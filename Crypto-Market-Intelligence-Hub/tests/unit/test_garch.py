@@ -0,0 +1,110 @@
+"""Unit tests for src.models.garch and the /volatility endpoint."""
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+from src.api.dependencies import get_models_path
+from src.api.main import app
+from src.models.garch import (
+    SCALE,
+    _backcast,
+    _clip_bounds,
+    _filter,
+    fit_garch_batch,
+    forecast_volatility,
+    update_garch_state,
+)
+from src.models.registry import save_sklearn
+
+TRUE = {"a": (0.05, 0.2, 0.10, 0.85), "b": (0.0, 0.5, 0.05, 0.90), "c": (-0.02, 0.1, 0.15, 0.80)}
+
+
+@pytest.fixture(scope="module")
+def returns() -> pd.DataFrame:
+    rng = np.random.default_rng(11)
+    n = 1500
+    cols = {}
+    for name, (mu, omega, alpha, beta) in TRUE.items():
+        s, e, r = omega / (1 - alpha - beta), 0.0, np.empty(n)
+        for t in range(n):
+            s = omega + alpha * e**2 + beta * s
+            e = np.sqrt(s) * rng.standard_normal()
+            r[t] = mu + e
+        cols[name] = r / SCALE
+    frame = pd.DataFrame(cols, index=pd.date_range("2020-01-01", periods=n, freq="D"))
+    frame.iloc[:400, 2] = np.nan  # shorter history for one asset
+    return frame
+
+
+@pytest.fixture(scope="module")
+def fitted(returns):
+    return fit_garch_batch(returns)
+
+
+def test_recovers_persistence(fitted):
+    assert fitted.converged
+    true_persistence = np.array([a + b for _, _, a, b in TRUE.values()])
+    np.testing.assert_allclose(fitted.persistence, true_persistence, atol=0.08)
+    assert fitted.nobs.tolist() == [1500, 1500, 1100]
+
+
+def test_matches_single_series_optimum(returns, fitted):
+    optimize = pytest.importorskip("scipy.optimize")
+    r = returns[["c"]].dropna().to_numpy().T * SCALE
+    lo, hi = _clip_bounds(r, 15.0)
+    r = np.clip(r, lo[:, None], hi[:, None])
+    backcast = _backcast(r)
+
+    def nll(p):
+        if p[2] + p[3] >= 1:
+            return 1e10
+        return _filter(r, np.array([[p[0], p[1], p[2], 0.0, p[3]]]), backcast)[0][0]
+
+    best = optimize.minimize(nll, [0.0, 0.2, 0.1, 0.8], method="L-BFGS-B",
+                             bounds=[(-5, 5), (1e-6, 10), (0, 1), (0, 1)])
+    assert fitted.llf[2] == pytest.approx(-best.fun, abs=1e-3)
+
+
+def test_warm_start_converges_faster(returns, fitted):
+    warm = fit_garch_batch(returns, start_params=fitted.params_frame())
+    assert warm.n_iter < fitted.n_iter
+    np.testing.assert_allclose(warm.llf, fitted.llf, atol=1e-2)
+
+
+def test_update_matches_full_filter(returns):
+    head = returns.iloc[:-20]
+    res = fit_garch_batch(head)
+    updated = update_garch_state(res.params_frame(), returns)
+
+    r = returns.to_numpy().T * SCALE
+    lo, hi = res.clip_lo, res.clip_hi
+    r_head = np.vstack([np.r_[np.full(400, np.nan), head["c"].dropna()] if i == 2 else head.iloc[:, i]
+                        for i in range(3)]) * SCALE
+    full = np.clip(r, lo[:, None], hi[:, None])
+    _, _, e, s = _filter(full, res.params, _backcast(np.clip(r_head, lo[:, None], hi[:, None])))
+    np.testing.assert_allclose(updated["last_sigma2"], s, rtol=1e-10)
+    assert (updated["last_date"] == returns.index[-1]).all()
+    assert (updated["nobs"] - res.params_frame()["nobs"] == 20).all()
+
+
+def test_forecast_reverts_to_long_run(fitted):
+    fc = forecast_volatility(fitted.params_frame(), steps=2000)
+    p = fitted.params_frame()
+    long_run = np.sqrt(p["omega"] / (1 - p["alpha"] - p["beta"])) / SCALE
+    last = fc.groupby("asset")["volatility"].last()
+    np.testing.assert_allclose(last.loc[long_run.index], long_run, rtol=1e-3)
+
+
+def test_volatility_endpoint(tmp_path, fitted):
+    save_sklearn(fitted.params_frame(), "garch_params", tmp_path)
+    app.dependency_overrides[get_models_path] = lambda: tmp_path
+    try:
+        client = TestClient(app)
+        resp = client.get("/api/v1/volatility/a", params={"horizon": 10})
+        assert resp.status_code == 200
+        body = resp.json()
+        assert len(body["forecast"]) == 10 and body["model"] == "garch"
+        assert client.get("/api/v1/volatility/zzz").status_code == 404
+    finally:
+        app.dependency_overrides.clear()
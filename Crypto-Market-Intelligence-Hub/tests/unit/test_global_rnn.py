@@ -0,0 +1,75 @@
+"""Unit tests for src.models.global_rnn (input pipeline; model tests need TensorFlow)."""
+import numpy as np
+import pytest
+
+from src.models.global_rnn import AssetScaler, WindowGenerator, asset_series, prefetch
+
+
+@pytest.fixture
+def series(sample_ohlcv_df):
+    return asset_series(sample_ohlcv_df, min_length=30)
+
+
+def test_asset_scaler_round_trip(series):
+    scaler = AssetScaler.fit(series)
+    assert scaler.assets == ["bitcoin", "ethereum"]
+    for a, close in series.items():
+        scaled = scaler.transform(a, close)
+        assert abs(scaled.mean()) < 1e-4 and abs(scaled.std() - 1) < 1e-3
+        ids = np.full(len(close), scaler.index(a))
+        np.testing.assert_allclose(scaler.inverse(ids, scaled), close, rtol=1e-5)
+
+
+def test_window_generator_matches_materialised_windows(series):
+    scaler = AssetScaler.fit(series)
+    scaled = {scaler.index(a): scaler.transform(a, s) for a, s in series.items()}
+    seq_len = 10
+    gen = WindowGenerator(scaled, seq_len, bounds={0: (50, 120)})
+
+    # Asset 0 restricted to targets [50, 120); asset 1 uses every window
+    assert len(gen) == 70 + len(scaled[1]) - seq_len
+    batches = list(prefetch(gen.batches(batch_size=32, shuffle=False)))
+    x = np.concatenate([b[0][0] for b in batches])
+    ids = np.concatenate([b[0][1] for b in batches])
+    y = np.concatenate([b[1] for b in batches])
+    assert x.shape == (len(gen), seq_len, 1)
+
+    expected_x = [scaled[0][t - seq_len:t] for t in range(50, 120)]
+    expected_x += [scaled[1][t - seq_len:t] for t in range(seq_len, len(scaled[1]))]
+    expected_y = np.concatenate([scaled[0][50:120], scaled[1][seq_len:]])
+    np.testing.assert_array_equal(x[..., 0], np.array(expected_x))
+    np.testing.assert_array_equal(y, expected_y)
+    assert (ids[:70] == 0).all() and (ids[70:] == 1).all()
+
+
+def test_window_generator_shuffle_covers_every_window_once(series):
+    scaled = {i: s.astype(np.float32) for i, s in enumerate(series.values())}
+    gen = WindowGenerator(scaled, 5)
+    y_sorted = np.concatenate([b[1] for b in gen.batches(64, shuffle=False)])
+    y_shuffled = np.concatenate([b[1] for b in gen.batches(64, shuffle=True, seed=1)])
+    assert not np.array_equal(y_sorted, y_shuffled)
+    np.testing.assert_array_equal(np.sort(y_sorted), np.sort(y_shuffled))
+
+
+def test_global_model_forecasts_every_asset(series):
+    pytest.importorskip("tensorflow")
+    from src.models.global_rnn import build_global_rnn, forecast_all
+
+    scaler = AssetScaler.fit(series)
+    model = build_global_rnn(seq_len=10, n_assets=len(scaler.assets), units=[8], dense_units=4)
+    forecast = forecast_all(model, scaler, series, seq_len=10, steps=5)
+    assert set(forecast) == set(series)
+    assert all(f.shape == (5,) and np.isfinite(f).all() for f in forecast.values())
+
+
+def test_prefetch_reraises_producer_error():
+    def broken():
+        yield 1
+        yield 2
+        raise OSError("disk gone")
+
+    seen = []
+    with pytest.raises(OSError, match="disk gone"):
+        for item in prefetch(broken()):
+            seen.append(item)
+    assert seen == [1, 2]
@@ -0,0 +1,113 @@
+"""Unit tests for src.data.ledger and ledger recording in /predict."""
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+from src.api.dependencies import get_data_path, get_forecast_ledger
+from src.api.main import app
+from src.api.routers import predictions
+from src.api.schemas import ForecastPoint
+from src.data.ledger import ACCURACY, ForecastLedger, read_ledger, score_ledger
+
+DATES = pd.date_range("2024-01-01", periods=30, freq="D")
+
+
+@pytest.fixture
+def ledger(tmp_path):
+    ledger = ForecastLedger(tmp_path / "ledger", flush_seconds=60)
+    yield ledger
+    ledger.close()
+
+
+def _issue(ledger, day, model="arima", asset="bitcoin", horizon=3, bias=1.0):
+    targets = list(DATES[day + 1:day + 1 + horizon])
+    ledger.record(
+        asset, model, "1.0.0", targets, [100.0 + day + h + bias for h in range(1, horizon + 1)],
+        lower=[90.0] * horizon, upper=[105.0] * horizon,
+        issued_at=datetime(2024, 1, 1 + day, 12, tzinfo=timezone.utc),
+    )
+
+
+def test_record_is_buffered_and_partitioned_by_issue_date(ledger):
+    for day in (0, 0, 1):
+        _issue(ledger, day)
+    assert ledger.rows_written == 0 and read_ledger(ledger.root).empty
+    assert ledger.flush() == 9
+
+    parts = sorted(p.name for p in ledger.root.glob("issue_date=*"))
+    assert parts == ["issue_date=2024-01-01", "issue_date=2024-01-02"]
+    frame = read_ledger(ledger.root)
+    assert len(frame) == 9 and frame["forecast_id"].nunique() == 3
+    assert sorted(frame["horizon"].unique()) == [1, 2, 3]
+    assert len(read_ledger(ledger.root, since="2024-01-02")) == 3
+
+    _issue(ledger, 1)
+    ledger.flush()
+    assert ledger.compact(before="2024-01-03") == 1
+    assert len(list((ledger.root / "issue_date=2024-01-02").glob("*.parquet"))) == 1
+    assert len(read_ledger(ledger.root)) == 12
+
+
+def test_score_ledger_joins_new_actuals_incrementally(ledger):
+    for day in range(10):
+        _issue(ledger, day, model="arima", bias=1.0)
+        _issue(ledger, day, model="prophet", bias=-4.0)
+    ledger.flush()
+    actual = 100.0 + np.arange(len(DATES)) + 1  # close on DATES[i] is 101 + i
+    prices = pd.DataFrame({"date": DATES, "asset": "bitcoin", "close": actual})
+
+    first = score_ledger(ledger.root, prices.iloc[:6])
+    assert first.set_index(["model", "horizon"]).loc[("arima", 1), "n"] == 5
+    full = score_ledger(ledger.root, prices)
+    realized = pd.read_parquet(ledger.root / "realized.parquet")
+    assert len(realized) == 60 and not realized.duplicated(["forecast_id", "horizon"]).any()
+
+    # predicted = 100 + day + h + bias; actual at DATES[day + h] = 101 + day + h
+    by_key = full.set_index(["model", "horizon"])
+    assert by_key.loc[("arima", 2), "mae"] == pytest.approx(0.0)
+    assert by_key.loc[("prophet", 3), "rmse"] == pytest.approx(5.0)
+    # Intervals are [90, 105]: actual 101 + day + h is inside while day + h <= 4
+    inside = np.mean([day + 1 <= 4 for day in range(10)])
+    assert by_key.loc[("arima", 1), "coverage"] == pytest.approx(inside)
+    pd.testing.assert_frame_equal(pd.read_parquet(ledger.root / ACCURACY), full)
+
+
+def test_late_issued_forecast_is_still_scored(ledger):
+    _issue(ledger, 5)
+    ledger.flush()
+    prices = pd.DataFrame({"date": DATES, "asset": "bitcoin", "close": 100.0 + np.arange(len(DATES))})
+    score_ledger(ledger.root, prices)
+
+    # Issued afterwards for dates before the last scored one (e.g. a backfill)
+    _issue(ledger, 2, model="prophet")
+    ledger.flush()
+    full = score_ledger(ledger.root, prices)
+    realized = pd.read_parquet(ledger.root / "realized.parquet")
+    assert len(realized) == 6 and not realized.duplicated(["forecast_id", "horizon"]).any()
+    assert set(full["model"]) == {"arima", "prophet"}
+
+
+def test_predict_records_forecast_in_ledger(sample_ohlcv_df, tmp_path, monkeypatch, ledger):
+    sample_ohlcv_df[sample_ohlcv_df["asset"] == "bitcoin"].drop(columns="asset").to_csv(
+        tmp_path / "bitcoin.csv", index=False
+    )
+
+    def fake_run_model(df, asset, model_name, horizon, last_date, charge=None):
+        return [ForecastPoint(date=d, predicted=1.0) for d in pd.date_range(last_date, periods=horizon + 1)[1:]]
+
+    monkeypatch.setattr(predictions, "_run_model", fake_run_model)
+    app.dependency_overrides[get_data_path] = lambda: tmp_path
+    app.dependency_overrides[get_forecast_ledger] = lambda: ledger
+    try:
+        response = TestClient(app).post("/api/v1/predict", json={"asset": "bitcoin", "model": "arima", "horizon": 4})
+    finally:
+        app.dependency_overrides.clear()
+    assert response.status_code == 200
+    ledger.flush()
+    frame = read_ledger(ledger.root)
+    assert len(frame) == 4
+    assert set(frame["model"]) == {"arima"} and set(frame["asset"]) == {"bitcoin"}
+    assert frame["target_date"].min() == sample_ohlcv_df["date"].max() + pd.Timedelta(days=1)
@@ -0,0 +1,111 @@
+"""Unit tests for src.data.quotes and the /quotes endpoint."""
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.api.dependencies import get_quote_service
+from src.api.main import app
+from src.data.quotes import QuoteService, QuoteUnavailable, StubUpstream
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def upstream():
+    return StubUpstream({"bitcoin": 60_000.0, "ethereum": 3_000.0, "solana": 150.0})
+
+
+def test_batches_ids_and_caches_within_ttl(upstream):
+    clock = FakeClock()
+    service = QuoteService(upstream, ttl_seconds=10, clock=clock)
+    quotes = service.get_quotes(["bitcoin", "ethereum", "nope"])
+    assert set(quotes) == {"bitcoin", "ethereum"}
+    assert upstream.calls == [["bitcoin", "ethereum", "nope"]]
+
+    clock.now = 5
+    again = service.get_quotes(["ethereum", "nope"])  # unknown IDs are cached too
+    assert again["ethereum"].age_seconds == 5
+    assert len(upstream.calls) == 1
+
+    clock.now = 11
+    service.get_quotes(["ethereum", "solana"])
+    assert upstream.calls[-1] == ["ethereum", "solana"]
+
+
+def test_concurrent_requests_share_one_upstream_call():
+    upstream = StubUpstream({"bitcoin": 1.0}, latency_seconds=0.2)
+    service = QuoteService(upstream)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(service.get_quotes(["bitcoin"])))
+               for _ in range(20)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(results) == 20 and all(r["bitcoin"].price == 1.0 for r in results)
+    assert len(upstream.calls) == 1
+    assert service.stats.coalesced == 19
+
+
+def test_serves_last_good_when_upstream_fails(upstream):
+    clock = FakeClock()
+    service = QuoteService(upstream, ttl_seconds=10, max_stale_seconds=100, clock=clock)
+    service.get_quotes(["bitcoin"])
+
+    upstream.fail = True
+    clock.now = 30
+    quote = service.get_quotes(["bitcoin"])["bitcoin"]
+    assert quote.stale and quote.age_seconds == 30
+    clock.now = 35  # within the back-off TTL: no new upstream call
+    assert service.get_quotes(["bitcoin"])["bitcoin"].stale
+    assert len(upstream.calls) == 2
+
+    clock.now = 200  # last good value is too old now
+    with pytest.raises(QuoteUnavailable):
+        service.get_quotes(["bitcoin"])
+    clock.now = 205  # back-off TTL: still unavailable, not silently dropped
+    with pytest.raises(QuoteUnavailable, match="bitcoin"):
+        service.get_quotes(["bitcoin"])
+
+    upstream.fail = False
+    clock.now = 220
+    assert not service.get_quotes(["bitcoin"])["bitcoin"].stale
+
+
+def test_failure_without_snapshot_is_backed_off(upstream):
+    clock = FakeClock()
+    service = QuoteService(upstream, ttl_seconds=10, clock=clock)
+    upstream.fail = True
+    for t in (0, 3, 6):  # one upstream call per TTL, not one per request
+        clock.now = t
+        with pytest.raises(QuoteUnavailable, match="solana"):
+            service.get_quotes(["solana"])
+    assert len(upstream.calls) == 1
+
+    upstream.fail = False
+    clock.now = 11
+    assert service.get_quotes(["solana"])["solana"].price == 150.0
+    assert len(upstream.calls) == 2
+
+
+def test_quotes_endpoint(upstream):
+    app.dependency_overrides[get_quote_service] = lambda: QuoteService(upstream)
+    try:
+        client = TestClient(app)
+        resp = client.get("/api/v1/quotes", params={"assets": "bitcoin,unknown"})
+        assert resp.status_code == 200
+        body = resp.json()
+        assert [q["asset"] for q in body["quotes"]] == ["bitcoin"]
+        assert body["missing"] == ["unknown"]
+        assert client.get("/api/v1/quotes", params={"assets": "unknown"}).status_code == 404
+        upstream.fail = True
+        assert client.get("/api/v1/quotes", params={"assets": "solana"}).status_code == 503
+    finally:
+        app.dependency_overrides.clear()
@@ -0,0 +1,142 @@
+"""Unit tests for src.data.resample."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data.resample import (
+    build_aggregate_cache,
+    load_timeframe,
+    merge_new_bars,
+    resample_all,
+    resample_ohlcv,
+    update_aggregate_cache,
+)
+from src.features.technical import add_technical_indicators
+
+
+@pytest.fixture
+def hourly_df() -> pd.DataFrame:
+    n = 24 * 20
+    rng = np.random.default_rng(7)
+    close = 100 + rng.normal(0, 1, n).cumsum()
+    return pd.DataFrame({
+        "date": pd.date_range("2024-01-01", periods=n, freq="h"),
+        "open": close + rng.normal(0, 0.1, n),
+        "high": close + 1,
+        "low": close - 1,
+        "close": close,
+        "volume": rng.uniform(1, 10, n),
+        "asset": "bitcoin",
+    })
+
+
+def test_weekly_matches_pandas_resample(sample_ohlcv_df):
+    weekly = resample_ohlcv(sample_ohlcv_df, "1w")
+    btc = sample_ohlcv_df[sample_ohlcv_df["asset"] == "bitcoin"].set_index("date")
+    expected = btc.resample("W-MON", label="left", closed="left").agg(
+        {"open": "first", "high": "max", "low": "min", "close": "last", "volume": "sum"}
+    )
+    got = weekly[weekly["asset"] == "bitcoin"].set_index("date")
+    pd.testing.assert_frame_equal(
+        got[["open", "high", "low", "close", "volume"]], expected, check_freq=False, check_names=False
+    )
+    assert got["n_bars"].sum() == len(btc)
+
+
+def test_intraday_chain_is_consistent(hourly_df):
+    aggs = resample_all(hourly_df)
+    assert set(aggs) == {"1h", "4h", "1d", "1w", "1mo"}
+    direct = resample_ohlcv(hourly_df, "1d")
+    pd.testing.assert_frame_equal(aggs["1d"], direct)
+    assert (aggs["4h"]["n_bars"] == 4).all()
+
+
+def test_daily_input_skips_intraday(sample_ohlcv_df):
+    assert set(resample_all(sample_ohlcv_df, ["4h", "1w"])) == {"1w"}
+
+
+def test_incremental_merge_equals_full_rebuild(hourly_df):
+    cut = 24 * 9 + 5  # mid-week, mid-day
+    old = hourly_df.iloc[:cut]
+    for tf in ("4h", "1d", "1w"):
+        agg = resample_ohlcv(old, tf)
+        # Overlapping replay must not double-count
+        merged = merge_new_bars(agg, hourly_df.iloc[cut - 3:], tf)
+        pd.testing.assert_frame_equal(merged, resample_ohlcv(hourly_df, tf))
+
+
+def test_restated_bars_replace_cached_ones(hourly_df):
+    cut = 24 * 9 + 5
+    corrected = hourly_df.copy()
+    corrected.loc[cut - 1, ["close", "high"]] += 50.0    # the partial last bar is restated
+    for tf in ("4h", "1d", "1w"):
+        agg = resample_ohlcv(hourly_df.iloc[:cut], tf)
+        merged = merge_new_bars(agg, corrected.iloc[cut - 1:], tf, history=corrected)
+        pd.testing.assert_frame_equal(merged, resample_ohlcv(corrected, tf))
+
+    # Without history, a replay that covers the whole bucket is enough
+    agg = resample_ohlcv(hourly_df.iloc[:cut], "4h")
+    merged = merge_new_bars(agg, corrected.iloc[cut - 1 - (cut - 1) % 4:], "4h")
+    pd.testing.assert_frame_equal(merged, resample_ohlcv(corrected, "4h"))
+
+
+def test_missing_timeframe_is_built_from_full_history(tmp_path, hourly_df):
+    build_aggregate_cache(hourly_df.iloc[:200], tmp_path, ["1d"])
+    update_aggregate_cache(hourly_df.iloc[200:], tmp_path, ["1d", "1w"])     # 1w from the 1d cache
+    pd.testing.assert_frame_equal(
+        load_timeframe(tmp_path, "1w", "bitcoin"), resample_ohlcv(hourly_df, "1w"), check_dtype=False
+    )
+    update_aggregate_cache(hourly_df.iloc[200:], tmp_path, ["4h"], history=hourly_df)
+    pd.testing.assert_frame_equal(
+        load_timeframe(tmp_path, "4h", "bitcoin"), resample_ohlcv(hourly_df, "4h"), check_dtype=False
+    )
+    with pytest.raises(ValueError, match="no history"):
+        update_aggregate_cache(hourly_df.iloc[200:], tmp_path / "empty", ["1d"])
+
+
+def test_cache_roundtrip_and_update(tmp_path, hourly_df):
+    build_aggregate_cache(hourly_df.iloc[:200], tmp_path, ["1d"])
+    update_aggregate_cache(hourly_df.iloc[200:], tmp_path, ["1d"])
+    cached = load_timeframe(tmp_path, "1d", "bitcoin")
+    expected = resample_ohlcv(hourly_df, "1d")
+    pd.testing.assert_frame_equal(cached, expected, check_dtype=False)
+
+
+def test_indicators_on_weekly_timeframe(sample_ohlcv_df):
+    out = add_technical_indicators(sample_ohlcv_df, timeframe="1w")
+    assert len(out) == len(resample_ohlcv(sample_ohlcv_df, "1w"))
+    assert "rsi" in out.columns
+
+
+def test_unknown_timeframe_raises(sample_ohlcv_df):
+    with pytest.raises(ValueError):
+        resample_ohlcv(sample_ohlcv_df, "3d")
+
+
+def test_intraday_timeframe_on_daily_bars_raises(sample_ohlcv_df):
+    with pytest.raises(ValueError, match="not intraday"):
+        resample_ohlcv(sample_ohlcv_df, "4h")
+
+
+def test_history_endpoint_serves_cached_timeframe(tmp_path, sample_ohlcv_df):
+    from fastapi.testclient import TestClient
+    from src.api.dependencies import get_data_path, get_processed_path
+    from src.api.main import app
+
+    build_aggregate_cache(sample_ohlcv_df, tmp_path, ["1w"])
+    daily = sample_ohlcv_df[sample_ohlcv_df["asset"] == "bitcoin"].drop(columns="asset")
+    daily.to_csv(tmp_path / "bitcoin.csv", index=False)
+    app.dependency_overrides[get_data_path] = lambda: tmp_path
+    app.dependency_overrides[get_processed_path] = lambda: tmp_path
+    try:
+        client = TestClient(app)
+        resp = client.get("/api/v1/history/bitcoin", params={"timeframe": "1w"})
+        assert resp.status_code == 200
+        body = resp.json()
+        assert body["timeframe"] == "1w"
+        assert body["total"] == len(resample_ohlcv(sample_ohlcv_df, "1w")) // 2
+        assert client.get("/api/v1/history/bitcoin", params={"timeframe": "2w"}).status_code == 422
+        # No 4h cache and daily raw bars: cannot be resampled
+        assert client.get("/api/v1/history/bitcoin", params={"timeframe": "4h"}).status_code == 422
+    finally:
+        app.dependency_overrides.clear()
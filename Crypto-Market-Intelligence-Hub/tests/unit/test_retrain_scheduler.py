@@ -0,0 +1,143 @@
+"""Unit tests for src.models.drift and src.models.retrain_scheduler."""
+import json
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.models.drift import ErrorTracker, PageHinkley
+from src.models.retrain_scheduler import ResourceBudget, RetrainScheduler
+
+
+def test_page_hinkley_quiet_on_stationary_stream():
+    ph = PageHinkley(delta=0.1, threshold=20)
+    rng = np.random.default_rng(0)
+    assert not any(ph.update(z) for z in rng.normal(size=500))
+
+
+def test_page_hinkley_detects_volatility_shift():
+    ph = PageHinkley(delta=0.1, threshold=20)
+    rng = np.random.default_rng(1)
+    for z in rng.normal(size=300):
+        ph.update(abs(z))
+    fired = [ph.update(abs(z)) for z in rng.normal(scale=3.0, size=100)]
+    assert any(fired)
+
+
+def test_error_tracker_flags_degradation():
+    tracker = ErrorTracker(baseline_mape=1.0, ratio=1.5, min_obs=3)
+    for _ in range(5):
+        tracker.update(100.0, 101.0)
+    assert not tracker.degraded
+    for _ in range(30):
+        tracker.update(100.0, 110.0)
+    assert tracker.degraded
+
+
+def _scheduler(tmp_path, trainer, budget=None):
+    return RetrainScheduler(trainer=trainer, budget=budget or ResourceBudget(4, 4096), summary_dir=tmp_path)
+
+
+def test_only_degraded_pairs_are_retrained(tmp_path):
+    calls = []
+    sched = _scheduler(tmp_path, lambda a, m: calls.append((a, m)) or {"mape": 1.0})
+    sched.register("bitcoin", "arima", baseline_mape=1.0, return_scale=0.03)
+    sched.register("ethereum", "arima", baseline_mape=1.0, return_scale=0.03)
+    for _ in range(10):
+        sched.observe_forecast("bitcoin", "arima", 100.0, 90.0)
+        sched.observe_forecast("ethereum", "arima", 100.0, 100.5)
+
+    summary = sched.run_cycle()
+    assert calls == [("bitcoin", "arima")]
+    assert summary["retrained"][0]["reasons"][0].startswith("forecast_error")
+    written = list(tmp_path.glob("retrain_*.json"))
+    assert len(written) == 1
+    assert json.loads(written[0].read_text())["retrained"][0]["asset"] == "bitcoin"
+
+    # Detector reset after retraining: next cycle is a no-op
+    assert sched.run_cycle()["retrained"] == []
+
+
+def test_return_drift_queues_all_models_of_asset(tmp_path):
+    sched = _scheduler(tmp_path, lambda a, m: None)
+    sched.register("solana", "arima", baseline_mape=1.0, return_scale=0.03)
+    sched.register("solana", "prophet", baseline_mape=1.0, return_scale=0.03)
+    rng = np.random.default_rng(2)
+    sched.observe_returns("solana", rng.normal(0, 0.03, 200))
+    sched.observe_returns("solana", rng.normal(0, 0.12, 60))
+    jobs = sched.plan()
+    assert {j.model for j in jobs} == {"arima", "prophet"}
+    assert "volatility_shift" in jobs[0].reasons
+
+
+def test_asset_drift_kept_until_every_pair_retrains(tmp_path):
+    calls = []
+    sched = _scheduler(tmp_path, lambda a, m: calls.append(m) or {})
+    sched.register("solana", "arima", baseline_mape=1.0, return_scale=0.03)
+    sched.register("solana", "prophet", baseline_mape=1.0, return_scale=0.03)
+    rng = np.random.default_rng(2)
+    sched.observe_returns("solana", rng.normal(0, 0.03, 200))
+    sched.observe_returns("solana", rng.normal(0, 0.12, 60))
+
+    sched.run_cycle(max_jobs=1)
+    assert len(calls) == 1
+    assert [j.model for j in sched.plan()] == [m for m in ("arima", "prophet") if m not in calls]
+    sched.run_cycle()
+    assert sorted(calls) == ["arima", "prophet"]
+    assert sched.plan() == []
+
+
+def test_sync_ledger_feeds_each_point_once(tmp_path):
+    sched = _scheduler(tmp_path, lambda a, m: None)
+    sched.register("bitcoin", "arima", baseline_mape=1.0)
+    realized = pd.DataFrame({
+        "forecast_id": ["f1", "f1", "f2", "f3"],
+        "horizon": [1, 2, 1, 1],
+        "asset": ["bitcoin", "bitcoin", "bitcoin", "ethereum"],
+        "model": ["arima"] * 4,
+        "actual": [100.0] * 4,
+        "predicted": [90.0] * 4,
+    })
+    assert sched.sync_ledger(realized.iloc[:2], observe=False) == 2
+    assert sched.sync_ledger(realized) == 1                     # f2; ethereum not registered
+    assert sched.sync_ledger(realized) == 0
+
+
+def test_budget_limits_concurrency_and_skips_oversized(tmp_path):
+    running, peak = [0], [0]
+    lock = threading.Lock()
+
+    def trainer(asset, model):
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        time.sleep(0.05)
+        with lock:
+            running[0] -= 1
+
+    sched = _scheduler(tmp_path, trainer, budget=ResourceBudget(cpu_cores=2, memory_mb=1000))
+    for asset in ["a", "b", "c", "d"]:
+        sched.register(asset, "arima", baseline_mape=1.0)
+        for _ in range(10):
+            sched.observe_forecast(asset, "arima", 100.0, 80.0)
+    sched.register("e", "lstm", baseline_mape=1.0)
+    for _ in range(10):
+        sched.observe_forecast("e", "lstm", 100.0, 50.0)
+
+    summary = sched.run_cycle()
+    assert len(summary["retrained"]) == 4
+    assert peak[0] <= 2
+    assert summary["skipped"][0]["asset"] == "e"
+
+
+def test_failed_job_is_reported(tmp_path):
+    def trainer(asset, model):
+        raise RuntimeError("boom")
+
+    sched = _scheduler(tmp_path, trainer)
+    sched.register("xrp", "arima", baseline_mape=1.0)
+    for _ in range(10):
+        sched.observe_forecast("xrp", "arima", 1.0, 2.0)
+    summary = sched.run_cycle()
+    assert summary["failed"][0]["error"] == "boom"
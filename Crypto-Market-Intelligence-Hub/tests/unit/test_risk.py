@@ -0,0 +1,96 @@
+"""Unit tests for src.models.risk and the /risk/portfolio endpoint."""
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+from src.api.dependencies import get_processed_path
+from src.api.main import app
+from src.data.store import save_asset_parquet
+from src.features.returns import add_return_features
+from src.models.risk import (
+    estimate_covariance,
+    ledoit_wolf_shrinkage,
+    portfolio_risk,
+    returns_matrix,
+    simulate_portfolio,
+)
+
+
+@pytest.fixture
+def returns() -> pd.DataFrame:
+    rng = np.random.default_rng(3)
+    cov = np.array([[4.0, 1.5, 0.5], [1.5, 3.0, 0.8], [0.5, 0.8, 2.0]]) * 1e-4
+    x = rng.multivariate_normal([0.001, 0.0, -0.0005], cov, size=500)
+    return pd.DataFrame(x, columns=["a", "b", "c"])
+
+
+def test_shrinkage_matches_sklearn(returns):
+    sk = pytest.importorskip("sklearn.covariance")
+    cov, intensity = sk.ledoit_wolf(returns.values)
+    assert ledoit_wolf_shrinkage(returns.values) == pytest.approx(intensity)
+    np.testing.assert_allclose(estimate_covariance(returns), cov)
+
+
+def test_var_matches_closed_form_for_single_asset():
+    sigma = 0.02
+    result = simulate_portfolio(np.zeros(1), np.array([[sigma**2]]), {"x": 1.0}, ["x"],
+                                horizon=1, n_paths=200_000, seed=0)
+    report = result.report((0.99,)).iloc[0]
+    expected = -np.expm1(-2.326348 * sigma)
+    assert report["var_99"] == pytest.approx(expected, rel=0.02)
+    assert report["cvar_99"] > report["var_99"]
+
+
+def test_chunking_is_memory_bounded_and_reproducible(returns):
+    kw = dict(weights=np.array([[0.5, 0.3, 0.2], [1.0, 0.0, 0.0]]), horizon=30, n_paths=5_000, seed=1)
+    a = portfolio_risk(returns, chunk_size=333, **kw)
+    b = portfolio_risk(returns, chunk_size=333, **kw)
+    pd.testing.assert_frame_equal(a, b)
+    assert list(a["portfolio"]) == ["portfolio_0", "portfolio_1"]
+    assert (a["max_drawdown_95"] >= 0).all()
+
+
+def test_portfolio_engine_agrees_with_asset_engine(returns):
+    w = {"a": 0.5, "b": 0.3, "c": 0.2}
+    fast = portfolio_risk(returns, w, n_paths=40_000, seed=2).iloc[0]
+    exact = portfolio_risk(returns, w, n_paths=40_000, seed=2, method="asset").iloc[0]
+    assert fast["var_95"] == pytest.approx(exact["var_95"], rel=0.05)
+    assert fast["median_max_drawdown"] == pytest.approx(exact["median_max_drawdown"], rel=0.05)
+
+
+def test_asset_engine_flags_ruin_instead_of_nan():
+    cov = np.array([[0.04**2]])
+    result = simulate_portfolio(np.zeros(1), cov, {"x": 20.0}, ["x"], horizon=30,
+                                n_paths=2_000, method="asset", seed=4)
+    assert np.isfinite(result.terminal_returns).all() and np.isfinite(result.max_drawdowns).all()
+    ruined = result.meta["ruined_paths"][0]
+    assert ruined > 0
+    assert (result.terminal_returns == -1.0).sum() == ruined
+    assert (result.max_drawdowns >= -1.0).all()
+
+
+def test_returns_matrix_rejects_sparse_requested_asset(sample_ohlcv_df):
+    df = add_return_features(sample_ohlcv_df)
+    df = df[~((df["asset"] == "ethereum") & (df["date"] < "2022-05-01"))]
+    with pytest.raises(ValueError):
+        returns_matrix(df, ["bitcoin", "ethereum"], lookback=200)
+    assert list(returns_matrix(df, lookback=200).columns) == ["bitcoin"]
+
+
+def test_risk_endpoint(tmp_path, sample_ohlcv_df):
+    save_asset_parquet(add_return_features(sample_ohlcv_df), tmp_path)
+    app.dependency_overrides[get_processed_path] = lambda: tmp_path
+    try:
+        client = TestClient(app)
+        resp = client.post("/api/v1/risk/portfolio", json={
+            "weights": {"bitcoin": 0.6, "ethereum": 0.4}, "n_paths": 5000, "lookback": 100, "seed": 0,
+        })
+        assert resp.status_code == 200
+        body = resp.json()
+        assert body["observations"] == 100
+        assert {"var_95", "cvar_99", "max_drawdown_99"} <= set(body["metrics"])
+        bad = client.post("/api/v1/risk/portfolio", json={"weights": {"nocoin": 1.0}})
+        assert bad.status_code == 404
+    finally:
+        app.dependency_overrides.clear()
@@ -0,0 +1,104 @@
+"""Unit tests for src.data.segment_log."""
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data.segment_log import SegmentLog
+
+
+def _bars(assets, dates, close):
+    return pd.DataFrame({"asset": assets, "date": pd.to_datetime(dates), "close": close})
+
+
+def _daily(asset, start, n, offset=0.0):
+    dates = pd.date_range(start, periods=n, freq="D")
+    return _bars(asset, dates, np.arange(n) + offset)
+
+
+def test_appends_merge_with_last_write_winning(tmp_path):
+    log = SegmentLog(tmp_path)
+    log.append(_daily("btc", "2024-01-01", 5))
+    log.append(_daily("eth", "2024-01-01", 5))
+    log.append(_bars(["btc"], ["2024-01-03"], [99.0]))  # correction of an earlier bar
+
+    merged = log.read()
+    assert len(merged) == 10
+    assert merged.loc[merged["asset"] == "btc", "close"].tolist() == [0, 1, 99, 3, 4]
+    only = log.read(assets=["btc"], start="2024-01-02", end="2024-01-03", columns=["close"])
+    assert only["close"].tolist() == [1, 99]
+
+
+def test_compaction_keeps_view_and_bounds_rewrites(tmp_path):
+    log = SegmentLog(tmp_path, fanout=4)
+    for i in range(64):
+        log.append(_daily("btc", pd.Timestamp("2024-01-01") + pd.Timedelta(days=i), 1, offset=i))
+        log.compact()
+
+    files = log.segments()
+    assert [f.level for f in files] == [3]
+    assert log.read()["close"].tolist() == list(range(64))
+    # Each row is written once on append and once per level: 1 + 3
+    assert log.rows_compacted == 64 * 3
+    assert log.write_amplification == 4.0
+
+
+def test_full_compaction_and_reopen(tmp_path):
+    log = SegmentLog(tmp_path)
+    for i in range(5):
+        log.append(_daily("btc", "2024-01-01", 3, offset=10 * i))
+    expected = log.read()
+    assert log.compact(full=True) == 5
+    log.compact()  # deletes the replaced segments
+    assert len(list(tmp_path.glob("*.parquet"))) == 1
+
+    reopened = SegmentLog(tmp_path)
+    pd.testing.assert_frame_equal(reopened.read(), expected)
+    reopened.append(_daily("btc", "2024-01-04", 1))
+    assert len(SegmentLog(tmp_path).read()) == 4
+
+
+def test_short_lived_writers_do_not_leak_compacted_files(tmp_path):
+    for i in range(20):  # a fresh instance per append, as a scheduled job would use
+        log = SegmentLog(tmp_path)
+        log.append(_daily("btc", pd.Timestamp("2024-01-01") + pd.Timedelta(days=i), 1, offset=i))
+        log.compact()
+    on_disk = {p.name for p in tmp_path.glob("*.parquet")}
+    assert on_disk == {f.name for f in SegmentLog(tmp_path).segments()}
+    assert len(on_disk) == 6  # two level-1 files + four fresh segments
+    assert SegmentLog(tmp_path).read()["close"].tolist() == list(range(20))
+
+
+def test_compaction_sweeps_stale_orphans(tmp_path):
+    import os
+
+    log = SegmentLog(tmp_path, orphan_grace_seconds=60)
+    log.append(_daily("btc", "2024-01-01", 2))
+    stale, fresh = tmp_path / "seg-stale.parquet", tmp_path / "seg-fresh.parquet"
+    _daily("btc", "2024-01-01", 1).to_parquet(stale)
+    _daily("btc", "2024-01-01", 1).to_parquet(fresh)
+    os.utime(stale, (time.time() - 120, time.time() - 120))
+    log.compact()
+    assert not stale.exists() and fresh.exists()
+    assert len(log.read()) == 2
+
+
+def test_background_compactor(tmp_path):
+    log = SegmentLog(tmp_path, fanout=2)
+    log.start_compactor(interval_seconds=0.01)
+    try:
+        for i in range(4):
+            log.append(_daily("eth", "2024-01-01", 2, offset=i))
+        deadline = time.time() + 5
+        while len(log.segments()) > 1 and time.time() < deadline:
+            time.sleep(0.01)
+    finally:
+        log.stop_compactor()
+    assert len(log.segments()) == 1
+    assert log.read()["close"].tolist() == [3.0, 4.0]
+
+
+def test_append_requires_key_columns(tmp_path):
+    with pytest.raises(KeyError):
+        SegmentLog(tmp_path).append(pd.DataFrame({"close": [1.0]}))
@@ -0,0 +1,145 @@
+"""Unit tests for the pre-forking server in src.api.serve (workers are stubbed)."""
+import os
+import signal
+import socket
+import time
+
+import pytest
+
+from config.settings import get_settings
+from src.api import serve as serve_mod
+
+pytestmark = pytest.mark.skipif(not hasattr(os, "fork"), reason="needs os.fork")
+
+
+GEN = {"current": "v0"}  # data version the master last preloaded; inherited by forks
+
+
+class FakeServer:
+    """Stands in for uvicorn.Server in forked workers: records itself, then idles."""
+
+    marker_dir = None
+    crash = False
+
+    def __init__(self, config) -> None:
+        self.config = config
+
+    def run(self, sockets=None) -> None:
+        if FakeServer.crash:
+            raise RuntimeError("boom")
+        (FakeServer.marker_dir / f"{GEN['current']}-{os.getpid()}").touch()
+        while True:
+            time.sleep(0.05)
+
+
+@pytest.fixture
+def fake_uvicorn(tmp_path, monkeypatch):
+    import uvicorn
+
+    FakeServer.marker_dir, FakeServer.crash = tmp_path, False
+    monkeypatch.setattr(uvicorn, "Server", FakeServer)
+    monkeypatch.setitem(GEN, "current", "v0")
+    return tmp_path
+
+
+def _settings(tmp_path, **update):
+    return get_settings().model_copy(update={
+        "data_processed_dir": tmp_path / "processed",
+        "serve_watch_seconds": 0.3,
+        "serve_graceful_seconds": 1,
+        **update,
+    })
+
+
+def _wait_for(predicate, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.05)
+    return False
+
+
+def _markers(path, gen):
+    return [p for p in path.iterdir() if p.name.startswith(f"{gen}-")]
+
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    return True
+
+
+def test_spawn_runs_worker_and_never_returns(fake_uvicorn):
+    sock = socket.socket()
+    try:
+        pid = serve_mod._spawn(sock, _settings(fake_uvicorn))
+        assert _wait_for(lambda: _markers(fake_uvicorn, "v0"))
+        assert _markers(fake_uvicorn, "v0")[0].name == f"v0-{pid}"
+        serve_mod._stop([pid], timeout=2)
+
+        FakeServer.crash = True
+        pid = serve_mod._spawn(sock, _settings(fake_uvicorn))
+        _, status = os.waitpid(pid, 0)
+        assert os.waitstatus_to_exitcode(status) == 1       # crash exits, does not return
+    finally:
+        sock.close()
+
+
+def test_reload_keeps_current_generation_on_failure(monkeypatch):
+    calls = []
+
+    def flaky(settings):
+        calls.append(1)
+        raise ValueError("half-written parquet")
+
+    monkeypatch.setattr(serve_mod, "preload", flaky)
+    assert serve_mod._reload(get_settings(), "v1") is None
+    monkeypatch.setattr(serve_mod, "preload", lambda settings: "v2")
+    assert serve_mod._reload(get_settings(), "v1") == "v2"
+
+
+def test_serve_survives_failed_reload_and_retries(fake_uvicorn, monkeypatch):
+    import src.data.shared_store as shared_store
+
+    # First preload succeeds, the first reload fails, the retry succeeds
+    outcomes = iter(["v1", RuntimeError("bad snapshot"), "v2"])
+
+    def fake_preload(settings):
+        outcome = next(outcomes, "v2")
+        if isinstance(outcome, Exception):
+            (fake_uvicorn / "reload-failed").touch()
+            raise outcome
+        GEN["current"] = outcome
+        return outcome
+
+    monkeypatch.setattr(serve_mod, "preload", fake_preload)
+    monkeypatch.setattr(shared_store, "store_version", lambda path: "v2")
+    probe = socket.socket()
+    probe.bind(("127.0.0.1", 0))
+    port = probe.getsockname()[1]
+    probe.close()
+
+    pid = os.fork()
+    if pid == 0:
+        code = 0
+        try:
+            serve_mod.serve("127.0.0.1", port, 2, _settings(fake_uvicorn))
+        except BaseException:  # noqa: BLE001
+            code = 1
+        finally:
+            os._exit(code)
+    try:
+        assert _wait_for(lambda: len(_markers(fake_uvicorn, "v1")) == 2)
+        assert _wait_for(lambda: len(_markers(fake_uvicorn, "v2")) == 2)
+        assert (fake_uvicorn / "reload-failed").exists()
+        assert os.waitpid(pid, os.WNOHANG) == (0, 0)        # master still running
+        # The v1 generation is retired only once v2 has been preloaded
+        old = [int(m.name.split("-")[1]) for m in _markers(fake_uvicorn, "v1")]
+        assert _wait_for(lambda: not any(_alive(p) for p in old))
+    finally:
+        os.kill(pid, signal.SIGTERM)
+        _, status = os.waitpid(pid, 0)
+    assert os.waitstatus_to_exitcode(status) == 0
@@ -0,0 +1,56 @@
+"""Unit tests for src.data.shared_store."""
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data import shared_store
+from src.data.shared_store import SharedStore, build_snapshot, store_version
+from src.data.store import save_asset_parquet
+from src.models.risk import load_returns
+
+
+@pytest.fixture
+def store_dir(sample_ohlcv_df, tmp_path):
+    df = sample_ohlcv_df.assign(log_return=np.log(sample_ohlcv_df["close"]).diff())
+    save_asset_parquet(df, tmp_path / "processed")
+    yield tmp_path / "processed"
+    shared_store.install(None)
+
+
+def test_snapshot_matches_store_and_is_read_only(store_dir, tmp_path):
+    path = build_snapshot(store_dir, tmp_path / "snap")
+    store = SharedStore(path)
+    assert store.assets == ["bitcoin", "ethereum"] and store.version == store_version(store_dir)
+
+    expected = pd.read_parquet(store_dir / "ethereum.parquet")
+    frame = store.frame("ethereum", ["close", "volume"])
+    np.testing.assert_array_equal(frame["close"], expected["close"])
+    assert (frame["date"].to_numpy() == expected["date"].to_numpy()).all()
+
+    view = store.column("bitcoin", "close")
+    assert isinstance(view.base, np.memmap) or isinstance(view, np.memmap)
+    with pytest.raises(ValueError):
+        view[0] = 0.0
+    # The same version is reused rather than rebuilt
+    assert build_snapshot(store_dir, tmp_path / "snap") == path
+
+
+def test_new_data_version_gets_a_new_snapshot(store_dir, tmp_path):
+    first = build_snapshot(store_dir, tmp_path / "snap")
+    st = (store_dir / "bitcoin.parquet").stat()
+    os.utime(store_dir / "bitcoin.parquet", ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    second = build_snapshot(store_dir, tmp_path / "snap")
+    assert second != first and second.name == store_version(store_dir)
+
+
+def test_installed_snapshot_serves_readers_of_its_store(store_dir, tmp_path):
+    expected = load_returns(store_dir, ["bitcoin", "ethereum"], lookback=50)
+    shared_store.install(SharedStore(build_snapshot(store_dir, tmp_path / "snap")))
+    assert shared_store.current(tmp_path) is None
+    assert shared_store.current(store_dir) is not None
+
+    for path in store_dir.glob("*.parquet"):
+        path.unlink()  # readers must now be served from the snapshot alone
+    pd.testing.assert_frame_equal(load_returns(store_dir, ["bitcoin", "ethereum"], lookback=50), expected)
@@ -0,0 +1,84 @@
+"""Unit tests for src.models.similarity and the /similar endpoint."""
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from src.api.dependencies import get_processed_path
+from src.api.main import app
+from src.data.store import save_asset_parquet
+from src.models.similarity import SimilarityIndex, refresh_from_store
+
+
+def _znorm(x):
+    return (x - x.mean()) / x.std()
+
+
+@pytest.fixture
+def index(sample_ohlcv_df):
+    series = {a: g.set_index("date")["close"] for a, g in sample_ohlcv_df.groupby("asset")}
+    return SimilarityIndex(series, max_window=60)
+
+
+def test_distance_profile_matches_brute_force(index, sample_ohlcv_df):
+    query = sample_ohlcv_df[sample_ohlcv_df["asset"] == "bitcoin"]["close"].to_numpy()[-20:]
+    profile = index.distance_profile(query)
+    eth = sample_ohlcv_df[sample_ohlcv_df["asset"] == "ethereum"]["close"].to_numpy()
+    brute = [np.linalg.norm(_znorm(query) - _znorm(eth[j:j + 20])) for j in range(len(eth) - 19)]
+    row = profile[index.assets.index("ethereum")]
+    np.testing.assert_allclose(row[:len(brute)], brute, atol=1e-8)
+    assert np.isinf(row[len(brute):]).all()
+
+
+def test_planted_pattern_is_found_and_self_excluded(index):
+    btc = index.series("bitcoin")
+    pattern = np.sin(np.linspace(0, 3 * np.pi, 25)) + 5
+    planted = btc.copy()
+    planted.iloc[50:75] = pattern * 100
+    index.update("ethereum", planted)
+    recent, matches = index.similar_to_recent("ethereum", 25, k=3)
+    assert all(not (m.asset == "ethereum" and m.end >= recent.index[0]) for m in matches)
+
+    top = index.search(pattern, k=1)[0]
+    assert (top.asset, top.start) == ("ethereum", planted.index[50])
+    assert top.distance == pytest.approx(0.0, abs=1e-6)
+
+
+def test_matches_do_not_overlap(index):
+    matches = index.search(index.series("bitcoin").to_numpy()[-30:], k=8)
+    assert len(matches) == 8
+    for asset in ("bitcoin", "ethereum"):
+        starts = sorted(m.start for m in matches if m.asset == asset)
+        assert all((b - a).days >= 15 for a, b in zip(starts, starts[1:]))
+
+
+def test_refresh_swaps_in_copy(tmp_path, sample_ohlcv_df):
+    import os
+
+    save_asset_parquet(sample_ohlcv_df, tmp_path)
+    old = SimilarityIndex.from_store(tmp_path, max_window=60)
+    assert refresh_from_store(old, tmp_path, since=1e12) == (old, 1e12)     # nothing newer
+
+    before = old.series("bitcoin").copy()
+    path = tmp_path / "bitcoin.parquet"
+    shorter = sample_ohlcv_df[sample_ohlcv_df["asset"] == "bitcoin"].iloc[:-10]
+    shorter.to_parquet(path)
+    os.utime(path, (2e9, 2e9))
+    new, newest = refresh_from_store(old, tmp_path, since=1e9)
+    assert new is not old and newest == 2e9
+    assert len(new.series("bitcoin")) == len(before) - 10
+    np.testing.assert_array_equal(old.series("bitcoin"), before)
+
+
+def test_similar_endpoint(tmp_path, sample_ohlcv_df):
+    save_asset_parquet(sample_ohlcv_df, tmp_path)
+    app.dependency_overrides[get_processed_path] = lambda: tmp_path
+    try:
+        client = TestClient(app)
+        resp = client.get("/api/v1/similar", params={"asset": "bitcoin", "window": 30, "k": 5})
+        assert resp.status_code == 200
+        body = resp.json()
+        assert len(body["matches"]) == 5
+        assert body["matches"][0]["distance"] <= body["matches"][-1]["distance"]
+        assert client.get("/api/v1/similar", params={"asset": "nope"}).status_code == 404
+    finally:
+        app.dependency_overrides.clear()
@@ -0,0 +1,102 @@
+"""Unit tests for src.data.ticks."""
+import socket
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data.ticks import CandleBuilder, load_candles, replay_file, replay_socket, run_replay
+
+T0 = 1_700_000_040_000  # 2023-11-14 22:14:00 UTC, on a minute boundary
+
+
+@pytest.fixture
+def ticks() -> pd.DataFrame:
+    """Two assets over three hours, arriving up to 2s out of order."""
+    rng = np.random.default_rng(1)
+    n = 20_000
+    ts = np.sort(rng.integers(0, 3 * 3_600_000, n)) + T0
+    order = np.argsort(ts + rng.integers(0, 2_000, n), kind="stable")
+    return pd.DataFrame({
+        "ts": ts[order],
+        "asset": np.array(["btc", "eth"])[rng.integers(0, 2, n)],
+        "price": 100 + rng.normal(0, 1, n).cumsum()[order],
+        "size": rng.random(n),
+    })
+
+
+def _reference(ticks: pd.DataFrame, freq: str) -> pd.DataFrame:
+    d = ticks.assign(date=pd.to_datetime(ticks["ts"], unit="ms").dt.floor(freq))
+    g = d.sort_values(["asset", "date", "ts"], kind="stable").groupby(["asset", "date"])
+    return pd.DataFrame({
+        "open": g["price"].first(), "high": g["price"].max(), "low": g["price"].min(),
+        "close": g["price"].last(), "volume": g["size"].sum(), "trades": g.size(),
+    }).reset_index()[["date", "asset", "open", "high", "low", "close", "volume", "trades"]]
+
+
+@pytest.mark.parametrize("chunk", [997, 50_000])
+def test_candles_match_batch_aggregation(ticks, chunk):
+    builder = CandleBuilder(allowed_lateness_ms=5_000)
+    for lo in range(0, len(ticks), chunk):
+        builder.ingest_frame(ticks.iloc[lo:lo + chunk])
+    out = builder.close()
+    for interval, freq in [("1m", "1min"), ("5m", "5min"), ("1h", "1h")]:
+        ref = _reference(ticks, freq)
+        pd.testing.assert_frame_equal(out[interval].drop(columns="trades"), ref.drop(columns="trades"),
+                                      check_dtype=False)
+        assert (out[interval]["trades"].to_numpy() == ref["trades"].to_numpy()).all()
+    assert sum(builder.stats.late_dropped.values()) == 0
+
+
+@pytest.mark.parametrize("as_ts", [
+    lambda ms: pd.to_datetime(ms, unit="ms", utc=True),
+    lambda ms: pd.to_datetime(ms, unit="ms").dt.strftime("%Y-%m-%dT%H:%M:%S.%fZ"),
+], ids=["datetime", "iso"])
+def test_datetime_ticks_are_converted_to_milliseconds(ticks, as_ts):
+    sample = ticks.iloc[:2_000]
+    expected = CandleBuilder(["1m"], allowed_lateness_ms=5_000)
+    expected.ingest_frame(sample)
+    builder = CandleBuilder(["1m"], allowed_lateness_ms=5_000)
+    builder.ingest_frame(sample.assign(ts=as_ts(sample["ts"])))
+    pd.testing.assert_frame_equal(builder.close()["1m"], expected.close()["1m"])
+
+
+def test_late_tick_dropped_only_for_closed_intervals():
+    builder = CandleBuilder(["1m", "1h"], allowed_lateness_ms=1_000)
+    builder.ingest("btc", [T0 + 1_000, T0 + 30_000], [10.0, 11.0], [1.0, 1.0])
+    builder.ingest("btc", [T0 + 62_000], [12.0], [1.0])  # watermark passes the first minute
+    builder.ingest("btc", [T0 + 59_000], [99.0], [1.0])  # too late for 1m, fine for 1h
+    out = builder.close()
+    assert builder.stats.late_dropped == {"1m": 1, "1h": 0}
+    assert out["1m"]["high"].tolist() == [11.0, 12.0]
+    assert out["1h"]["high"].tolist() == [99.0]
+    assert out["1h"]["close"].tolist() == [12.0]  # close follows tick time, not arrival
+
+
+def test_flush_to_store_and_file_replay(tmp_path, ticks):
+    source = tmp_path / "ticks.parquet"
+    ticks.to_parquet(source, index=False)
+    builder = CandleBuilder(["1m", "1h"], store_dir=tmp_path, flush_rows=100)
+    run_replay(builder, replay_file(source, chunk_size=3_000))
+    stored = load_candles(tmp_path, "1h", asset="eth")
+    ref = _reference(ticks, "1h").query("asset == 'eth'")
+    assert len(list((tmp_path / "candles" / "1m").glob("seg-*.parquet"))) > 1
+    np.testing.assert_allclose(stored["close"], ref["close"])
+
+
+def test_socket_replay(ticks):
+    server = socket.create_server(("127.0.0.1", 0))
+    port = server.getsockname()[1]
+    payload = "".join(f"{r.ts},{r.asset},{r.price},{r.size}\n" for r in ticks.head(500).itertuples())
+
+    def serve():
+        conn, _ = server.accept()
+        with conn:
+            conn.sendall(payload.encode())
+        server.close()
+
+    threading.Thread(target=serve, daemon=True).start()
+    builder = CandleBuilder(["1m"])
+    stats = run_replay(builder, replay_socket("127.0.0.1", port, chunk_size=100))
+    assert stats.ticks == 500
@@ -49,6 +49,11 @@ class Settings(BaseSettings):
     train_test_ratio: float   = 0.80
     cv_folds: int             = 5
 
+    # ── Model Serving (src/models/serving.py) ─────────────────────────────────
+    serving_regions: list[str]  = []     # preloaded at startup; empty = every region with artifacts
+    model_reload_seconds: int   = 60     # how often artifacts / data are checked for changes
+    arima_window_hours: int     = 8760   # trailing hours ARIMA is estimated / filtered on (0 = all)
+
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
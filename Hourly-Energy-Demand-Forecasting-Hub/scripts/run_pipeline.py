@@ -1,7 +1,7 @@
 """
 scripts/run_pipeline.py
 =======================
-Full data pipeline: load → clean → store parquet for all PJM regions.
+Full data pipeline: load → clean → store parquet → feature cache for all PJM regions.
 
 Usage
 -----
@@ -23,6 +23,7 @@ sys.path.insert(0, str(Path(__file__).parents[1]))
 from src.data.load import load_region, list_regions
 from src.data.clean import basic_clean
 from src.data.store import save_parquet
+from src.features.cache import load_features
 
 logging.basicConfig(
     level=logging.INFO,
@@ -40,6 +41,7 @@ def process_region(region: str) -> bool:
         df = load_region(region)
         df = basic_clean(df, region=region)
         path = save_parquet(df, region)
+        load_features(region, df)
         elapsed = time.perf_counter() - t0
         log.info(
             "✅  %s — %d records  (%.1f s)  → %s",
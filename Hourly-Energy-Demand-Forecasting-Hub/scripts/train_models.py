@@ -0,0 +1,169 @@
+"""
+scripts/train_models.py
+=======================
+Scheduled training job: fit the serving models and write their artifacts to
+models/{REGION}/ for the API (src/models/serving.py) to pick up.
+
+    xgboost.json          recursive XGBoost on recursive_frame() features, early-stopped on a
+                          validation tail of the training span
+    arima_params.json     ARIMA(1,1,1) parameters on the trailing ARIMA_WINDOW_HOURS, warm-started
+                          from the previous run (served by filtering, never refit per request)
+    serving_metrics.json  hold-out MAE / RMSE / MAPE per model (XGBoost: recursive forecasts
+                          over the served horizon, as the API issues them)
+
+The running API notices the new files within MODEL_RELOAD_SECONDS.
+
+Usage
+-----
+    python scripts/train_models.py                              # all processed regions
+    python scripts/train_models.py --region AEP PJME --models arima
+    python scripts/train_models.py --every 24                   # retrain every 24 h
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from pathlib import Path
+
+# Allow running from project root
+sys.path.insert(0, str(Path(__file__).parents[1]))
+
+from config.settings import settings
+from src.data.store import list_processed_regions, load_parquet
+from src.models.evaluate import compute_metrics
+from src.models.serving import ARTIFACTS, MAX_HORIZON, METRICS_FILE
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s  %(levelname)-8s  %(message)s",
+    datefmt="%H:%M:%S",
+)
+log = logging.getLogger(__name__)
+
+MODELS = ("xgboost", "arima")
+
+
+def _metrics_dict(m) -> dict:
+    return {"mae": m.mae, "rmse": m.rmse, "mape": m.mape, "n_test": m.n_test}
+
+
+def _recursive_holdout(model, series, test_index, steps: int = MAX_HORIZON):
+    """Forecasts issued every *steps* hours across *test_index*, each from the hours before it."""
+    import pandas as pd
+    from src.models.recursive import LAG_BUFFER
+
+    histories = {str(t): series.loc[:t].iloc[-LAG_BUFFER - 1:-1] for t in test_index[::steps]}
+    pred = pd.concat(model.forecast_many(histories, steps).values())
+    return pred[pred.index.isin(test_index)]    # the last window may run past the test end
+
+
+def train_xgboost(region: str, df, out_dir: Path) -> dict:
+    from src.features.cache import load_features
+    from src.models.recursive import recursive_frame
+    from src.models.xgboost_model import XGBoostForecaster
+
+    frame = recursive_frame(load_features(region, df))
+    split = int(len(frame) * settings.train_test_ratio)
+    train, test = frame.iloc[:split], frame.iloc[split:]
+    # Early stopping watches the tail of the training span; the test span stays unseen
+    fit_end = int(len(train) * settings.train_test_ratio)
+
+    probe   = XGBoostForecaster().fit(train.iloc[:fit_end], val_df=train.iloc[fit_end:])
+    n_trees = probe.best_iteration
+
+    def served_config() -> XGBoostForecaster:
+        return XGBoostForecaster(n_estimators=n_trees + 1) if n_trees is not None else XGBoostForecaster()
+
+    # Score the configuration that is served: same trees, fitted on everything before the test span
+    holdout = served_config().fit(train)
+    pred    = _recursive_holdout(holdout, df["MW"], test.index)
+    metrics = compute_metrics(df["MW"].reindex(pred.index), pred, "XGBoost")
+    # Refit on everything with the early-stopped number of trees
+    served_config().fit(frame).save(out_dir / ARTIFACTS["xgboost"])
+    return _metrics_dict(metrics)
+
+
+def _previous_params(path: Path, order: tuple) -> dict | None:
+    """Parameters from the last run, if it used the same order (warm start)."""
+    if not path.exists():
+        return None
+    meta = json.loads(path.read_text())
+    return meta["params"] if tuple(meta["order"]) == order else None
+
+
+def train_arima(region: str, df, out_dir: Path) -> dict:
+    from src.models.arima_model import ARIMAForecaster
+
+    order  = (1, 1, 1)
+    window = settings.arima_window_hours or None
+    path   = out_dir / ARTIFACTS["arima"]
+    series = df["MW"]
+    split  = int(len(series) * settings.train_test_ratio)
+    train, test = series.iloc[:split], series.iloc[split:]
+
+    warm    = _previous_params(path, order)
+    holdout = ARIMAForecaster(order=order, window=window).fit(train, start_params=warm)
+    metrics = compute_metrics(test, holdout.predict(test.index[0], test.index[-1]), "ARIMA")
+    # Re-estimate on the latest window, starting from the hold-out estimate
+    final = ARIMAForecaster(order=order, window=window).fit(series, start_params=holdout.params)
+    final.save_params(path, train_end=str(series.index[-1]))
+    return _metrics_dict(metrics)
+
+
+TRAINERS = {"xgboost": train_xgboost, "arima": train_arima}
+
+
+def _update_metrics(out_dir: Path, new: dict) -> None:
+    path = out_dir / METRICS_FILE
+    metrics = json.loads(path.read_text()) if path.exists() else {}
+    metrics.update(new)
+    tmp = path.with_name(f".{path.name}.tmp")
+    tmp.write_text(json.dumps(metrics, indent=2))
+    os.replace(tmp, path)
+
+
+def train_region(region: str, models: list[str]) -> bool:
+    """Train *models* for *region*; returns True if all succeeded."""
+    df      = load_parquet(region)
+    out_dir = settings.models_dir / region
+    out_dir.mkdir(parents=True, exist_ok=True)
+    ok, metrics = True, {}
+    for name in models:
+        t0 = time.perf_counter()
+        try:
+            metrics[name] = TRAINERS[name](region, df, out_dir)
+            log.info("✅  %s %s — MAPE %.2f%%  (%.1f s)", region, name, metrics[name]["mape"], time.perf_counter() - t0)
+        except Exception as e:
+            ok = False
+            log.error("❌  %s %s failed: %s", region, name, e)
+    if metrics:
+        _update_metrics(out_dir, metrics)
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PJM Energy Demand — train serving models")
+    parser.add_argument("--region", nargs="*", default=None, help="Region(s). Default: all processed.")
+    parser.add_argument("--models", nargs="*", default=list(MODELS), choices=MODELS)
+    parser.add_argument("--every", type=float, default=None, help="Repeat every N hours.")
+    args = parser.parse_args()
+
+    while True:
+        regions = [r.upper() for r in args.region] if args.region else list_processed_regions()
+        log.info("=== Training %s for %s ===", args.models, regions)
+        results = {r: train_region(r, args.models) for r in regions}
+        failed = [r for r, ok in results.items() if not ok]
+        if failed:
+            log.error("Failed regions: %s", failed)
+        if not args.every:
+            sys.exit(0 if not failed else 1)
+        log.info("Next run in %.1f h", args.every)
+        time.sleep(args.every * 3600)
+
+
+if __name__ == "__main__":
+    main()
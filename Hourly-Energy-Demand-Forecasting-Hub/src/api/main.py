@@ -12,6 +12,9 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import RedirectResponse
 
+from config.settings import settings
+from src.models.serving import get_model_store
+
 from .routers import health, history, predict
 
 logger = logging.getLogger(__name__)
@@ -19,6 +22,8 @@ logger = logging.getLogger(__name__)
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     logger.info("⚡ Energy Forecasting API starting up…")
+    loaded = get_model_store().load(settings.serving_regions or None)
+    logger.info("Serving models for regions: %s", loaded or "none (run scripts/train_models.py)")
     yield
     logger.info("⚡ Energy Forecasting API shutting down.")
 
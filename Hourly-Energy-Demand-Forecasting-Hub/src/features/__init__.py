@@ -1,8 +1,10 @@
 # src/features/__init__.py
-from .time_features import add_time_features, select_feature_columns
+from .time_features import add_time_features, calendar_features, holiday_dates, select_feature_columns
+from .cache import load_features
 from .stationarity import adf_test, kpss_test, make_stationary
 
 __all__ = [
-    "add_time_features", "select_feature_columns",
+    "add_time_features", "calendar_features", "holiday_dates", "select_feature_columns",
+    "load_features",
     "adf_test", "kpss_test", "make_stationary",
 ]
@@ -0,0 +1,124 @@
+"""
+src/features/cache.py
+=====================
+Per-region cache of add_time_features() output.
+
+Feature frames are stored as compact Parquet (features as float32, the MW
+target kept in float64) under datasets/interim/features/{REGION}.parquet.
+Every feature looks back at most ``CONTEXT_HOURS`` hours, so appending hours
+never changes rows that are already cached. When the region's series has
+grown, only the new rows are computed, from a trailing context window, and
+appended. Any other change (revised history, new feature version) triggers a
+full rebuild.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import uuid
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from .time_features import SEASONS, add_time_features
+
+logger = logging.getLogger(__name__)
+
+_THIS_FILE    = Path(__file__).resolve()
+_PROJECT_ROOT = _THIS_FILE.parents[2]
+_FEATURES     = _PROJECT_ROOT / "datasets" / "interim" / "features"
+
+FEATURE_VERSION = "2"        # bump whenever add_time_features() changes
+CONTEXT_HOURS   = 8760       # longest look-back in add_time_features (lag_8760)
+_META_KEY       = b"feature_version"
+
+
+def feature_path(region: str, cache_dir: Optional[Path] = None) -> Path:
+    """Path of the cached feature frame for *region*."""
+    return (cache_dir or _FEATURES) / f"{region.upper()}.parquet"
+
+
+def compact_features(df: pd.DataFrame, target_col: str = "MW") -> pd.DataFrame:
+    """Cast feature columns to float32 and ``season`` to a categorical."""
+    out = df.astype({c: np.float32 for c in df.columns
+                     if c != target_col and pd.api.types.is_numeric_dtype(df[c])})
+    if "season" in out:
+        out["season"] = pd.Categorical(out["season"], categories=SEASONS)
+    return out
+
+
+def _read(path: Path) -> Optional[pd.DataFrame]:
+    if not path.exists():
+        return None
+    table = pq.read_table(path)
+    if (table.schema.metadata or {}).get(_META_KEY) != FEATURE_VERSION.encode():
+        logger.info("Feature cache %s is from another feature version — rebuilding.", path.name)
+        return None
+    return table.to_pandas()
+
+
+def _write(df: pd.DataFrame, path: Path) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    table = pa.Table.from_pandas(df, preserve_index=True)
+    table = table.replace_schema_metadata({**(table.schema.metadata or {}), _META_KEY: FEATURE_VERSION.encode()})
+    tmp = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+    pq.write_table(table, tmp, compression="zstd")
+    os.replace(tmp, path)
+
+
+def _is_prefix(cached: pd.DataFrame, df: pd.DataFrame, target_col: str) -> bool:
+    n = len(cached)
+    return (
+        n <= len(df)
+        and cached.index.equals(df.index[:n])
+        and np.array_equal(cached[target_col].to_numpy(), df[target_col].to_numpy()[:n], equal_nan=True)
+    )
+
+
+def load_features(
+    region: str,
+    df: Optional[pd.DataFrame] = None,
+    cache_dir: Optional[Path] = None,
+    processed_dir: Optional[Path] = None,
+    target_col: str = "MW",
+) -> pd.DataFrame:
+    """
+    Return the feature frame for *region*, extending or rebuilding the cache as needed.
+
+    Parameters
+    ----------
+    region        : str        Region key (e.g. 'AEP').
+    df            : DataFrame  Current hourly series (default: the processed parquet).
+    cache_dir     : Path       Override the feature cache directory.
+    processed_dir : Path       Override the processed directory (when *df* is None).
+    target_col    : str        Target column (kept in float64).
+
+    Returns
+    -------
+    pd.DataFrame  Same columns as add_time_features(df), compacted.
+    """
+    if df is None:
+        from src.data.store import load_parquet
+        df = load_parquet(region, processed_dir=processed_dir)
+
+    path   = feature_path(region, cache_dir)
+    cached = _read(path)
+
+    if cached is not None and _is_prefix(cached, df, target_col):
+        n_new = len(df) - len(cached)
+        if n_new == 0:
+            return cached
+        start   = max(len(cached) - CONTEXT_HOURS, 0)
+        new     = compact_features(add_time_features(df.iloc[start:]), target_col).iloc[-n_new:]
+        feat    = pd.concat([cached, new])
+        logger.info("Feature cache %s: appended %d hours.", region.upper(), n_new)
+    else:
+        feat = compact_features(add_time_features(df), target_col)
+        logger.info("Feature cache %s: rebuilt %d hours.", region.upper(), len(feat))
+
+    _write(feat, path)
+    return feat
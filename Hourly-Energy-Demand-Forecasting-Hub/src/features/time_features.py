@@ -7,19 +7,99 @@ Generates 31+ features including temporal, lag, rolling, and calendar features.
 from __future__ import annotations
 
 import logging
+from functools import lru_cache
 
 import numpy as np
 import pandas as pd
+from pandas.tseries.holiday import Holiday, USFederalHolidayCalendar
 
 logger = logging.getLogger(__name__)
 
-# US Federal Holidays (approximate — common peak/trough days)
-_US_HOLIDAYS = {
-    (1, 1):   "New Year's Day",
-    (7, 4):   "Independence Day",
-    (12, 25): "Christmas Day",
-    (11, 11): "Veterans Day",
-}
+SEASONS = ["Winter", "Spring", "Summer", "Fall"]
+
+# Fixed-date federal holidays whose observed day moves off a weekend.
+# Demand is low on both days, so both are flagged.
+_FIXED_HOLIDAYS = [
+    Holiday("New Year's Day",   month=1,  day=1),
+    Holiday("Juneteenth",       month=6,  day=19, start_date="2021-06-19"),
+    Holiday("Independence Day", month=7,  day=4),
+    Holiday("Veterans Day",     month=11, day=11),
+    Holiday("Christmas Day",    month=12, day=25),
+]
+
+
+@lru_cache(maxsize=32)
+def _holiday_days(first_year: int, last_year: int) -> np.ndarray:
+    start = pd.Timestamp(first_year, 1, 1) - pd.Timedelta(days=7)
+    end   = pd.Timestamp(last_year, 12, 31) + pd.Timedelta(days=7)
+    observed = USFederalHolidayCalendar().holidays(start, end)   # incl. MLK, Memorial, Labor, Thanksgiving…
+    actual   = [h.dates(start, end) for h in _FIXED_HOLIDAYS]
+    days = observed.append(actual).unique().sort_values()
+    return days.to_numpy("datetime64[D]").astype(np.int64)
+
+
+def holiday_dates(start, end) -> pd.DatetimeIndex:
+    """US federal holidays between *start* and *end* (observed days plus fixed actual dates)."""
+    start, end = pd.Timestamp(start), pd.Timestamp(end)
+    days = pd.DatetimeIndex(_holiday_days(start.year, end.year).astype("datetime64[D]"))
+    return days[(days >= start.normalize()) & (days <= end)]
+
+
+def calendar_features(index: pd.DatetimeIndex) -> pd.DataFrame:
+    """
+    Vectorised calendar block of :func:`add_time_features` for *index*.
+
+    Every column is derived from the integer day / hour of each timestamp with
+    array arithmetic. ``is_holiday`` comes from the rule-based US federal
+    calendar: moving holidays (MLK Day, Memorial Day, Labor Day,
+    Thanksgiving…), observed weekdays of fixed ones, and the fixed dates
+    themselves.
+    """
+    idx   = pd.DatetimeIndex(index)
+    day   = idx.to_numpy("datetime64[D]")
+    hour  = idx.hour.to_numpy()
+    dow   = idx.dayofweek.to_numpy()          # 0=Mon … 6=Sun
+    month = idx.month.to_numpy()
+
+    season_num = (month % 12) // 3            # Dec–Feb=0 … Sep–Nov=3
+    is_weekend = (dow >= 5).astype(np.int64)
+    if len(idx):
+        holidays = _holiday_days(int(idx.year.min()), int(idx.year.max()))
+        is_holiday = np.isin(day.astype(np.int64), holidays).astype(np.int64)
+    else:
+        is_holiday = np.zeros(0, dtype=np.int64)
+
+    return pd.DataFrame(
+        {
+            # ── Basic calendar ────────────────────────────────────────────────
+            "hour":         hour,
+            "day_of_week":  dow,
+            "day_of_month": idx.day.to_numpy(),
+            "day_of_year":  idx.dayofyear.to_numpy(),
+            "week":         idx.isocalendar().week.to_numpy(dtype=np.int64),
+            "month":        month,
+            "quarter":      idx.quarter.to_numpy(),
+            "year":         idx.year.to_numpy(),
+            # ── Season (meteorological) ───────────────────────────────────────
+            "season":       np.asarray(SEASONS, dtype=object)[season_num],
+            "season_num":   season_num.astype(np.int64),
+            # ── Binary flags ──────────────────────────────────────────────────
+            "is_weekend":   is_weekend,
+            "is_weekday":   1 - is_weekend,
+            "is_holiday":   is_holiday,
+            "is_business_hour": ((hour >= 8) & (hour <= 18) & (dow < 5)).astype(np.int64),
+            "is_peak_hour": ((hour >= 12) & (hour <= 20)).astype(np.int64),
+            "is_night":     ((hour >= 22) | (hour <= 6)).astype(np.int64),
+            # ── Cyclical encoding (sin/cos) ───────────────────────────────────
+            "hour_sin":     np.sin(2 * np.pi * hour  / 24),
+            "hour_cos":     np.cos(2 * np.pi * hour  / 24),
+            "month_sin":    np.sin(2 * np.pi * month / 12),
+            "month_cos":    np.cos(2 * np.pi * month / 12),
+            "dow_sin":      np.sin(2 * np.pi * dow   / 7),
+            "dow_cos":      np.cos(2 * np.pi * dow   / 7),
+        },
+        index=index,
+    )
 
 
 def add_time_features(df: pd.DataFrame) -> pd.DataFrame:
@@ -34,44 +114,7 @@ def add_time_features(df: pd.DataFrame) -> pd.DataFrame:
     ------
     pd.DataFrame with all original columns plus engineered features.
     """
-    df = df.copy()
-    idx = df.index
-
-    # ── Basic calendar ────────────────────────────────────────────────────────
-    df["hour"]         = idx.hour
-    df["day_of_week"]  = idx.dayofweek          # 0=Mon … 6=Sun
-    df["day_of_month"] = idx.day
-    df["day_of_year"]  = idx.dayofyear
-    df["week"]         = idx.isocalendar().week.astype(int)
-    df["month"]        = idx.month
-    df["quarter"]      = idx.quarter
-    df["year"]         = idx.year
-
-    # ── Season (meteorological) ───────────────────────────────────────────────
-    season_map = {12: "Winter", 1: "Winter", 2: "Winter",
-                  3: "Spring", 4: "Spring", 5: "Spring",
-                  6: "Summer", 7: "Summer", 8: "Summer",
-                  9: "Fall",   10: "Fall",  11: "Fall"}
-    df["season"]       = df["month"].map(season_map)
-    df["season_num"]   = df["season"].map({"Winter": 0, "Spring": 1, "Summer": 2, "Fall": 3})
-
-    # ── Binary flags ──────────────────────────────────────────────────────────
-    df["is_weekend"]   = (df["day_of_week"] >= 5).astype(int)
-    df["is_weekday"]   = 1 - df["is_weekend"]
-    df["is_holiday"]   = df.apply(
-        lambda r: int((r["month"], r["day_of_month"]) in _US_HOLIDAYS), axis=1
-    )
-    df["is_business_hour"] = ((df["hour"] >= 8) & (df["hour"] <= 18) & df["is_weekday"].astype(bool)).astype(int)
-    df["is_peak_hour"] = ((df["hour"] >= 12) & (df["hour"] <= 20)).astype(int)
-    df["is_night"]     = ((df["hour"] >= 22) | (df["hour"] <= 6)).astype(int)
-
-    # ── Cyclical encoding (sin/cos) ───────────────────────────────────────────
-    df["hour_sin"]     = np.sin(2 * np.pi * df["hour"]       / 24)
-    df["hour_cos"]     = np.cos(2 * np.pi * df["hour"]       / 24)
-    df["month_sin"]    = np.sin(2 * np.pi * df["month"]      / 12)
-    df["month_cos"]    = np.cos(2 * np.pi * df["month"]      / 12)
-    df["dow_sin"]      = np.sin(2 * np.pi * df["day_of_week"] / 7)
-    df["dow_cos"]      = np.cos(2 * np.pi * df["day_of_week"] / 7)
+    df = pd.concat([df, calendar_features(df.index)], axis=1)
 
     # ── Lag features ─────────────────────────────────────────────────────────
     df["lag_1"]        = df["MW"].shift(1)      # 1 hour ago
@@ -1,8 +1,8 @@
 # src/models/__init__.py
 from .arima_model import ARIMAForecaster, ARIMAResult
-from .evaluate import compute_metrics, rolling_cross_validate, compare_models, MetricsResult
+from .evaluate import compute_metrics, rolling_cross_validate, compare_models, MetricsResult, FoldResult
 
 __all__ = [
     "ARIMAForecaster", "ARIMAResult",
-    "compute_metrics", "rolling_cross_validate", "compare_models", "MetricsResult",
+    "compute_metrics", "rolling_cross_validate", "compare_models", "MetricsResult", "FoldResult",
 ]
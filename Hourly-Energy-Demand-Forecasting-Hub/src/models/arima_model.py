@@ -5,17 +5,30 @@ ARIMA / SARIMA forecaster for hourly energy demand.
 """
 from __future__ import annotations
 
+import copy
+import json
 import logging
+import os
 import warnings
 from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
 from typing import Optional
 
 import pandas as pd
+from statsmodels.tsa.statespace import kalman_filter as kf
 from statsmodels.tsa.statespace.sarimax import SARIMAX
 
 logger = logging.getLogger(__name__)
 warnings.filterwarnings("ignore")
 
+# Keep only what forecast() and update() need (predicted state and one-step
+# forecasts); drops the filtered / smoothed / gain arrays
+_SERVING_MEMORY = (
+    kf.MEMORY_NO_FILTERED | kf.MEMORY_NO_GAIN
+    | kf.MEMORY_NO_SMOOTHING | kf.MEMORY_NO_LIKELIHOOD | kf.MEMORY_NO_STD_FORECAST
+)
+
 
 @dataclass
 class ARIMAResult:
@@ -38,6 +51,11 @@ class ARIMAForecaster:
 
     For short hourly horizons, use ARIMA(5,1,0) or ARIMA(1,1,1).
     For daily-seasonal patterns, use SARIMA with s=24.
+
+    *window* limits fit() and apply() to the trailing *window* hours of the
+    series. Parameters of a low-order model settle well within a year of
+    hourly data, and the filter forgets its diffuse start after a few days,
+    so forecasts match a full-history run at a fraction of the cost.
     """
 
     def __init__(
@@ -45,13 +63,27 @@ class ARIMAForecaster:
         order: tuple = (1, 1, 1),
         seasonal_order: tuple = (0, 0, 0, 0),
         trend: str = "n",
+        window: Optional[int] = None,
     ):
         self.order         = order
         self.seasonal_order = seasonal_order
         self.trend         = trend
+        self.window        = window
+        self.meta: dict    = {}
+        self.last_timestamp: Optional[pd.Timestamp] = None
         self._fit_result   = None
 
-    def fit(self, train: pd.Series) -> "ARIMAForecaster":
+    def _tail(self, series: pd.Series) -> pd.Series:
+        return series.iloc[-self.window:] if self.window else series
+
+    def fit(self, train: pd.Series, start_params=None) -> "ARIMAForecaster":
+        """
+        Estimate parameters on (the trailing window of) *train*.
+
+        *start_params* — e.g. the previous run's ``params`` — warm-starts the
+        optimiser, which then usually converges in a few iterations.
+        """
+        train = self._tail(train)
         model = SARIMAX(
             train,
             order=self.order,
@@ -60,14 +92,102 @@ class ARIMAForecaster:
             enforce_stationarity=True,
             enforce_invertibility=True,
         )
-        self._fit_result = model.fit(disp=False)
+        if start_params is not None:
+            start_params = pd.Series(start_params)[model.param_names].to_numpy()
+        self._fit_result = model.fit(start_params=start_params, disp=False)
+        self.last_timestamp = train.index[-1]
         logger.info(
-            "ARIMA%s%s fitted — AIC=%.2f  BIC=%.2f",
-            self.order, self.seasonal_order,
+            "ARIMA%s%s fitted on %d obs — AIC=%.2f  BIC=%.2f",
+            self.order, self.seasonal_order, len(train),
             self._fit_result.aic, self._fit_result.bic,
         )
         return self
 
+    def apply(self, series: pd.Series, params) -> "ARIMAForecaster":
+        """
+        Run the Kalman filter over *series* with fixed *params* — no estimation.
+
+        Used to serve stored parameters: forecast() works afterwards exactly as
+        after fit(), at the cost of one filter pass instead of an optimisation.
+        """
+        series = self._tail(series)
+        model = SARIMAX(
+            series,
+            order=self.order,
+            seasonal_order=self.seasonal_order,
+            trend=self.trend,
+            enforce_stationarity=True,
+            enforce_invertibility=True,
+        )
+        self._fit_result = model.filter(
+            pd.Series(params)[model.param_names].to_numpy(), conserve_memory=_SERVING_MEMORY,
+        )
+        self.last_timestamp = series.index[-1]
+        return self
+
+    def update(self, series: pd.Series) -> "ARIMAForecaster":
+        """
+        Return a copy advanced over the hours of *series* after ``last_timestamp``.
+
+        Parameters stay fixed and only the new hours are filtered, so keeping a
+        served model current costs milliseconds. This instance is not modified
+        and can keep answering forecasts meanwhile. *series* may be the full
+        history; earlier hours are ignored. Raises ValueError if the new hours
+        do not continue the filtered ones.
+        """
+        if self._fit_result is None:
+            raise RuntimeError("Model not fitted. Call fit() first.")
+        new = series[series.index > self.last_timestamp]
+        if new.empty:
+            return self
+        expected = self.last_timestamp + pd.Timedelta(hours=1)
+        if new.index[0] != expected:
+            raise ValueError(f"New data starts at {new.index[0]}, expected {expected}.")
+        advanced = copy.copy(self)
+        advanced._fit_result = self._fit_result.extend(new)
+        advanced.last_timestamp = new.index[-1]
+        logger.debug("ARIMA filter advanced %d hours to %s", len(new), advanced.last_timestamp)
+        return advanced
+
+    @property
+    def params(self) -> pd.Series:
+        if self._fit_result is None:
+            raise RuntimeError("Model not fitted. Call fit() first.")
+        return pd.Series(self._fit_result.params, index=self._fit_result.model.param_names)
+
+    def save_params(self, path: Path, **extra) -> Path:
+        """Write order, fitted parameters and *extra* metadata to a JSON file."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        payload = {
+            "order":          list(self.order),
+            "seasonal_order": list(self.seasonal_order),
+            "trend":          self.trend,
+            "window":         self.window,
+            "params":         self.params.to_dict(),
+            "nobs":           int(self._fit_result.nobs),
+            "fitted_at":      datetime.utcnow().isoformat(timespec="seconds"),
+            **extra,
+        }
+        tmp = path.with_name(f".{path.name}.tmp")
+        tmp.write_text(json.dumps(payload, indent=2))
+        os.replace(tmp, path)
+        logger.info("ARIMA parameters saved → %s", path)
+        return path
+
+    @classmethod
+    def from_params(cls, path: Path, series: pd.Series) -> "ARIMAForecaster":
+        """Rebuild a forecaster from save_params() output, filtered over *series*."""
+        meta = json.loads(Path(path).read_text())
+        model = cls(
+            order=tuple(meta["order"]),
+            seasonal_order=tuple(meta["seasonal_order"]),
+            trend=meta.get("trend", "n"),
+            window=meta.get("window"),
+        )
+        model.meta = meta
+        return model.apply(series, meta["params"])
+
     def predict(self, start, end) -> pd.Series:
         if self._fit_result is None:
             raise RuntimeError("Model not fitted. Call fit() first.")
@@ -6,8 +6,12 @@ Model evaluation: MAE, RMSE, MAPE, and rolling cross-validation.
 from __future__ import annotations
 
 import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
-from typing import Callable
+from multiprocessing import shared_memory
+from typing import Callable, Optional
 
 import numpy as np
 import pandas as pd
@@ -54,31 +58,144 @@ def compute_metrics(
     return result
 
 
+@dataclass
+class FoldResult:
+    """Outcome of one cross-validation fold — metrics or the error that stopped it."""
+
+    fold: int
+    train_size: int
+    test_start: str
+    test_end: str
+    fit_seconds: float = 0.0
+    predict_seconds: float = 0.0
+    metrics: Optional[MetricsResult] = None
+    error: Optional[str] = None
+    params: Optional[dict] = None       # fitted parameters, if the model exposes .params
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def to_dict(self) -> dict:
+        out = {
+            "fold":            self.fold,
+            "train_size":      self.train_size,
+            "test_start":      self.test_start,
+            "test_end":        self.test_end,
+            "fit_seconds":     round(self.fit_seconds, 3),
+            "predict_seconds": round(self.predict_seconds, 3),
+            "error":           self.error,
+        }
+        if self.metrics is not None:
+            out.update({k: v for k, v in self.metrics.to_dict().items() if k != "model"})
+        return out
+
+
+# ── Shared-memory fold workers ────────────────────────────────────────────────
+# The series is copied into shared memory once; each worker attaches in its
+# initializer and rebuilds a zero-copy Series, so a task carries only fold
+# bounds and warm-start parameters.
+
+_SHARED: dict = {}
+
+
+def _share(series: pd.Series) -> tuple[shared_memory.SharedMemory, tuple]:
+    values = series.to_numpy(dtype=np.float64)
+    stamps = series.index.to_numpy()
+    shm = shared_memory.SharedMemory(create=True, size=max(values.nbytes + stamps.nbytes, 1))
+    np.ndarray(values.shape, np.float64, shm.buf)[:] = values
+    np.ndarray(stamps.shape, stamps.dtype, shm.buf, offset=values.nbytes)[:] = stamps
+    return shm, (shm.name, len(values), stamps.dtype.str, series.index.freqstr, series.name)
+
+
+def _attach(name: str, n: int, index_dtype: str, freq: Optional[str], series_name) -> None:
+    shm = shared_memory.SharedMemory(name=name)
+    values = np.ndarray((n,), np.float64, shm.buf)
+    stamps = np.ndarray((n,), np.dtype(index_dtype), shm.buf, offset=values.nbytes)
+    _SHARED["shm"] = shm                                # keep the mapping alive
+    _SHARED["series"] = pd.Series(
+        values, index=pd.DatetimeIndex(stamps, freq=freq), name=series_name, copy=False,
+    )
+
+
+def _run_fold(
+    model_factory: Callable,
+    fold: int,
+    bounds: tuple[int, int, int],
+    start_params: Optional[dict] = None,
+    series: Optional[pd.Series] = None,
+) -> FoldResult:
+    series = _SHARED["series"] if series is None else series
+    train_end, test_start, test_end = bounds
+    train = series.iloc[:train_end]
+    test  = series.iloc[test_start:test_end]
+    result = FoldResult(
+        fold=fold, train_size=len(train),
+        test_start=str(test.index[0]), test_end=str(test.index[-1]),
+    )
+    try:
+        t0 = time.perf_counter()
+        if start_params is not None:
+            model = model_factory(train, start_params=start_params)
+        else:
+            model = model_factory(train)
+        t1 = time.perf_counter()
+        preds  = model.forecast(steps=len(test))
+        pred_s = preds.forecast if hasattr(preds, "forecast") else preds
+        pred_s = pd.Series(np.asarray(pred_s, dtype=float), index=test.index)
+        result.predict_seconds = time.perf_counter() - t1
+        result.fit_seconds = t1 - t0
+        result.metrics = compute_metrics(test, pred_s, model_name=f"fold_{fold}")
+        params = getattr(model, "params", None)
+        result.params = None if params is None else {k: float(v) for k, v in dict(params).items()}
+    except Exception as e:  # noqa: BLE001 — reported per fold, not raised
+        result.error = f"{type(e).__name__}: {e}"
+        logger.error("Fold %d failed: %s", fold, result.error)
+    return result
+
+
 def rolling_cross_validate(
     series: pd.Series,
     model_factory: Callable,
-    n_folds: int = 5,
+    n_folds: Optional[int] = None,
     test_size: int = 24 * 7,   # 1 week of hourly data
     min_train_size: int = 24 * 90,  # at least 90 days
+    n_jobs: Optional[int] = None,
+    warm_start: bool = False,
 ) -> dict:
     """
     Rolling window cross-validation for hourly time series.
 
+    Folds run in a process pool over one shared-memory copy of *series*, so
+    wall time is close to the slowest fold rather than the sum of all folds.
+
     Parameters
     ----------
     series         : pd.Series  Full hourly energy series.
-    model_factory  : Callable   factory(train) → fitted model with .predict(steps) method
-    n_folds        : int        Number of CV folds.
+    model_factory  : Callable   factory(train) → fitted model with .forecast(steps) method.
+                                Must be picklable (module-level function or
+                                functools.partial) when n_jobs > 1.
+    n_folds        : int        Number of CV folds (default: settings.cv_folds).
     test_size      : int        Hours per test fold (default: 1 week = 168 hours).
     min_train_size : int        Minimum training hours (default: 90 days = 2160 hours).
+    n_jobs         : int        Worker processes (default: one per fold, capped
+                                at the CPU count); 1 runs in-process.
+    warm_start     : bool       Call factory(train, start_params=…) with the
+                                parameters of an earlier fold. Serially each
+                                fold starts from the one before it; in parallel
+                                the oldest fold is fitted first and seeds the rest.
 
     Returns
     -------
-    dict  'fold_metrics', 'mean_mae', 'mean_rmse', 'mean_mape', 'std_*'
+    dict  'folds' (per-fold timing / metrics / error), 'fold_metrics',
+          'mean_*', 'std_*', 'n_failed', 'wall_seconds'
     """
-    total       = len(series)
-    fold_metrics = []
+    if n_folds is None:
+        from config.settings import settings
+        n_folds = settings.cv_folds
 
+    total = len(series)
+    plan  = []                                  # (fold, (train_end, test_start, test_end)), oldest first
     for fold in range(n_folds):
         test_end   = total - fold * test_size
         test_start = test_end - test_size
@@ -90,37 +207,63 @@ def rolling_cross_validate(
                 fold + 1, train_end, min_train_size,
             )
             continue
+        plan.append((fold + 1, (train_end, test_start, test_end)))
+    plan.reverse()
 
-        train = series.iloc[:train_end]
-        test  = series.iloc[test_start:test_end]
-
+    n_jobs = min(n_jobs or os.cpu_count() or 1, len(plan)) if plan else 1
+    t0 = time.perf_counter()
+    if n_jobs <= 1:
+        folds, start = [], None
+        for fold, bounds in plan:
+            folds.append(_run_fold(model_factory, fold, bounds, start, series=series))
+            if warm_start and folds[-1].params is not None:
+                start = folds[-1].params
+    else:
+        folds = []
+        if warm_start:
+            first = plan.pop(0)
+            folds.append(_run_fold(model_factory, *first, series=series))
+        start = folds[0].params if folds else None
+        shm, spec = _share(series)
         try:
-            model  = model_factory(train)
-            preds  = model.forecast(steps=len(test))
-            pred_s = preds.forecast if hasattr(preds, "forecast") else preds
-            pred_s = pd.Series(pred_s.values if hasattr(pred_s, "values") else pred_s,
-                               index=test.index)
-            m = compute_metrics(test, pred_s, model_name=f"fold_{fold+1}")
-            fold_metrics.append(m)
-        except Exception as e:
-            logger.error("Fold %d failed: %s", fold + 1, e)
-
-    if not fold_metrics:
-        return {}
-
-    maes  = [m.mae  for m in fold_metrics]
-    rmses = [m.rmse for m in fold_metrics]
-    mapes = [m.mape for m in fold_metrics]
-
-    return {
-        "fold_metrics": [m.to_dict() for m in fold_metrics],
+            with ProcessPoolExecutor(max_workers=n_jobs, initializer=_attach, initargs=spec) as pool:
+                futures = [pool.submit(_run_fold, model_factory, fold, bounds, start)
+                           for fold, bounds in plan]
+                folds += [f.result() for f in futures]
+        finally:
+            shm.close()
+            shm.unlink()
+    wall = time.perf_counter() - t0
+
+    folds.sort(key=lambda r: r.fold)
+    ok = [r.metrics for r in folds if r.ok]
+    logger.info(
+        "Rolling CV: %d/%d folds in %.2fs (%d workers, slowest fold %.2fs)",
+        len(ok), len(folds), wall, n_jobs,
+        max((r.fit_seconds + r.predict_seconds for r in folds), default=0.0),
+    )
+    out = {
+        "folds":        [r.to_dict() for r in folds],
+        "n_failed":     len(folds) - len(ok),
+        "wall_seconds": round(wall, 3),
+    }
+    if not ok:
+        return out
+
+    maes  = [m.mae  for m in ok]
+    rmses = [m.rmse for m in ok]
+    mapes = [m.mape for m in ok]
+
+    out.update({
+        "fold_metrics": [m.to_dict() for m in ok],
         "mean_mae":   round(np.mean(maes),  3),
         "std_mae":    round(np.std(maes),   3),
         "mean_rmse":  round(np.mean(rmses), 3),
         "std_rmse":   round(np.std(rmses),  3),
         "mean_mape":  round(np.mean(mapes), 3),
         "std_mape":   round(np.std(mapes),  3),
-    }
+    })
+    return out
 
 
 def compare_models(results: list[MetricsResult]) -> pd.DataFrame:
@@ -0,0 +1,278 @@
+"""
+src/models/hierarchical.py
+==========================
+Coherent grid-wide forecasts: forecast every node of the PJM region hierarchy
+in one batched pass, then reconcile so that parents equal the sum of their
+children.
+
+Hierarchy
+---------
+The raw files do not contain an aggregate that sums their zones. PJM_Load
+ends in 2001, before any zone series starts, and the legacy NI zone was
+folded into COMED in 2011. Aggregates are therefore built bottom-up from the
+zones that are active together (2013-06 onward):
+
+    PJM ── WEST ── AEP · COMED · DAYTON · DEOK · DUQ · EKPC · FE · PJMW
+       ├── PJME
+       └── DOM
+
+PJM is then ≈ the RTO load (~90 GW average over 2014–2017).
+
+Base forecasts
+--------------
+One XGBoost model is shared by every node. Each node is divided by its
+training mean, and the model is trained on the stacked
+src.models.recursive.recursive_frame() rows. At forecast time all nodes go
+through RecursiveEngine together: one predict call per hour for the whole
+grid.
+
+Reconciliation
+--------------
+The summing matrix S (n_nodes × n_bottom) is a scipy.sparse matrix, and the
+reconciled forecast is ỹ = S G ŷ with
+
+    G = (Sᵀ W⁻¹ S)⁻¹ Sᵀ W⁻¹
+
+    ols          W = I
+    wls_struct   W = diag(S 1)            — number of bottom series under a node
+    wls_var      W = diag(residual variances)
+    mint_shrink  W = shrinkage estimate of the one-step residual covariance
+                     (Schäfer–Strimmer, as in Wickramasuriya et al. 2019)
+
+The diagonal methods stay sparse end to end. mint_shrink solves with the
+dense W, which is n_nodes × n_nodes.
+"""
+from __future__ import annotations
+
+import logging
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from scipy.sparse.linalg import spsolve
+
+from src.data.clean import ensure_hourly_frequency, remove_duplicates
+from src.features.time_features import add_time_features
+from src.models.recursive import LAG_BUFFER, recursive_frame
+
+logger = logging.getLogger(__name__)
+
+PJM_HIERARCHY: dict[str, list[str]] = {
+    "PJM":  ["WEST", "PJME", "DOM"],
+    "WEST": ["AEP", "COMED", "DAYTON", "DEOK", "DUQ", "EKPC", "FE", "PJMW"],
+}
+METHODS = ("ols", "wls_struct", "wls_var", "mint_shrink")
+
+
+# ── Hierarchy ─────────────────────────────────────────────────────────────────
+
+@dataclass
+class Hierarchy:
+    """Node order and sparse summing matrix for a parent → children tree."""
+
+    nodes: list[str]            # aggregates top-down, then bottom series
+    bottom: list[str]
+    S: sparse.csr_matrix        # (n_nodes, n_bottom)
+
+    @classmethod
+    def from_tree(cls, tree: dict[str, list[str]]) -> "Hierarchy":
+        children = {c for kids in tree.values() for c in kids}
+        roots = [p for p in tree if p not in children]
+        if len(roots) != 1:
+            raise ValueError(f"Hierarchy needs exactly one root, found {roots}")
+
+        aggregates, bottom, stack = [], [], [roots[0]]
+        while stack:                                    # depth-first, children in order
+            node = stack.pop()
+            if node in tree:
+                aggregates.append(node)
+                stack.extend(reversed(tree[node]))
+            else:
+                bottom.append(node)
+
+        col = {b: j for j, b in enumerate(bottom)}
+
+        def leaves(node: str) -> list[str]:
+            return [leaf for c in tree[node] for leaf in leaves(c)] if node in tree else [node]
+
+        rows, cols = [], []
+        for i, node in enumerate(aggregates + bottom):
+            for leaf in leaves(node):
+                rows.append(i)
+                cols.append(col[leaf])
+        S = sparse.csr_matrix(
+            (np.ones(len(rows)), (rows, cols)), shape=(len(aggregates) + len(bottom), len(bottom)),
+        )
+        return cls(nodes=aggregates + bottom, bottom=bottom, S=S)
+
+    def aggregate(self, bottom: pd.DataFrame) -> pd.DataFrame:
+        """Every node's series from the bottom-level columns (rows × nodes)."""
+        values = (self.S @ bottom[self.bottom].to_numpy(np.float64).T).T
+        return pd.DataFrame(values, index=bottom.index, columns=self.nodes)
+
+
+# ── Reconciliation ────────────────────────────────────────────────────────────
+
+def shrink_covariance(residuals: np.ndarray) -> np.ndarray:
+    """
+    Schäfer–Strimmer shrinkage of a residual covariance towards its diagonal.
+
+    residuals : (T, n) one-step in-sample errors, one column per node.
+    """
+    x = residuals - residuals.mean(axis=0)
+    T = x.shape[0]
+    cov = x.T @ x / T
+    sd = np.sqrt(np.diag(cov))
+    xs = x / sd
+    corr = xs.T @ xs / T
+    v = (xs**2).T @ (xs**2) / T - corr**2
+    np.fill_diagonal(v, 0.0)
+    np.fill_diagonal(corr, 0.0)
+    lam = float(np.clip(v.sum() / (T - 1) / max((corr**2).sum(), 1e-12), 0.0, 1.0))
+    return lam * np.diag(np.diag(cov)) + (1.0 - lam) * cov
+
+
+def reconciliation_matrix(
+    S: sparse.spmatrix, method: str = "mint_shrink", residuals: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """G (n_bottom × n_nodes) such that S @ G @ base is the reconciled forecast."""
+    if method not in METHODS:
+        raise ValueError(f"Unknown reconciliation method '{method}'. Choose from {METHODS}.")
+    if method in ("wls_var", "mint_shrink") and residuals is None:
+        raise ValueError(f"'{method}' needs in-sample residuals.")
+
+    S = sparse.csr_matrix(S)
+    if method == "mint_shrink":
+        W = shrink_covariance(residuals)
+        Winv_S = np.linalg.solve(W, S.toarray())
+        return np.linalg.solve(S.T @ Winv_S, Winv_S.T)
+
+    if method == "ols":
+        w = np.ones(S.shape[0])
+    elif method == "wls_struct":
+        w = np.asarray(S.sum(axis=1)).ravel()
+    else:
+        w = residuals.var(axis=0)
+    St_Winv = (S.T @ sparse.diags(1.0 / w)).tocsc()
+    G = spsolve((St_Winv @ S).tocsc(), St_Winv)
+    return G.toarray() if sparse.issparse(G) else np.asarray(G)
+
+
+def reconcile(
+    base: pd.DataFrame,
+    hierarchy: Hierarchy,
+    method: str = "mint_shrink",
+    residuals: Optional[np.ndarray] = None,
+) -> pd.DataFrame:
+    """Coherent version of *base* (hours × hierarchy.nodes)."""
+    G = reconciliation_matrix(hierarchy.S, method, residuals)
+    bottom = base[hierarchy.nodes].to_numpy(np.float64) @ G.T         # (hours, n_bottom)
+    return pd.DataFrame(
+        (hierarchy.S @ bottom.T).T, index=base.index, columns=hierarchy.nodes,
+    )
+
+
+# ── Forecaster ────────────────────────────────────────────────────────────────
+
+@dataclass
+class HierarchicalResult:
+    method: str
+    base: pd.DataFrame                  # hours × nodes, incoherent model output
+    forecast: pd.DataFrame              # hours × nodes, reconciled
+    seconds: float = 0.0
+
+
+class HierarchicalForecaster:
+    """
+    Forecast every node of a region hierarchy and reconcile.
+
+    Parameters
+    ----------
+    hierarchy      : dict  parent → children (default PJM_HIERARCHY)
+    method         : str   one of METHODS
+    model          : XGBoostForecaster  (default: XGBoostForecaster())
+    residual_hours : int   trailing hours of one-step residuals for wls_var / mint_shrink
+    """
+
+    def __init__(
+        self,
+        hierarchy: Optional[dict[str, list[str]]] = None,
+        method: str = "mint_shrink",
+        model=None,
+        residual_hours: int = 24 * 28,
+    ):
+        if method not in METHODS:
+            raise ValueError(f"Unknown reconciliation method '{method}'. Choose from {METHODS}.")
+        self.hierarchy      = Hierarchy.from_tree(hierarchy or PJM_HIERARCHY)
+        self.method         = method
+        self.residual_hours = residual_hours
+        self.model          = model
+        self.scale: Optional[pd.Series] = None
+        self.residuals: Optional[np.ndarray] = None
+        self._G: Optional[np.ndarray] = None
+
+    def node_frame(self, wide: pd.DataFrame) -> pd.DataFrame:
+        """
+        Hourly frame of every node from a wide region frame (e.g. load_est_parquet()).
+
+        Trimmed to the span where all bottom series report; interior gaps are
+        interpolated.
+        """
+        missing = [b for b in self.hierarchy.bottom if b not in wide.columns]
+        if missing:
+            raise ValueError(f"Bottom-level series missing from data: {missing}")
+        bottom = wide[self.hierarchy.bottom]
+        start = max(bottom[c].first_valid_index() for c in bottom)
+        end   = min(bottom[c].last_valid_index() for c in bottom)
+        bottom = ensure_hourly_frequency(remove_duplicates(bottom.loc[start:end]))
+        return self.hierarchy.aggregate(bottom)
+
+    def _frames(self, nodes: pd.DataFrame) -> dict[str, pd.DataFrame]:
+        return {
+            n: recursive_frame(add_time_features((nodes[n] / self.scale[n]).to_frame("MW")))
+            for n in self.hierarchy.nodes
+        }
+
+    def fit(self, wide: pd.DataFrame) -> "HierarchicalForecaster":
+        """Train the shared model on every node and estimate the reconciliation weights."""
+        if self.model is None:
+            from src.models.xgboost_model import XGBoostForecaster
+            self.model = XGBoostForecaster()
+
+        nodes = self.node_frame(wide)
+        self.scale = nodes.mean()
+        frames = self._frames(nodes)
+        self.model.fit(pd.concat(frames.values(), ignore_index=True))
+
+        # One-step in-sample residuals (MW) over the trailing window, node by node
+        tails = [frames[n].iloc[-self.residual_hours:] for n in self.hierarchy.nodes]
+        preds = self.model.predict(pd.concat(tails, ignore_index=True)).reshape(len(tails), -1)
+        actual = np.stack([t["MW"].to_numpy() for t in tails])
+        self.residuals = ((actual - preds) * self.scale.to_numpy()[:, None]).T
+        self._G = reconciliation_matrix(self.hierarchy.S, self.method, self.residuals)
+        logger.info(
+            "Hierarchical model fitted on %d nodes × %d hours (%s)",
+            len(self.hierarchy.nodes), len(nodes), self.method,
+        )
+        return self
+
+    def forecast(self, wide: pd.DataFrame, steps: int = 24) -> HierarchicalResult:
+        """Coherent *steps*-hour forecast for every node after the end of *wide*."""
+        if self._G is None:
+            raise RuntimeError("Model not fitted. Call fit() first.")
+        t0 = time.perf_counter()
+        tail  = wide.loc[wide.index[-1] - pd.Timedelta(hours=LAG_BUFFER - 1):]
+        nodes = self.node_frame(tail)
+        histories = {n: nodes[n] / self.scale[n] for n in self.hierarchy.nodes}
+        scaled = self.model.forecast_many(histories, steps)          # one batched pass
+        base = pd.DataFrame({n: scaled[n] * self.scale[n] for n in self.hierarchy.nodes})
+
+        S = self.hierarchy.S
+        coherent = (S @ (self._G @ base.to_numpy().T)).T
+        forecast = pd.DataFrame(coherent, index=base.index, columns=self.hierarchy.nodes)
+        return HierarchicalResult(
+            method=self.method, base=base, forecast=forecast, seconds=time.perf_counter() - t0,
+        )
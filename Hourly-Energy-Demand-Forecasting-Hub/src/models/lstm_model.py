@@ -19,6 +19,21 @@ _THIS_FILE    = Path(__file__).resolve()
 _PROJECT_ROOT = _THIS_FILE.parents[2]
 _MODELS_DIR   = _PROJECT_ROOT / "models"
 
+# feature_cols.json was written by the training notebook, which named some
+# columns differently from add_time_features()
+_NOTEBOOK_FEATURES = {
+    "day":           "day_of_month",
+    "lag_1h":        "lag_1",
+    "lag_24h":       "lag_24",
+    "lag_48h":       "lag_48",
+    "lag_168h":      "lag_168",
+    "roll_mean_24h": "rolling_mean_24",
+    "roll_std_24h":  "rolling_std_24",
+    "roll_mean_7d":  "rolling_mean_168",
+    "diff_1h":       "diff_1",
+    "diff_24h":      "diff_24",
+}
+
 
 class LSTMForecaster:
     """
@@ -28,9 +43,10 @@ class LSTMForecaster:
     Requires tensorflow ≥ 2.12 (not in core requirements.txt — install separately).
     """
 
-    def __init__(self, region: str = "AEP"):
+    def __init__(self, region: str = "AEP", models_dir: Optional[Path] = None):
         self.region     = region.upper()
-        self.model_dir  = _MODELS_DIR / self.region / "lstm_model"
+        self.region_dir = (models_dir or _MODELS_DIR) / self.region
+        self.model_dir  = self.region_dir / "lstm_model"
         self._model     = None
         self._feature_cols: list[str] = []
         self._load_metadata()
@@ -39,8 +55,8 @@ class LSTMForecaster:
         """Load feature_cols.json and model_metrics.json if available."""
         import json
 
-        fc_path = _MODELS_DIR / self.region / "feature_cols.json"
-        mm_path = _MODELS_DIR / self.region / "model_metrics.json"
+        fc_path = self.region_dir / "feature_cols.json"
+        mm_path = self.region_dir / "model_metrics.json"
 
         if fc_path.exists():
             with open(fc_path) as f:
@@ -122,7 +138,28 @@ class LSTMForecaster:
 
         last_dt  = df.index[-1]
         fc_index = pd.date_range(last_dt + pd.Timedelta(hours=1), periods=horizon, freq="h")
-        return pd.Series(preds[:horizon], index=fc_index, name="MW_forecast")
+        return pd.Series(preds[:horizon], index=fc_index[:len(preds)], name="MW_forecast")
+
+    def features_from_history(self, history: pd.Series) -> pd.DataFrame:
+        """
+        Build the model's input features from a raw hourly MW series.
+
+        Columns listed in feature_cols.json are computed by add_time_features()
+        and renamed to the notebook names the network was trained with.
+        """
+        from src.features.time_features import add_time_features
+
+        feat = add_time_features(history.to_frame("MW"))
+        for name, source in _NOTEBOOK_FEATURES.items():
+            feat[name] = feat[source]
+        feat["ewm_mean_24h"] = history.ewm(span=24, adjust=False).mean()
+        return feat
+
+    def load(self) -> "LSTMForecaster":
+        """Load the network now instead of on the first prediction."""
+        if self._model is None:
+            self._load_model()
+        return self
 
     @property
     def is_available(self) -> bool:
@@ -0,0 +1,198 @@
+"""
+src/models/recursive.py
+=======================
+Recursive (and direct) multi-step forecasting engine for tree models.
+
+add_time_features() is built for one-step evaluation. Its rolling windows
+include the current hour, and log_MW / diff_* / pct_change_24 are transforms
+of the target itself, so none of them exist for an hour that has not
+happened. The engine therefore works on RECURSIVE_FEATURES:
+
+    calendar   — every add_time_features() calendar column (known in advance)
+    lags       — lag_1 … lag_8760
+    trailing   — trail_{mean,std,min,max}_{24,168}: rolling stats over the
+                 window that *ends at the previous hour*
+
+Build the matching training frame with recursive_frame().
+
+At forecast time each series' last LAG_BUFFER hours sit in one row of a
+preallocated (n_series, LAG_BUFFER) ring buffer. Calendar columns for all
+future hours are computed in one vectorised call. Each step gathers lags and
+trailing windows for every series at once with fancy indexing. It predicts
+one (n_series, n_features) batch and writes the predictions back into the
+ring. No DataFrame is built inside the loop.
+"""
+from __future__ import annotations
+
+import logging
+from collections.abc import Mapping
+from functools import partial
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from src.features.time_features import calendar_features
+
+logger = logging.getLogger(__name__)
+
+CALENDAR_FEATURES = [
+    "hour", "day_of_week", "day_of_month", "day_of_year", "week", "month", "quarter", "year",
+    "season_num", "is_weekend", "is_weekday", "is_holiday",
+    "is_business_hour", "is_peak_hour", "is_night",
+    "hour_sin", "hour_cos", "month_sin", "month_cos", "dow_sin", "dow_cos",
+]
+LAG_HOURS = (1, 24, 48, 168, 8760)
+# name → (statistic, window hours); each is the matching rolling_* column shifted by one hour
+TRAILING_FEATURES = {
+    "trail_mean_24":  ("mean", 24),
+    "trail_std_24":   ("std", 24),
+    "trail_min_24":   ("min", 24),
+    "trail_max_24":   ("max", 24),
+    "trail_mean_168": ("mean", 168),
+    "trail_std_168":  ("std", 168),
+}
+RECURSIVE_FEATURES = CALENDAR_FEATURES + [f"lag_{k}" for k in LAG_HOURS] + list(TRAILING_FEATURES)
+LAG_BUFFER = max(LAG_HOURS)
+MIN_HISTORY = max(w for _, w in TRAILING_FEATURES.values())
+
+
+def recursive_frame(feat: pd.DataFrame, target_col: str = "MW") -> pd.DataFrame:
+    """
+    Training frame for the engine from add_time_features() / load_features() output.
+
+    Returns *target_col* plus RECURSIVE_FEATURES. Rows keep any NaN lags
+    (XGBoost treats them as missing).
+    """
+    out = feat[[target_col, *CALENDAR_FEATURES, *(f"lag_{k}" for k in LAG_HOURS)]].copy()
+    for name, (stat, window) in TRAILING_FEATURES.items():
+        out[name] = feat[f"rolling_{stat}_{window}"].shift(1)
+    return out.iloc[1:]
+
+
+class LagState:
+    """
+    Ring buffers holding the last LAG_BUFFER hours of several series.
+
+    All rows share one write position, so a lag or trailing window is a single
+    fancy-indexed gather across every series.
+    """
+
+    def __init__(self, histories: list[np.ndarray], size: int = LAG_BUFFER) -> None:
+        self.size = size
+        self.buf  = np.full((len(histories), size), np.nan)
+        for i, h in enumerate(histories):
+            tail = np.asarray(h, dtype=np.float64)[-size:]
+            self.buf[i, size - len(tail):] = tail
+        self.pos = 0                                     # slot of the next hour
+
+    def window(self, w: int) -> np.ndarray:
+        return self.buf[:, (self.pos - w + np.arange(w)) % self.size]
+
+    def push(self, values: np.ndarray) -> None:
+        self.buf[:, self.pos] = values
+        self.pos = (self.pos + 1) % self.size
+
+
+_STATS = {
+    "mean": lambda w: w.mean(axis=1),
+    "std":  lambda w: w.std(axis=1, ddof=1),
+    "min":  lambda w: w.min(axis=1),
+    "max":  lambda w: w.max(axis=1),
+}
+
+
+class RecursiveEngine:
+    """
+    Generate multi-step forecasts from a fitted model and its feature columns.
+
+    Parameters
+    ----------
+    model        : fitted XGBoost Booster / XGBRegressor (or anything with
+                   ``inplace_predict`` or ``predict`` on a 2-D float array)
+    feature_cols : column order the model was trained on (⊆ RECURSIVE_FEATURES)
+    """
+
+    def __init__(self, model: Any, feature_cols: list[str]) -> None:
+        unknown = [c for c in feature_cols if c not in RECURSIVE_FEATURES]
+        if unknown:
+            raise ValueError(
+                f"Features {unknown} cannot be generated for future hours. "
+                "Train on src.models.recursive.recursive_frame() columns."
+            )
+        self.feature_cols = list(feature_cols)
+        booster = model.get_booster() if hasattr(model, "get_booster") else model
+        self._predict = getattr(booster, "inplace_predict", None) or booster.predict
+        # Early-stopped models predict with the trees up to best_iteration, as predict() does
+        best = getattr(model, "best_iteration", None)
+        if best is not None and hasattr(booster, "inplace_predict"):
+            self._predict = partial(booster.inplace_predict, iteration_range=(0, best + 1))
+
+        col = {c: j for j, c in enumerate(self.feature_cols)}
+        cal  = [k for k, c in enumerate(CALENDAR_FEATURES) if c in col]
+        lags = [k for k in LAG_HOURS if f"lag_{k}" in col]
+        self._cal_src = np.array(cal, dtype=np.intp)
+        self._cal_dst = np.array([col[CALENDAR_FEATURES[k]] for k in cal], dtype=np.intp)
+        self._lag_k   = np.array(lags, dtype=np.intp)
+        self._lag_dst = np.array([col[f"lag_{k}"] for k in lags], dtype=np.intp)
+        self._trail = [(col[n], stat, w) for n, (stat, w) in TRAILING_FEATURES.items() if n in col]
+
+    def _prepare(self, histories: Mapping[str, pd.Series], steps: int):
+        short = [r for r, h in histories.items() if len(h) < MIN_HISTORY]
+        if short:
+            raise ValueError(f"Need at least {MIN_HISTORY} hours of history for: {short}")
+        index = {
+            r: pd.date_range(h.index[-1] + pd.Timedelta(hours=1), periods=steps, freq="h")
+            for r, h in histories.items()
+        }
+        # (steps, n_series, n_calendar) — the whole future calendar in one pass per series
+        cal = np.stack(
+            [calendar_features(ix)[CALENDAR_FEATURES].to_numpy(np.float64) for ix in index.values()],
+            axis=1,
+        )
+        state = LagState([h.to_numpy() for h in histories.values()])
+        X = np.empty((len(histories), len(self.feature_cols)), dtype=np.float32)
+        return index, cal, state, X
+
+    def _fill(self, X: np.ndarray, cal_step: np.ndarray, state: LagState) -> None:
+        X[:, self._cal_dst] = cal_step[:, self._cal_src]
+        X[:, self._lag_dst] = state.buf[:, (state.pos - self._lag_k) % state.size]
+        windows: dict[int, np.ndarray] = {}
+        for j, stat, w in self._trail:
+            if w not in windows:
+                windows[w] = state.window(w)
+            X[:, j] = _STATS[stat](windows[w])
+
+    def forecast(self, histories: Mapping[str, pd.Series], steps: int) -> dict[str, pd.Series]:
+        """
+        Recursive forecast of *steps* hours after the end of each history.
+
+        Parameters
+        ----------
+        histories : {name: hourly MW Series}  — one batch, any number of series
+        steps     : int                       — forecast horizon in hours
+
+        Returns
+        -------
+        dict[str, pd.Series]  Forecast per series, indexed by the future hours.
+        """
+        index, cal, state, X = self._prepare(histories, steps)
+        out = np.empty((steps, len(histories)))
+        for t in range(steps):
+            self._fill(X, cal[t], state)
+            pred = np.asarray(self._predict(X), dtype=np.float64).reshape(-1)
+            out[t] = pred
+            state.push(pred)
+        return {r: pd.Series(out[:, i], index=index[r], name="MW_forecast")
+                for i, r in enumerate(histories)}
+
+    def forecast_direct(self, histories: Mapping[str, pd.Series], steps: int) -> dict[str, pd.Series]:
+        """Forecast with a direct multi-output model: one predict call for all hours."""
+        index, cal, state, X = self._prepare(histories, 1)
+        self._fill(X, cal[0], state)
+        pred = np.asarray(self._predict(X), dtype=np.float64).reshape(len(histories), -1)
+        if pred.shape[1] < steps:
+            raise ValueError(f"Direct model covers {pred.shape[1]} hours; requested {steps}.")
+        future = {r: pd.date_range(ix[0], periods=steps, freq="h") for r, ix in index.items()}
+        return {r: pd.Series(pred[i, :steps], index=future[r], name="MW_forecast")
+                for i, r in enumerate(histories)}
@@ -0,0 +1,297 @@
+"""
+src/models/serving.py
+=====================
+Pre-loaded per-region models for the forecast API.
+
+Everything expensive happens when a region is loaded, at API startup or when
+its data or artifacts change. A request only builds features from the
+in-memory history tail and runs inference.
+
+Artifacts under models/{REGION}/ (written by scripts/train_models.py):
+
+    xgboost.json          XGBoostForecaster.save() — recursive or direct model
+    arima_params.json     ARIMAForecaster.save_params() — order + fitted parameters
+    lstm_model/           Keras SavedModel (+ feature_cols.json)
+    serving_metrics.json  hold-out MAE / RMSE / MAPE per model
+
+ARIMA parameters are never re-estimated here. Loading runs one Kalman filter
+pass with the stored parameters over their trailing window, so each forecast
+starts from the latest hour. When only new hours arrive, the loaded model is
+advanced over just those hours (ARIMAForecaster.update). The training job
+replaces the parameters on its own schedule.
+
+The XGBoost and LSTM forecasts depend only on the loaded history. Each is
+computed once, at load, for MAX_HORIZON hours, and requests take a prefix of
+it. When only the data changed, the loaded XGBoost / LSTM objects are kept and
+just these forecasts are recomputed. The ARIMA forecast depends on the
+requested confidence level, so it is computed per request (≈15 ms).
+
+A region is checked for changes at most every reload_seconds. Once it has been
+loaded, the check and any reload run in a background thread while requests keep
+getting the current models; each region has its own lock, so a reload never
+holds up another region.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Optional
+
+import pandas as pd
+
+from src.models.recursive import LAG_BUFFER
+
+logger = logging.getLogger(__name__)
+
+_THIS_FILE    = Path(__file__).resolve()
+_PROJECT_ROOT = _THIS_FILE.parents[2]
+_MODELS_DIR   = _PROJECT_ROOT / "models"
+_PROCESSED    = _PROJECT_ROOT / "datasets" / "processed"
+
+ARTIFACTS = {
+    "xgboost": "xgboost.json",
+    "arima":   "arima_params.json",
+    "lstm":    "lstm_model",
+}
+METRICS_FILE  = "serving_metrics.json"
+HISTORY_HOURS = LAG_BUFFER      # enough for lag_8760 and every rolling window
+MAX_HORIZON   = 168             # PredictRequest.horizon upper bound
+
+
+class ModelNotAvailable(LookupError):
+    """No pre-trained artifact for this region / model."""
+
+
+class ModelLoadError(RuntimeError):
+    """The artifact exists but could not be loaded (e.g. optional dependency missing)."""
+
+
+@dataclass
+class ServedForecast:
+    forecast: pd.Series
+    lower: Optional[pd.Series] = None
+    upper: Optional[pd.Series] = None
+    metrics: Optional[dict] = None
+
+
+@dataclass
+class RegionModels:
+    """Everything needed to answer forecasts for one region."""
+
+    region: str
+    history: pd.Series
+    models: dict[str, Any] = field(default_factory=dict)
+    errors: dict[str, str] = field(default_factory=dict)     # model → why it could not load
+    metrics: dict[str, dict] = field(default_factory=dict)
+    forecasts: dict[str, pd.Series] = field(default_factory=dict)   # MAX_HORIZON, deterministic models
+    stamp: tuple = ()
+    checked: float = 0.0
+
+
+class ModelStore:
+    """
+    Region → loaded models, refreshed when data or artifacts change on disk.
+
+    Parameters
+    ----------
+    models_dir     : Path   Root of the per-region artifact directories.
+    processed_dir  : Path   Processed parquet directory (history source).
+    reload_seconds : float  How often a region's files are checked for changes.
+    background     : bool   Refresh loaded regions in a background thread (False: in the
+                            calling request, for tests and scripts).
+    """
+
+    def __init__(
+        self,
+        models_dir: Optional[Path] = None,
+        processed_dir: Optional[Path] = None,
+        reload_seconds: float = 60.0,
+        background: bool = True,
+    ):
+        self.models_dir     = Path(models_dir or _MODELS_DIR)
+        self.processed_dir  = Path(processed_dir or _PROCESSED)
+        self.reload_seconds = reload_seconds
+        self.background     = background
+        self._regions: dict[str, RegionModels] = {}
+        self._locks: dict[str, threading.Lock] = {}
+        self._locks_lock = threading.Lock()
+        self._refreshes: dict[str, threading.Thread] = {}
+
+    # ── Loading ───────────────────────────────────────────────────────────────
+
+    def available_regions(self) -> list[str]:
+        """Regions with at least one serving artifact."""
+        if not self.models_dir.exists():
+            return []
+        return sorted(
+            d.name for d in self.models_dir.iterdir()
+            if d.is_dir() and any((d / a).exists() for a in ARTIFACTS.values())
+        )
+
+    def load(self, regions: Optional[list[str]] = None) -> list[str]:
+        """Load *regions* (default: every region with artifacts); return those loaded."""
+        loaded = []
+        for region in regions or self.available_regions():
+            try:
+                self.region(region.upper())
+                loaded.append(region.upper())
+            except Exception as e:  # noqa: BLE001 — one bad region must not stop startup
+                logger.error("Could not load models for %s: %s", region, e)
+        return loaded
+
+    def _stamp(self, region: str) -> tuple:
+        paths = [self.processed_dir / f"{region}.parquet"]
+        paths += [self.models_dir / region / a for a in [*ARTIFACTS.values(), METRICS_FILE]]
+        return tuple(p.stat().st_mtime_ns if p.exists() else None for p in paths)
+
+    @staticmethod
+    def _reusable(previous: Optional[RegionModels], stamp: tuple, name: str) -> Optional[Any]:
+        """*previous*'s *name* model if its artifact is unchanged (at most the data moved on)."""
+        if previous is None or name not in previous.models:
+            return None
+        i = 1 + list(ARTIFACTS).index(name)
+        return previous.models[name] if previous.stamp[i] == stamp[i] else None
+
+    def _load_region(
+        self, region: str, stamp: tuple, previous: Optional[RegionModels] = None,
+    ) -> RegionModels:
+        from src.data.store import load_parquet
+
+        t0      = time.perf_counter()
+        df      = load_parquet(region, processed_dir=self.processed_dir)
+        bundle  = RegionModels(region=region, history=df["MW"].iloc[-HISTORY_HOURS:], stamp=stamp)
+        rdir    = self.models_dir / region
+
+        same_data = previous is not None and previous.stamp[0] == stamp[0]
+        loaders = {"xgboost": self._load_xgboost, "arima": self._load_arima, "lstm": self._load_lstm}
+        for name, loader in loaders.items():
+            path = rdir / ARTIFACTS[name]
+            if not path.exists():
+                continue
+            try:
+                loaded = self._reusable(previous, stamp, name)
+                bundle.models[name] = model = loader(region, path, df, loaded=loaded)
+                if same_data and loaded is not None and name in previous.forecasts:
+                    bundle.forecasts[name] = previous.forecasts[name]
+                elif name == "xgboost":
+                    bundle.forecasts[name] = model.forecast(bundle.history, steps=MAX_HORIZON).forecast
+                elif name == "lstm":
+                    feat = model.features_from_history(bundle.history)
+                    bundle.forecasts[name] = model.forecast_from_df(feat, horizon=MAX_HORIZON)
+            except Exception as e:  # noqa: BLE001 — e.g. optional dependency missing
+                bundle.models.pop(name, None)
+                bundle.errors[name] = f"{type(e).__name__}: {e}"
+                logger.warning("%s %s model not loaded: %s", region, name, e)
+
+        if (rdir / METRICS_FILE).exists():
+            bundle.metrics = json.loads((rdir / METRICS_FILE).read_text())
+        bundle.checked = time.monotonic()
+        logger.info(
+            "Loaded %s models %s in %.2fs", region, sorted(bundle.models), time.perf_counter() - t0,
+        )
+        return bundle
+
+    def _load_xgboost(self, region: str, path: Path, df: pd.DataFrame, loaded=None):
+        from src.models.xgboost_model import XGBoostForecaster
+        return loaded if loaded is not None else XGBoostForecaster().load(path)
+
+    def _load_arima(self, region: str, path: Path, df: pd.DataFrame, loaded=None):
+        from src.models.arima_model import ARIMAForecaster
+        if loaded is not None:
+            try:
+                return loaded.update(df["MW"])
+            except ValueError as e:     # gap or revised history — filter afresh
+                logger.info("%s arima update not possible (%s); refiltering", region, e)
+        return ARIMAForecaster.from_params(path, df["MW"])
+
+    def _load_lstm(self, region: str, path: Path, df: pd.DataFrame, loaded=None):
+        from src.models.lstm_model import LSTMForecaster
+        return loaded if loaded is not None else LSTMForecaster(region, models_dir=self.models_dir).load()
+
+    def _region_lock(self, region: str) -> threading.Lock:
+        with self._locks_lock:
+            return self._locks.setdefault(region, threading.Lock())
+
+    def region(self, region: str) -> RegionModels:
+        """Loaded models for *region*, reloading them if their files changed."""
+        region = region.upper()
+        bundle = self._regions.get(region)
+        if bundle is not None and time.monotonic() - bundle.checked < self.reload_seconds:
+            return bundle
+        if bundle is not None and self.background:
+            self._refresh_in_background(region)
+            return bundle
+        with self._region_lock(region):
+            return self._refresh(region)
+
+    def _refresh(self, region: str) -> RegionModels:
+        """Reload *region* if its files changed (caller holds the region's lock)."""
+        bundle = self._regions.get(region)
+        if bundle is not None and time.monotonic() - bundle.checked < self.reload_seconds:
+            return bundle
+        stamp = self._stamp(region)
+        if bundle is None or bundle.stamp != stamp:
+            bundle = self._regions[region] = self._load_region(region, stamp, previous=bundle)
+        bundle.checked = time.monotonic()
+        return bundle
+
+    def _refresh_in_background(self, region: str) -> None:
+        lock = self._region_lock(region)
+        if not lock.acquire(blocking=False):
+            return                          # already being refreshed
+
+        def run() -> None:
+            try:
+                self._refresh(region)
+            except Exception as e:  # noqa: BLE001 — keep serving the loaded models
+                self._regions[region].checked = time.monotonic()
+                logger.error("Could not reload models for %s: %s", region, e)
+            finally:
+                lock.release()
+
+        thread = self._refreshes[region] = threading.Thread(
+            target=run, name=f"model-refresh-{region}", daemon=True,
+        )
+        thread.start()
+
+    # ── Inference ─────────────────────────────────────────────────────────────
+
+    def forecast(self, region: str, model: str, horizon: int, confidence: float = 0.95) -> ServedForecast:
+        """Forecast *horizon* hours for *region* with an already-loaded *model*."""
+        bundle = self.region(region)
+        if model in bundle.errors:
+            raise ModelLoadError(f"{model} model for {bundle.region} failed to load — {bundle.errors[model]}")
+        if model not in ARTIFACTS:
+            raise ModelNotAvailable(f"Unknown model: {model}")
+        if model not in bundle.models:
+            raise ModelNotAvailable(
+                f"No pre-trained {model} model for region {bundle.region} "
+                f"(expected {self.models_dir / bundle.region / ARTIFACTS[model]})."
+            )
+        metrics = bundle.metrics.get(model)
+
+        if model == "arima":
+            result = bundle.models[model].forecast(steps=horizon, alpha=1 - confidence)
+            return ServedForecast(
+                forecast=result.forecast, lower=result.forecast_lower,
+                upper=result.forecast_upper, metrics=metrics,
+            )
+        if horizon > MAX_HORIZON:
+            raise ValueError(f"Horizon {horizon} exceeds the served maximum of {MAX_HORIZON} hours.")
+        return ServedForecast(forecast=bundle.forecasts[model].iloc[:horizon], metrics=metrics)
+
+
+@lru_cache(maxsize=1)
+def get_model_store() -> ModelStore:
+    """Process-wide ModelStore (loaded by the API lifespan)."""
+    from config.settings import settings
+    return ModelStore(
+        models_dir=settings.models_dir,
+        processed_dir=settings.data_proc_dir,
+        reload_seconds=settings.model_reload_seconds,
+    )
@@ -3,6 +3,7 @@ src/models/xgboost_model.py
 ============================
 XGBoost gradient-boosted tree forecaster for hourly energy demand.
 Uses time-based features from src/features/time_features.py.
+Multi-step forecasting (recursive or direct) runs through src/models/recursive.py.
 """
 from __future__ import annotations
 
@@ -35,6 +36,11 @@ class XGBoostForecaster:
 
     Uses time-feature columns (hour, day_of_week, month, lag_24, lag_168, etc.)
     produced by src.features.time_features.add_time_features().
+
+    To forecast future hours, fit on src.models.recursive.recursive_frame()
+    columns. forecast() then rolls the model forward one hour at a time.
+    Alternatively, fit_direct() trains one multi-output model that predicts
+    every hour of the horizon in a single call.
     """
 
     def __init__(
@@ -60,6 +66,7 @@ class XGBoostForecaster:
         self.early_stopping = early_stopping
         self._model         = None
         self._feature_cols: list[str] = []
+        self.direct_horizon: Optional[int] = None
 
     def fit(
         self,
@@ -101,8 +108,12 @@ class XGBoostForecaster:
             fit_kwargs["eval_set"] = [(X_val, y_val)]
             fit_kwargs["verbose"]  = False
 
-        self._model = xgb.XGBRegressor(**self.params)
+        self._model = xgb.XGBRegressor(
+            **self.params, early_stopping_rounds=self.early_stopping if val_df is not None else None,
+        )
         self._model.fit(X_train, y_train, **fit_kwargs)
+        self._model.get_booster().feature_names = self._feature_cols
+        self.direct_horizon = None
 
         importance = dict(zip(
             self._feature_cols,
@@ -114,6 +125,73 @@ class XGBoostForecaster:
         )
         return self
 
+    @property
+    def best_iteration(self) -> Optional[int]:
+        """Last useful boosting round when fitted with early stopping (else None)."""
+        return getattr(self._model, "best_iteration", None) if self._model is not None else None
+
+    def fit_direct(
+        self,
+        train_df: pd.DataFrame,
+        horizon: int,
+        val_df: Optional[pd.DataFrame] = None,
+        feature_cols: Optional[list[str]] = None,
+        target_col: str = "MW",
+    ) -> "XGBoostForecaster":
+        """
+        Fit a direct multi-horizon model: features at hour t → MW[t … t+horizon-1].
+
+        Uses XGBoost's multi-output trees, so the whole horizon is one model
+        and one predict call. train_df should come from recursive_frame().
+        """
+        try:
+            import xgboost as xgb  # type: ignore
+        except ImportError:
+            raise ImportError("xgboost not installed. Run: pip install xgboost")
+        from numpy.lib.stride_tricks import sliding_window_view
+
+        from .recursive import RECURSIVE_FEATURES
+
+        self._feature_cols = feature_cols or [c for c in RECURSIVE_FEATURES if c in train_df.columns]
+
+        def xy(df: pd.DataFrame) -> tuple[np.ndarray, np.ndarray]:
+            Y = sliding_window_view(df[target_col].to_numpy(np.float32), horizon)
+            return df[self._feature_cols].to_numpy(np.float32)[: len(Y)], Y
+
+        X_train, Y_train = xy(train_df)
+        fit_kwargs: dict = {}
+        if val_df is not None and len(val_df) >= horizon:
+            fit_kwargs["eval_set"] = [xy(val_df)]
+            fit_kwargs["verbose"]  = False
+
+        self._model = xgb.XGBRegressor(**self.params, tree_method="hist", multi_strategy="multi_output_tree")
+        self._model.fit(X_train, Y_train, **fit_kwargs)
+        booster = self._model.get_booster()
+        booster.feature_names = self._feature_cols
+        booster.set_attr(direct_horizon=str(horizon))
+        self.direct_horizon = horizon
+        logger.info(
+            "XGBoost direct model fitted: %d samples × %d features → %d hours.",
+            len(X_train), len(self._feature_cols), horizon,
+        )
+        return self
+
+    def forecast_many(self, histories: dict[str, pd.Series], steps: int) -> dict[str, pd.Series]:
+        """Forecast *steps* hours for several series (e.g. regions) in one batched pass."""
+        if self._model is None:
+            raise RuntimeError("Model not fitted. Call fit() first.")
+        from .recursive import RecursiveEngine
+        engine = RecursiveEngine(self._model, self._feature_cols)
+        if self.direct_horizon:
+            return engine.forecast_direct(histories, steps)
+        return engine.forecast(histories, steps)
+
+    def forecast(self, history: pd.Series, steps: int = 24) -> XGBResult:
+        """Forecast *steps* hours after the end of *history* (hourly MW series)."""
+        name = history.name or "MW"
+        fc = self.forecast_many({name: history}, steps)[name]
+        return XGBResult(forecast=fc)
+
     def predict(self, df: pd.DataFrame) -> np.ndarray:
         if self._model is None:
             raise RuntimeError("Model not fitted. Call fit() first.")
@@ -164,5 +242,9 @@ class XGBoostForecaster:
             raise ImportError("xgboost not installed. Run: pip install xgboost")
         self._model = xgb.XGBRegressor()
         self._model.load_model(str(path))
+        booster = self._model.get_booster()
+        self._feature_cols  = list(booster.feature_names or [])
+        horizon             = booster.attr("direct_horizon")
+        self.direct_horizon = int(horizon) if horizon else None
         logger.info("XGBoost model loaded from %s", path)
         return self
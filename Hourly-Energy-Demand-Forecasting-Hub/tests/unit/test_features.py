@@ -0,0 +1,73 @@
+"""
+tests/unit/test_features.py
+===========================
+Unit tests for the calendar kernel and the per-region feature cache.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.features.cache import compact_features, feature_path, load_features
+from src.features.time_features import add_time_features, calendar_features
+
+
+@pytest.fixture
+def long_df():
+    """Two years of synthetic hourly demand — enough to exercise lag_8760."""
+    rng = np.random.default_rng(7)
+    n = 2 * 8760
+    t = np.arange(n)
+    vals = 12_000 + 1_500 * np.sin(2 * np.pi * t / 24) + rng.normal(0, 150, n)
+    idx = pd.date_range("2021-01-01", periods=n, freq="h")
+    return pd.DataFrame({"MW": vals}, index=idx)
+
+
+# ── Calendar ───────────────────────────────────────────────────────────────────
+
+@pytest.mark.parametrize("day, expected", [
+    ("2022-11-24", 1),   # Thanksgiving (4th Thursday of November)
+    ("2022-05-30", 1),   # Memorial Day (last Monday of May)
+    ("2021-12-24", 1),   # Christmas observed (Dec 25 2021 is a Saturday)
+    ("2021-12-25", 1),   # …and the actual date
+    ("2023-07-04", 1),   # Independence Day
+    ("2022-11-25", 0),
+    ("2023-07-05", 0),
+])
+def test_calendar_holidays(day, expected):
+    idx = pd.date_range(day, periods=24, freq="h")
+    assert (calendar_features(idx)["is_holiday"] == expected).all()
+
+
+def test_calendar_matches_datetime_accessors():
+    idx = pd.date_range("2019-12-30", periods=24 * 400, freq="h")
+    cal = calendar_features(idx)
+    assert (cal["hour"] == idx.hour).all()
+    assert (cal["week"] == idx.isocalendar().week.to_numpy()).all()
+    assert (cal["season"].iloc[:24] == "Winter").all()
+    assert cal.loc["2020-07-01", "season_num"].eq(2).all()
+
+
+# ── Feature cache ──────────────────────────────────────────────────────────────
+
+def test_feature_cache_is_compact(long_df, tmp_path):
+    feat = load_features("TEST", long_df, cache_dir=tmp_path)
+    assert feature_path("TEST", tmp_path).exists()
+    assert feat["MW"].dtype == np.float64
+    assert feat["lag_24"].dtype == np.float32
+    assert isinstance(feat["season"].dtype, pd.CategoricalDtype)
+
+
+def test_feature_cache_appends_incrementally(long_df, tmp_path):
+    load_features("TEST", long_df.iloc[:-100], cache_dir=tmp_path)
+    extended = load_features("TEST", long_df, cache_dir=tmp_path)
+    expected = compact_features(add_time_features(long_df))
+    pd.testing.assert_frame_equal(extended, expected, check_freq=False)
+
+
+def test_feature_cache_rebuilds_on_revised_history(long_df, tmp_path):
+    load_features("TEST", long_df, cache_dir=tmp_path)
+    revised = long_df.copy()
+    revised.iloc[10, 0] += 500.0
+    feat = load_features("TEST", revised, cache_dir=tmp_path)
+    assert feat["MW"].iloc[10] == pytest.approx(revised["MW"].iloc[10])
+    assert feat["lag_1"].iloc[11] == pytest.approx(revised["MW"].iloc[10])
@@ -0,0 +1,81 @@
+"""
+tests/unit/test_hierarchical.py
+===============================
+Unit tests for hierarchy construction, reconciliation and the grid forecaster.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.models.hierarchical import (
+    METHODS, Hierarchy, HierarchicalForecaster, reconcile, shrink_covariance,
+)
+
+TREE = {"TOP": ["G", "C"], "G": ["A", "B"]}
+
+
+@pytest.fixture
+def wide():
+    """Six weeks of three synthetic zones; C starts a day late."""
+    rng = np.random.default_rng(5)
+    n = 24 * 42
+    t = np.arange(n)
+    idx = pd.date_range("2022-03-01", periods=n, freq="h")
+    base = np.sin(2 * np.pi * t / 24)
+    df = pd.DataFrame({
+        "A": 5_000 + 600 * base + rng.normal(0, 40, n),
+        "B": 2_000 + 300 * base + rng.normal(0, 20, n),
+        "C": 9_000 + 900 * base + rng.normal(0, 60, n),
+    }, index=idx)
+    df.iloc[:24, 2] = np.nan
+    return df
+
+
+def test_hierarchy_summing_matrix():
+    h = Hierarchy.from_tree(TREE)
+    assert h.nodes == ["TOP", "G", "A", "B", "C"]
+    np.testing.assert_array_equal(
+        h.S.toarray(),
+        [[1, 1, 1], [1, 1, 0], [1, 0, 0], [0, 1, 0], [0, 0, 1]],
+    )
+
+
+@pytest.mark.parametrize("method", METHODS)
+def test_reconcile_is_coherent_and_keeps_coherent_input(method):
+    rng = np.random.default_rng(0)
+    h = Hierarchy.from_tree(TREE)
+    residuals = rng.normal(size=(200, len(h.nodes)))
+    base = pd.DataFrame(rng.normal(100, 10, size=(6, len(h.nodes))), columns=h.nodes)
+    rec = reconcile(base, h, method, residuals)
+    np.testing.assert_allclose(rec["TOP"], rec[["A", "B", "C"]].sum(axis=1))
+    np.testing.assert_allclose(rec["G"], rec["A"] + rec["B"])
+
+    coherent = h.aggregate(base[h.bottom])
+    np.testing.assert_allclose(reconcile(coherent, h, method, residuals), coherent)
+
+
+def test_shrink_covariance_keeps_variances():
+    rng = np.random.default_rng(1)
+    r = rng.normal(size=(50, 4))
+    W = shrink_covariance(r)
+    np.testing.assert_allclose(np.diag(W), r.var(axis=0))
+    assert np.all(np.linalg.eigvalsh(W) > 0)
+
+
+def test_hierarchical_forecast_is_coherent(wide):
+    pytest.importorskip("xgboost")
+    from src.models.xgboost_model import XGBoostForecaster
+
+    hf = HierarchicalForecaster(TREE, model=XGBoostForecaster(n_estimators=20)).fit(wide)
+    assert hf.residuals.shape == (hf.residual_hours, 5)
+    result = hf.forecast(wide, steps=24)
+    fc = result.forecast
+    assert list(fc.columns) == ["TOP", "G", "A", "B", "C"] and len(fc) == 24
+    assert fc.index[0] == wide.index[-1] + pd.Timedelta(hours=1)
+    np.testing.assert_allclose(fc["TOP"], fc["G"] + fc["C"])
+    assert not np.allclose(result.base["TOP"], result.base["G"] + result.base["C"])
+
+
+def test_unknown_method_rejected():
+    with pytest.raises(ValueError, match="Unknown reconciliation method"):
+        HierarchicalForecaster(TREE, method="bottom_up")
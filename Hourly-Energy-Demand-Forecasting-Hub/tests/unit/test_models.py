@@ -8,7 +8,9 @@ import pandas as pd
 import pytest
 
 from src.models.arima_model import ARIMAForecaster, ARIMAResult
-from src.models.evaluate import compute_metrics, compare_models, MetricsResult
+from src.models.evaluate import (
+    compute_metrics, compare_models, MetricsResult, rolling_cross_validate,
+)
 from src.features.time_features import add_time_features
 
 
@@ -53,6 +55,26 @@ def test_arima_train_test_split(short_series):
     assert result.forecast is not None
 
 
+def test_arima_window_limits_fit(short_series):
+    model = ARIMAForecaster(order=(1, 1, 1), window=120).fit(short_series)
+    assert model._fit_result.nobs == 120
+    assert model.last_timestamp == short_series.index[-1]
+    warm = ARIMAForecaster(order=(1, 1, 1), window=120).fit(short_series, start_params=model.params)
+    np.testing.assert_allclose(warm.params, model.params, rtol=1e-3)
+
+
+def test_arima_update_matches_full_filter(short_series):
+    params = ARIMAForecaster(order=(1, 1, 1)).fit(short_series).params
+    served = ARIMAForecaster(order=(1, 1, 1)).apply(short_series.iloc[:-10], params)
+    before = served.forecast(6).forecast
+    updated = served.update(short_series)
+    pd.testing.assert_series_equal(served.forecast(6).forecast, before)     # served copy untouched
+    full = ARIMAForecaster(order=(1, 1, 1)).apply(short_series, params)
+    np.testing.assert_allclose(updated.forecast(6).forecast, full.forecast(6).forecast)
+    with pytest.raises(ValueError, match="expected"):
+        updated.update(short_series.iloc[-5:].shift(10, freq="h"))     # 5-hour gap
+
+
 # ── Evaluate ───────────────────────────────────────────────────────────────────
 
 def test_compute_metrics_perfect_prediction():
@@ -80,6 +102,35 @@ def test_compare_models_sorts_by_rmse():
     assert list(df["model"]) == ["A", "B", "C"]
 
 
+def _fit_arima(train, start_params=None):
+    if len(train) < 150:
+        raise ValueError("too short")
+    return ARIMAForecaster(order=(1, 1, 1)).fit(train, start_params=start_params)
+
+
+def test_rolling_cv_parallel_matches_serial(short_series):
+    kwargs = dict(n_folds=3, test_size=24, min_train_size=100)
+    serial   = rolling_cross_validate(short_series, _fit_arima, n_jobs=1, **kwargs)
+    parallel = rolling_cross_validate(short_series, _fit_arima, n_jobs=2, **kwargs)
+    assert serial["fold_metrics"] == parallel["fold_metrics"]
+    assert [f["fold"] for f in parallel["folds"]] == [1, 2, 3]
+    assert parallel["n_failed"] == 1                                 # fold 3 trains on 128 h
+    assert "too short" in parallel["folds"][2]["error"]
+    assert parallel["folds"][0]["fit_seconds"] > 0
+
+
+def test_rolling_cv_warm_start_chains_params(short_series):
+    seen = []
+
+    def factory(train, start_params=None):
+        seen.append(start_params)
+        return ARIMAForecaster(order=(1, 1, 1)).fit(train, start_params=start_params)
+
+    rolling_cross_validate(short_series, factory, n_folds=2, test_size=24,
+                           min_train_size=100, n_jobs=1, warm_start=True)
+    assert seen[0] is None and set(seen[1]) == {"ar.L1", "ma.L1", "sigma2"}
+
+
 # ── Time Features ──────────────────────────────────────────────────────────────
 
 def test_add_time_features_adds_columns(short_series):
@@ -95,3 +146,75 @@ def test_add_time_features_no_data_loss(short_series):
     df = pd.DataFrame({"MW": short_series})
     result = add_time_features(df)
     assert len(result) == len(short_series)
+
+
+# ── Recursive / direct multi-step ──────────────────────────────────────────────
+
+@pytest.fixture
+def recursive_df():
+    """Six weeks of hourly data as a recursive_frame() training frame."""
+    from src.models.recursive import recursive_frame
+    rng = np.random.default_rng(1)
+    n = 24 * 42
+    t = np.arange(n)
+    vals = 10_000 + 800 * np.sin(2 * np.pi * t / 24) + rng.normal(0, 50, n)
+    idx = pd.date_range("2022-03-01", periods=n, freq="h")
+    return recursive_frame(add_time_features(pd.DataFrame({"MW": vals}, index=idx)))
+
+
+def test_recursive_engine_first_row_matches_training_frame(recursive_df):
+    from src.models.recursive import RECURSIVE_FEATURES, RecursiveEngine
+
+    class Echo:
+        def predict(self, X):
+            self.X = X.copy()
+            return np.zeros(len(X))
+
+    model = Echo()
+    history = recursive_df["MW"].iloc[:-1]
+    RecursiveEngine(model, RECURSIVE_FEATURES).forecast({"R": history}, steps=1)
+    expected = recursive_df[RECURSIVE_FEATURES].iloc[-1].to_numpy(np.float32)
+    np.testing.assert_allclose(model.X[0], expected, rtol=1e-5)
+
+
+def test_recursive_engine_rejects_leaky_features():
+    from src.models.recursive import RecursiveEngine
+    with pytest.raises(ValueError, match="cannot be generated"):
+        RecursiveEngine(object(), ["hour", "rolling_mean_24", "log_MW"])
+
+
+def test_xgboost_recursive_forecast_batches_regions(recursive_df, tmp_path):
+    pytest.importorskip("xgboost")
+    from src.models.xgboost_model import XGBoostForecaster
+
+    model = XGBoostForecaster(n_estimators=30).fit(recursive_df)
+    history = recursive_df["MW"]
+    fc = model.forecast_many({"A": history, "B": history.iloc[:-24] * 1.1}, steps=48)
+    assert len(fc["A"]) == 48 and fc["A"].index[0] == history.index[-1] + pd.Timedelta(hours=1)
+    assert fc["B"].index[0] == history.index[-25] + pd.Timedelta(hours=1)
+
+    model.save(tmp_path / "xgb.json")
+    reloaded = XGBoostForecaster().load(tmp_path / "xgb.json")
+    np.testing.assert_allclose(reloaded.forecast(history, steps=48).forecast, fc["A"], rtol=1e-5)
+
+
+def test_xgboost_forecast_respects_early_stopping(recursive_df):
+    pytest.importorskip("xgboost")
+    from src.models.xgboost_model import XGBoostForecaster
+
+    train, val = recursive_df.iloc[:-168], recursive_df.iloc[-168:]
+    model = XGBoostForecaster(n_estimators=300, early_stopping=5).fit(train, val_df=val.assign(MW=val["MW"] * 1.3))
+    assert model.best_iteration is not None and model.best_iteration < 299
+    one_step = model.forecast(recursive_df["MW"].iloc[:-1], steps=1).forecast
+    np.testing.assert_allclose(one_step, model.predict(recursive_df.iloc[[-1]]), rtol=1e-5)
+
+
+def test_xgboost_direct_forecast(recursive_df):
+    pytest.importorskip("xgboost")
+    from src.models.xgboost_model import XGBoostForecaster
+
+    model = XGBoostForecaster(n_estimators=20).fit_direct(recursive_df, horizon=24)
+    result = model.forecast(recursive_df["MW"], steps=24)
+    assert len(result.forecast) == 24 and result.forecast.notna().all()
+    with pytest.raises(ValueError, match="covers 24 hours"):
+        model.forecast(recursive_df["MW"], steps=48)
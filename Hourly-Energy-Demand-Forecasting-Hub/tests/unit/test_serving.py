@@ -0,0 +1,146 @@
+"""
+tests/unit/test_serving.py
+==========================
+Unit tests for the pre-loaded model store behind /predict.
+"""
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+from src.data.store import save_parquet
+from src.models.arima_model import ARIMAForecaster
+from src.models.serving import ModelNotAvailable, ModelStore, get_model_store
+
+
+@pytest.fixture
+def store(tmp_path):
+    """Processed REGION parquet + stored ARIMA parameters in temp dirs."""
+    rng = np.random.default_rng(3)
+    n = 24 * 60
+    t = np.arange(n)
+    vals = 10_000 + 900 * np.sin(2 * np.pi * t / 24) + rng.normal(0, 80, n)
+    df = pd.DataFrame({"MW": vals}, index=pd.date_range("2023-01-01", periods=n, freq="h"))
+    save_parquet(df, "TEST", processed_dir=tmp_path / "processed")
+
+    model = ARIMAForecaster(order=(1, 1, 1)).fit(df["MW"].iloc[:-240])
+    model.save_params(tmp_path / "models" / "TEST" / "arima_params.json")
+    (tmp_path / "models" / "TEST" / "serving_metrics.json").write_text(
+        json.dumps({"arima": {"mae": 1.0, "rmse": 2.0, "mape": 3.0}})
+    )
+    return ModelStore(tmp_path / "models", tmp_path / "processed", reload_seconds=0, background=False)
+
+
+def test_arima_served_from_stored_params(store):
+    served = store.forecast("test", "arima", horizon=24, confidence=0.9)
+    history = store.region("TEST").history
+    assert len(served.forecast) == 24
+    assert served.forecast.index[0] == history.index[-1] + pd.Timedelta(hours=1)
+    assert (served.lower < served.forecast).all() and (served.forecast < served.upper).all()
+    assert served.metrics["mape"] == 3.0
+
+
+def test_missing_artifact_raises(store):
+    with pytest.raises(ModelNotAvailable, match="xgboost"):
+        store.forecast("TEST", "xgboost", horizon=24)
+
+
+def test_store_reloads_changed_artifacts(store):
+    before = store.forecast("TEST", "arima", horizon=6).forecast
+    path = store.models_dir / "TEST" / "arima_params.json"
+    meta = json.loads(path.read_text())
+    meta["params"]["ar.L1"] = -0.5
+    path.write_text(json.dumps(meta))
+    after = store.forecast("TEST", "arima", horizon=6).forecast
+    assert not np.allclose(before, after)
+
+
+def test_store_advances_arima_over_new_hours(store, monkeypatch):
+    model = store.region("TEST").models["arima"]
+    served_until = model.last_timestamp
+    df = store.region("TEST").history.to_frame("MW")
+    extra = pd.DataFrame(
+        {"MW": df["MW"].iloc[-24:].to_numpy()},
+        index=df.index[-1] + pd.to_timedelta(np.arange(1, 25), unit="h"),
+    )
+    full = pd.concat([df, extra])
+    save_parquet(full, "TEST", processed_dir=store.processed_dir)
+    monkeypatch.setattr(ARIMAForecaster, "from_params", None)      # filtered forward, not reloaded
+    served = store.forecast("TEST", "arima", horizon=3)
+    assert store.region("TEST").models["arima"] is not model
+    assert model.last_timestamp == served_until                     # the old bundle kept its model
+    assert served.forecast.index[0] == full.index[-1] + pd.Timedelta(hours=1)
+
+
+def test_xgboost_served_as_prefix_of_precomputed_forecast(store, tmp_path):
+    pytest.importorskip("xgboost")
+    from src.features.time_features import add_time_features
+    from src.models.recursive import recursive_frame
+    from src.models.xgboost_model import XGBoostForecaster
+
+    history = store.region("TEST").history
+    frame = recursive_frame(add_time_features(history.to_frame("MW")))
+    XGBoostForecaster(n_estimators=20).fit(frame).save(store.models_dir / "TEST" / "xgboost.json")
+
+    short = store.forecast("TEST", "xgboost", horizon=12).forecast
+    full = store.forecast("TEST", "xgboost", horizon=168).forecast
+    assert len(full) == 168
+    pd.testing.assert_series_equal(short, full.iloc[:12])
+
+
+def _append_hours(store, hours: int) -> pd.DataFrame:
+    df = store.region("TEST").history.to_frame("MW")
+    extra = pd.DataFrame(
+        {"MW": df["MW"].iloc[-hours:].to_numpy()},
+        index=df.index[-1] + pd.to_timedelta(np.arange(1, hours + 1), unit="h"),
+    )
+    full = pd.concat([df, extra])
+    save_parquet(full, "TEST", processed_dir=store.processed_dir)
+    return full
+
+
+def test_xgboost_object_reused_when_only_data_changes(store):
+    pytest.importorskip("xgboost")
+    from src.features.time_features import add_time_features
+    from src.models.recursive import recursive_frame
+    from src.models.xgboost_model import XGBoostForecaster
+
+    history = store.region("TEST").history
+    frame = recursive_frame(add_time_features(history.to_frame("MW")))
+    XGBoostForecaster(n_estimators=20).fit(frame).save(store.models_dir / "TEST" / "xgboost.json")
+    model = store.region("TEST").models["xgboost"]
+
+    full = _append_hours(store, 24)
+    served = store.forecast("TEST", "xgboost", horizon=6).forecast
+    assert store.region("TEST").models["xgboost"] is model
+    assert served.index[0] == full.index[-1] + pd.Timedelta(hours=1)     # forecast recomputed
+
+
+def test_background_refresh_serves_current_models_meanwhile(store):
+    store.background = True
+    before = store.region("TEST")
+    full = _append_hours(store, 24)
+
+    assert store.region("TEST") is before            # request is not held up by the reload
+    store._refreshes["TEST"].join(timeout=30)
+    after = store.region("TEST")
+    assert after is not before and after.history.index[-1] == full.index[-1]
+
+
+def test_predict_endpoint_uses_store(store):
+    from src.api.main import app
+
+    app.dependency_overrides[get_model_store] = lambda: store
+    try:
+        with TestClient(app) as client:
+            ok = client.post("/api/v1/predict", json={"region": "TEST", "model": "arima", "horizon": 6})
+            missing = client.post("/api/v1/predict", json={"region": "TEST", "model": "lstm"})
+    finally:
+        app.dependency_overrides.clear()
+    assert ok.status_code == 200
+    body = ok.json()
+    assert len(body["forecast"]) == 6 and body["mape"] == 3.0
+    assert body["forecast"][0]["lower_MW"] is not None
+    assert missing.status_code == 404